@@ -0,0 +1,5 @@
+"""
+Benchmarks for the formatters, extractors and listing tools
+
+Run with ``python -m benchmarks``; see ``python -m benchmarks --help``.
+"""
@@ -0,0 +1,77 @@
+"""
+Run the benchmark suite
+
+    python -m benchmarks                      # run and compare against baselines
+    python -m benchmarks --check              # exit 1 on a throughput regression
+    python -m benchmarks --update-baselines   # record new baselines
+    python -m benchmarks -k extract_log_info -k hierarchy
+"""
+
+import argparse
+import json
+import logging
+import sys
+from pathlib import Path
+
+from .cases import build_cases, select_cases
+from .harness import (
+    BASELINES_PATH,
+    DEFAULT_THRESHOLD,
+    compare,
+    format_report,
+    load_baselines,
+    run_case,
+    save_baselines,
+)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the datadog-mcp formatters and extractors")
+    parser.add_argument("-k", dest="patterns", action="append", default=[],
+                        help="Only run benchmarks whose name[scale] contains this (repeatable)")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repeats per benchmark (default: 5)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"Allowed relative throughput drop (default: {DEFAULT_THRESHOLD})")
+    parser.add_argument("--check", action="store_true", help="Exit with status 1 if any benchmark regressed")
+    parser.add_argument("--update-baselines", action="store_true", help=f"Write results to {BASELINES_PATH.name}")
+    parser.add_argument("--baselines", default=str(BASELINES_PATH), help="Baselines file")
+    parser.add_argument("--json", dest="json_output", help="Also write raw results to this file")
+    parser.add_argument("--list", action="store_true", help="List benchmarks and exit")
+    args = parser.parse_args()
+
+    # Tools log errors on failure paths; keep benchmark output readable
+    logging.basicConfig(level=logging.WARNING)
+
+    cases = select_cases(build_cases(), args.patterns)
+    if args.list:
+        for case in cases:
+            print(f"{case.key} ({case.items} items)")
+        return 0
+
+    results = []
+    for case in cases:
+        print(f"running {case.key}...", file=sys.stderr, flush=True)
+        results.append(run_case(case, repeat=args.repeat))
+
+    baselines_path = Path(args.baselines)
+    compare(results, load_baselines(baselines_path), threshold=args.threshold)
+    print(format_report(results))
+
+    if args.json_output:
+        Path(args.json_output).write_text(json.dumps(results, indent=2) + "\n")
+
+    if args.update_baselines:
+        save_baselines(results, baselines_path)
+        print(f"\nBaselines written to {baselines_path}")
+        return 0
+
+    regressions = [r for r in results if r["regressed"]]
+    if regressions:
+        print(f"\n{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%} throughput")
+        if args.check:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
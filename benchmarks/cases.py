@@ -0,0 +1,171 @@
+"""
+Benchmark cases at several production-like scales
+
+Inputs come from the seeded generators shared with the fake Datadog API,
+so every run measures the same data.
+"""
+
+from typing import Any, Dict, List
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from datadog_mcp.tools import get_logs_field_values, list_metrics, list_monitors, list_slos
+from datadog_mcp.utils.formatters import (
+    TABLE_LOG_PLAN,
+    extract_log_info,
+    extract_trace_info,
+    format_logs_as_table,
+    format_metrics_table,
+    format_traces_as_hierarchy,
+)
+from datadog_mcp.utils.json_codec import dumps
+from datadog_mcp.utils.monitor_snapshot import MonitorSnapshot
+from tests.fake_datadog.generators import (
+    generate_logs,
+    generate_metric_names,
+    generate_metric_series,
+    generate_monitors,
+    generate_slos,
+    generate_spans,
+)
+
+from .harness import BenchmarkCase
+
+LOG_SCALES = {"small": 100, "medium": 1_000, "large": 5_000}
+# (traces, spans per trace)
+SPAN_SCALES = {"small": (10, 100), "medium": (50, 200), "large": (200, 100)}
+SERIES_SCALES = {"small": 200, "medium": 2_000}
+LISTING_SCALES = {"small": 100, "large": 1_000, "xlarge": 10_000}
+SNAPSHOT_SCALES = {"large": 1_000, "xlarge": 20_000}
+
+
+def _logs(count: int) -> List[Dict[str, Any]]:
+    return generate_logs(count, seed=1)
+
+
+def _spans(traces: int, spans_per_trace: int) -> List[Dict[str, Any]]:
+    return generate_spans(traces, spans_per_trace, seed=2)
+
+
+def _metrics(count: int) -> Dict[str, Dict[str, Any]]:
+    """One single-series query result per metric, as passed to format_metrics_table."""
+    series = generate_metric_series("trace.http.request.duration", count, points=60, seed=3, group_by=["host"])
+    return {f"{s['metric']}{{{s['scope']}}}": {"series": [s]} for s in series}
+
+
+def _field_values(count: int) -> Dict[str, Any]:
+    """A logs aggregation result as passed to get_logs_field_values._format_as_table."""
+    values = [{"value": f"service-{i}-" + "x" * (i % 60), "count": count - i} for i in range(count)]
+    return {"field": "service", "time_range": "1h", "values": values, "total_values": count}
+
+
+def _monitor_snapshot(count: int) -> MonitorSnapshot:
+    snapshot = MonitorSnapshot()
+    snapshot.apply(generate_monitors(count, seed=4))
+    return snapshot
+
+
+def _request(**arguments: Any) -> MagicMock:
+    request = MagicMock()
+    request.arguments = arguments
+    return request
+
+
+def _listing_case(name: str, scale: str, count: int, module: Any, fetch_name: str,
+                  payload: Any, arguments: Dict[str, Any]) -> BenchmarkCase:
+    async def run(request: MagicMock) -> None:
+        result = await module.handle_call(request)
+        assert not result.isError, result.content[0].text
+
+    return BenchmarkCase(
+        name=name,
+        scale=scale,
+        items=count,
+        setup=lambda: _request(**arguments),
+        func=run,
+        # Serve the fetch from memory so only the tool's own processing is measured
+        context=lambda: patch.object(module, fetch_name, AsyncMock(return_value=payload)),
+    )
+
+
+def build_cases() -> List[BenchmarkCase]:
+    """All benchmark cases, in a stable order."""
+    cases: List[BenchmarkCase] = []
+
+    for scale, count in LOG_SCALES.items():
+        cases.append(BenchmarkCase(
+            "extract_log_info", scale, count,
+            setup=lambda count=count: _logs(count),
+            func=extract_log_info,
+        ))
+        cases.append(BenchmarkCase(
+            "extract_log_info.table_plan", scale, count,
+            setup=lambda count=count: _logs(count),
+            func=lambda logs: extract_log_info(logs, TABLE_LOG_PLAN),
+        ))
+        cases.append(BenchmarkCase(
+            "format_logs_as_table", scale, count,
+            setup=lambda count=count: extract_log_info(_logs(count)),
+            func=format_logs_as_table,
+        ))
+
+    for scale, (traces, per_trace) in SPAN_SCALES.items():
+        count = traces * per_trace
+        cases.append(BenchmarkCase(
+            "extract_trace_info", scale, count,
+            setup=lambda traces=traces, per_trace=per_trace: _spans(traces, per_trace),
+            func=extract_trace_info,
+        ))
+        cases.append(BenchmarkCase(
+            "format_traces_as_hierarchy", scale, count,
+            setup=lambda traces=traces, per_trace=per_trace: extract_trace_info(_spans(traces, per_trace)),
+            func=format_traces_as_hierarchy,
+        ))
+        cases.append(BenchmarkCase(
+            "dumps.traces", scale, count,
+            setup=lambda traces=traces, per_trace=per_trace: {"traces": extract_trace_info(_spans(traces, per_trace))},
+            func=dumps,
+        ))
+
+    for scale, count in SERIES_SCALES.items():
+        cases.append(BenchmarkCase(
+            "format_metrics_table", scale, count,
+            setup=lambda count=count: _metrics(count),
+            func=format_metrics_table,
+        ))
+
+    for scale, count in LISTING_SCALES.items():
+        cases.append(_listing_case(
+            "list_monitors.table", scale, count, list_monitors, "fetch_monitors",
+            generate_monitors(count, seed=4), {"format": "table", "page_size": count},
+        ))
+        cases.append(_listing_case(
+            "list_slos.table", scale, count, list_slos, "fetch_slos",
+            generate_slos(count, seed=5), {"format": "table", "limit": count},
+        ))
+        cases.append(_listing_case(
+            "list_metrics.list", scale, count, list_metrics, "fetch_metrics_list",
+            {"data": generate_metric_names(count, seed=6), "meta": {}}, {"format": "list", "limit": count},
+        ))
+
+        cases.append(BenchmarkCase(
+            "get_logs_field_values.table", scale, count,
+            setup=lambda count=count: _field_values(count),
+            func=get_logs_field_values._format_as_table,
+        ))
+
+    for scale, count in SNAPSHOT_SCALES.items():
+        cases.append(BenchmarkCase(
+            "monitor_snapshot.query", scale, count,
+            setup=lambda count=count: _monitor_snapshot(count),
+            # "All alerting monitors of one team"
+            func=lambda snapshot: snapshot.query(monitor_tags="team:payments", state="Alert"),
+        ))
+
+    return cases
+
+
+def select_cases(cases: List[BenchmarkCase], patterns: List[str]) -> List[BenchmarkCase]:
+    """Keep cases whose ``name[scale]`` contains any of the patterns."""
+    if not patterns:
+        return cases
+    return [case for case in cases if any(pattern in case.key for pattern in patterns)]
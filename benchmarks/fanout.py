@@ -0,0 +1,154 @@
+"""
+Fan-out latency benchmark: per-call clients vs the shared connection pool
+
+Runs rounds of N concurrent team-membership fetches (the shape of the
+fan-out paths: SLO histories, all_pages listings) against the
+fake Datadog API, once per connection mode:
+
+- ``per-call``: a new client and new connections for every fetch
+- ``pooled``: the shared pool over HTTP/1.1
+- ``http2``: the shared pool over HTTP/2 (needs ``h2`` and an HTTPS API
+  that speaks HTTP/2, given with --api-url; the local stand-in is HTTP/1.1)
+
+    python -m benchmarks.fanout --requests 50 --rounds 10
+    python -m benchmarks.fanout --connect-latency 0.03 --latency 0.05
+
+``--connect-latency`` charges the first request on every new connection,
+standing in for the TCP and TLS handshakes a real API costs.
+"""
+
+import argparse
+import asyncio
+import inspect
+import json
+import statistics
+import sys
+import time
+from typing import Any, Dict, List, Optional
+from unittest.mock import patch
+
+import httpx
+
+from datadog_mcp.utils import datadog_client, http_pool
+from datadog_mcp.utils.circuit_breaker import CircuitBreakerTransport
+from datadog_mcp.utils.deadline import request_timeout
+from datadog_mcp.utils.http_pool import SharedTransport
+from datadog_mcp.utils.orgs import default_org_at
+from tests.fake_datadog import FakeDatadogConfig, FakeDatadogServer
+
+MODES = ["per-call", "pooled", "http2"]
+
+
+def _per_call_client(**kwargs: Any) -> httpx.AsyncClient:
+    """How fetches built their client before the shared pool."""
+    return httpx.AsyncClient(timeout=request_timeout(), transport=CircuitBreakerTransport(), **kwargs)
+
+
+async def run_rounds(api_url: str, team_ids: List[str], rounds: int) -> List[float]:
+    """Seconds per round of concurrent membership fetches, one fetch per team."""
+    fetch = inspect.unwrap(datadog_client.fetch_team_memberships)  # skip caching and coalescing
+    timings = []
+    with default_org_at(api_url):
+        for _ in range(rounds):
+            started = time.perf_counter()
+            await asyncio.gather(*(fetch(team_id) for team_id in team_ids))
+            timings.append(time.perf_counter() - started)
+    return timings
+
+
+async def run_mode(mode: str, api_url: str, team_ids: List[str], rounds: int) -> Optional[Dict[str, Any]]:
+    """Time one connection mode; None if it cannot run here."""
+    if mode == "per-call":
+        with patch.object(datadog_client, "_http_client", _per_call_client):
+            timings = await run_rounds(api_url, team_ids, rounds)
+    else:
+        http2 = mode == "http2"
+        if http2 and (http_pool.h2 is None or not api_url.startswith("https://")):
+            return None
+        transport = SharedTransport(http2=http2)
+        try:
+            with patch.object(datadog_client, "shared_transport", transport):
+                timings = await run_rounds(api_url, team_ids, rounds)
+        finally:
+            await transport.close_pool()
+    return {
+        "first_round_s": round(timings[0], 4),
+        "median_round_s": round(statistics.median(timings), 4),
+        "mean_round_s": round(statistics.fmean(timings), 4),
+    }
+
+
+def _connections(fake: Optional[FakeDatadogServer], before: int) -> Optional[int]:
+    return fake.stats()["connections"] - before if fake is not None else None
+
+
+async def run_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    config = FakeDatadogConfig(
+        teams=args.requests, latency=args.latency, connect_latency=args.connect_latency,
+    )
+    fake = None if args.api_url else FakeDatadogServer(config).start()
+    try:
+        api_url = args.api_url or fake.url
+        team_ids = [f"team-{i}" for i in range(args.requests)]
+        if fake is not None:
+            team_ids = sorted(fake.app.state.fake.team_ids)[:args.requests]
+        results: Dict[str, Any] = {}
+        for mode in args.modes:
+            before = fake.stats()["connections"] if fake is not None else 0
+            result = await run_mode(mode, api_url, team_ids, args.rounds)
+            if result is not None:
+                result["connections"] = _connections(fake, before)
+            results[mode] = result
+        return {"requests": args.requests, "rounds": args.rounds, "modes": results}
+    finally:
+        if fake is not None:
+            fake.stop()
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    lines = [
+        f"{report['requests']}-way fan-out, {report['rounds']} rounds",
+        f"{'mode':<10} {'first':>9} {'median':>9} {'mean':>9} {'connections':>12}",
+    ]
+    baseline = (report["modes"].get("per-call") or {}).get("median_round_s")
+    for mode, result in report["modes"].items():
+        if result is None:
+            lines.append(f"{mode:<10} skipped (needs the h2 package and an HTTPS API speaking HTTP/2)")
+            continue
+        connections = "-" if result["connections"] is None else result["connections"]
+        line = (f"{mode:<10} {result['first_round_s'] * 1000:>7.1f}ms {result['median_round_s'] * 1000:>7.1f}ms "
+                f"{result['mean_round_s'] * 1000:>7.1f}ms {connections:>12}")
+        if baseline and mode != "per-call":
+            line += f"  ({baseline / result['median_round_s']:.1f}x faster)"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark fan-out latency per connection mode")
+    parser.add_argument("--requests", type=int, default=50, help="Concurrent fetches per round (default: 50)")
+    parser.add_argument("--rounds", type=int, default=10, help="Rounds per mode (default: 10)")
+    parser.add_argument("--latency", type=float, default=0.02, help="Fake API latency per request, seconds")
+    parser.add_argument("--connect-latency", type=float, default=0.02,
+                        help="Fake API latency added per new connection, seconds (default: 0.02)")
+    parser.add_argument("--mode", dest="modes", action="append", choices=MODES,
+                        help="Connection mode to measure (default: all)")
+    parser.add_argument("--api-url", help="Use an already running API stand-in instead of starting one")
+    parser.add_argument("--json", dest="json_output", help="Also write the report to this file")
+    args = parser.parse_args(argv)
+    args.modes = args.modes or MODES
+    return args
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    report = asyncio.run(run_benchmark(args))
+    print(format_report(report))
+    if args.json_output:
+        with open(args.json_output, "w") as output:
+            json.dump(report, output, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,186 @@
+"""
+Benchmark harness: timing, peak memory and baseline comparison
+"""
+
+import asyncio
+import json
+import platform
+import statistics
+import sys
+import timeit
+import tracemalloc
+from contextlib import nullcontext
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, ContextManager, Dict, List, Optional
+
+BASELINES_PATH = Path(__file__).with_name("baselines.json")
+DEFAULT_THRESHOLD = 0.25
+
+
+@dataclass
+class BenchmarkCase:
+    """A function measured on inputs built (untimed) by ``setup``."""
+
+    name: str
+    scale: str
+    items: int
+    setup: Callable[[], Any]
+    func: Callable[[Any], Any]
+    context: Optional[Callable[[], ContextManager]] = None
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}[{self.scale}]"
+
+
+def _bind(case: BenchmarkCase, inputs: Any, loop: asyncio.AbstractEventLoop) -> Callable[[], Any]:
+    """Return a zero-argument callable running the case once."""
+    if asyncio.iscoroutinefunction(case.func):
+        return lambda: loop.run_until_complete(case.func(inputs))
+    return lambda: case.func(inputs)
+
+
+def measure_peak_memory(call: Callable[[], Any]) -> int:
+    """Peak bytes allocated by a single call, as seen by tracemalloc."""
+    already_tracing = tracemalloc.is_tracing()
+    if not already_tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    baseline, _ = tracemalloc.get_traced_memory()
+    try:
+        call()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        if not already_tracing:
+            tracemalloc.stop()
+    return max(0, peak - baseline)
+
+
+def run_case(case: BenchmarkCase, repeat: int = 5) -> Dict[str, Any]:
+    """Time a case and measure its peak memory.
+
+    Timing and memory are measured in separate runs since tracemalloc
+    slows allocation-heavy code down considerably.
+
+    Returns:
+        Result dictionary with per-call timings and throughput in items/s
+    """
+    loop = asyncio.new_event_loop()
+    try:
+        with (case.context() if case.context else nullcontext()):
+            call = _bind(case, case.setup(), loop)
+            call()  # warm up caches and lazy imports
+
+            timer = timeit.Timer(call)
+            number, _ = timer.autorange()
+            timings = [total / number for total in timer.repeat(repeat=repeat, number=number)]
+            peak = measure_peak_memory(call)
+    finally:
+        loop.close()
+
+    best = min(timings)
+    return {
+        "name": case.name,
+        "scale": case.scale,
+        "items": case.items,
+        "best_s": best,
+        "median_s": statistics.median(timings),
+        "items_per_s": case.items / best if best > 0 else float("inf"),
+        "peak_memory_bytes": peak,
+    }
+
+
+def environment_info() -> Dict[str, str]:
+    """Describe the machine the results were recorded on."""
+    return {
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+    }
+
+
+def load_baselines(path: Path = BASELINES_PATH) -> Dict[str, Any]:
+    """Load stored baselines, or an empty set if none were recorded yet."""
+    if not path.exists():
+        return {"environment": {}, "results": {}}
+    return json.loads(path.read_text())
+
+
+def save_baselines(results: List[Dict[str, Any]], path: Path = BASELINES_PATH, merge: bool = True) -> None:
+    """Store results as the new baselines, keyed by ``name[scale]``."""
+    stored = load_baselines(path) if merge else {"results": {}}
+    for result in results:
+        stored["results"][f"{result['name']}[{result['scale']}]"] = {
+            "items": result["items"],
+            "items_per_s": round(result["items_per_s"], 2),
+            "peak_memory_bytes": result["peak_memory_bytes"],
+        }
+    stored["environment"] = environment_info()
+    stored["results"] = dict(sorted(stored["results"].items()))
+    path.write_text(json.dumps(stored, indent=2) + "\n")
+
+
+def compare(
+    results: List[Dict[str, Any]],
+    baselines: Dict[str, Any],
+    threshold: float = DEFAULT_THRESHOLD,
+) -> List[Dict[str, Any]]:
+    """Annotate results with their change against the baselines.
+
+    Args:
+        results: Results from run_case
+        baselines: Baselines as returned by load_baselines
+        threshold: Allowed relative throughput drop before a result counts as a regression
+
+    Returns:
+        The results, each with ``throughput_change``, ``memory_change`` and ``regressed`` set
+    """
+    stored = baselines.get("results", {})
+    for result in results:
+        baseline = stored.get(f"{result['name']}[{result['scale']}]")
+        if not baseline:
+            result.update(throughput_change=None, memory_change=None, regressed=False)
+            continue
+        throughput_change = result["items_per_s"] / baseline["items_per_s"] - 1
+        memory_change = None
+        if baseline.get("peak_memory_bytes"):
+            memory_change = result["peak_memory_bytes"] / baseline["peak_memory_bytes"] - 1
+        result.update(
+            throughput_change=throughput_change,
+            memory_change=memory_change,
+            regressed=throughput_change < -threshold,
+        )
+    return results
+
+
+def _format_bytes(size: int) -> str:
+    for unit in ("B", "KiB", "MiB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
+
+
+def _format_change(change: Optional[float]) -> str:
+    return "-" if change is None else f"{change:+.1%}"
+
+
+def format_report(results: List[Dict[str, Any]]) -> str:
+    """Format results (optionally annotated by compare) as a text table."""
+    header = f"{'BENCHMARK':<40} {'ITEMS':>7} {'BEST':>10} {'ITEMS/S':>12} {'PEAK MEM':>10} {'Δ THRU':>8} {'Δ MEM':>8}"
+    lines = [header, "-" * len(header)]
+    for result in results:
+        flag = "  REGRESSION" if result.get("regressed") else ""
+        lines.append(
+            f"{result['name'] + '[' + result['scale'] + ']':<40} "
+            f"{result['items']:>7} "
+            f"{result['best_s'] * 1000:>8.2f}ms "
+            f"{result['items_per_s']:>12,.0f} "
+            f"{_format_bytes(result['peak_memory_bytes']):>10} "
+            f"{_format_change(result.get('throughput_change')):>8} "
+            f"{_format_change(result.get('memory_change')):>8}"
+            f"{flag}"
+        )
+    return "\n".join(lines)
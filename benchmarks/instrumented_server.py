@@ -0,0 +1,33 @@
+"""
+The MCP server with event-loop lag and RSS sampling, for the load test
+
+Samples are appended as JSON lines to the file named by
+DD_MCP_LOADTEST_SAMPLES, since stdout carries the MCP protocol.
+"""
+
+import asyncio
+import json
+import os
+
+from datadog_mcp.server import async_main
+
+from .loadtest import SAMPLES_ENV, LoopSampler
+
+
+async def main() -> None:
+    path = os.environ[SAMPLES_ENV]
+
+    def write_sample(sample):
+        with open(path, "a") as samples:
+            samples.write(json.dumps(sample) + "\n")
+
+    sampler = LoopSampler(sink=write_sample)
+    sampler.start()
+    try:
+        await async_main()
+    finally:
+        await sampler.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,471 @@
+"""
+End-to-end load test of the MCP server against the fake Datadog API
+
+Many concurrent simulated agents call a realistic mix of tools over the
+server's MCP transport, while the server's event-loop lag and memory are
+sampled over time.
+
+    python -m benchmarks.loadtest --agents 50 --duration 30 --output before.json
+    # ...apply a change...
+    python -m benchmarks.loadtest --agents 50 --duration 30 --compare before.json
+
+``--transport stdio`` (default) runs ``datadog_mcp.server`` as a subprocess
+exactly as MCP clients do. ``--transport memory`` runs it in-process over
+memory streams, which is handy under a profiler.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from tests.fake_datadog import FakeDatadogConfig, FakeDatadogServer
+from tests.fake_datadog.generators import generate_metric_names, generate_service_definitions
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+SAMPLES_ENV = "DD_MCP_LOADTEST_SAMPLES"
+
+
+def current_rss_bytes() -> int:
+    """Resident set size of this process."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource
+
+        # Peak rather than current RSS; ru_maxrss is KiB on Linux, bytes on macOS
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of ``values``."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class LoopSampler:
+    """Sample event-loop lag and RSS of the running process.
+
+    Lag is how late a short sleep wakes up; anything blocking the loop
+    (JSON parsing, formatting, synchronous SDK calls) shows up here.
+    """
+
+    def __init__(self, tick: float = 0.01, interval: float = 1.0,
+                 sink: Optional[Callable[[Dict[str, Any]], None]] = None):
+        self.tick = tick
+        self.interval = interval
+        self.sink = sink
+        self.samples: List[Dict[str, Any]] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        window: List[float] = []
+        window_start = started
+        while True:
+            before = loop.time()
+            await asyncio.sleep(self.tick)
+            now = loop.time()
+            window.append(max(0.0, now - before - self.tick) * 1000)
+            if now - window_start >= self.interval:
+                sample = {
+                    "t": round(now - started, 3),
+                    "loop_lag_max_ms": round(max(window), 3),
+                    "loop_lag_p99_ms": round(percentile(window, 99), 3),
+                    "rss_bytes": current_rss_bytes(),
+                }
+                self.samples.append(sample)
+                if self.sink:
+                    self.sink(sample)
+                window = []
+                window_start = now
+
+    def start(self) -> None:
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+
+@dataclass
+class ToolCall:
+    """One entry of the tool mix."""
+
+    weight: int
+    name: str
+    arguments: Callable[[random.Random], Dict[str, Any]]
+
+
+def build_tool_mix(config: FakeDatadogConfig) -> List[ToolCall]:
+    """A mix of calls resembling what agents do during an investigation."""
+    services = ["web-api", "checkout", "payments", "search", "auth", "gateway"]
+    metric_names = [m["id"] for m in generate_metric_names(min(config.metrics, 200), config.seed)]
+    service_names = [
+        d["attributes"]["service"]["name"]
+        for d in generate_service_definitions(min(config.service_definitions, 50), config.seed)
+    ]
+    return [
+        ToolCall(25, "get_logs", lambda rng: {
+            "filters": {"service": rng.choice(services)}, "limit": rng.choice([20, 50, 100]),
+            "time_range": rng.choice(["1h", "4h", "1d"]), "format": rng.choice(["table", "text"]),
+        }),
+        ToolCall(12, "get_traces", lambda rng: {
+            "filters": {"service": rng.choice(services)}, "limit": rng.choice([20, 50]),
+            "format": rng.choice(["table", "text"]),
+        }),
+        ToolCall(3, "get_traces", lambda rng: {
+            "filters": {"parent_id": "0"}, "limit": 5, "format": "text", "include_children": True,
+        }),
+        ToolCall(15, "list_monitors", lambda rng: {
+            "page_size": rng.choice([50, 200]), "format": rng.choice(["table", "summary"]),
+        }),
+        ToolCall(12, "get_metrics", lambda rng: {
+            "metric_name": rng.choice(metric_names), "aggregation_by": rng.choice([[], ["service"]]),
+            "format": rng.choice(["table", "summary"]),
+        }),
+        ToolCall(5, "get_metric_fields", lambda rng: {"metric_name": rng.choice(metric_names)}),
+        ToolCall(5, "list_metrics", lambda rng: {"limit": 100, "filter": rng.choice(["", "aws", "system"])}),
+        ToolCall(6, "list_slos", lambda rng: {"limit": 50, "format": rng.choice(["table", "summary"])}),
+        ToolCall(5, "get_logs_field_values", lambda rng: {
+            "field_name": rng.choice(["service", "host", "status"]), "limit": 20,
+        }),
+        ToolCall(4, "get_teams", lambda rng: {"page_size": 20, "include_members": rng.random() < 0.3}),
+        ToolCall(4, "list_service_definitions", lambda rng: {"page_size": 20}),
+        ToolCall(4, "get_service_definition", lambda rng: {"service_name": rng.choice(service_names)}),
+    ]
+
+
+@dataclass
+class CallStats:
+    """Outcomes collected by the agents."""
+
+    started: float = field(default_factory=time.perf_counter)
+    latencies: Dict[str, List[float]] = field(default_factory=dict)
+    errors: Dict[str, int] = field(default_factory=dict)
+    completions: List[Tuple[float, str, bool]] = field(default_factory=list)
+
+    def record(self, tool: str, latency: float, ok: bool) -> None:
+        self.latencies.setdefault(tool, []).append(latency)
+        if not ok:
+            self.errors[tool] = self.errors.get(tool, 0) + 1
+        self.completions.append((time.perf_counter() - self.started, tool, ok))
+
+
+def _is_error(result: Any) -> bool:
+    if result.isError:
+        return True
+    text = result.content[0].text if result.content else ""
+    return text.startswith(("Error", "Unknown tool"))
+
+
+async def run_agent(session: Any, mix: List[ToolCall], rng: random.Random, deadline: float,
+                    stats: CallStats, think_time: float) -> None:
+    """Call tools from the mix until the deadline."""
+    weights = [call.weight for call in mix]
+    while time.perf_counter() < deadline:
+        call = rng.choices(mix, weights)[0]
+        arguments = call.arguments(rng)
+        start = time.perf_counter()
+        try:
+            ok = not _is_error(await session.call_tool(call.name, arguments))
+        except Exception:
+            ok = False
+        stats.record(call.name, time.perf_counter() - start, ok)
+        if think_time:
+            await asyncio.sleep(rng.uniform(0, 2 * think_time))
+
+
+@asynccontextmanager
+async def stdio_session(api_url: str, samples_path: Path) -> AsyncIterator[Any]:
+    """Start the server as a subprocess and connect to it over stdio."""
+    from mcp import ClientSession
+    from mcp.client.stdio import StdioServerParameters, stdio_client
+
+    env = dict(os.environ)
+    env.update({
+        "DD_API_URL": api_url,
+        "DD_API_KEY": env.get("DD_API_KEY", "loadtest"),
+        "DD_APP_KEY": env.get("DD_APP_KEY", "loadtest"),
+        SAMPLES_ENV: str(samples_path),
+    })
+    params = StdioServerParameters(
+        command=sys.executable, args=["-m", "benchmarks.instrumented_server"], env=env, cwd=str(REPO_ROOT),
+    )
+    with open(os.devnull, "w") as errlog:
+        async with stdio_client(params, errlog=errlog) as (read_stream, write_stream):
+            async with ClientSession(read_stream, write_stream) as session:
+                await session.initialize()
+                yield session
+
+
+@asynccontextmanager
+async def memory_session(api_url: str) -> AsyncIterator[Any]:
+    """Run the server in this process, connected over memory streams."""
+    os.environ.setdefault("DD_API_KEY", "loadtest")
+    os.environ.setdefault("DD_APP_KEY", "loadtest")
+    from mcp.shared.memory import create_connected_server_and_client_session
+
+    from datadog_mcp import server as server_module
+    from datadog_mcp.utils.orgs import default_org, set_default_org
+
+    set_default_org(default_org().at(api_url))
+    # The server logs every upstream request at INFO
+    root_logger = logging.getLogger()
+    level = root_logger.level
+    root_logger.setLevel(logging.WARNING)
+    try:
+        async with create_connected_server_and_client_session(server_module.server) as session:
+            yield session
+    finally:
+        root_logger.setLevel(level)
+
+
+def _throughput_timeline(completions: List[Tuple[float, str, bool]], interval: float) -> List[Dict[str, Any]]:
+    buckets: Dict[int, List[int]] = {}
+    for elapsed, _, ok in completions:
+        bucket = buckets.setdefault(int(elapsed // interval), [0, 0])
+        bucket[0] += 1
+        bucket[1] += 0 if ok else 1
+    return [
+        {"t": round((index + 1) * interval, 3), "calls": calls, "errors": errors}
+        for index, (calls, errors) in sorted(buckets.items())
+    ]
+
+
+def summarize(stats: CallStats, elapsed: float, server_samples: List[Dict[str, Any]],
+              interval: float) -> Dict[str, Any]:
+    """Build the JSON report from collected calls and server samples."""
+    tools = {}
+    for tool, latencies in sorted(stats.latencies.items()):
+        ms = [latency * 1000 for latency in latencies]
+        tools[tool] = {
+            "calls": len(ms),
+            "errors": stats.errors.get(tool, 0),
+            "p50_ms": percentile(ms, 50),
+            "p95_ms": percentile(ms, 95),
+            "p99_ms": percentile(ms, 99),
+            "max_ms": max(ms),
+        }
+    all_ms = [latency * 1000 for latencies in stats.latencies.values() for latency in latencies]
+    total_calls = len(all_ms)
+
+    lag_max = [s["loop_lag_max_ms"] for s in server_samples]
+    lag_p99 = [s["loop_lag_p99_ms"] for s in server_samples]
+    rss = [s["rss_bytes"] for s in server_samples]
+    return {
+        "elapsed_s": round(elapsed, 3),
+        "total_calls": total_calls,
+        "total_errors": sum(stats.errors.values()),
+        "throughput_per_s": round(total_calls / elapsed, 2) if elapsed else 0,
+        "latency": {
+            "p50_ms": percentile(all_ms, 50),
+            "p95_ms": percentile(all_ms, 95),
+            "p99_ms": percentile(all_ms, 99),
+        },
+        "tools": tools,
+        "event_loop_lag": {
+            "max_ms": max(lag_max, default=None),
+            "p99_of_windows_ms": percentile(lag_p99, 99),
+        },
+        "memory": {
+            "rss_start_bytes": rss[0] if rss else None,
+            "rss_end_bytes": rss[-1] if rss else None,
+            "rss_peak_bytes": max(rss, default=None),
+            "rss_growth_bytes": rss[-1] - rss[0] if rss else None,
+        },
+        "timeline": _throughput_timeline(stats.completions, interval),
+        "server_samples": server_samples,
+    }
+
+
+async def run_loadtest(args: argparse.Namespace, fake_config: FakeDatadogConfig, api_url: str) -> Dict[str, Any]:
+    """Drive the server with ``args.agents`` concurrent agents for ``args.duration`` seconds."""
+    mix = build_tool_mix(fake_config)
+    stats = CallStats()
+    samples_file = Path(tempfile.mkstemp(prefix="dd-mcp-loadtest-", suffix=".jsonl")[1])
+    sampler = None
+
+    if args.transport == "stdio":
+        session_cm = stdio_session(api_url, samples_file)
+    else:
+        sampler = LoopSampler(interval=args.sample_interval)
+        session_cm = memory_session(api_url)
+
+    try:
+        async with session_cm as session:
+            # One call of each tool first, so imports and connection setup are not measured
+            warmup_rng = random.Random(args.seed)
+            for call in {call.name: call for call in mix}.values():
+                await session.call_tool(call.name, call.arguments(warmup_rng))
+
+            if sampler:
+                sampler.start()
+            stats = CallStats()
+            deadline = time.perf_counter() + args.duration
+            await asyncio.gather(*(
+                run_agent(session, mix, random.Random(args.seed + i), deadline, stats, args.think_time)
+                for i in range(args.agents)
+            ))
+            elapsed = time.perf_counter() - stats.started
+            if sampler:
+                await sampler.stop()
+
+        if sampler:
+            server_samples = sampler.samples
+        else:
+            lines = samples_file.read_text().splitlines()
+            server_samples = [json.loads(line) for line in lines if line.strip()]
+    finally:
+        samples_file.unlink(missing_ok=True)
+
+    report = summarize(stats, elapsed, server_samples, args.sample_interval)
+    report["config"] = {
+        "transport": args.transport,
+        "agents": args.agents,
+        "duration_s": args.duration,
+        "think_time_s": args.think_time,
+        "seed": args.seed,
+        "fake_api": asdict(fake_config) if not args.api_url else {"url": args.api_url},
+    }
+    return report
+
+
+def _delta(before: Optional[float], after: Optional[float]) -> str:
+    if before is None or after is None:
+        return "-"
+    if before == 0:
+        return "-"
+    return f"{after / before - 1:+.1%}"
+
+
+def _fmt(value: Optional[float]) -> str:
+    return "-" if value is None else f"{value:.1f}"
+
+
+def format_report(report: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None) -> str:
+    """Format a report as text, side by side with a baseline report if given."""
+    base_tools = (baseline or {}).get("tools", {})
+    lines = [
+        f"Calls: {report['total_calls']} ({report['total_errors']} errors) in {report['elapsed_s']:.1f}s"
+        f" | Throughput: {report['throughput_per_s']:.1f}/s"
+        + (f" (before {baseline['throughput_per_s']:.1f}/s, "
+           f"{_delta(baseline['throughput_per_s'], report['throughput_per_s'])})" if baseline else ""),
+        "",
+        f"{'TOOL':<26} {'CALLS':>6} {'ERR':>4} {'P50 ms':>9} {'P95 ms':>9} {'P99 ms':>9}"
+        + (f" {'Δ P50':>8} {'Δ P95':>8} {'Δ P99':>8}" if baseline else ""),
+    ]
+    lines.append("-" * len(lines[-1]))
+    rows = dict(report["tools"])
+    rows["(all)"] = {"calls": report["total_calls"], "errors": report["total_errors"], **report["latency"]}
+    base_rows = dict(base_tools)
+    if baseline:
+        base_rows["(all)"] = baseline["latency"]
+    for tool, row in rows.items():
+        line = (f"{tool:<26} {row['calls']:>6} {row['errors']:>4} "
+                f"{_fmt(row['p50_ms']):>9} {_fmt(row['p95_ms']):>9} {_fmt(row['p99_ms']):>9}")
+        if baseline:
+            before = base_rows.get(tool, {})
+            line += "".join(
+                f" {_delta(before.get(key), row[key]):>8}" for key in ("p50_ms", "p95_ms", "p99_ms")
+            )
+        lines.append(line)
+
+    lag = report["event_loop_lag"]
+    memory = report["memory"]
+    lines.append("")
+    lines.append(f"Event loop lag: max {_fmt(lag['max_ms'])}ms, p99 of windows {_fmt(lag['p99_of_windows_ms'])}ms")
+    if memory["rss_start_bytes"] is not None:
+        lines.append(
+            f"RSS: {memory['rss_start_bytes'] / 2**20:.1f} MiB -> {memory['rss_end_bytes'] / 2**20:.1f} MiB "
+            f"(peak {memory['rss_peak_bytes'] / 2**20:.1f} MiB, growth {memory['rss_growth_bytes'] / 2**20:+.1f} MiB)"
+        )
+    if "fake_api_stats" in report:
+        upstream = report["fake_api_stats"]["requests"]
+        lines.append(f"Upstream API requests: {sum(upstream.values())} "
+                     f"({', '.join(f'{family} {count}' for family, count in sorted(upstream.items()))})")
+    if baseline:
+        base_lag = baseline["event_loop_lag"]
+        base_memory = baseline["memory"]
+        lines.append(
+            f"Before: lag max {_fmt(base_lag['max_ms'])}ms, "
+            f"RSS growth {(base_memory['rss_growth_bytes'] or 0) / 2**20:+.1f} MiB"
+        )
+    return "\n".join(lines)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Load test the datadog-mcp server against a fake Datadog API")
+    parser.add_argument("--transport", choices=["stdio", "memory"], default="stdio")
+    parser.add_argument("--agents", type=int, default=20, help="Concurrent simulated agents (default: 20)")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds to run (default: 20)")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Mean pause between an agent's calls, seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--sample-interval", type=float, default=1.0, help="Seconds per timeline sample")
+    parser.add_argument("--latency", type=float, default=0.05, help="Fake API latency per request, seconds")
+    parser.add_argument("--latency-jitter", type=float, default=0.02)
+    parser.add_argument("--rate-limit", type=int, default=0, help="Fake API requests per family per period (0: off)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of fake API requests failing with 500")
+    parser.add_argument("--api-url", help="Use an already running API stand-in instead of starting one")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--compare", help="JSON report of an earlier run to compare against")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    fake_config = FakeDatadogConfig(
+        seed=args.seed,
+        latency=args.latency,
+        latency_jitter=args.latency_jitter,
+        rate_limit=args.rate_limit,
+        error_rate=args.error_rate,
+        logs=2000,
+        traces=50,
+        spans_per_trace=40,
+        metrics=2000,
+        monitors=500,
+        slos=100,
+        teams=40,
+        service_definitions=100,
+    )
+
+    print(f"Running {args.agents} agents for {args.duration:.0f}s over {args.transport}...", file=sys.stderr)
+    if args.api_url:
+        report = asyncio.run(run_loadtest(args, fake_config, args.api_url))
+    else:
+        # A separate process, so the stand-in does not compete with the server for CPU
+        with FakeDatadogServer(fake_config, subprocess_mode=True) as fake:
+            report = asyncio.run(run_loadtest(args, fake_config, fake.url))
+            # Upstream request counts show the effect of caching and coalescing
+            report["fake_api_stats"] = fake.stats()
+
+    baseline = json.loads(Path(args.compare).read_text()) if args.compare else None
+    print(format_report(report, baseline))
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
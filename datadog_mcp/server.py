@@ -12,9 +12,19 @@ from typing import List
 from mcp.server import Server
 from mcp.server.models import InitializationOptions
 from mcp.server.stdio import stdio_server
-from mcp.types import Tool, ServerCapabilities, TextContent
-
-from .tools import get_fingerprints, list_pipelines, get_logs, get_teams, get_metrics, get_metric_fields, get_metric_field_values, list_metrics, list_service_definitions, get_service_definition, list_monitors, list_slos, get_logs_field_values, get_traces
+from mcp.types import InitializedNotification, Tool, ServerCapabilities, TextContent
+
+from .tools import get_fingerprints, list_pipelines, get_logs, get_teams, get_metrics, get_metric_fields, get_metric_field_values, list_metrics, list_service_definitions, get_service_definition, list_monitors, list_slos, get_logs_field_values, get_traces, slo_status
+from .utils.circuit_breaker import circuit_breakers
+from .utils.coalescing import single_flight
+from .utils.deadline import TOOL_TIMEOUT, DeadlineExceeded, deadline
+from .utils.hedging import hedger
+from .utils.http_pool import shared_transport
+from .utils.monitor_snapshot import MONITOR_SNAPSHOT_INTERVAL, monitor_snapshot_refresher
+from .utils.orgs import org_registry, use_org
+from .utils.prewarm import prewarmer
+from .utils.profiling import profile_tool_call
+from .utils.response_cache import collect_stale_notes, get_response_cache
 
 # Configure logging
 logging.basicConfig(
@@ -85,13 +95,27 @@ TOOLS = {
         "definition": get_traces.get_tool_definition,
         "handler": get_traces.handle_call,
     },
+    "slo_status": {
+        "definition": slo_status.get_tool_definition,
+        "handler": slo_status.handle_call,
+    },
 }
 
 
 @server.list_tools()
 async def handle_list_tools() -> List[Tool]:
     """List available tools."""
-    return [tool_config["definition"]() for tool_config in TOOLS.values()]
+    tools = [tool_config["definition"]() for tool_config in TOOLS.values()]
+    orgs = org_registry.names()
+    if len(orgs) > 1:
+        # One process serves every configured org; tools pick one per call
+        for tool in tools:
+            tool.inputSchema.setdefault("properties", {})["org"] = {
+                "type": "string",
+                "enum": orgs,
+                "description": f"Datadog org to query (default: {orgs[0]})",
+            }
+    return tools
 
 
 @server.call_tool()
@@ -107,20 +131,46 @@ async def handle_call_tool(name: str, arguments: dict):
             
             handler = TOOLS[name]["handler"]
             request = MockRequest(name, arguments)
-            result = await handler(request)
+            with prewarmer.interactive(), use_org((arguments or {}).get("org")), \
+                    collect_stale_notes() as stale_notes:
+                async with profile_tool_call(name, arguments), deadline(TOOL_TIMEOUT):
+                    result = await handler(request)
             
             # Extract content from CallToolResult and return as list
             if hasattr(result, 'content'):
+                tripped = circuit_breakers.describe_tripped() if getattr(result, "isError", False) else ""
+                if tripped:
+                    # Tell the agent the failure is upstream, not in its arguments
+                    result.content.append(TextContent(type="text", text=f"Circuit breakers: {tripped}"))
+                if stale_notes:
+                    # Cached data served while Datadog was slow or failing
+                    note = TextContent(type="text", text=f"Stale data: {'; '.join(stale_notes)}")
+                    return [note, *result.content]
                 return result.content
             else:
                 return [TextContent(type="text", text="Unexpected response format")]
         else:
             return [TextContent(type="text", text=f"Unknown tool: {name}")]
+    except DeadlineExceeded as e:
+        logger.warning(f"Tool call {name} {e}")
+        return [TextContent(type="text", text=f"Error: {name} {e}; try a narrower query or time range")]
+    except asyncio.CancelledError:
+        # The client cancelled the call; its Datadog requests are aborted with it
+        logger.info(f"Tool call {name} was cancelled")
+        raise
     except Exception as e:
         logger.error(f"Error handling tool call: {e}")
         return [TextContent(type="text", text=f"Error: {str(e)}")]
 
 
+async def handle_initialized(notification: InitializedNotification) -> None:
+    """Start the optional prewarm once the client has completed the handshake."""
+    prewarmer.start()
+
+
+server.notification_handlers[InitializedNotification] = handle_initialized
+
+
 async def async_main():
     """Async main entry point."""
     try:
@@ -128,6 +178,8 @@ async def async_main():
         # Run the server using stdio transport
         async with stdio_server() as (read_stream, write_stream):
             logger.info("Server transport initialized")
+            if MONITOR_SNAPSHOT_INTERVAL > 0:
+                monitor_snapshot_refresher.start()
             await server.run(
                 read_stream,
                 write_stream,
@@ -142,6 +194,25 @@ async def async_main():
     except Exception as e:
         logger.error(f"Server startup failed: {e}")
         raise
+    finally:
+        await prewarmer.stop()
+        await monitor_snapshot_refresher.stop()
+        saved = {name: stats["saved"] for name, stats in single_flight.stats().items() if stats["saved"]}
+        if saved:
+            logger.info(f"Requests saved by coalescing identical concurrent fetches: {saved}")
+        tripped = circuit_breakers.states(tripped_only=True)
+        if tripped:
+            logger.info(f"Circuit breakers not closed at shutdown: {tripped}")
+        hedged = {name: stats for name, stats in hedger.stats().items() if stats["hedged"]}
+        if hedged:
+            logger.info(f"Hedged requests: {hedged}")
+        cache = get_response_cache()
+        if cache is not None:
+            logger.info(f"Response cache: {cache.hits} hits, {cache.stale_hits} stale hits, "
+                f"{cache.misses} misses, {cache.size} bytes")
+            cache.close()
+        await shared_transport.close_pool()
+        await org_registry.close()
 
 
 def cli_main():
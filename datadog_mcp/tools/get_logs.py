@@ -2,7 +2,6 @@
 Get service logs tool
 """
 
-import json
 import logging
 from typing import Any, Dict
 
@@ -11,7 +10,9 @@ from mcp.types import CallToolRequest, CallToolResult, Tool, TextContent
 logger = logging.getLogger(__name__)
 
 from ..utils.datadog_client import fetch_logs
-from ..utils.formatters import extract_log_info, format_logs_as_table, format_logs_as_text
+from ..utils.formatters import TABLE_LOG_PLAN, extract_log_info, format_logs_as_table, format_logs_as_text
+from ..utils.json_codec import dumps
+from ..utils.profiling import phase
 
 
 def get_tool_definition() -> Tool:
@@ -76,18 +77,22 @@ async def handle_call(request: CallToolRequest) -> CallToolResult:
         format_type = args.get("format", "table")
         
         # Fetch log events using the new flexible API
-        response = await fetch_logs(
-            time_range=time_range,
-            filters=filters,
-            query=query,
-            limit=limit,
-            cursor=cursor if cursor else None,
-        )
+        with phase("fetch"):
+            response = await fetch_logs(
+                time_range=time_range,
+                filters=filters,
+                query=query,
+                limit=limit,
+                cursor=cursor if cursor else None,
+            )
         
         log_events = response.get("data", [])
         
         # Extract log info
-        logs = extract_log_info(log_events)
+        with phase("extract"):
+            # The table only shows core fields, so skip extracting the rest
+            plan = TABLE_LOG_PLAN if format_type == "table" else None
+            logs = extract_log_info(log_events, plan)
         
         # Get pagination info
         meta = response.get("meta", {})
@@ -106,24 +111,25 @@ async def handle_call(request: CallToolRequest) -> CallToolResult:
             )
         
         # Format output
-        if format_type == "json":
-            # Include pagination info in JSON response
-            output = {
-                "logs": logs,
-                "pagination": {
-                    "next_cursor": next_cursor,
-                    "has_more": bool(next_cursor)
+        with phase("format"):
+            if format_type == "json":
+                # Include pagination info in JSON response
+                output = {
+                    "logs": logs,  # records are converted by the encoder
+                    "pagination": {
+                        "next_cursor": next_cursor,
+                        "has_more": bool(next_cursor)
+                    }
                 }
-            }
-            content = json.dumps(output, indent=2)
-        elif format_type == "text":
-            content = format_logs_as_text(logs)
-            if next_cursor:
-                content += f"\n\nNext cursor: {next_cursor}"
-        else:  # table
-            content = format_logs_as_table(logs)
-            if next_cursor:
-                content += f"\n\nNext cursor: {next_cursor}"
+                content = dumps(output)
+            elif format_type == "text":
+                content = format_logs_as_text(logs)
+                if next_cursor:
+                    content += f"\n\nNext cursor: {next_cursor}"
+            else:  # table
+                content = format_logs_as_table(logs)
+                if next_cursor:
+                    content += f"\n\nNext cursor: {next_cursor}"
         
         # Add summary header (not for JSON format which includes pagination separately)
         if format_type != "json":
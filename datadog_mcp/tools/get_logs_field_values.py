@@ -9,6 +9,8 @@ from mcp import types
 from mcp.types import CallToolResult, TextContent, Tool
 
 from ..utils.datadog_client import fetch_logs_filter_values
+from ..utils.json_codec import dumps
+from ..utils.text_writer import TextWriter
 
 logger = logging.getLogger(__name__)
 
@@ -81,8 +83,7 @@ async def handle_call(request: types.CallToolRequest) -> CallToolResult:
         
         # Format response
         if format_type == "json":
-            import json
-            content = json.dumps(response, indent=2)
+            content = dumps(response)
         elif format_type == "list":
             content = _format_as_list(response)
         else:  # table
@@ -111,13 +112,9 @@ def _format_as_table(response: Dict[str, Any]) -> str:
     if not values:
         return f"No values found for field '{field_name}' in the last {time_range}"
     
-    # Create header
-    header = f"Field: {field_name} | Time Range: {time_range} | Total Values: {total_values}\n"
-    header += "=" * len(header.strip()) + "\n\n"
-    
-    # Create table
-    table = "| Value | Count |\n"
-    table += "|-------|-------|\n"
+    out = TextWriter().heading(f"Field: {field_name} | Time Range: {time_range} | Total Values: {total_values}")
+    out.line("| Value | Count |")
+    out.line("|-------|-------|")
     
     for item in values:
         value = str(item["value"])
@@ -125,9 +122,9 @@ def _format_as_table(response: Dict[str, Any]) -> str:
         # Truncate long values
         if len(value) > 50:
             value = value[:47] + "..."
-        table += f"| {value:<50} | {count:>5} |\n"
+        out.line(f"| {value:<50} | {count:>5} |")
     
-    return header + table
+    return out.getvalue()
 
 
 def _format_as_list(response: Dict[str, Any]) -> str:
@@ -140,9 +137,9 @@ def _format_as_list(response: Dict[str, Any]) -> str:
     if not values:
         return f"No values found for field '{field_name}' in the last {time_range}"
     
-    result = f"Field: {field_name} | Time Range: {time_range} | Total Values: {total_values}\n\n"
+    out = TextWriter().write(f"Field: {field_name} | Time Range: {time_range} | Total Values: {total_values}\n\n")
     
     for item in values:
-        result += f"• {item['value']} ({item['count']} occurrences)\n"
+        out.line(f"• {item['value']} ({item['count']} occurrences)")
     
-    return result
\ No newline at end of file
+    return out.getvalue()
\ No newline at end of file
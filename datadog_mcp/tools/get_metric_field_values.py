@@ -2,7 +2,6 @@
 Get metric field values tool
 """
 
-import json
 import logging
 from typing import Any, Dict
 
@@ -11,6 +10,8 @@ from mcp.types import CallToolRequest, CallToolResult, Tool, TextContent
 logger = logging.getLogger(__name__)
 
 from ..utils.datadog_client import fetch_metric_field_values
+from ..utils.json_codec import dumps
+from ..utils.not_found import did_you_mean, name_catalog, not_found_cache
 
 
 def get_tool_definition() -> Tool:
@@ -69,13 +70,19 @@ async def handle_call(request: CallToolRequest) -> CallToolResult:
             field_name=field_name,
         )
         
+        missing = not field_values and not_found_cache.is_missing("metric", metric_name)
+        
         # Format output
         if format_type == "json":
-            content = json.dumps({
+            result = {
                 "metric_name": metric_name,
                 "field_name": field_name,
                 "field_values": field_values
-            }, indent=2)
+            }
+            if missing:
+                result["not_found"] = True
+                result["suggestions"] = await name_catalog.suggest("metric", metric_name)
+            content = dumps(result)
         else:  # list format
             # Add summary header
             summary = f"Values for field '{field_name}' in metric '{metric_name}'"
@@ -92,6 +99,8 @@ async def handle_call(request: CallToolRequest) -> CallToolResult:
                 if field_values:
                     sample_value = field_values[0]
                     content += f"• Query for specific {field_name}: add filter {field_name}:{sample_value} to your query"
+            elif missing:
+                content += f"Metric '{metric_name}' not found.{await did_you_mean('metric', metric_name)}"
             else:
                 content += f"No values found for field '{field_name}'.\n\n"
                 content += "This could mean:\n"
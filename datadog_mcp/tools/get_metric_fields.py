@@ -2,7 +2,6 @@
 Get metric fields tool
 """
 
-import json
 import logging
 from typing import Any, Dict
 
@@ -11,6 +10,8 @@ from mcp.types import CallToolRequest, CallToolResult, Tool, TextContent
 logger = logging.getLogger(__name__)
 
 from ..utils.datadog_client import fetch_metric_available_fields
+from ..utils.json_codec import dumps
+from ..utils.not_found import did_you_mean, name_catalog, not_found_cache
 
 
 def get_tool_definition() -> Tool:
@@ -65,13 +66,19 @@ async def handle_call(request: CallToolRequest) -> CallToolResult:
             time_range=time_range,
         )
         
+        missing = not available_fields and not_found_cache.is_missing("metric", metric_name)
+        
         # Format output
         if format_type == "json":
-            content = json.dumps({
+            result = {
                 "metric_name": metric_name,
                 "time_range": time_range,
                 "available_fields": available_fields
-            }, indent=2)
+            }
+            if missing:
+                result["not_found"] = True
+                result["suggestions"] = await name_catalog.suggest("metric", metric_name)
+            content = dumps(result)
         else:  # list format
             # Add summary header
             summary = f"Available fields for metric '{metric_name}'"
@@ -84,6 +91,8 @@ async def handle_call(request: CallToolRequest) -> CallToolResult:
                 content += f"\n\nUsage example: aggregation_by: [\"{available_fields[0]}\"]"
                 if len(available_fields) > 1:
                     content += f" or [\"{available_fields[0]}\", \"{available_fields[1]}\"]"
+            elif missing:
+                content += f"Metric '{metric_name}' not found.{await did_you_mean('metric', metric_name)}"
             else:
                 content += "No fields found for this metric."
         
@@ -2,7 +2,6 @@
 Get metrics tool - execute metric queries on Datadog
 """
 
-import json
 import logging
 from typing import Any, Dict
 
@@ -12,10 +11,12 @@ logger = logging.getLogger(__name__)
 
 from ..utils.datadog_client import fetch_metrics
 from ..utils.formatters import (
+    METRICS_QUERY_FIELDS,
     format_metrics_summary,
     format_metrics_table,
     format_metrics_timeseries,
 )
+from ..utils.json_codec import dumps
 
 
 def get_tool_definition() -> Tool:
@@ -103,6 +104,8 @@ async def handle_call(request: CallToolRequest) -> CallToolResult:
             filters=filters,
             aggregation_by=aggregation_by,
             as_count=as_count,
+            # The JSON format returns the whole response
+            fields=None if format_type == "json" else METRICS_QUERY_FIELDS,
         )
         
         # Wrap single result in dict for consistent formatting
@@ -129,7 +132,7 @@ async def handle_call(request: CallToolRequest) -> CallToolResult:
         
         # Format output
         if format_type == "json":
-            content = json.dumps(metrics_data, indent=2)
+            content = dumps(metrics_data)
         elif format_type == "summary":
             content = format_metrics_summary(metrics_data)
         elif format_type == "timeseries":
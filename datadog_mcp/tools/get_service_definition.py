@@ -6,11 +6,15 @@ import json
 import logging
 from typing import Any, Dict
 
+import httpx
 from mcp.types import CallToolRequest, CallToolResult, Tool, TextContent
 
 logger = logging.getLogger(__name__)
 
 from ..utils.datadog_client import fetch_service_definition
+from ..utils.conditional import format_once
+from ..utils.json_codec import dumps
+from ..utils.not_found import did_you_mean
 
 
 def get_tool_definition() -> Tool:
@@ -44,6 +48,117 @@ def get_tool_definition() -> Tool:
     )
 
 
+def _format_service_definition(
+    service_definition_response: Dict[str, Any], service_name: str, format_type: str
+) -> str:
+    """Format a service definition response for output."""
+    service_definition = service_definition_response["data"]
+    
+    # Format output
+    if format_type == "json":
+        content = dumps(service_definition_response)
+    elif format_type == "yaml":
+        try:
+            import yaml
+            content = yaml.dump(service_definition_response, default_flow_style=False, indent=2)
+        except ImportError:
+            content = "YAML format requires pyyaml package. Showing JSON instead:\n\n"
+            content += dumps(service_definition_response)
+    else:  # formatted
+        attributes = service_definition.get("attributes", {})
+        service_info = attributes.get("service", {})
+        
+        content = f"Service Definition: {service_name}\n"
+        content += "=" * (len(content) - 1) + "\n\n"
+        
+        # Basic info
+        content += f"Schema Version: {attributes.get('schema-version', 'unknown')}\n"
+        content += f"Service Name: {service_info.get('name', 'unknown')}\n"
+        
+        # Description
+        if "description" in service_info:
+            content += f"Description: {service_info['description']}\n"
+        
+        # Team and contacts
+        if "team" in service_info:
+            content += f"Team: {service_info['team']}\n"
+        
+        if "contacts" in service_info:
+            contacts = service_info["contacts"]
+            if contacts:
+                content += f"Contacts:\n"
+                for contact in contacts:
+                    contact_type = contact.get("type", "unknown")
+                    contact_name = contact.get("name", "unknown")
+                    contact_contact = contact.get("contact", "")
+                    content += f"  - {contact_type}: {contact_name}"
+                    if contact_contact:
+                        content += f" ({contact_contact})"
+                    content += "\n"
+        
+        # Links
+        if "links" in service_info:
+            links = service_info["links"]
+            if links:
+                content += f"Links:\n"
+                for link in links:
+                    link_name = link.get("name", "unknown")
+                    link_type = link.get("type", "unknown")
+                    link_url = link.get("url", "")
+                    content += f"  - {link_name} ({link_type}): {link_url}\n"
+        
+        # Technologies
+        if "languages" in service_info:
+            languages = service_info["languages"]
+            if languages:
+                content += f"Languages: {', '.join(languages)}\n"
+        
+        if "type" in service_info:
+            content += f"Type: {service_info['type']}\n"
+        
+        # Tags
+        if "tags" in service_info:
+            tags = service_info["tags"]
+            if tags:
+                content += f"Tags: {', '.join(tags)}\n"
+        
+        # Integrations
+        if "integrations" in service_info:
+            integrations = service_info["integrations"]
+            if integrations:
+                content += f"\nIntegrations:\n"
+                for integration_type, integration_config in integrations.items():
+                    content += f"  {integration_type}:\n"
+                    if isinstance(integration_config, dict):
+                        for key, value in integration_config.items():
+                            content += f"    {key}: {value}\n"
+                    else:
+                        content += f"    {integration_config}\n"
+        
+        # Application info
+        if "application" in attributes:
+            app_info = attributes["application"]
+            content += f"\nApplication:\n"
+            for key, value in app_info.items():
+                if isinstance(value, (list, dict)):
+                    content += f"  {key}: {json.dumps(value, indent=2)}\n"
+                else:
+                    content += f"  {key}: {value}\n"
+        
+        # Extensions
+        if "extensions" in service_info:
+            extensions = service_info["extensions"]
+            if extensions:
+                content += f"\nExtensions:\n"
+                for ext_key, ext_value in extensions.items():
+                    if isinstance(ext_value, (list, dict)):
+                        content += f"  {ext_key}: {json.dumps(ext_value, indent=2)}\n"
+                    else:
+                        content += f"  {ext_key}: {ext_value}\n"
+    
+    return content
+
+
 async def handle_call(request: CallToolRequest) -> CallToolResult:
     """Handle the get_service_definition tool call."""
     try:
@@ -71,115 +186,32 @@ async def handle_call(request: CallToolRequest) -> CallToolResult:
                 isError=True,
             )
         
-        service_definition = service_definition_response["data"]
-        
-        # Format output
-        if format_type == "json":
-            content = json.dumps(service_definition_response, indent=2)
-        elif format_type == "yaml":
-            try:
-                import yaml
-                content = yaml.dump(service_definition_response, default_flow_style=False, indent=2)
-            except ImportError:
-                content = "YAML format requires pyyaml package. Showing JSON instead:\n\n"
-                content += json.dumps(service_definition_response, indent=2)
-        else:  # formatted
-            attributes = service_definition.get("attributes", {})
-            service_info = attributes.get("service", {})
-            
-            content = f"Service Definition: {service_name}\n"
-            content += "=" * (len(content) - 1) + "\n\n"
-            
-            # Basic info
-            content += f"Schema Version: {attributes.get('schema-version', 'unknown')}\n"
-            content += f"Service Name: {service_info.get('name', 'unknown')}\n"
-            
-            # Description
-            if "description" in service_info:
-                content += f"Description: {service_info['description']}\n"
-            
-            # Team and contacts
-            if "team" in service_info:
-                content += f"Team: {service_info['team']}\n"
-            
-            if "contacts" in service_info:
-                contacts = service_info["contacts"]
-                if contacts:
-                    content += f"Contacts:\n"
-                    for contact in contacts:
-                        contact_type = contact.get("type", "unknown")
-                        contact_name = contact.get("name", "unknown")
-                        contact_contact = contact.get("contact", "")
-                        content += f"  - {contact_type}: {contact_name}"
-                        if contact_contact:
-                            content += f" ({contact_contact})"
-                        content += "\n"
-            
-            # Links
-            if "links" in service_info:
-                links = service_info["links"]
-                if links:
-                    content += f"Links:\n"
-                    for link in links:
-                        link_name = link.get("name", "unknown")
-                        link_type = link.get("type", "unknown")
-                        link_url = link.get("url", "")
-                        content += f"  - {link_name} ({link_type}): {link_url}\n"
-            
-            # Technologies
-            if "languages" in service_info:
-                languages = service_info["languages"]
-                if languages:
-                    content += f"Languages: {', '.join(languages)}\n"
-            
-            if "type" in service_info:
-                content += f"Type: {service_info['type']}\n"
-            
-            # Tags
-            if "tags" in service_info:
-                tags = service_info["tags"]
-                if tags:
-                    content += f"Tags: {', '.join(tags)}\n"
-            
-            # Integrations
-            if "integrations" in service_info:
-                integrations = service_info["integrations"]
-                if integrations:
-                    content += f"\nIntegrations:\n"
-                    for integration_type, integration_config in integrations.items():
-                        content += f"  {integration_type}:\n"
-                        if isinstance(integration_config, dict):
-                            for key, value in integration_config.items():
-                                content += f"    {key}: {value}\n"
-                        else:
-                            content += f"    {integration_config}\n"
-            
-            # Application info
-            if "application" in attributes:
-                app_info = attributes["application"]
-                content += f"\nApplication:\n"
-                for key, value in app_info.items():
-                    if isinstance(value, (list, dict)):
-                        content += f"  {key}: {json.dumps(value, indent=2)}\n"
-                    else:
-                        content += f"  {key}: {value}\n"
-            
-            # Extensions
-            if "extensions" in service_info:
-                extensions = service_info["extensions"]
-                if extensions:
-                    content += f"\nExtensions:\n"
-                    for ext_key, ext_value in extensions.items():
-                        if isinstance(ext_value, (list, dict)):
-                            content += f"  {ext_key}: {json.dumps(ext_value, indent=2)}\n"
-                        else:
-                            content += f"  {ext_key}: {ext_value}\n"
+        content = format_once(
+            service_definition_response,
+            (service_name, format_type),
+            lambda: _format_service_definition(service_definition_response, service_name, format_type),
+        )
         
         return CallToolResult(
             content=[TextContent(type="text", text=content)],
             isError=False,
         )
         
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code != 404:
+            logger.error(f"Error in get_service_definition: {e}")
+            return CallToolResult(
+                content=[TextContent(type="text", text=f"Error: {str(e)}")],
+                isError=True,
+            )
+        hint = await did_you_mean("service", service_name)
+        return CallToolResult(
+            content=[TextContent(
+                type="text",
+                text=f"No service definition found for '{service_name}'.{hint}",
+            )],
+            isError=True,
+        )
     except Exception as e:
         logger.error(f"Error in get_service_definition: {e}")
         return CallToolResult(
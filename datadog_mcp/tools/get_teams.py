@@ -2,7 +2,6 @@
 Get teams and their members tool
 """
 
-import json
 from typing import Any, Dict, List
 
 from mcp.types import CallToolRequest, CallToolResult, Tool, TextContent
@@ -14,6 +13,8 @@ from ..utils.formatters import (
     format_teams_as_table,
     format_team_with_members,
 )
+from ..utils.json_codec import dumps
+from ..utils.pagination import OUTPUT_BUDGET, collect_numbered_pages, fit_items, fit_output
 
 
 def get_tool_definition() -> Tool:
@@ -46,6 +47,11 @@ def get_tool_definition() -> Tool:
                     "default": 0,
                     "minimum": 0,
                 },
+                "all_pages": {
+                    "type": "boolean",
+                    "description": "Return every team in one response, up to the output budget (page_size and page_number are ignored)",
+                    "default": False,
+                },
                 "format": {
                     "type": "string",
                     "description": "Output format",
@@ -68,10 +74,16 @@ async def handle_call(request: CallToolRequest) -> CallToolResult:
         page_size = args.get("page_size", 50)
         page_number = args.get("page_number", 0)
         format_type = args.get("format", "table")
+        all_pages = args.get("all_pages", False)
         
-        # Fetch teams with pagination
-        teams_response = await fetch_teams(page_size=page_size, page_number=page_number)
-        teams_data = teams_response.get("data", [])
+        if all_pages:
+            teams_data, teams_response = await collect_numbered_pages(
+                lambda number: fetch_teams(page_size=100, page_number=number)
+            )
+        else:
+            # Fetch teams with pagination
+            teams_response = await fetch_teams(page_size=page_size, page_number=page_number)
+            teams_data = teams_response.get("data", [])
         teams = extract_team_info(teams_data)
         
         # Get pagination info
@@ -93,6 +105,9 @@ async def handle_call(request: CallToolRequest) -> CallToolResult:
                     isError=False,
                 )
         
+        # JSON is rendered once the header is known, to fit the output budget with it
+        json_items = None
+        
         # If detailed format or specific team, get members
         if format_type == "detailed" or (team_name and include_members):
             detailed_teams = []
@@ -122,7 +137,7 @@ async def handle_call(request: CallToolRequest) -> CallToolResult:
             
             # Format detailed output
             if format_type == "json":
-                content = json.dumps(detailed_teams, indent=2)
+                json_items = detailed_teams
             else:
                 content_parts = []
                 for detail in detailed_teams:
@@ -138,14 +153,14 @@ async def handle_call(request: CallToolRequest) -> CallToolResult:
         else:
             # Simple table format
             if format_type == "json":
-                content = json.dumps(teams, indent=2)
+                json_items = teams
             else:
                 content = format_teams_as_table(teams)
         
         # Add summary header with pagination info
         total_count = pagination.get("total_count", len(teams))
         summary = f"Found {total_count} team(s) total"
-        if page_size < total_count:
+        if not all_pages and page_size < total_count:
             summary += f" (showing page {page_number + 1}, {len(teams)} teams)"
         if team_name:
             summary += f" matching '{team_name}'"
@@ -153,17 +168,30 @@ async def handle_call(request: CallToolRequest) -> CallToolResult:
             summary += " (with member details)"
         
         # Add pagination info
-        if pagination and total_count > page_size:
+        if not all_pages and pagination and total_count > page_size:
             total_pages = pagination.get("total_pages", 1)
             current_page = page_number + 1
             summary += f"\nPage {current_page} of {total_pages}"
             if current_page < total_pages:
                 summary += f" | Use page_number={page_number + 1} for next page"
         
-        final_content = f"{summary}\n{'=' * len(summary.split('\n')[0])}\n\n{content}"
+        header = f"{summary}\n{'=' * len(summary.split('\n')[0])}\n\n"
+        truncated = None
+        if json_items is None:
+            final_content = header + content
+            if all_pages:
+                final_content = fit_output(final_content)
+        elif all_pages:
+            content, truncated = fit_items(json_items, dumps, budget=OUTPUT_BUDGET - len(header))
+            final_content = header + content
+        else:
+            final_content = header + dumps(json_items)
         
+        contents = [TextContent(type="text", text=final_content)]
+        if truncated:
+            contents.append(TextContent(type="text", text=truncated))
         return CallToolResult(
-            content=[TextContent(type="text", text=final_content)],
+            content=contents,
             isError=False,
         )
         
@@ -2,7 +2,6 @@
 Get APM traces tool
 """
 
-import json
 import logging
 from typing import Any, Dict
 
@@ -11,7 +10,15 @@ from mcp.types import CallToolRequest, CallToolResult, Tool, TextContent
 logger = logging.getLogger(__name__)
 
 from ..utils.datadog_client import fetch_traces
-from ..utils.formatters import extract_trace_info, format_traces_as_table, format_traces_as_text, format_traces_as_hierarchy
+from ..utils.formatters import (
+    TRACE_EVENT_FIELDS,
+    extract_trace_info,
+    format_traces_as_table,
+    format_traces_as_text,
+    format_traces_as_hierarchy,
+)
+from ..utils.json_codec import dumps
+from ..utils.profiling import phase
 
 
 def get_tool_definition() -> Tool:
@@ -81,14 +88,19 @@ async def handle_call(request: CallToolRequest) -> CallToolResult:
         format_type = args.get("format", "table")
         include_children = args.get("include_children", False)
 
+        # Only decode what extraction reads; the debug format shows raw attributes
+        fields = None if format_type == "debug" else TRACE_EVENT_FIELDS
+
         # Fetch trace events using the flexible API
-        response = await fetch_traces(
-            time_range=time_range,
-            filters=filters,
-            query=query,
-            limit=limit,
-            cursor=cursor if cursor else None,
-        )
+        with phase("fetch"):
+            response = await fetch_traces(
+                time_range=time_range,
+                filters=filters,
+                query=query,
+                limit=limit,
+                cursor=cursor if cursor else None,
+                fields=fields,
+            )
 
         # Handle case where response might be None or missing expected structure
         if response is None:
@@ -116,11 +128,13 @@ async def handle_call(request: CallToolRequest) -> CallToolResult:
 
                     # Fetch all spans for this trace_id
                     logger.debug(f"Fetching child spans for trace_id: {trace_id}")
-                    child_response = await fetch_traces(
-                        time_range=time_range,
-                        query=f"trace_id:{trace_id}",
-                        limit=1000,  # Get all spans in the trace
-                    )
+                    with phase("fetch"):
+                        child_response = await fetch_traces(
+                            time_range=time_range,
+                            query=f"trace_id:{trace_id}",
+                            limit=1000,  # Get all spans in the trace
+                            fields=fields,
+                        )
 
                     if child_response and child_response.get("data"):
                         all_spans.extend(child_response["data"])
@@ -135,7 +149,8 @@ async def handle_call(request: CallToolRequest) -> CallToolResult:
             logger.debug(f"After fetching children: {len(trace_events)} total spans")
 
         # Extract trace info
-        traces = extract_trace_info(trace_events)
+        with phase("extract"):
+            traces = extract_trace_info(trace_events)
 
         logger.debug(f"Extracted {len(traces)} traces after processing")
 
@@ -171,71 +186,72 @@ async def handle_call(request: CallToolRequest) -> CallToolResult:
             )
 
         # Format output
-        if format_type == "debug":
-            # Debug format: show raw API response for the first event
-            sample_event = None
-            if trace_events:
-                event = trace_events[0]
-                attrs = event.get("attributes", {})
-
-                # Show all attribute keys (sorted for easier reading)
-                all_keys = sorted(list(attrs.keys()))
-
-                # Separate out timestamp/duration related fields
-                timestamp_related = {k: attrs[k] for k in all_keys if 'time' in k.lower() or 'start' in k.lower()}
-                duration_related = {k: attrs[k] for k in all_keys if 'duration' in k.lower()}
-
-                sample_event = {
-                    "id": event.get("id"),
-                    "type": event.get("type"),
-                    "total_attributes": len(all_keys),
-                    "all_attribute_keys": all_keys,
-                    "timestamp_related_fields": timestamp_related,
-                    "duration_related_fields": duration_related,
-                    "selected_attributes": {}
+        with phase("format"):
+            if format_type == "debug":
+                # Debug format: show raw API response for the first event
+                sample_event = None
+                if trace_events:
+                    event = trace_events[0]
+                    attrs = event.get("attributes", {})
+
+                    # Show all attribute keys (sorted for easier reading)
+                    all_keys = sorted(list(attrs.keys()))
+
+                    # Separate out timestamp/duration related fields
+                    timestamp_related = {k: attrs[k] for k in all_keys if 'time' in k.lower() or 'start' in k.lower()}
+                    duration_related = {k: attrs[k] for k in all_keys if 'duration' in k.lower()}
+
+                    sample_event = {
+                        "id": event.get("id"),
+                        "type": event.get("type"),
+                        "total_attributes": len(all_keys),
+                        "all_attribute_keys": all_keys,
+                        "timestamp_related_fields": timestamp_related,
+                        "duration_related_fields": duration_related,
+                        "selected_attributes": {}
+                    }
+
+                    # Show first 30 attributes with their values
+                    for i, (key, value) in enumerate(attrs.items()):
+                        if i < 30:
+                            # Truncate long values
+                            if isinstance(value, str) and len(value) > 100:
+                                sample_event["selected_attributes"][key] = value[:100] + "..."
+                            elif isinstance(value, dict):
+                                sample_event["selected_attributes"][key] = f"<dict with {len(value)} keys>"
+                            elif isinstance(value, list):
+                                sample_event["selected_attributes"][key] = f"<list with {len(value)} items>"
+                            else:
+                                sample_event["selected_attributes"][key] = value
+
+                debug_output = {
+                    "total_events": len(trace_events),
+                    "sample_event": sample_event,
+                    "extracted_trace": traces[0] if traces else None,
                 }
-
-                # Show first 30 attributes with their values
-                for i, (key, value) in enumerate(attrs.items()):
-                    if i < 30:
-                        # Truncate long values
-                        if isinstance(value, str) and len(value) > 100:
-                            sample_event["selected_attributes"][key] = value[:100] + "..."
-                        elif isinstance(value, dict):
-                            sample_event["selected_attributes"][key] = f"<dict with {len(value)} keys>"
-                        elif isinstance(value, list):
-                            sample_event["selected_attributes"][key] = f"<list with {len(value)} items>"
-                        else:
-                            sample_event["selected_attributes"][key] = value
-
-            debug_output = {
-                "total_events": len(trace_events),
-                "sample_event": sample_event,
-                "extracted_trace": traces[0] if traces else None,
-            }
-            content = json.dumps(debug_output, indent=2)
-        elif format_type == "json":
-            # Include pagination info in JSON response
-            output = {
-                "traces": traces,
-                "pagination": {
-                    "next_cursor": next_cursor,
-                    "has_more": bool(next_cursor)
+                content = dumps(debug_output)
+            elif format_type == "json":
+                # Include pagination info in JSON response
+                output = {
+                    "traces": traces,  # records are converted by the encoder
+                    "pagination": {
+                        "next_cursor": next_cursor,
+                        "has_more": bool(next_cursor)
+                    }
                 }
-            }
-            content = json.dumps(output, indent=2)
-        elif format_type == "text":
-            # Use hierarchy format if child spans were fetched
-            if include_children:
-                content = format_traces_as_hierarchy(traces)
-            else:
-                content = format_traces_as_text(traces)
-            if next_cursor:
-                content += f"\n\nNext cursor: {next_cursor}"
-        else:  # table
-            content = format_traces_as_table(traces)
-            if next_cursor:
-                content += f"\n\nNext cursor: {next_cursor}"
+                content = dumps(output)
+            elif format_type == "text":
+                # Use hierarchy format if child spans were fetched
+                if include_children:
+                    content = format_traces_as_hierarchy(traces)
+                else:
+                    content = format_traces_as_text(traces)
+                if next_cursor:
+                    content += f"\n\nNext cursor: {next_cursor}"
+            else:  # table
+                content = format_traces_as_table(traces)
+                if next_cursor:
+                    content += f"\n\nNext cursor: {next_cursor}"
 
         # Add summary header (not for JSON/debug format which includes pagination separately)
         if format_type not in ["json", "debug"]:
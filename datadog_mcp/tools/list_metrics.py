@@ -2,7 +2,6 @@
 List metrics tool
 """
 
-import json
 import logging
 from typing import Any, Dict
 
@@ -10,7 +9,9 @@ from mcp.types import CallToolRequest, CallToolResult, Tool, TextContent
 
 logger = logging.getLogger(__name__)
 
-from ..utils.datadog_client import fetch_metrics_list
+from ..utils.datadog_client import METRICS_LIST_FIELDS, fetch_metrics_list
+from ..utils.json_codec import dumps
+from ..utils.text_writer import TextWriter
 
 
 def get_tool_definition() -> Tool:
@@ -74,7 +75,8 @@ async def handle_call(request: CallToolRequest) -> CallToolResult:
         metrics_response = await fetch_metrics_list(
             filter_query=api_filter,
             limit=fetch_limit,
-            cursor=cursor if cursor else None
+            cursor=cursor if cursor else None,
+            fields=None if format_type == "json" else METRICS_LIST_FIELDS,
         )
 
         if "data" not in metrics_response:
@@ -100,33 +102,34 @@ async def handle_call(request: CallToolRequest) -> CallToolResult:
         
         # Format output
         if format_type == "json":
-            content = json.dumps(metrics_response, indent=2)
+            content = dumps(metrics_response)
         elif format_type == "summary":
-            content = f"Found {len(metrics)} metrics"
+            out = TextWriter().write(f"Found {len(metrics)} metrics")
             if filter_query:
-                content += f" matching filter: '{filter_query}'"
+                out.write(f" matching filter: '{filter_query}'")
             if cursor:
-                content += f" (using cursor pagination)"
+                out.write(f" (using cursor pagination)")
             if next_cursor:
-                content += f"\nNext cursor: {next_cursor}"
-            content += f"\n\nFirst 10 metrics:\n"
+                out.write(f"\nNext cursor: {next_cursor}")
+            out.write(f"\n\nFirst 10 metrics:\n")
             for i, metric in enumerate(metrics[:10]):
                 metric_id = metric.get("id", "unknown")
-                content += f"{i+1:2d}. {metric_id}\n"
+                out.write(f"{i+1:2d}. {metric_id}\n")
             if len(metrics) > 10:
-                content += f"... and {len(metrics) - 10} more"
+                out.write(f"... and {len(metrics) - 10} more")
+            content = out.getvalue()
         else:  # list format
-            content = f"Available Datadog metrics"
+            title = f"Available Datadog metrics"
             if filter_query:
-                content += f" (filtered by: '{filter_query}')"
-            content += f" | Total: {len(metrics)}"
+                title += f" (filtered by: '{filter_query}')"
+            title += f" | Total: {len(metrics)}"
             if cursor:
-                content += f" (cursor pagination)"
+                title += f" (cursor pagination)"
             if limit < len(metrics):
-                content += f" (showing first {limit})"
+                title += f" (showing first {limit})"
             if next_cursor:
-                content += f"\nNext cursor: {next_cursor}"
-            content += "\n" + "=" * len(content.split('\n')[-1]) + "\n\n"
+                title += f"\nNext cursor: {next_cursor}"
+            out = TextWriter().heading(title)
             
             if metrics:
                 for i, metric in enumerate(metrics, 1):
@@ -138,18 +141,19 @@ async def handle_call(request: CallToolRequest) -> CallToolResult:
                     description = attributes.get("description", "")
                     unit = attributes.get("unit", "")
                     
-                    content += f"{i:3d}. {metric_id}"
+                    out.write(f"{i:3d}. {metric_id}")
                     if unit:
-                        content += f" ({unit})"
+                        out.write(f" ({unit})")
                     if description:
-                        content += f"\n     {description[:100]}"
+                        out.write(f"\n     {description[:100]}")
                         if len(description) > 100:
-                            content += "..."
-                    content += "\n"
+                            out.write("...")
+                    out.write("\n")
             else:
-                content += "No metrics found"
+                out.write("No metrics found")
                 if filter_query:
-                    content += f" matching filter: '{filter_query}'"
+                    out.write(f" matching filter: '{filter_query}'")
+            content = out.getvalue()
         
         return CallToolResult(
             content=[TextContent(type="text", text=content)],
@@ -2,7 +2,6 @@
 List monitors tool
 """
 
-import json
 import logging
 from typing import Any, Dict
 
@@ -11,6 +10,11 @@ from mcp.types import CallToolRequest, CallToolResult, Tool, TextContent
 logger = logging.getLogger(__name__)
 
 from ..utils.datadog_client import fetch_monitors
+from ..utils.json_codec import dumps
+from ..utils.monitor_snapshot import PAGE_SIZE, monitor_snapshot, snapshot_max_age
+from ..utils.orgs import current_org
+from ..utils.pagination import ALL_PAGES_MAX_ITEMS, collect_pages_until_short, fit_items, fit_output
+from ..utils.text_writer import TextWriter
 
 
 def get_tool_definition() -> Tool:
@@ -36,6 +40,16 @@ def get_tool_definition() -> Tool:
                     "description": "Filter monitors by monitor tags (e.g., 'team:backend'). Leave empty to include all monitors.",
                     "default": "",
                 },
+                "state": {
+                    "type": "string",
+                    "description": "Filter monitors by overall state (e.g., 'Alert', 'Warn', 'No Data', 'OK'). Leave empty to include all states.",
+                    "default": "",
+                },
+                "type": {
+                    "type": "string",
+                    "description": "Filter monitors by type (e.g., 'metric alert', 'log alert'). Leave empty to include all types.",
+                    "default": "",
+                },
                 "format": {
                     "type": "string",
                     "description": "Output format",
@@ -55,6 +69,11 @@ def get_tool_definition() -> Tool:
                     "default": 0,
                     "minimum": 0,
                 },
+                "all_pages": {
+                    "type": "boolean",
+                    "description": "Return every matching monitor in one response, up to the output budget (page and page_size are ignored)",
+                    "default": False,
+                },
             },
             "additionalProperties": False,
             "required": [],
@@ -70,18 +89,57 @@ async def handle_call(request: CallToolRequest) -> CallToolResult:
         tags = args.get("tags", "")
         name = args.get("name", "")
         monitor_tags = args.get("monitor_tags", "")
+        state = args.get("state", "")
+        monitor_type_filter = args.get("type", "")
         format_type = args.get("format", "table")
         page_size = args.get("page_size", 50)
         page = args.get("page", 0)
+        all_pages = args.get("all_pages", False)
+        paged = not all_pages and page_size < 1000
         
-        # Fetch monitors list
-        monitors = await fetch_monitors(
-            tags=tags,
-            name=name,
-            monitor_tags=monitor_tags,
-            page_size=page_size,
-            page=page
-        )
+        total = None
+        if current_org() is None and monitor_snapshot.is_fresh(snapshot_max_age()):
+            # Answer from the background snapshot of the default org; summaries cover every match, not one page
+            matches = monitor_snapshot.query(
+                tags=tags,
+                name=name,
+                monitor_tags=monitor_tags,
+                state=state,
+                monitor_type=monitor_type_filter,
+            )
+            total = len(matches)
+            if all_pages:
+                monitors = matches[:ALL_PAGES_MAX_ITEMS]
+            elif format_type == "summary":
+                monitors = matches
+            else:
+                monitors = matches[page * page_size:(page + 1) * page_size]
+        elif all_pages:
+            monitors = await collect_pages_until_short(
+                lambda page_number: fetch_monitors(
+                    tags=tags,
+                    name=name,
+                    monitor_tags=monitor_tags,
+                    page_size=PAGE_SIZE,
+                    page=page_number,
+                ),
+                PAGE_SIZE,
+            )
+        else:
+            # Fetch monitors list
+            monitors = await fetch_monitors(
+                tags=tags,
+                name=name,
+                monitor_tags=monitor_tags,
+                page_size=page_size,
+                page=page
+            )
+        
+        if total is None:
+            if state:
+                monitors = [m for m in monitors if str(m.get("overall_state", "")).lower() == state.lower()]
+            if monitor_type_filter:
+                monitors = [m for m in monitors if str(m.get("type", "")).lower() == monitor_type_filter.lower()]
         
         if not monitors:
             return CallToolResult(
@@ -90,13 +148,17 @@ async def handle_call(request: CallToolRequest) -> CallToolResult:
             )
         
         # Format output
+        truncated = None
         if format_type == "json":
-            content = json.dumps(monitors, indent=2)
+            if all_pages:
+                content, truncated = fit_items(monitors, dumps)
+            else:
+                content = dumps(monitors)
         elif format_type == "summary":
-            content = f"Found {len(monitors)} monitors"
-            if page_size < 1000:
-                content += f" (page {page + 1}, showing up to {page_size} per page)"
-            if tags or name or monitor_tags:
+            summary = f"Found {len(monitors)} monitors"
+            if total is None and paged:
+                summary += f" (page {page + 1}, showing up to {page_size} per page)"
+            if tags or name or monitor_tags or state or monitor_type_filter:
                 filters = []
                 if tags:
                     filters.append(f"tags: '{tags}'")
@@ -104,7 +166,11 @@ async def handle_call(request: CallToolRequest) -> CallToolResult:
                     filters.append(f"name: '{name}'")
                 if monitor_tags:
                     filters.append(f"monitor_tags: '{monitor_tags}'")
-                content += f" matching filters: {', '.join(filters)}"
+                if state:
+                    filters.append(f"state: '{state}'")
+                if monitor_type_filter:
+                    filters.append(f"type: '{monitor_type_filter}'")
+                summary += f" matching filters: {', '.join(filters)}"
             
             # Group by type and state
             by_type = {}
@@ -116,16 +182,17 @@ async def handle_call(request: CallToolRequest) -> CallToolResult:
                 by_type[monitor_type] = by_type.get(monitor_type, 0) + 1
                 by_state[monitor_state] = by_state.get(monitor_state, 0) + 1
             
-            content += "\n\nBy Type:"
+            out = TextWriter().write(summary, "\n\nBy Type:")
             for type_name, count in sorted(by_type.items()):
-                content += f"\n  {type_name}: {count}"
+                out.write(f"\n  {type_name}: {count}")
             
-            content += "\n\nBy State:"
+            out.write("\n\nBy State:")
             for state, count in sorted(by_state.items()):
-                content += f"\n  {state}: {count}"
+                out.write(f"\n  {state}: {count}")
+            content = out.getvalue()
             
         else:  # table format
-            content = f"Datadog Monitors"
+            title = f"Datadog Monitors"
             filters = []
             if tags:
                 filters.append(f"tags: '{tags}'")
@@ -133,13 +200,19 @@ async def handle_call(request: CallToolRequest) -> CallToolResult:
                 filters.append(f"name: '{name}'")
             if monitor_tags:
                 filters.append(f"monitor_tags: '{monitor_tags}'")
+            if state:
+                filters.append(f"state: '{state}'")
+            if monitor_type_filter:
+                filters.append(f"type: '{monitor_type_filter}'")
             
             if filters:
-                content += f" (filtered by: {', '.join(filters)})"
-            content += f" | Total: {len(monitors)}"
-            if page_size < 1000:
-                content += f" (page {page + 1}, up to {page_size} per page)"
-            content += "\n" + "=" * len(content.split('\n')[-1]) + "\n\n"
+                title += f" (filtered by: {', '.join(filters)})"
+            title += f" | Total: {len(monitors)}"
+            if total is not None and total > len(monitors):
+                title += f" of {total}"
+            if paged:
+                title += f" (page {page + 1}, up to {page_size} per page)"
+            out = TextWriter().heading(title)
             
             for i, monitor in enumerate(monitors, 1):
                 monitor_id = monitor.get("id", "unknown")
@@ -153,14 +226,23 @@ async def handle_call(request: CallToolRequest) -> CallToolResult:
                 if len(monitor_tag_list) > 3:
                     tags_str += f" (+{len(monitor_tag_list) - 3} more)"
                 
-                content += f"{i:3d}. [{monitor_state.upper()}] {monitor_name}\n"
-                content += f"     ID: {monitor_id} | Type: {monitor_type}"
+                out.write(
+                    f"{i:3d}. [{monitor_state.upper()}] {monitor_name}\n",
+                    f"     ID: {monitor_id} | Type: {monitor_type}",
+                )
                 if tags_str:
-                    content += f" | Tags: {tags_str}"
-                content += "\n\n"
+                    out.write(f" | Tags: {tags_str}")
+                out.write("\n\n")
+            content = out.getvalue()
+        
+        if all_pages and format_type != "json":
+            content = fit_output(content)
         
+        contents = [TextContent(type="text", text=content)]
+        if truncated:
+            contents.append(TextContent(type="text", text=truncated))
         return CallToolResult(
-            content=[TextContent(type="text", text=content)],
+            content=contents,
             isError=False,
         )
         
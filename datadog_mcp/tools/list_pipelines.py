@@ -2,13 +2,13 @@
 List CI pipelines tool
 """
 
-import json
 from typing import Any, Dict
 
 from mcp.types import CallToolRequest, CallToolResult, Tool, TextContent
 
 from ..utils.datadog_client import fetch_ci_pipelines
 from ..utils.formatters import extract_pipeline_info, format_as_table
+from ..utils.json_codec import dumps
 
 
 def get_tool_definition() -> Tool:
@@ -99,7 +99,7 @@ async def handle_call(request: CallToolRequest) -> CallToolResult:
                     "has_more": bool(next_cursor)
                 }
             }
-            content = json.dumps(output, indent=2)
+            content = dumps(output)
         else:
             content = format_as_table(pipelines)
             if next_cursor:
@@ -2,7 +2,6 @@
 List service definitions tool
 """
 
-import json
 import logging
 from typing import Any, Dict
 
@@ -11,6 +10,8 @@ from mcp.types import CallToolRequest, CallToolResult, Tool, TextContent
 logger = logging.getLogger(__name__)
 
 from ..utils.datadog_client import fetch_service_definitions
+from ..utils.json_codec import dumps
+from ..utils.pagination import collect_numbered_pages, fit_items, fit_output
 
 
 def get_tool_definition() -> Tool:
@@ -34,6 +35,11 @@ def get_tool_definition() -> Tool:
                     "minimum": 0,
                     "default": 0,
                 },
+                "all_pages": {
+                    "type": "boolean",
+                    "description": "Return every service definition in one response, up to the output budget (page_size and page_number are ignored)",
+                    "default": False,
+                },
                 "schema_version": {
                     "type": "string",
                     "description": "Filter by schema version (e.g., 'v2', 'v2.1', 'v2.2')",
@@ -60,13 +66,24 @@ async def handle_call(request: CallToolRequest) -> CallToolResult:
         page_number = args.get("page_number", 0)
         schema_version = args.get("schema_version")
         format_type = args.get("format", "table")
+        all_pages = args.get("all_pages", False)
         
-        # Fetch service definitions
-        service_definitions_response = await fetch_service_definitions(
-            page_size=page_size,
-            page_number=page_number,
-            schema_version=schema_version
-        )
+        if all_pages:
+            definitions, first_response = await collect_numbered_pages(
+                lambda number: fetch_service_definitions(
+                    page_size=100,
+                    page_number=number,
+                    schema_version=schema_version,
+                )
+            )
+            service_definitions_response = {**first_response, "data": definitions}
+        else:
+            # Fetch service definitions
+            service_definitions_response = await fetch_service_definitions(
+                page_size=page_size,
+                page_number=page_number,
+                schema_version=schema_version
+            )
         
         if "data" not in service_definitions_response:
             return CallToolResult(
@@ -78,14 +95,24 @@ async def handle_call(request: CallToolRequest) -> CallToolResult:
         meta = service_definitions_response.get("meta", {})
         
         # Format output
+        truncated = None
         if format_type == "json":
-            content = json.dumps(service_definitions_response, indent=2)
+            if all_pages:
+                content, truncated = fit_items(
+                    service_definitions,
+                    lambda kept: dumps({**service_definitions_response, "data": kept}),
+                )
+            else:
+                content = dumps(service_definitions_response)
         elif format_type == "summary":
             total_count = meta.get("pagination", {}).get("total_count", len(service_definitions))
             content = f"Found {total_count} service definitions"
             if schema_version:
                 content += f" with schema version: '{schema_version}'"
-            content += f"\n\nShowing page {page_number + 1} ({len(service_definitions)} definitions):\n"
+            if all_pages:
+                content += f"\n\nShowing all pages ({len(service_definitions)} definitions):\n"
+            else:
+                content += f"\n\nShowing page {page_number + 1} ({len(service_definitions)} definitions):\n"
             for i, definition in enumerate(service_definitions):
                 attributes = definition.get("attributes", {})
                 service_name = attributes.get("service", {}).get("name", "unknown")
@@ -97,7 +124,10 @@ async def handle_call(request: CallToolRequest) -> CallToolResult:
             if schema_version:
                 content += f" (schema: {schema_version})"
             content += f" | Total: {total_count}"
-            content += f" | Page: {page_number + 1} ({len(service_definitions)} shown)"
+            if all_pages:
+                content += f" | All pages ({len(service_definitions)} shown)"
+            else:
+                content += f" | Page: {page_number + 1} ({len(service_definitions)} shown)"
             content += "\n" + "=" * len(content.split('\n')[-1]) + "\n\n"
             
             if service_definitions:
@@ -132,7 +162,7 @@ async def handle_call(request: CallToolRequest) -> CallToolResult:
                 
                 # Pagination info
                 pagination = meta.get("pagination", {})
-                if pagination:
+                if pagination and not all_pages:
                     current_page = page_number + 1
                     total_pages = pagination.get("total_pages", 1)
                     content += f"\nPage {current_page} of {total_pages}"
@@ -143,8 +173,14 @@ async def handle_call(request: CallToolRequest) -> CallToolResult:
                 if schema_version:
                     content += f" with schema version: '{schema_version}'"
         
+        if all_pages and format_type != "json":
+            content = fit_output(content)
+        
+        contents = [TextContent(type="text", text=content)]
+        if truncated:
+            contents.append(TextContent(type="text", text=truncated))
         return CallToolResult(
-            content=[TextContent(type="text", text=content)],
+            content=contents,
             isError=False,
         )
         
@@ -2,7 +2,6 @@
 List SLOs tool
 """
 
-import json
 import logging
 from typing import Any, Dict
 
@@ -11,6 +10,9 @@ from mcp.types import CallToolRequest, CallToolResult, Tool, TextContent
 logger = logging.getLogger(__name__)
 
 from ..utils.datadog_client import fetch_slos
+from ..utils.json_codec import dumps
+from ..utils.pagination import collect_pages_until_short, fit_items, fit_output
+from ..utils.text_writer import TextWriter
 
 
 def get_tool_definition() -> Tool:
@@ -44,6 +46,11 @@ def get_tool_definition() -> Tool:
                     "default": 0,
                     "minimum": 0,
                 },
+                "all_pages": {
+                    "type": "boolean",
+                    "description": "Return every matching SLO in one response, up to the output budget (limit and offset are ignored)",
+                    "default": False,
+                },
                 "format": {
                     "type": "string",
                     "description": "Output format",
@@ -67,14 +74,27 @@ async def handle_call(request: CallToolRequest) -> CallToolResult:
         limit = args.get("limit", 50)
         offset = args.get("offset", 0)
         format_type = args.get("format", "table")
+        all_pages = args.get("all_pages", False)
         
-        # Fetch SLOs list
-        slos = await fetch_slos(
-            tags=tags if tags else None,
-            query=query if query else None,
-            limit=limit,
-            offset=offset
-        )
+        if all_pages:
+            slos = await collect_pages_until_short(
+                lambda page: fetch_slos(
+                    tags=tags if tags else None,
+                    query=query if query else None,
+                    limit=1000,
+                    offset=page * 1000,
+                ),
+                1000,
+            )
+            limit, offset = 1000, 0  # no paging details in the headers
+        else:
+            # Fetch SLOs list
+            slos = await fetch_slos(
+                tags=tags if tags else None,
+                query=query if query else None,
+                limit=limit,
+                offset=offset
+            )
         
         if not slos:
             return CallToolResult(
@@ -83,24 +103,28 @@ async def handle_call(request: CallToolRequest) -> CallToolResult:
             )
         
         # Format output
+        truncated = None
         if format_type == "json":
-            content = json.dumps(slos, indent=2)
+            if all_pages:
+                content, truncated = fit_items(slos, dumps)
+            else:
+                content = dumps(slos)
         elif format_type == "summary":
-            content = f"Found {len(slos)} SLOs"
+            summary = f"Found {len(slos)} SLOs"
             if limit < 1000 or offset > 0:
                 page_info = []
                 if offset > 0:
                     page_info.append(f"offset {offset}")
                 if limit < 1000:
                     page_info.append(f"limit {limit}")
-                content += f" ({', '.join(page_info)})"
+                summary += f" ({', '.join(page_info)})"
             if tags or query:
                 filters = []
                 if tags:
                     filters.append(f"tags: '{tags}'")
                 if query:
                     filters.append(f"query: '{query}'")
-                content += f" matching filters: {', '.join(filters)}"
+                summary += f" matching filters: {', '.join(filters)}"
             
             # Group by type and status
             by_type = {}
@@ -130,21 +154,22 @@ async def handle_call(request: CallToolRequest) -> CallToolResult:
                             by_status[status] = by_status.get(status, 0) + 1
                             break
             
-            content += "\n\nBy Type:"
+            out = TextWriter().write(summary, "\n\nBy Type:")
             for type_name, count in sorted(by_type.items()):
-                content += f"\n  {type_name}: {count}"
+                out.write(f"\n  {type_name}: {count}")
             
             if by_status:
-                content += "\n\nBy Status:"
+                out.write("\n\nBy Status:")
                 for status, count in sorted(by_status.items()):
-                    content += f"\n  {status}: {count}"
+                    out.write(f"\n  {status}: {count}")
             
             if targets:
                 avg_target = sum(targets) / len(targets)
-                content += f"\n\nAverage Target: {avg_target:.2%}"
+                out.write(f"\n\nAverage Target: {avg_target:.2%}")
+            content = out.getvalue()
             
         else:  # table format
-            content = f"Datadog SLOs"
+            title = f"Datadog SLOs"
             filters = []
             if tags:
                 filters.append(f"tags: '{tags}'")
@@ -152,16 +177,16 @@ async def handle_call(request: CallToolRequest) -> CallToolResult:
                 filters.append(f"query: '{query}'")
             
             if filters:
-                content += f" (filtered by: {', '.join(filters)})"
-            content += f" | Total: {len(slos)}"
+                title += f" (filtered by: {', '.join(filters)})"
+            title += f" | Total: {len(slos)}"
             if limit < 1000 or offset > 0:
                 page_info = []
                 if offset > 0:
                     page_info.append(f"offset {offset}")
                 if limit < 1000:
                     page_info.append(f"limit {limit}")
-                content += f" ({', '.join(page_info)})"
-            content += "\n" + "=" * len(content.split('\n')[-1]) + "\n\n"
+                title += f" ({', '.join(page_info)})"
+            out = TextWriter().heading(title)
             
             for i, slo in enumerate(slos, 1):
                 slo_id = slo.get("id", "unknown")
@@ -192,14 +217,23 @@ async def handle_call(request: CallToolRequest) -> CallToolResult:
                 description = slo.get("description", "")
                 desc_str = f" - {description[:50]}..." if len(description) > 50 else f" - {description}" if description else ""
                 
-                content += f"{i:3d}. {slo_name}{desc_str}\n"
-                content += f"     ID: {slo_id} | Type: {slo_type} | Target: {target_str}{warning_str}"
+                out.write(
+                    f"{i:3d}. {slo_name}{desc_str}\n",
+                    f"     ID: {slo_id} | Type: {slo_type} | Target: {target_str}{warning_str}",
+                )
                 if tags_str:
-                    content += f"\n     Tags: {tags_str}"
-                content += "\n\n"
+                    out.write(f"\n     Tags: {tags_str}")
+                out.write("\n\n")
+            content = out.getvalue()
+        
+        if all_pages and format_type != "json":
+            content = fit_output(content)
         
+        contents = [TextContent(type="text", text=content)]
+        if truncated:
+            contents.append(TextContent(type="text", text=truncated))
         return CallToolResult(
-            content=[TextContent(type="text", text=content)],
+            content=contents,
             isError=False,
         )
         
@@ -0,0 +1,235 @@
+"""
+SLO status tool
+"""
+
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+from mcp.types import CallToolRequest, CallToolResult, Tool, TextContent
+
+logger = logging.getLogger(__name__)
+
+from ..utils.datadog_client import fetch_slo_history, fetch_slos
+from ..utils.fanout import fan_out
+from ..utils.json_codec import dumps
+from ..utils.text_writer import TextWriter
+
+TIMEFRAME_DAYS = {"7d": 7, "30d": 30, "90d": 90}
+
+# Display order, most urgent first
+STATUS_ORDER = ["breached", "warning", "ok", "no data", "error"]
+
+
+def get_tool_definition() -> Tool:
+    """Get the tool definition for slo_status."""
+    return Tool(
+        name="slo_status",
+        description="Report the current status of SLOs from Datadog: SLI, error budget remaining and burn rate over a timeframe, fetched for all matching SLOs at once.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "tags": {
+                    "type": "string",
+                    "description": "Filter SLOs by tags (e.g., 'team:backend,env:prod'). Leave empty to check all SLOs.",
+                    "default": "",
+                },
+                "query": {
+                    "type": "string",
+                    "description": "Filter SLOs by name or description (substring match). Leave empty to include all SLOs.",
+                    "default": "",
+                },
+                "timeframe": {
+                    "type": "string",
+                    "description": "Window to compute the SLI and error budget over",
+                    "enum": list(TIMEFRAME_DAYS),
+                    "default": "30d",
+                },
+                "limit": {
+                    "type": "integer",
+                    "description": "Maximum number of SLOs to check (default: 100, max: 1000)",
+                    "default": 100,
+                    "minimum": 1,
+                    "maximum": 1000,
+                },
+                "format": {
+                    "type": "string",
+                    "description": "Output format",
+                    "enum": ["table", "json", "summary"],
+                    "default": "table",
+                },
+            },
+            "additionalProperties": False,
+            "required": [],
+        },
+    )
+
+
+def _threshold(slo: Dict[str, Any], timeframe: str) -> Dict[str, Any]:
+    """The SLO threshold for the timeframe, or its first threshold."""
+    thresholds = slo.get("thresholds") or []
+    for threshold in thresholds:
+        if threshold.get("timeframe") == timeframe:
+            return threshold
+    return thresholds[0] if thresholds else {}
+
+
+def _slo_status(slo: Dict[str, Any], history: Any, timeframe: str) -> Dict[str, Any]:
+    """SLI, error budget and burn rate of one SLO from its history.
+
+    The error budget remaining is the share of the allowed error (100 - target)
+    not yet used; the burn rate is the observed error over the allowed error,
+    so 1.0 uses up exactly the budget over the timeframe.
+    """
+    threshold = _threshold(slo, timeframe)
+    target = threshold.get("target")
+    warning = threshold.get("warning")
+    status = {
+        "id": slo.get("id", "unknown"),
+        "name": slo.get("name", "Unnamed"),
+        "type": slo.get("type", "unknown"),
+        "tags": slo.get("tags", []),
+        "timeframe": timeframe,
+        "target": target,
+        "warning": warning,
+        "sli": None,
+        "error_budget_remaining": None,
+        "burn_rate": None,
+        "status": "no data",
+    }
+    if isinstance(history, Exception):
+        status["status"] = "error"
+        status["error"] = str(history)
+        return status
+
+    sli = ((history or {}).get("overall") or {}).get("sli_value")
+    if sli is None or target is None:
+        return status
+    status["sli"] = sli
+    allowed = 100 - target
+    if allowed > 0:
+        status["error_budget_remaining"] = round((sli - target) / allowed * 100, 2)
+        status["burn_rate"] = round((100 - sli) / allowed, 2)
+    if sli < target:
+        status["status"] = "breached"
+    elif warning is not None and sli < warning:
+        status["status"] = "warning"
+    else:
+        status["status"] = "ok"
+    return status
+
+
+def _urgency(status: Dict[str, Any]) -> tuple:
+    """Sort key: by status, then least error budget left first."""
+    budget = status["error_budget_remaining"]
+    return (STATUS_ORDER.index(status["status"]), budget if budget is not None else float("inf"))
+
+
+def _format_value(value: Optional[float], suffix: str = "%") -> str:
+    return "N/A" if value is None else f"{value:g}{suffix}"
+
+
+async def handle_call(request: CallToolRequest) -> CallToolResult:
+    """Handle the slo_status tool call."""
+    try:
+        args = request.arguments or {}
+
+        tags = args.get("tags", "")
+        query = args.get("query", "")
+        timeframe = args.get("timeframe", "30d")
+        limit = args.get("limit", 100)
+        format_type = args.get("format", "table")
+
+        if timeframe not in TIMEFRAME_DAYS:
+            raise ValueError(f"Unsupported timeframe '{timeframe}', use one of: {', '.join(TIMEFRAME_DAYS)}")
+
+        slos = await fetch_slos(
+            tags=tags if tags else None,
+            query=query if query else None,
+            limit=limit,
+        )
+
+        if not slos:
+            return CallToolResult(
+                content=[TextContent(type="text", text="No SLOs found")],
+                isError=False,
+            )
+
+        # One window for every SLO, so their numbers compare
+        to_ts = int(time.time())
+        from_ts = to_ts - TIMEFRAME_DAYS[timeframe] * 86400
+        histories = await fan_out(
+            slos, lambda slo: fetch_slo_history(slo["id"], from_ts, to_ts)
+        )
+        statuses = sorted(
+            (_slo_status(slo, history, timeframe) for slo, history in zip(slos, histories)),
+            key=_urgency,
+        )
+
+        if format_type == "json":
+            content = dumps(statuses)
+        elif format_type == "summary":
+            by_status: Dict[str, int] = {}
+            for status in statuses:
+                by_status[status["status"]] = by_status.get(status["status"], 0) + 1
+
+            out = TextWriter().write(f"Status of {len(statuses)} SLOs over {timeframe}")
+            if tags or query:
+                filters = []
+                if tags:
+                    filters.append(f"tags: '{tags}'")
+                if query:
+                    filters.append(f"query: '{query}'")
+                out.write(f" matching filters: {', '.join(filters)}")
+
+            out.write("\n\nBy Status:")
+            for name in STATUS_ORDER:
+                if name in by_status:
+                    out.write(f"\n  {name}: {by_status[name]}")
+
+            at_risk: List[Dict[str, Any]] = [s for s in statuses if s["status"] in ("breached", "warning")]
+            if at_risk:
+                out.write("\n\nLeast Error Budget Remaining:")
+                for status in at_risk[:5]:
+                    out.write(
+                        f"\n  {status['name']}: {_format_value(status['error_budget_remaining'])}"
+                        f" (burn rate {_format_value(status['burn_rate'], 'x')})"
+                    )
+            content = out.getvalue()
+
+        else:  # table format
+            title = f"Datadog SLO Status ({timeframe})"
+            filters = []
+            if tags:
+                filters.append(f"tags: '{tags}'")
+            if query:
+                filters.append(f"query: '{query}'")
+            if filters:
+                title += f" (filtered by: {', '.join(filters)})"
+            title += f" | Total: {len(statuses)}"
+            out = TextWriter().heading(title)
+
+            for i, status in enumerate(statuses, 1):
+                out.write(
+                    f"{i:3d}. [{status['status'].upper()}] {status['name']}\n",
+                    f"     SLI: {_format_value(status['sli'])} | Target: {_format_value(status['target'])}",
+                    f" | Budget left: {_format_value(status['error_budget_remaining'])}",
+                    f" | Burn rate: {_format_value(status['burn_rate'], 'x')}\n",
+                    f"     ID: {status['id']} | Type: {status['type']}",
+                )
+                if "error" in status:
+                    out.write(f"\n     Error: {status['error']}")
+                out.write("\n\n")
+            content = out.getvalue()
+
+        return CallToolResult(
+            content=[TextContent(type="text", text=content)],
+            isError=False,
+        )
+
+    except Exception as e:
+        logger.error(f"Error in slo_status: {e}")
+        return CallToolResult(
+            content=[TextContent(type="text", text=f"Error: {str(e)}")],
+            isError=True,
+        )
@@ -0,0 +1,250 @@
+"""
+Circuit breakers per Datadog endpoint family
+
+When one family of endpoints degrades (e.g. span search timing out), calls
+to it would each wait out the full request timeout. After
+DD_MCP_BREAKER_FAILURES consecutive failures (default: 5; 0 disables the
+breakers) a family's breaker opens, and its requests fail at once with
+CircuitOpenError for DD_MCP_BREAKER_RESET_SECONDS (default: 30). Then a
+single probe request is let through (half-open): its success closes the
+breaker, its failure opens it again.
+
+Failures are connection errors, timeouts and 5xx responses; other 4xx and
+429 responses say nothing about the endpoint's health. Neither do timeouts
+once the tool call's deadline is due, since the request's timeout was capped
+by it (see deadline.request_timeout).
+"""
+
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+import httpx
+import urllib3
+
+from .deadline import expired
+from .orgs import org_scoped
+
+logger = logging.getLogger(__name__)
+
+BREAKER_FAILURES = int(os.getenv("DD_MCP_BREAKER_FAILURES", "5"))
+BREAKER_RESET_SECONDS = float(os.getenv("DD_MCP_BREAKER_RESET_SECONDS", "30"))
+
+# Endpoint families by path prefix; a breaker trips for a whole family
+ENDPOINT_FAMILIES = [
+    ("/api/v2/logs", "logs"),
+    ("/api/v2/spans", "spans"),
+    ("/api/v1/query", "metrics_query"),
+    ("/api/v2/metrics", "metrics_catalog"),
+    ("/api/v1/monitor", "monitors"),
+    ("/api/v1/slo", "slos"),
+    ("/api/v2/team", "teams"),
+    ("/api/v2/services/definitions", "service_definitions"),
+    ("/api/v2/ci", "ci"),
+]
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+T = TypeVar("T")
+
+
+def endpoint_family(path: str) -> str:
+    """Map a request path to its endpoint family."""
+    for prefix, family in ENDPOINT_FAMILIES:
+        if path.startswith(prefix):
+            return family
+    return "other"
+
+
+def is_failure(error: BaseException) -> bool:
+    """Whether an error counts against the health of the endpoint."""
+    if isinstance(error, CircuitOpenError):
+        return False
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code >= 500
+    if isinstance(error, (httpx.TransportError, urllib3.exceptions.HTTPError, TimeoutError)):
+        return True
+    # Datadog SDK errors carry the response status
+    status = getattr(error, "status", None)
+    return isinstance(status, int) and status >= 500
+
+
+def is_timeout(error: BaseException) -> bool:
+    """Whether an error is a request timing out, in httpx or the SDK's urllib3."""
+    if isinstance(error, urllib3.exceptions.MaxRetryError):
+        error = error.reason
+    return isinstance(error, (httpx.TimeoutException, urllib3.exceptions.TimeoutError, TimeoutError))
+
+
+class CircuitOpenError(httpx.TransportError):
+    """A request was not sent because its endpoint family's breaker is open."""
+
+    def __init__(self, family: str, failures: int, retry_in: float, request: Optional[httpx.Request] = None):
+        super().__init__(
+            f"Datadog {family} endpoints are failing ({failures} consecutive failures); "
+            f"not sending requests to them for another {retry_in:.0f}s",
+            request=request,
+        )
+        self.family = family
+        self.retry_in = retry_in
+
+
+@dataclass
+class BreakerState:
+    """What a breaker reports about itself."""
+
+    state: str
+    failures: int
+    retry_in: float
+    opened: int
+
+
+class CircuitBreaker:
+    """Closed, open or half-open state of one endpoint family."""
+
+    def __init__(
+        self, family: str, failures: int = BREAKER_FAILURES, reset_seconds: float = BREAKER_RESET_SECONDS
+    ):
+        self.family = family
+        self.threshold = failures
+        self.reset_seconds = reset_seconds
+        self.state = CLOSED
+        self.failures = 0
+        self.opened = 0
+        self._opened_at = 0.0
+        self._probing = False
+
+    def retry_in(self) -> float:
+        if self.state != OPEN:
+            return 0.0
+        return max(self._opened_at + self.reset_seconds - time.monotonic(), 0.0)
+
+    def check(self, request: Optional[httpx.Request] = None) -> None:
+        """Let a request through, or raise CircuitOpenError."""
+        if self.threshold <= 0 or self.state == CLOSED:
+            return
+        if self.state == OPEN and self.retry_in() <= 0:
+            self.state = HALF_OPEN
+            logger.info(f"Circuit breaker for {self.family} is half-open, probing")
+        if self.state == HALF_OPEN and not self._probing:
+            self._probing = True
+            return
+        raise CircuitOpenError(self.family, self.failures, max(self.retry_in(), 1.0), request)
+
+    def record(self, failed: bool) -> None:
+        """Record the outcome of a request let through by ``check``."""
+        if self.threshold <= 0:
+            return
+        probe = self._probing
+        self._probing = False
+        if not failed:
+            if self.state != CLOSED:
+                logger.info(f"Circuit breaker for {self.family} closed again")
+            self.state = CLOSED
+            self.failures = 0
+            return
+        self.failures += 1
+        if probe or self.failures >= self.threshold:
+            if self.state != OPEN:
+                self.opened += 1
+                logger.warning(
+                    f"Circuit breaker for {self.family} opened after {self.failures} consecutive failures"
+                )
+            self.state = OPEN
+            self._opened_at = time.monotonic()
+
+    def release(self) -> None:
+        """Forget a request that ended without an outcome, e.g. cancelled."""
+        self._probing = False
+
+    def report(self) -> BreakerState:
+        return BreakerState(self.state, self.failures, round(self.retry_in(), 1), self.opened)
+
+
+class CircuitBreakers:
+    """One breaker per endpoint family and org, created on first use."""
+
+    def __init__(self) -> None:
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, family: str) -> CircuitBreaker:
+        """The family's breaker in the org of the current tool call, e.g. "eu:spans"."""
+        family = org_scoped(family)
+        breaker = self._breakers.get(family)
+        if breaker is None:
+            breaker = self._breakers[family] = CircuitBreaker(family)
+        return breaker
+
+    def states(self, tripped_only: bool = False) -> Dict[str, Dict[str, Any]]:
+        """State of each breaker; only those not closed with ``tripped_only``."""
+        return {
+            family: vars(breaker.report())
+            for family, breaker in sorted(self._breakers.items())
+            if not tripped_only or breaker.state != CLOSED
+        }
+
+    def describe_tripped(self) -> str:
+        """One line naming the breakers that are not closed, or an empty string."""
+        parts = []
+        for family, state in self.states(tripped_only=True).items():
+            if state["state"] == OPEN:
+                parts.append(f"{family} open (retrying in {state['retry_in']:.0f}s)")
+            else:
+                parts.append(f"{family} {state['state']}")
+        return ", ".join(parts)
+
+    def reset(self) -> None:
+        self._breakers.clear()
+
+
+circuit_breakers = CircuitBreakers()
+
+
+async def guarded(family: str, call: Callable[[], Awaitable[T]]) -> T:
+    """Await ``call()`` through the family's breaker, for requests outside httpx (the SDK)."""
+    breaker = circuit_breakers.get(family)
+    breaker.check()
+    try:
+        result = await call()
+    except Exception as e:
+        if is_timeout(e) and expired():
+            breaker.release()
+        else:
+            breaker.record(is_failure(e))
+        raise
+    except BaseException:
+        breaker.release()
+        raise
+    breaker.record(False)
+    return result
+
+
+class CircuitBreakerTransport(httpx.AsyncBaseTransport):
+    """httpx transport sending each request through its endpoint family's breaker."""
+
+    def __init__(self, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self._transport = transport or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        breaker = circuit_breakers.get(endpoint_family(request.url.path))
+        breaker.check(request)
+        try:
+            response = await self._transport.handle_async_request(request)
+        except httpx.TransportError as e:
+            if is_timeout(e) and expired():
+                breaker.release()
+            else:
+                breaker.record(True)
+            raise
+        except BaseException:
+            breaker.release()
+            raise
+        breaker.record(response.status_code >= 500)
+        return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
@@ -0,0 +1,168 @@
+"""
+Single-flight coalescing of identical concurrent fetches
+
+Agents investigating the same incident often issue the same query within
+moments of each other. While a fetch is in flight, identical calls (same
+function, same normalized arguments) wait for it and share its result
+instead of sending another Datadog request. Calls for different orgs are
+never shared.
+
+The shared request runs for all of its callers alike: it carries the org
+it is for, but not the deadline, stale-data notes or profile of the caller
+that happened to start it. Each caller still stops waiting at its own
+deadline, and stale-data notes come from the response cache, which sits in
+front of coalescing and so notes each caller separately.
+
+Set DD_MCP_COALESCE=0 to disable.
+"""
+
+import asyncio
+import contextvars
+import functools
+import inspect
+import logging
+import os
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple, TypeVar
+
+from .orgs import current_org, org_context
+
+logger = logging.getLogger(__name__)
+
+COALESCING_ENABLED = os.getenv("DD_MCP_COALESCE", "1").lower() not in ("0", "false", "no")
+
+F = TypeVar("F", bound=Callable[..., Awaitable[Any]])
+
+
+@dataclass
+class CoalescingStats:
+    """Counters for one coalesced function."""
+
+    calls: int = 0
+    executed: int = 0
+
+    @property
+    def saved(self) -> int:
+        """Calls served by another caller's in-flight request."""
+        return self.calls - self.executed
+
+
+def _freeze(value: Any) -> Hashable:
+    """Hashable form of an argument; mappings compare regardless of key order."""
+    if isinstance(value, dict):
+        return tuple(sorted((str(key), _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, (set, frozenset)):
+        return tuple(sorted(_freeze(item) for item in value))
+    return value
+
+
+class SingleFlight:
+    """Share one in-flight call among all concurrent callers with the same key.
+
+    The shared call runs as its own task, so a caller being cancelled does
+    not cancel it for the others; once every caller is gone it is cancelled
+    too, aborting its request. Every caller receives the same result
+    object, which must therefore be treated as read-only.
+
+    The task runs in ``context``, by default a copy of the first caller's;
+    callers sharing a key must then not differ in any context variable the
+    call reads.
+    """
+
+    def __init__(self) -> None:
+        self._inflight: Dict[Tuple[Any, ...], asyncio.Future] = {}
+        self._waiters: Dict[asyncio.Future, int] = {}
+        self._stats: Dict[str, CoalescingStats] = {}
+
+    async def do(
+        self,
+        name: str,
+        key: Hashable,
+        call: Callable[[], Awaitable[Any]],
+        context: Optional[contextvars.Context] = None,
+    ) -> Any:
+        """Await ``call()``, or the identical call already in flight."""
+        stats = self._stats.get(name)
+        if stats is None:
+            stats = self._stats[name] = CoalescingStats()
+        stats.calls += 1
+
+        # Tasks belong to one event loop
+        flight_key = (id(asyncio.get_running_loop()), name, key)
+        task = self._inflight.get(flight_key)
+        if task is None:
+            stats.executed += 1
+            task = asyncio.get_running_loop().create_task(call(), context=context)
+            self._inflight[flight_key] = task
+            task.add_done_callback(functools.partial(self._landed, flight_key))
+        else:
+            logger.debug(f"Coalesced {name} call with an in-flight request")
+
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            self._waiters[task] -= 1
+            if not self._waiters[task]:
+                del self._waiters[task]
+                if not task.done():
+                    # Every caller was cancelled; nobody needs the response any more
+                    task.cancel()
+
+    def _landed(self, flight_key: Tuple[Any, ...], task: asyncio.Future) -> None:
+        if self._inflight.get(flight_key) is task:
+            del self._inflight[flight_key]
+        if not task.cancelled():
+            task.exception()  # waiters may all have been cancelled; avoid "never retrieved" warnings
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Calls, executed requests and saved requests per function."""
+        return {
+            name: {**asdict(stats), "saved": stats.saved}
+            for name, stats in sorted(self._stats.items())
+        }
+
+    def reset_stats(self) -> None:
+        self._stats.clear()
+
+
+single_flight = SingleFlight()
+
+
+def coalesce(func: Optional[F] = None, *, scope: Callable[[], str] = lambda: "") -> Any:
+    """Coalesce identical concurrent calls of an async fetch function.
+
+    Calls are identical when their arguments are equal after defaults are
+    applied; dict arguments such as filters are compared regardless of
+    key order. Calls with unhashable arguments always run on their own.
+    The shared call runs with the org of its callers and no deadline; each
+    caller waits for it until its own deadline.
+
+    Args:
+        func: The fetch function, when used as a bare ``@coalesce``
+        scope: Returns what besides the arguments distinguishes calls,
+            e.g. the API URL and credentials in use
+    """
+
+    def decorate(func: F) -> F:
+        signature = inspect.signature(func)
+        name = func.__name__
+
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not COALESCING_ENABLED:
+                return await func(*args, **kwargs)
+            try:
+                bound = signature.bind(*args, **kwargs)
+                bound.apply_defaults()
+                key = (current_org(), scope(), _freeze(tuple(bound.arguments.items())))
+                hash(key)
+            except TypeError:
+                return await func(*args, **kwargs)
+            return await single_flight.do(name, key, lambda: func(*args, **kwargs), context=org_context())
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorate(func) if func is not None else decorate
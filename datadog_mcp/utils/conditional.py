@@ -0,0 +1,161 @@
+"""
+Conditional requests for large, slow-changing documents
+
+Service definitions and the monitor catalog are re-requested far more often
+than they change. The validators of each response (ETag, Last-Modified) are
+kept per URL and sent back as If-None-Match / If-Modified-Since, so a 304
+answers with the document decoded last time. Where Datadog sends no
+validators, a hash of the body tells an unchanged payload apart, which then
+skips parsing as well; text formatted from such a document can be reused
+through ``format_once``.
+
+DD_MCP_CONDITIONAL_ENTRIES sets how many documents are kept (default: 256).
+"""
+
+import hashlib
+import logging
+import os
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Hashable, Mapping, Optional, Tuple
+
+import httpx
+
+from .json_codec import loads
+from .profiling import phase
+
+logger = logging.getLogger(__name__)
+
+CONDITIONAL_ENTRIES = int(os.getenv("DD_MCP_CONDITIONAL_ENTRIES", "256"))
+
+# Formatted texts kept for reuse
+FORMATTED_ENTRIES = 64
+
+
+@dataclass
+class ValidatedDocument:
+    """A decoded response with what is needed to tell whether it changed."""
+
+    digest: str
+    value: Any
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+
+class ValidatorStore:
+    """Decoded documents and their validators, least recently used dropped first."""
+
+    def __init__(self, max_entries: int = CONDITIONAL_ENTRIES):
+        self.max_entries = max_entries
+        self._documents: "OrderedDict[str, ValidatedDocument]" = OrderedDict()
+        # Responses answered with 304, with an unchanged body, and with a new body
+        self.not_modified = 0
+        self.unchanged = 0
+        self.changed = 0
+
+    def get(self, key: str) -> Optional[ValidatedDocument]:
+        document = self._documents.get(key)
+        if document is not None:
+            self._documents.move_to_end(key)
+        return document
+
+    def put(self, key: str, document: ValidatedDocument) -> None:
+        if self.max_entries <= 0:
+            return
+        self._documents[key] = document
+        self._documents.move_to_end(key)
+        while len(self._documents) > self.max_entries:
+            self._documents.popitem(last=False)
+
+    def clear(self) -> None:
+        self._documents.clear()
+        self.not_modified = self.unchanged = self.changed = 0
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+
+validator_store = ValidatorStore()
+
+
+def _document_key(url: str, params: Optional[Mapping[str, Any]], headers: Mapping[str, str]) -> str:
+    """Documents belong to one URL, query and key pair."""
+    query = "&".join(f"{name}={value}" for name, value in sorted((params or {}).items()))
+    credentials = hashlib.sha256(
+        f"{headers.get('DD-API-KEY')}:{headers.get('DD-APPLICATION-KEY')}".encode()
+    ).hexdigest()[:16]
+    return f"{url}?{query}|{credentials}"
+
+
+async def conditional_get(
+    client: httpx.AsyncClient,
+    url: str,
+    headers: Mapping[str, str],
+    params: Optional[Mapping[str, Any]] = None,
+) -> Any:
+    """GET a JSON document, reusing the last decoded copy when it did not change.
+
+    Args:
+        client: Client to send the request with
+        url: Document URL
+        headers: Request headers, including the API keys
+        params: Query parameters
+
+    Returns:
+        The decoded document; callers must not modify it, as it may be
+        returned again for later requests
+    """
+    key = _document_key(url, params, headers)
+    known = validator_store.get(key)
+
+    request_headers = dict(headers)
+    if known is not None:
+        if known.etag:
+            request_headers["If-None-Match"] = known.etag
+        if known.last_modified:
+            request_headers["If-Modified-Since"] = known.last_modified
+
+    response = await client.get(url, headers=request_headers, params=params)
+    if response.status_code == 304 and known is not None:
+        validator_store.not_modified += 1
+        return known.value
+    response.raise_for_status()
+
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    body = response.content
+    digest = hashlib.sha256(body).hexdigest()
+    if known is not None and known.digest == digest:
+        validator_store.unchanged += 1
+        known.etag, known.last_modified = etag, last_modified
+        return known.value
+
+    with phase("parse"):
+        value = loads(body)
+    validator_store.changed += 1
+    validator_store.put(key, ValidatedDocument(digest, value, etag, last_modified))
+    return value
+
+
+_formatted: "OrderedDict[Tuple[int, Hashable], Tuple[Any, str]]" = OrderedDict()
+
+
+def format_once(document: Any, key: Hashable, render: Callable[[], str]) -> str:
+    """Text rendered from ``document``, reused while the same document is returned.
+
+    Args:
+        document: A document returned by ``conditional_get``
+        key: Everything else the text depends on, e.g. the output format
+        render: Renders the text
+    """
+    memo_key = (id(document), key)
+    entry = _formatted.get(memo_key)
+    # The document is kept with its text, so its id cannot be reused meanwhile
+    if entry is not None and entry[0] is document:
+        _formatted.move_to_end(memo_key)
+        return entry[1]
+    text = render()
+    _formatted[memo_key] = (document, text)
+    while len(_formatted) > FORMATTED_ENTRIES:
+        _formatted.popitem(last=False)
+    return text
@@ -2,9 +2,9 @@
 Datadog API client utilities
 """
 
-import json
+import asyncio
+import copy
 import logging
-import os
 from typing import Any, Dict, List, Optional
 
 import httpx
@@ -22,28 +22,83 @@ from datadog_api_client.v2.model.logs_compute_type import LogsComputeType
 from datadog_api_client.v2.model.logs_group_by import LogsGroupBy
 from datadog_api_client.v2.model.logs_aggregate_sort import LogsAggregateSort
 
+from .circuit_breaker import CircuitBreakerTransport, guarded
+from .coalescing import coalesce
+from .conditional import conditional_get
+from .deadline import request_timeout
+from .hedging import hedger
+from .http_pool import shared_transport
+from .json_codec import DECODE_ERRORS, JsonProjection, decode_stream, dumps
+from .not_found import remember_names, remember_not_found
+from .orgs import DEFAULT_API_URL, Org, active_org, current_org, org_registry
+from .profiling import phase
+from .response_cache import cached
+
 logger = logging.getLogger(__name__)
 
-# Datadog API configuration
-DATADOG_API_URL = "https://api.datadoghq.com"
-DATADOG_API_KEY = os.getenv("DD_API_KEY")
-DATADOG_APP_KEY = os.getenv("DD_APP_KEY")
 
-# Datadog API configuration loaded from environment
+async def _stream_json(
+    client: httpx.AsyncClient, method: str, url: str, fields: JsonProjection, **kwargs: Any
+) -> Any:
+    """Send a request and decode only ``fields`` from the streamed JSON response."""
+    async with client.stream(method, url, **kwargs) as response:
+        if response.is_error:
+            await response.aread()  # so error handlers can log the body
+        response.raise_for_status()
+        # Reading the body and decoding it are interleaved, so both count as parsing
+        with phase("parse"):
+            return await decode_stream(response.aiter_bytes(), fields)
+
+
+def _http_client(**kwargs: Any) -> httpx.AsyncClient:
+    """Client for one fetch: deadline-bound timeout, requests through the circuit breakers.
+
+    Clients are cheap; the connections behind them come from the shared pool
+    and stay open when the client is closed.
+    """
+    org = current_org()
+    transport = shared_transport if org is None else org_registry.transport(org)
+    return httpx.AsyncClient(
+        timeout=request_timeout(), transport=CircuitBreakerTransport(transport), **kwargs
+    )
+
+
+def _cache_scope() -> str:
+    """Cached responses belong to one org: its API base URL and key pair."""
+    return active_org().cache_scope
 
-if not DATADOG_API_KEY or not DATADOG_APP_KEY:
-    logger.error("DD_API_KEY and DD_APP_KEY environment variables must be set")
-    raise ValueError("Datadog API credentials not configured")
+
+# How long catalog responses are served from the response cache
+CATALOG_TTL = 3600
+TAGS_TTL = 900
+# Monitors carry their current state, which changes much faster than their definitions,
+# so expired monitor pages are fetched again rather than served while refreshing
+MONITORS_TTL = 60
+
+
+# SDK configuration per org, built once; calls get a shallow copy with their own timeout
+_sdk_configurations: Dict[Org, Configuration] = {}
 
 
 def get_datadog_configuration() -> Configuration:
-    """Get Datadog API configuration."""
-    configuration = Configuration()
-    configuration.api_key["apiKeyAuth"] = DATADOG_API_KEY
-    configuration.api_key["appKeyAuth"] = DATADOG_APP_KEY
+    """Get Datadog API configuration for the org of the current tool call."""
+    org = active_org()
+    base = _sdk_configurations.get(org)
+    if base is None:
+        base = Configuration()
+        base.api_key["apiKeyAuth"] = org.api_key
+        base.api_key["appKeyAuth"] = org.app_key
+        if org.api_url != DEFAULT_API_URL:
+            # Keep SDK calls on the same base URL as the raw HTTP calls
+            base.host = org.api_url
+        _sdk_configurations[org] = base
+    configuration = copy.copy(base)
+    # SDK calls run in a thread that cannot be cancelled, so bound them by the deadline
+    configuration.request_timeout = request_timeout()
     return configuration
 
 
+@coalesce(scope=_cache_scope)
 async def fetch_ci_pipelines(
     repository: Optional[str] = None,
     pipeline_name: Optional[str] = None,
@@ -52,13 +107,10 @@ async def fetch_ci_pipelines(
     cursor: Optional[str] = None,
 ) -> Dict[str, Any]:
     """Fetch CI pipelines from Datadog API."""
-    url = f"{DATADOG_API_URL}/api/v2/ci/pipelines/events/search"
+    org = active_org()
+    url = f"{org.api_url}/api/v2/ci/pipelines/events/search"
     
-    headers = {
-        "Content-Type": "application/json",
-        "DD-API-KEY": DATADOG_API_KEY,
-        "DD-APPLICATION-KEY": DATADOG_APP_KEY,
-    }
+    headers = org.json_headers
     
     # Build query filter
     query_parts = []
@@ -81,7 +133,7 @@ async def fetch_ci_pipelines(
     if cursor:
         payload["page"]["cursor"] = cursor
     
-    async with httpx.AsyncClient() as client:
+    async with _http_client() as client:
         try:
             response = await client.post(url, headers=headers, json=payload)
             response.raise_for_status()
@@ -94,6 +146,7 @@ async def fetch_ci_pipelines(
             raise
 
 
+@coalesce(scope=_cache_scope)
 async def fetch_logs(
     time_range: str = "1h",
     filters: Optional[Dict[str, str]] = None,
@@ -137,15 +190,18 @@ async def fetch_logs(
         configuration = get_datadog_configuration()
         with ApiClient(configuration) as api_client:
             api_instance = LogsApi(api_client)
-            response = api_instance.list_logs(body=body)
+            # The SDK client is synchronous; keep the event loop free for other calls.
+            # Not hedged: a request in a thread cannot be cancelled, so every hedge would cost two.
+            response = await guarded("logs", lambda: asyncio.to_thread(api_instance.list_logs, body=body))
             
             # Convert to dict format for backward compatibility
-            result = {
-                "data": [log.to_dict() for log in response.data] if response.data else [],
-                "meta": response.meta.to_dict() if response.meta else {},
-                # Note: LogsListResponse doesn't have a 'links' attribute in the current API version
-                # Pagination is handled via cursor in meta.page.after
-            }
+            with phase("parse"):
+                result = {
+                    "data": [log.to_dict() for log in response.data] if response.data else [],
+                    "meta": response.meta.to_dict() if response.meta else {},
+                    # Note: LogsListResponse doesn't have a 'links' attribute in the current API version
+                    # Pagination is handled via cursor in meta.page.after
+                }
 
             return result
     
@@ -154,6 +210,7 @@ async def fetch_logs(
         raise
 
 
+@coalesce(scope=_cache_scope)
 async def fetch_logs_filter_values(
     field_name: str,
     time_range: str = "1h",
@@ -200,7 +257,7 @@ async def fetch_logs_filter_values(
         configuration = get_datadog_configuration()
         with ApiClient(configuration) as api_client:
             api_instance = LogsApi(api_client)
-            response = api_instance.aggregate_logs(body=body)
+            response = await guarded("logs", lambda: asyncio.to_thread(api_instance.aggregate_logs, body=body))
             
             # Extract field values from buckets
             field_values = []
@@ -254,18 +311,35 @@ async def fetch_service_logs(
     )
 
 
+async def validate_api_key() -> Dict[str, Any]:
+    """Check the API key with Datadog; cheap enough to open a pooled connection with.
+
+    Deliberately not coalesced: concurrent calls each open a connection.
+    """
+    org = active_org()
+    url = f"{org.api_url}/api/v1/validate"
+
+    async with _http_client() as client:
+        try:
+            response = await client.get(url, headers=org.headers)
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPError as e:
+            logger.error(f"HTTP error validating API key: {e}")
+            raise
+
+
+@cached(ttl=CATALOG_TTL, scope=_cache_scope)
+@coalesce(scope=_cache_scope)
 async def fetch_teams(
     page_size: int = 50,
     page_number: int = 0,
 ) -> Dict[str, Any]:
     """Fetch teams from Datadog API."""
-    url = f"{DATADOG_API_URL}/api/v2/team"
+    org = active_org()
+    url = f"{org.api_url}/api/v2/team"
     
-    headers = {
-        "Content-Type": "application/json",
-        "DD-API-KEY": DATADOG_API_KEY,
-        "DD-APPLICATION-KEY": DATADOG_APP_KEY,
-    }
+    headers = org.json_headers
     
     # Add pagination parameters
     params = {
@@ -273,7 +347,7 @@ async def fetch_teams(
         "page[number]": page_number,
     }
     
-    async with httpx.AsyncClient() as client:
+    async with _http_client() as client:
         try:
             response = await client.get(url, headers=headers, params=params)
             response.raise_for_status()
@@ -286,17 +360,16 @@ async def fetch_teams(
             raise
 
 
+@cached(ttl=CATALOG_TTL, scope=_cache_scope)
+@coalesce(scope=_cache_scope)
 async def fetch_team_memberships(team_id: str) -> List[Dict[str, Any]]:
     """Fetch team memberships from Datadog API."""
-    url = f"{DATADOG_API_URL}/api/v2/team/{team_id}/memberships"
+    org = active_org()
+    url = f"{org.api_url}/api/v2/team/{team_id}/memberships"
     
-    headers = {
-        "Content-Type": "application/json",
-        "DD-API-KEY": DATADOG_API_KEY,
-        "DD-APPLICATION-KEY": DATADOG_APP_KEY,
-    }
+    headers = org.json_headers
     
-    async with httpx.AsyncClient() as client:
+    async with _http_client() as client:
         try:
             response = await client.get(url, headers=headers)
             response.raise_for_status()
@@ -309,6 +382,7 @@ async def fetch_team_memberships(team_id: str) -> List[Dict[str, Any]]:
             raise
 
 
+@coalesce(scope=_cache_scope)
 async def fetch_metrics(
     metric_name: str,
     time_range: str = "1h",
@@ -316,6 +390,7 @@ async def fetch_metrics(
     filters: Optional[Dict[str, str]] = None,
     aggregation_by: Optional[List[str]] = None,
     as_count: bool = False,
+    fields: Optional[JsonProjection] = None,
 ) -> Dict[str, Any]:
     """Fetch metrics from Datadog API with flexible filtering.
 
@@ -328,12 +403,11 @@ async def fetch_metrics(
         as_count: If True, applies .as_count() to get totals instead of rates.
                   Use for count/rate metrics (e.g., request.hits, error.count).
                   Do NOT use for gauge metrics (e.g., cpu.percent, memory.usage).
+        fields: Only decode these parts of the response (default: all of it)
     """
     
-    headers = {
-        "DD-API-KEY": DATADOG_API_KEY,
-        "DD-APPLICATION-KEY": DATADOG_APP_KEY,
-    }
+    org = active_org()
+    headers = org.headers
     
     # Build metric query
     query_parts = [f"{aggregation}:{metric_name}"]
@@ -392,13 +466,19 @@ async def fetch_metrics(
         "to": to_timestamp,
     }
     
-    url = f"{DATADOG_API_URL}/api/v1/query"
+    url = f"{org.api_url}/api/v1/query"
     
-    async with httpx.AsyncClient() as client:
+    async def attempt() -> Dict[str, Any]:
+        if fields is not None:
+            return await _stream_json(client, "GET", url, fields, headers=headers, params=params)
+        response = await client.get(url, headers=headers, params=params)
+        response.raise_for_status()
+        return response.json()
+    
+    async with _http_client(event_hooks=hedger.event_hooks("metrics_query")) as client:
         try:
-            response = await client.get(url, headers=headers, params=params)
-            response.raise_for_status()
-            return response.json()
+            # Queries are idempotent, so a slow one can be sent again
+            return await hedger.run("metrics_query", attempt)
         except httpx.HTTPError as e:
             logger.error(f"HTTP error fetching metrics: {e}")
             logger.error(f"Query: {query}")
@@ -410,20 +490,49 @@ async def fetch_metrics(
 
 
 
+# Parts of a metrics list page shown by list_metrics' list and summary formats
+METRICS_LIST_FIELDS = JsonProjection([
+    "data.id", "data.type", "data.attributes.description", "data.attributes.unit", "meta",
+])
+
+
+def _metric_names(response: Dict[str, Any]) -> List[str]:
+    return [metric.get("id") for metric in response.get("data") or [] if isinstance(metric, dict)]
+
+
+def _service_names(response: Dict[str, Any]) -> List[str]:
+    data = response.get("data") or []
+    definitions = data if isinstance(data, list) else [data]
+    return [
+        definition.get("attributes", {}).get("service", {}).get("name")
+        for definition in definitions
+        if isinstance(definition, dict)
+    ]
+
+
+@remember_names("metric", _metric_names, scope=_cache_scope)
+@cached(ttl=CATALOG_TTL, scope=_cache_scope)
+@coalesce(scope=_cache_scope)
 async def fetch_metrics_list(
     filter_query: str = "",
     limit: int = 50,
     cursor: Optional[str] = None,
+    fields: Optional[JsonProjection] = None,
 ) -> Dict[str, Any]:
-    """Fetch list of all available metrics from Datadog API."""
+    """Fetch list of all available metrics from Datadog API.
+
+    Args:
+        filter_query: Tag filter for the listed metrics
+        limit: Page size
+        cursor: Pagination cursor from previous response
+        fields: Only decode these parts of the response (default: all of it)
+    """
     
-    headers = {
-        "DD-API-KEY": DATADOG_API_KEY,
-        "DD-APPLICATION-KEY": DATADOG_APP_KEY,
-    }
+    org = active_org()
+    headers = org.headers
     
     # Use the v2 metrics endpoint to list all metrics
-    url = f"{DATADOG_API_URL}/api/v2/metrics"
+    url = f"{org.api_url}/api/v2/metrics"
     
     # Build query parameters
     params = {
@@ -436,8 +545,10 @@ async def fetch_metrics_list(
     if cursor:
         params["page[cursor]"] = cursor
     
-    async with httpx.AsyncClient() as client:
+    async with _http_client() as client:
         try:
+            if fields is not None:
+                return await _stream_json(client, "GET", url, fields, headers=headers, params=params)
             response = await client.get(url, headers=headers, params=params)
             response.raise_for_status()
             return response.json()
@@ -450,21 +561,22 @@ async def fetch_metrics_list(
             raise
 
 
+@remember_not_found("metric", "metric_name", default=list)
+@cached(ttl=TAGS_TTL, scope=_cache_scope)
+@coalesce(scope=_cache_scope)
 async def fetch_metric_available_fields(
     metric_name: str,
     time_range: str = "1h",
 ) -> List[str]:
     """Fetch available fields/tags for a metric from Datadog API."""
     
-    headers = {
-        "DD-API-KEY": DATADOG_API_KEY,
-        "DD-APPLICATION-KEY": DATADOG_APP_KEY,
-    }
+    org = active_org()
+    headers = org.headers
     
     # Use the proper Datadog API endpoint to get all tags for a metric
-    url = f"{DATADOG_API_URL}/api/v2/metrics/{metric_name}/all-tags"
+    url = f"{org.api_url}/api/v2/metrics/{metric_name}/all-tags"
     
-    async with httpx.AsyncClient() as client:
+    async with _http_client() as client:
         try:
             response = await client.get(url, headers=headers)
             response.raise_for_status()
@@ -488,9 +600,6 @@ async def fetch_metric_available_fields(
             
         except httpx.HTTPError as e:
             logger.error(f"HTTP error fetching metric tags: {e}")
-            if hasattr(e, 'response') and e.response.status_code == 404:
-                logger.warning(f"Metric {metric_name} not found or has no tags")
-                return []
             raise
         except Exception as e:
             logger.error(f"Error fetching metric tags: {e}")
@@ -498,21 +607,22 @@ async def fetch_metric_available_fields(
 
 
 
+@remember_not_found("metric", "metric_name", default=list)
+@cached(ttl=TAGS_TTL, scope=_cache_scope)
+@coalesce(scope=_cache_scope)
 async def fetch_metric_field_values(
     metric_name: str,
     field_name: str,
 ) -> List[str]:
     """Fetch all possible values for a specific field of a metric from Datadog API."""
     
-    headers = {
-        "DD-API-KEY": DATADOG_API_KEY,
-        "DD-APPLICATION-KEY": DATADOG_APP_KEY,
-    }
+    org = active_org()
+    headers = org.headers
     
     # Use the same endpoint as get_metric_fields but extract values for specific field
-    url = f"{DATADOG_API_URL}/api/v2/metrics/{metric_name}/all-tags"
+    url = f"{org.api_url}/api/v2/metrics/{metric_name}/all-tags"
     
-    async with httpx.AsyncClient() as client:
+    async with _http_client() as client:
         try:
             response = await client.get(url, headers=headers)
             response.raise_for_status()
@@ -537,15 +647,15 @@ async def fetch_metric_field_values(
             
         except httpx.HTTPError as e:
             logger.error(f"HTTP error fetching metric field values: {e}")
-            if hasattr(e, 'response') and e.response.status_code == 404:
-                logger.warning(f"Metric '{metric_name}' not found")
-                return []
             raise
         except Exception as e:
             logger.error(f"Error fetching metric field values: {e}")
             raise
 
 
+@remember_names("service", _service_names, scope=_cache_scope)
+@cached(ttl=CATALOG_TTL, scope=_cache_scope)
+@coalesce(scope=_cache_scope)
 async def fetch_service_definitions(
     page_size: int = 10,
     page_number: int = 0,
@@ -553,13 +663,11 @@ async def fetch_service_definitions(
 ) -> Dict[str, Any]:
     """Fetch service definitions from Datadog API."""
     
-    headers = {
-        "DD-API-KEY": DATADOG_API_KEY,
-        "DD-APPLICATION-KEY": DATADOG_APP_KEY,
-    }
+    org = active_org()
+    headers = org.headers
     
     # Use the service definitions endpoint
-    url = f"{DATADOG_API_URL}/api/v2/services/definitions"
+    url = f"{org.api_url}/api/v2/services/definitions"
     
     # Build query parameters
     params = {
@@ -570,11 +678,9 @@ async def fetch_service_definitions(
     if schema_version:
         params["filter[schema_version]"] = schema_version
     
-    async with httpx.AsyncClient() as client:
+    async with _http_client() as client:
         try:
-            response = await client.get(url, headers=headers, params=params)
-            response.raise_for_status()
-            return response.json()
+            return await conditional_get(client, url, headers, params)
             
         except httpx.HTTPError as e:
             logger.error(f"HTTP error fetching service definitions: {e}")
@@ -584,41 +690,41 @@ async def fetch_service_definitions(
             raise
 
 
+@remember_not_found("service", "service_name")
+@remember_names("service", _service_names, scope=_cache_scope)
+@cached(ttl=CATALOG_TTL, scope=_cache_scope)
+@coalesce(scope=_cache_scope)
 async def fetch_service_definition(
     service_name: str,
     schema_version: str = "v2.2",
 ) -> Dict[str, Any]:
     """Fetch a single service definition from Datadog API."""
     
-    headers = {
-        "DD-API-KEY": DATADOG_API_KEY,
-        "DD-APPLICATION-KEY": DATADOG_APP_KEY,
-    }
+    org = active_org()
+    headers = org.headers
     
     # Use the specific service definition endpoint
-    url = f"{DATADOG_API_URL}/api/v2/services/definitions/{service_name}"
+    url = f"{org.api_url}/api/v2/services/definitions/{service_name}"
     
     # Build query parameters
     params = {
         "schema_version": schema_version,
     }
     
-    async with httpx.AsyncClient() as client:
+    async with _http_client() as client:
         try:
-            response = await client.get(url, headers=headers, params=params)
-            response.raise_for_status()
-            return response.json()
+            return await conditional_get(client, url, headers, params)
             
         except httpx.HTTPError as e:
             logger.error(f"HTTP error fetching service definition for '{service_name}': {e}")
-            if hasattr(e, 'response') and e.response.status_code == 404:
-                logger.warning(f"Service definition for '{service_name}' not found")
             raise
         except Exception as e:
             logger.error(f"Error fetching service definition for '{service_name}': {e}")
             raise
 
 
+@cached(ttl=MONITORS_TTL, scope=_cache_scope, revalidate_in_background=False)
+@coalesce(scope=_cache_scope)
 async def fetch_monitors(
     tags: str = "",
     name: str = "",
@@ -628,13 +734,11 @@ async def fetch_monitors(
 ) -> List[Dict[str, Any]]:
     """Fetch monitors from Datadog API."""
     
-    headers = {
-        "DD-API-KEY": DATADOG_API_KEY,
-        "DD-APPLICATION-KEY": DATADOG_APP_KEY,
-    }
+    org = active_org()
+    headers = org.headers
     
     # Use the v1 monitors endpoint
-    url = f"{DATADOG_API_URL}/api/v1/monitor"
+    url = f"{org.api_url}/api/v1/monitor"
     
     # Build query parameters
     params = {}
@@ -650,11 +754,9 @@ async def fetch_monitors(
     params["page_size"] = page_size
     params["page"] = page
     
-    async with httpx.AsyncClient() as client:
+    async with _http_client() as client:
         try:
-            response = await client.get(url, headers=headers, params=params)
-            response.raise_for_status()
-            return response.json()
+            return await conditional_get(client, url, headers, params)
             
         except httpx.HTTPError as e:
             logger.error(f"HTTP error fetching monitors: {e}")
@@ -664,6 +766,7 @@ async def fetch_monitors(
             raise
 
 
+@coalesce(scope=_cache_scope)
 async def fetch_slos(
     tags: Optional[str] = None,
     query: Optional[str] = None,
@@ -671,13 +774,10 @@ async def fetch_slos(
     offset: int = 0,
 ) -> List[Dict[str, Any]]:
     """Fetch SLOs from Datadog API."""
-    url = f"{DATADOG_API_URL}/api/v1/slo"
+    org = active_org()
+    url = f"{org.api_url}/api/v1/slo"
     
-    headers = {
-        "Content-Type": "application/json",
-        "DD-API-KEY": DATADOG_API_KEY,
-        "DD-APPLICATION-KEY": DATADOG_APP_KEY,
-    }
+    headers = org.json_headers
     
     params = {
         "limit": limit,
@@ -689,7 +789,7 @@ async def fetch_slos(
     if query:
         params["query"] = query
     
-    async with httpx.AsyncClient() as client:
+    async with _http_client() as client:
         try:
             response = await client.get(url, headers=headers, params=params)
             response.raise_for_status()
@@ -704,17 +804,15 @@ async def fetch_slos(
             raise
 
 
+@coalesce(scope=_cache_scope)
 async def fetch_slo_details(slo_id: str) -> Dict[str, Any]:
     """Fetch detailed information for a specific SLO."""
-    url = f"{DATADOG_API_URL}/api/v1/slo/{slo_id}"
+    org = active_org()
+    url = f"{org.api_url}/api/v1/slo/{slo_id}"
     
-    headers = {
-        "Content-Type": "application/json",
-        "DD-API-KEY": DATADOG_API_KEY,
-        "DD-APPLICATION-KEY": DATADOG_APP_KEY,
-    }
+    headers = org.json_headers
     
-    async with httpx.AsyncClient() as client:
+    async with _http_client() as client:
         try:
             response = await client.get(url, headers=headers)
             response.raise_for_status()
@@ -729,6 +827,7 @@ async def fetch_slo_details(slo_id: str) -> Dict[str, Any]:
             raise
 
 
+@coalesce(scope=_cache_scope)
 async def fetch_slo_history(
     slo_id: str,
     from_ts: int,
@@ -736,13 +835,10 @@ async def fetch_slo_history(
     target: Optional[float] = None,
 ) -> Dict[str, Any]:
     """Fetch SLO history data."""
-    url = f"{DATADOG_API_URL}/api/v1/slo/{slo_id}/history"
+    org = active_org()
+    url = f"{org.api_url}/api/v1/slo/{slo_id}/history"
 
-    headers = {
-        "Content-Type": "application/json",
-        "DD-API-KEY": DATADOG_API_KEY,
-        "DD-APPLICATION-KEY": DATADOG_APP_KEY,
-    }
+    headers = org.json_headers
 
     params = {
         "from_ts": from_ts,
@@ -752,7 +848,7 @@ async def fetch_slo_history(
     if target is not None:
         params["target"] = target
 
-    async with httpx.AsyncClient() as client:
+    async with _http_client() as client:
         try:
             response = await client.get(url, headers=headers, params=params)
             response.raise_for_status()
@@ -767,12 +863,14 @@ async def fetch_slo_history(
             raise
 
 
+@coalesce(scope=_cache_scope)
 async def fetch_traces(
     time_range: str = "1h",
     filters: Optional[Dict[str, str]] = None,
     query: Optional[str] = None,
     limit: int = 50,
     cursor: Optional[str] = None,
+    fields: Optional[JsonProjection] = None,
 ) -> Dict[str, Any]:
     """Fetch APM traces (spans) from Datadog API with flexible filtering.
 
@@ -782,17 +880,15 @@ async def fetch_traces(
         query: Free-text search query (e.g., 'error', 'status:error', 'service:web AND env:prod')
         limit: Maximum number of spans to return (default: 50, max: 1000)
         cursor: Pagination cursor from previous response
+        fields: Only decode these parts of the response (default: all of it)
 
     Returns:
         Dict containing traces data and pagination info
     """
-    url = f"{DATADOG_API_URL}/api/v2/spans/events/search"
+    org = active_org()
+    url = f"{org.api_url}/api/v2/spans/events/search"
 
-    headers = {
-        "Content-Type": "application/json",
-        "DD-API-KEY": DATADOG_API_KEY,
-        "DD-APPLICATION-KEY": DATADOG_APP_KEY,
-    }
+    headers = org.json_headers
 
     # Build query filter
     query_parts = []
@@ -837,15 +933,23 @@ async def fetch_traces(
     if cursor:
         payload["data"]["attributes"]["page"]["cursor"] = cursor
 
-    async with httpx.AsyncClient() as client:
+    async def attempt() -> Any:
+        if fields is not None:
+            return await _stream_json(client, "POST", url, fields, headers=headers, json=payload)
+        response = await client.post(url, headers=headers, json=payload)
+        response.raise_for_status()
+
+        with phase("parse"):
+            return response.json()
+
+    async with _http_client(event_hooks=hedger.event_hooks("spans")) as client:
         try:
             logger.debug(f"Fetching traces with query: {combined_query}")
-            logger.debug(f"Request payload: {json.dumps(payload, indent=2)}")
-
-            response = await client.post(url, headers=headers, json=payload, timeout=30.0)
-            response.raise_for_status()
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Request payload: {dumps(payload, pretty=True)}")
 
-            result = response.json()
+            # Searches are idempotent, so a slow one can be sent again
+            result = await hedger.run("spans", attempt)
 
             # Validate we got a proper response
             if result is None:
@@ -865,7 +969,7 @@ async def fetch_traces(
                 logger.error(f"Response status: {e.response.status_code}")
                 logger.error(f"Response body: {e.response.text}")
             raise
-        except json.JSONDecodeError as e:
+        except DECODE_ERRORS as e:
             logger.error(f"Failed to decode JSON response: {e}")
             raise
         except Exception as e:
@@ -0,0 +1,95 @@
+"""
+Per-tool-call deadlines
+
+Every tool call runs under a deadline of DD_MCP_TOOL_TIMEOUT seconds
+(default: 120; 0 disables it). When it passes, or the MCP client cancels
+the call, the call's task is cancelled: pagination loops stop and in-flight
+Datadog requests are aborted, which frees their connections and rate-limit
+quota. Each request is also given at most DD_MCP_HTTP_TIMEOUT seconds
+(default: 30), and never more than what is left of the deadline.
+"""
+
+import asyncio
+import contextvars
+import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+TOOL_TIMEOUT = float(os.getenv("DD_MCP_TOOL_TIMEOUT", "120"))
+HTTP_TIMEOUT = float(os.getenv("DD_MCP_HTTP_TIMEOUT", "30"))
+
+# Shortest timeout handed to a request once the deadline is (nearly) due
+MIN_REQUEST_TIMEOUT = 0.01
+
+# Event loop time the current tool call must finish by
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("deadline", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    """A tool call did not finish within its deadline."""
+
+    def __init__(self, seconds: float):
+        super().__init__(f"did not finish within {seconds:g}s")
+        self.seconds = seconds
+
+
+@asynccontextmanager
+async def deadline(seconds: Optional[float] = TOOL_TIMEOUT) -> AsyncIterator[None]:
+    """Cancel the enclosed work after ``seconds``, raising DeadlineExceeded.
+
+    An enclosing deadline that is due sooner still applies. ``None`` or 0
+    sets no deadline of its own.
+    """
+    if not seconds or seconds <= 0:
+        yield
+        return
+    loop = asyncio.get_running_loop()
+    due = loop.time() + seconds
+    outer = _deadline.get()
+    if outer is not None:
+        due = min(due, outer)
+    token = _deadline.set(due)
+    try:
+        async with asyncio.timeout_at(due):
+            yield
+    except TimeoutError as e:
+        if isinstance(e, DeadlineExceeded) or loop.time() < due:
+            raise
+        raise DeadlineExceeded(seconds) from None
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left until the current deadline, or None without one."""
+    due = _deadline.get()
+    if due is None:
+        return None
+    return due - asyncio.get_running_loop().time()
+
+
+def request_timeout() -> float:
+    """Timeout for one Datadog request: HTTP_TIMEOUT, capped by the deadline."""
+    left = remaining()
+    if left is None:
+        return HTTP_TIMEOUT
+    return max(min(HTTP_TIMEOUT, left), MIN_REQUEST_TIMEOUT)
+
+
+def expired() -> bool:
+    """Whether the current deadline is due.
+
+    A request timing out then was given what was left of the deadline, or
+    was cut short by it; the endpoint was not necessarily slow.
+    """
+    left = remaining()
+    return left is not None and left <= MIN_REQUEST_TIMEOUT
+
+
+def detach() -> None:
+    """Free the current task from the deadline of the call that started it.
+
+    For background work, e.g. cache refreshes, which copies the context of
+    the tool call it was started from but may outlive it.
+    """
+    _deadline.set(None)
@@ -0,0 +1,94 @@
+"""
+Bounded, rate-limit-aware fan-out of Datadog requests
+
+Tools that need one request per item (e.g. the history of every SLO) run
+them concurrently with a cap on requests in flight. A 429 response pauses
+every worker until the window named by Retry-After / X-RateLimit-Reset
+resets, then the throttled request is retried.
+
+DD_MCP_FANOUT_CONCURRENCY sets the cap (default: 8).
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable, Iterable, List, Optional, TypeVar, Union
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+FANOUT_CONCURRENCY = int(os.getenv("DD_MCP_FANOUT_CONCURRENCY", "8"))
+
+# Longest pause honoured for a single throttled response
+MAX_THROTTLE_WAIT = 60.0
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """Seconds to wait before retrying a throttled request, or None if it was not throttled."""
+    if not isinstance(error, httpx.HTTPStatusError) or error.response.status_code != 429:
+        return None
+    headers = error.response.headers
+    for name in ("Retry-After", "X-RateLimit-Reset"):
+        try:
+            return min(max(float(headers[name]), 0.0), MAX_THROTTLE_WAIT)
+        except (KeyError, ValueError):
+            continue
+    return 1.0
+
+
+class RateLimitGate:
+    """Hold back every worker of a fan-out while the API is throttling."""
+
+    def __init__(self) -> None:
+        self._resume_at = 0.0
+
+    def pause(self, seconds: float) -> None:
+        self._resume_at = max(self._resume_at, time.monotonic() + seconds)
+
+    async def wait(self) -> None:
+        while True:
+            delay = self._resume_at - time.monotonic()
+            if delay <= 0:
+                return
+            await asyncio.sleep(delay)
+
+
+async def fan_out(
+    items: Iterable[T],
+    call: Callable[[T], Awaitable[R]],
+    concurrency: int = FANOUT_CONCURRENCY,
+    max_retries: int = 3,
+) -> List[Union[R, Exception]]:
+    """Await ``call(item)`` for every item, at most ``concurrency`` at a time.
+
+    Args:
+        items: Inputs, one request each
+        call: Async function issuing the request for one item
+        concurrency: Maximum requests in flight
+        max_retries: Retries of a throttled request before giving up on it
+
+    Returns:
+        Results in the order of ``items``; a failed item's exception takes its place
+    """
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+    gate = RateLimitGate()
+
+    async def run(item: T) -> Any:
+        async with semaphore:
+            for attempt in range(max_retries + 1):
+                await gate.wait()
+                try:
+                    return await call(item)
+                except Exception as e:
+                    delay = retry_after(e)
+                    if delay is None or attempt == max_retries:
+                        return e
+                    logger.info(f"Throttled by Datadog, pausing fan-out for {delay:.1f}s")
+                    gate.pause(delay)
+
+    return await asyncio.gather(*(run(item) for item in items))
@@ -2,7 +2,11 @@
 Data formatting utilities
 """
 
-from typing import Any, Dict, List
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from .json_codec import JsonProjection
+from .records import LogRecord, SpanRecord
 
 
 def extract_pipeline_info(events: List[Dict[str, Any]]) -> List[Dict[str, str]]:
@@ -63,163 +67,246 @@ def format_as_table(pipelines: List[Dict[str, str]]) -> str:
     return "\n".join(lines)
 
 
-def extract_log_info(log_events: List[Dict[str, Any]]) -> List[Dict[str, str]]:
-    """Extract relevant information from log events."""
+# Attributes never shown as attr_* extras
+_ALWAYS_SKIPPED_ATTRIBUTES = frozenset({"service", "host", "id", "timestamp"})
+
+_MISSING = object()
+
+# Bounds the attr_<name> key cache of a plan, since attribute names are open-ended
+_MAX_CACHED_ATTRIBUTE_KEYS = 1024
+
+
+def _truncate(value: str, max_length: int) -> str:
+    return value if len(value) <= max_length else value[:max_length - 3] + "..."
+
+
+def _summarize_task_stats(task_stats: Any) -> Optional[Dict[str, str]]:
+    """Non-zero task type counts and their total (specific to caorchestrator)."""
+    if not isinstance(task_stats, dict):
+        return None
+    total_tasks = sum(task_stats.values())
+    if total_tasks <= 0:
+        return None
+    summary = {}
+    active_tasks = [f"{k}:{v}" for k, v in task_stats.items() if v > 0]
+    if active_tasks:
+        summary["task_stats"] = ", ".join(active_tasks)
+    summary["total_tasks"] = str(total_tasks)
+    return summary
+
+
+class _PlannedField:
+    """Leaf of a LogExtractionPlan trie."""
+
+    __slots__ = ("output_key", "transform")
+
+    def __init__(self, output_key: str, transform: Optional[Callable[[Any], Any]]):
+        self.output_key = output_key
+        self.transform = transform
+
+
+# Tag keys shown for logs in the content format; other tags are clutter
+DEFAULT_LOG_TAG_PREFIXES = ("env", "owner", "project", "stage", "region", "source")
+
+# (output key, dotted attribute path[, transform]) in display order. A transform
+# returns the value to store, None to skip the field, or a dict of several entries.
+DEFAULT_LOG_FIELDS: Tuple[Tuple, ...] = (
+    ("environment", "environment"),
+    ("duration", "duration"),
+    ("customAttribute", "customAttribute"),
+    ("function", "lambda.name"),
+    ("lambda_arn", "lambda.arn"),
+    ("request_id", "lambda.request_id"),
+    ("task_stats", "task_type_stats", _summarize_task_stats),
+    ("log_group", "aws.awslogs.logGroup"),
+    ("log_stream", "aws.awslogs.logStream", lambda stream: _truncate(str(stream), 50)),  # for readability
+    ("function_version", "aws.function_version"),
+    # Overrides the status-derived level
+    ("level", "level"),
+)
+
+
+class LogExtractionPlan:
+    """Which log fields to extract, compiled into a lookup trie.
+
+    Args:
+        fields: (output key, dotted attribute path[, transform]) tuples, in display order
+        tag_prefixes: Tag keys kept for logs in the content format
+        extra_attributes: Whether to add remaining attributes as attr_* entries
+    """
+
+    def __init__(
+        self,
+        fields: Sequence[Tuple] = DEFAULT_LOG_FIELDS,
+        tag_prefixes: Iterable[str] = DEFAULT_LOG_TAG_PREFIXES,
+        extra_attributes: bool = True,
+    ):
+        self.tag_prefixes = frozenset(prefix.rstrip(":") for prefix in tag_prefixes)
+        self.extra_attributes = extra_attributes
+
+        # Group paths by segment so each attribute is looked up once per event
+        trie: Dict[str, Any] = {}
+        for spec in fields:
+            output_key, path = spec[0], spec[1]
+            transform = spec[2] if len(spec) > 2 else None
+            *parents, leaf = path.split(".")
+            node = trie
+            for segment in parents:
+                node = node.setdefault(segment, {})
+            node[leaf] = _PlannedField(output_key, transform)
+        self._trie = self._freeze(trie)
+        self.skipped_attributes = _ALWAYS_SKIPPED_ATTRIBUTES | trie.keys()
+        self._attr_keys: Dict[str, str] = {}
+
+    @classmethod
+    def _freeze(cls, node: Dict[str, Any]) -> Tuple:
+        return tuple(
+            (key, child if isinstance(child, _PlannedField) else cls._freeze(child))
+            for key, child in node.items()
+        )
+
+    def apply(self, attrs: Dict[str, Any], log_entry: Dict[str, str]) -> None:
+        """Add the planned fields found in ``attrs`` to ``log_entry``."""
+        self._apply_node(self._trie, attrs, log_entry)
+
+        if not self.extra_attributes:
+            return
+        skipped = self.skipped_attributes
+        attr_keys = self._attr_keys
+        for key, value in attrs.items():
+            if key in skipped:
+                continue
+            # Convert complex objects to strings, but keep it concise
+            if type(value) is str:
+                text = value
+            elif isinstance(value, dict):
+                if len(value) > 3:  # Only show small dicts
+                    continue
+                text = str(value)
+            elif isinstance(value, list):
+                if len(value) > 5:  # Only show small lists
+                    continue
+                text = str(value)
+            else:
+                text = str(value)
+            output_key = attr_keys.get(key)
+            if output_key is None:
+                output_key = "attr_" + key
+                if len(attr_keys) < _MAX_CACHED_ATTRIBUTE_KEYS:
+                    attr_keys[key] = output_key
+            log_entry[output_key] = text
+
+    @classmethod
+    def _apply_node(cls, node: Tuple, source: Dict[str, Any], log_entry: Dict[str, str]) -> None:
+        for key, child in node:
+            value = source.get(key, _MISSING)
+            if value is _MISSING:
+                continue
+            if type(child) is tuple:
+                if isinstance(value, dict):
+                    cls._apply_node(child, value, log_entry)
+            elif child.transform is None:
+                log_entry[child.output_key] = value if type(value) is str else str(value)
+            else:
+                value = child.transform(value)
+                if isinstance(value, dict):
+                    log_entry.update(value)
+                elif value is not None:
+                    log_entry[child.output_key] = value
+
+    def relevant_tags(self, tags: List[str]) -> List[str]:
+        """Tags whose key is one of the plan's tag prefixes."""
+        prefixes = self.tag_prefixes
+        return [tag for tag in tags if tag.partition(":")[0] in prefixes]
+
+
+DEFAULT_LOG_PLAN = LogExtractionPlan()
+# Table output only shows timestamp, level, service and message
+TABLE_LOG_PLAN = LogExtractionPlan(fields=(("level", "level"),), extra_attributes=False)
+
+
+def extract_log_info(log_events: List[Dict[str, Any]], plan: Optional[LogExtractionPlan] = None) -> List[LogRecord]:
+    """Extract relevant information from log events.
+
+    Args:
+        log_events: Log events from the logs search API
+        plan: Fields to extract (default: everything shown by the text format)
+
+    Returns:
+        List of log records; use ``to_dict()`` for JSON output
+    """
+    plan = plan or DEFAULT_LOG_PLAN
     logs = []
-    
+
     for event in log_events:
+        extra: Dict[str, str] = {}
+
         # Handle both old format (attributes) and new format (content)
         if "content" in event:
-            # New realistic format with content wrapper
             content = event["content"]
             attrs = content.get("attributes", {})
-            
-            # Extract basic log info from content level
-            log_entry = {
-                "timestamp": content.get("timestamp", ""),
-                "level": content.get("status", attrs.get("level", "unknown")),
-                "service": content.get("service", "unknown"),
-                "host": content.get("host", "unknown"),
-                "message": content.get("message", ""),
-            }
-            
-            # Add tags if available (much more comprehensive now)
-            if "tags" in content and isinstance(content["tags"], list):
-                # Show only the most relevant tags to avoid clutter
-                relevant_tags = []
-                for tag in content["tags"]:
-                    if any(prefix in tag for prefix in ["env:", "owner:", "project:", "stage:", "region:", "source:"]):
-                        relevant_tags.append(tag)
+            source = content
+            level = content.get("status", attrs.get("level", "unknown"))
+
+            # Show only the most relevant tags to avoid clutter
+            tags = content.get("tags")
+            if isinstance(tags, list):
+                relevant_tags = plan.relevant_tags(tags)
                 if relevant_tags:
-                    log_entry["tags"] = ", ".join(relevant_tags)
-            
+                    extra["tags"] = ", ".join(relevant_tags)
+
         elif "attributes" in event:
             # Old format for backward compatibility
-            attrs = event["attributes"]
-            
-            # Extract basic log info
-            log_entry = {
-                "timestamp": attrs.get("timestamp", ""),
-                "level": attrs.get("status", "unknown"),
-                "service": attrs.get("service", "unknown"),
-                "host": attrs.get("host", "unknown"),
-                "message": attrs.get("message", ""),
-            }
-            
-            # Add tags if available
-            if "tags" in attrs and isinstance(attrs["tags"], list):
-                log_entry["tags"] = ", ".join(attrs["tags"])
-            
+            source = event["attributes"]
+            level = source.get("status", "unknown")
+
+            tags = source.get("tags")
+            if isinstance(tags, list):
+                extra["tags"] = ", ".join(tags)
+
             # For old format, attributes are nested under "attributes"
-            attrs = attrs.get("attributes", {})
+            attrs = source.get("attributes", {})
         else:
             continue
-        
-        # Add additional context from attributes
+
         if attrs and isinstance(attrs, dict):
-            # Add useful extra fields
-            if "environment" in attrs:
-                log_entry["environment"] = str(attrs["environment"])
-            if "duration" in attrs:
-                log_entry["duration"] = str(attrs["duration"])
-            if "customAttribute" in attrs:
-                log_entry["customAttribute"] = str(attrs["customAttribute"])
-            
-            # Lambda-specific fields
-            if "lambda" in attrs and isinstance(attrs["lambda"], dict):
-                lambda_info = attrs["lambda"]
-                if "name" in lambda_info:
-                    log_entry["function"] = str(lambda_info["name"])
-                if "arn" in lambda_info:
-                    log_entry["lambda_arn"] = str(lambda_info["arn"])
-                if "request_id" in lambda_info:
-                    log_entry["request_id"] = str(lambda_info["request_id"])
-            
-            # Task type statistics (specific to caorchestrator)
-            if "task_type_stats" in attrs and isinstance(attrs["task_type_stats"], dict):
-                task_stats = attrs["task_type_stats"]
-                total_tasks = sum(task_stats.values())
-                if total_tasks > 0:
-                    # Show only non-zero task types
-                    active_tasks = [f"{k}:{v}" for k, v in task_stats.items() if v > 0]
-                    if active_tasks:
-                        log_entry["task_stats"] = ", ".join(active_tasks)
-                    log_entry["total_tasks"] = str(total_tasks)
-            
-            # AWS-specific information
-            if "aws" in attrs and isinstance(attrs["aws"], dict):
-                aws_info = attrs["aws"]
-                if "awslogs" in aws_info:
-                    awslogs = aws_info["awslogs"]
-                    if "logGroup" in awslogs:
-                        log_entry["log_group"] = str(awslogs["logGroup"])
-                    if "logStream" in awslogs:
-                        # Truncate log stream for readability
-                        log_stream = str(awslogs["logStream"])
-                        if len(log_stream) > 50:
-                            log_stream = log_stream[:47] + "..."
-                        log_entry["log_stream"] = log_stream
-                
-                if "function_version" in aws_info:
-                    log_entry["function_version"] = str(aws_info["function_version"])
-            
-            # Override level if specified in attributes
-            if "level" in attrs:
-                log_entry["level"] = str(attrs["level"])
-            
-            # Add other interesting custom attributes (but skip verbose ones)
-            skip_attrs = {
-                "environment", "duration", "customAttribute", "lambda", "level", 
-                "task_type_stats", "aws", "service", "host", "id", "timestamp"
-            }
-            
-            for key, value in attrs.items():
-                if key not in skip_attrs:
-                    # Convert complex objects to strings, but keep it concise
-                    if isinstance(value, dict):
-                        if len(value) <= 3:  # Only show small dicts
-                            log_entry[f"attr_{key}"] = str(value)
-                    elif isinstance(value, list):
-                        if len(value) <= 5:  # Only show small lists
-                            log_entry[f"attr_{key}"] = str(value)
-                    else:
-                        log_entry[f"attr_{key}"] = str(value)
-        
-        logs.append(log_entry)
-    
+            plan.apply(attrs, extra)
+
+        logs.append(LogRecord(
+            source.get("timestamp", ""),
+            level,
+            source.get("service", "unknown"),
+            source.get("host", "unknown"),
+            source.get("message", ""),
+            extra,
+        ))
+
     return logs
 
 
-def format_logs_as_table(logs: List[Dict[str, str]], max_message_length: int = 80) -> str:
+def format_logs_as_table(logs: Sequence[Mapping[str, str]], max_message_length: int = 80) -> str:
     """Format log data as a table."""
     if not logs:
         return "No logs found."
     
     # Truncate long messages for table display
-    display_logs = []
-    for log in logs:
-        display_log = log.copy()
-        message = display_log.get("message", "")
-        if len(message) > max_message_length:
-            display_log["message"] = message[:max_message_length - 3] + "..."
-        display_logs.append(display_log)
+    messages = [_truncate(log.get("message", ""), max_message_length) for log in logs]
     
     # Calculate column widths
     timestamp_width = 20  # Fixed width for timestamp
-    level_width = max(len("Level"), max(len(log.get("level", "")) for log in display_logs))
-    service_width = max(len("Service"), max(len(log.get("service", "")) for log in display_logs))
-    message_width = max(len("Message"), max(len(log.get("message", "")) for log in display_logs))
+    level_width = max(len("Level"), max(len(log.get("level", "")) for log in logs))
+    service_width = max(len("Service"), max(len(log.get("service", "")) for log in logs))
+    message_width = max(len("Message"), max(len(message) for message in messages))
     
     # Create table
     header = f"| {'Timestamp':<{timestamp_width}} | {'Level':<{level_width}} | {'Service':<{service_width}} | {'Message':<{message_width}} |"
     separator = f"|{'-' * (timestamp_width + 2)}|{'-' * (level_width + 2)}|{'-' * (service_width + 2)}|{'-' * (message_width + 2)}|"
     
     lines = [header, separator]
-    for log in display_logs:
+    for log, message in zip(logs, messages):
         timestamp = log.get("timestamp", "")[:timestamp_width]  # Truncate timestamp if needed
         level = log.get("level", "")
         service = log.get("service", "")
-        message = log.get("message", "")
         
         line = f"| {timestamp:<{timestamp_width}} | {level:<{level_width}} | {service:<{service_width}} | {message:<{message_width}} |"
         lines.append(line)
@@ -227,7 +314,7 @@ def format_logs_as_table(logs: List[Dict[str, str]], max_message_length: int = 8
     return "\n".join(lines)
 
 
-def format_logs_as_text(logs: List[Dict[str, str]]) -> str:
+def format_logs_as_text(logs: Sequence[Mapping[str, str]]) -> str:
     """Format log data as readable text."""
     if not logs:
         return "No logs found."
@@ -375,6 +462,13 @@ def format_team_with_members(team: Dict[str, str], members: List[Dict[str, str]]
     return "\n".join(lines)
 
 
+# Parts of a /api/v1/query response read by the metrics formatters
+METRICS_QUERY_FIELDS = JsonProjection([
+    "status", "error", "errors",
+    "series.metric", "series.display_name", "series.aggr", "series.scope", "series.pointlist", "series.unit",
+])
+
+
 def extract_metrics_info(metrics_data: Dict[str, Any]) -> Dict[str, Any]:
     """Extract relevant information from metrics data."""
     if "series" not in metrics_data or not metrics_data["series"]:
@@ -584,14 +678,27 @@ def format_metrics_timeseries(metrics: Dict[str, Dict[str, Any]], limit_points:
     return "\n".join(lines)
 
 
-def extract_trace_info(trace_events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+# Parts of a spans search response read by extract_trace_info and get_traces
+TRACE_EVENT_FIELDS = JsonProjection(
+    ["data.id", "data.type", "data.attributes.@*", "meta", "links"]
+    + [
+        f"data.attributes.{name}"
+        for name in (
+            "trace_id", "span_id", "parent_id", "service", "resource_name", "operation_name", "duration",
+            "start_timestamp", "end_timestamp", "start", "status", "error", "env", "tags",
+        )
+    ]
+)
+
+
+def extract_trace_info(trace_events: List[Dict[str, Any]]) -> List[SpanRecord]:
     """Extract relevant information from trace events.
 
     Args:
         trace_events: List of trace event dictionaries from Datadog API
 
     Returns:
-        List of processed trace dictionaries with extracted fields
+        List of span records; use ``to_dict()`` for JSON output
     """
     from datetime import datetime
 
@@ -614,37 +721,27 @@ def extract_trace_info(trace_events: List[Dict[str, Any]]) -> List[Dict[str, Any
                 except (ValueError, AttributeError):
                     pass
 
-        # Extract key fields
-        trace = {
-            "trace_id": attrs.get("trace_id", ""),
-            "span_id": attrs.get("span_id", ""),
-            "parent_id": attrs.get("parent_id"),
-            "service": attrs.get("service", ""),
-            "resource_name": attrs.get("resource_name", ""),
-            "operation_name": attrs.get("operation_name", ""),
-            "duration_ns": duration_ns,
-            "duration_ms": round(duration_ns / 1_000_000, 2),
-            "start_timestamp": attrs.get("start_timestamp", attrs.get("start", 0)),
-            "status": attrs.get("status", ""),
-            "error": attrs.get("error", 0),
-            "env": attrs.get("env", ""),
-            "tags": attrs.get("tags", []),
-        }
-
-        # Extract custom tags (@ prefixed attributes)
-        custom_attrs = {}
-        for key, value in attrs.items():
-            if key.startswith("@"):
-                custom_attrs[key] = value
-
-        trace["custom_attributes"] = custom_attrs
-
-        traces.append(trace)
+        # Extract key fields; custom (@ prefixed) attributes are read from attrs on demand
+        traces.append(SpanRecord(
+            attrs.get("trace_id", ""),
+            attrs.get("span_id", ""),
+            attrs.get("parent_id"),
+            attrs.get("service", ""),
+            attrs.get("resource_name", ""),
+            attrs.get("operation_name", ""),
+            duration_ns,
+            attrs.get("start_timestamp", attrs.get("start", 0)),
+            attrs.get("status", ""),
+            attrs.get("error", 0),
+            attrs.get("env", ""),
+            attrs.get("tags", []),
+            attrs,
+        ))
 
     return traces
 
 
-def format_traces_as_table(traces: List[Dict[str, Any]]) -> str:
+def format_traces_as_table(traces: Sequence[Mapping[str, Any]]) -> str:
     """Format traces as a text table.
 
     Args:
@@ -676,7 +773,7 @@ def format_traces_as_table(traces: List[Dict[str, Any]]) -> str:
     return "\n".join(lines)
 
 
-def format_traces_as_text(traces: List[Dict[str, Any]]) -> str:
+def format_traces_as_text(traces: Sequence[Mapping[str, Any]]) -> str:
     """Format traces as detailed text output.
 
     Args:
@@ -711,11 +808,335 @@ def format_traces_as_text(traces: List[Dict[str, Any]]) -> str:
     return "\n".join(lines)
 
 
-def format_traces_as_hierarchy(traces: List[Dict[str, Any]]) -> str:
+# Fields the hierarchy shows, read once per span into flat columns, with
+# their defaults for spans given as plain dicts
+_HIERARCHY_FIELDS = (
+    ("trace_id", None), ("span_id", None), ("parent_id", None), ("service", "unknown"),
+    ("operation_name", ""), ("resource_name", ""), ("status", ""), ("error", None),
+    ("duration_ms", 0), ("duration_ns", None), ("start_timestamp", None),
+)
+
+
+def _span_columns(traces: Sequence[Mapping[str, Any]]) -> List[List[Any]]:
+    """One list per field in ``_HIERARCHY_FIELDS``, holding that field of every span."""
+    if set(map(type, traces)) == {SpanRecord}:
+        # Slot reads in a comprehension are much cheaper than Mapping.get
+        return [
+            [span.trace_id for span in traces],
+            [span.span_id for span in traces],
+            [span.parent_id for span in traces],
+            [span.service for span in traces],
+            [span.operation_name for span in traces],
+            [span.resource_name for span in traces],
+            [span.status for span in traces],
+            [span.error for span in traces],
+            [span.duration_ms for span in traces],
+            [span.duration_ns for span in traces],
+            [span.start_timestamp for span in traces],
+        ]
+    columns = [[trace.get(field, default) for trace in traces] for field, default in _HIERARCHY_FIELDS]
+    columns[1] = [trace["span_id"] for trace in traces]
+    return columns
+
+
+def _span_start_ns(start: Any, second_cache: Dict[str, int]) -> Optional[int]:
+    """Span start in epoch nanoseconds, from an ISO timestamp or a nanosecond number."""
+    if type(start) is str and start:
+        if len(start) > 20 and start[19] == "." and start[-1] == "Z" and start[20:-1].isdigit():
+            second = start[:19]
+            base_ns = second_cache.get(second)
+            if base_ns is None:
+                try:
+                    base_ns = int(datetime.fromisoformat(second + "+00:00").timestamp()) * 1_000_000_000
+                except ValueError:
+                    return None
+                second_cache[second] = base_ns
+            return base_ns + int(start[20:-1].ljust(9, "0")[:9])
+        try:
+            start_dt = datetime.fromisoformat(start)
+        except ValueError:
+            return None
+        if start_dt.tzinfo is None:
+            start_dt = start_dt.replace(tzinfo=timezone.utc)
+        return round(start_dt.timestamp() * 1_000_000) * 1000
+    if isinstance(start, (int, float)) and not isinstance(start, bool) and start > 0:
+        return int(start)
+    return None
+
+
+# Nanoseconds per unit of a fraction of a second with that many digits
+_FRACTION_SCALE = [10 ** (9 - digits) for digits in range(10)]
+
+
+def _span_starts_ns(start_values: Iterable[Any]) -> List[Optional[int]]:
+    """Span starts in epoch nanoseconds, from ISO timestamps or nanosecond numbers.
+
+    Spans of a trace mostly start within the same few seconds, so the epoch
+    value of each ``YYYY-MM-DDTHH:MM:SS`` prefix is computed once and only
+    the fraction of ``...SS.fffZ`` timestamps is parsed per span.
+    """
+    second_cache: Dict[str, int] = {}
+    # The second the previous timestamp fell in, which the next one most likely shares
+    second, base_ns = "\0", 0
+    starts: List[Optional[int]] = []
+    append = starts.append
+    for start in start_values:
+        if type(start) is str and 20 < len(start) < 31 and start[-1] == "Z" and start[19] == ".":
+            if not start.startswith(second):
+                second = start[:19]
+                base_ns = second_cache.get(second)
+                if base_ns is None:
+                    start_ns = _span_start_ns(start, second_cache)
+                    append(start_ns)
+                    if start_ns is None:
+                        second = "\0"
+                    else:
+                        base_ns = second_cache[second]
+                    continue
+            fraction = start[20:-1]
+            if fraction.isdigit():
+                append(base_ns + int(fraction) * _FRACTION_SCALE[len(fraction)])
+                continue
+        append(_span_start_ns(start, second_cache))
+    return starts
+
+
+def _span_parents(trace_ids: List[Any], span_ids: List[Any], parent_ids: List[Any]) -> List[Optional[int]]:
+    """Index of each span's parent span, or None if its parent is not among the spans.
+
+    Spans sharing an id within a trace are one parent: the first of them
+    gets the children, so every span has at most one parent in the tree.
+    """
+    span_count = len(span_ids)
+    first_indexes = range(span_count - 1, -1, -1)
+    span_index: Dict[Any, int] = dict(zip(reversed(span_ids), first_indexes))
+    if len(span_index) == span_count:
+        # Unique span ids; the caller rejects parents found in another trace
+        return list(map(span_index.get, parent_ids))
+    span_index = dict(zip(zip(reversed(trace_ids), reversed(span_ids)), first_indexes))
+    return [
+        None if parent_id == span_id else span_index.get((trace_id, parent_id))
+        for trace_id, span_id, parent_id in zip(trace_ids, span_ids, parent_ids)
+    ]
+
+
+def _hierarchy_lines(traces: Sequence[Mapping[str, Any]], collapse_threshold: int) -> List[str]:
+    """Lines of ``format_traces_as_hierarchy`` for a non-empty list of spans."""
+    # Spans are referred to by index, since span ids may repeat across traces
+    (
+        trace_ids, span_ids, parent_ids, services, operations, resources,
+        statuses, errors, durations, durations_ns, start_values,
+    ) = _span_columns(traces)
+    span_count = len(span_ids)
+    starts = _span_starts_ns(start_values)
+    ends = [
+        None if start is None else start + (duration_ns or int(duration * 1_000_000))
+        for start, duration_ns, duration in zip(starts, durations_ns, durations)
+    ]
+
+    parents = _span_parents(trace_ids, span_ids, parent_ids)
+
+    # Build parent-child mapping
+    root_indexes = []
+    children_by_parent: Dict[int, List[int]] = {}
+    for index, parent in enumerate(parents):
+        # A span claiming itself as parent is malformed; show it as a root
+        if parent is None or parent == index or trace_ids[parent] != trace_ids[index]:
+            parents[index] = None
+            root_indexes.append(index)
+        elif parent in children_by_parent:
+            children_by_parent[parent].append(index)
+        else:
+            children_by_parent[parent] = [index]
+
+    all_starts_known = None not in starts
+    start_key: Callable[[int], Any] = (
+        starts.__getitem__ if all_starts_known else lambda index: (starts[index] is None, starts[index] or 0)
+    )
+    children: List[Sequence[int]] = [()] * span_count
+    # Self time: duration minus the union of the children's intervals within the span
+    self_times = list(durations)
+    for parent, child_indexes in children_by_parent.items():
+        if len(child_indexes) > 1:
+            child_indexes.sort(key=start_key)
+        children[parent] = child_indexes
+
+        cursor, end = starts[parent], ends[parent]
+        if not all_starts_known and (cursor is None or any(starts[child] is None for child in child_indexes)):
+            self_ms = durations[parent] - sum(durations[child] for child in child_indexes)
+        else:
+            covered_ns = 0
+            for child in child_indexes:  # sorted by start
+                child_start = starts[child]
+                if child_start < cursor:
+                    child_start = cursor
+                child_end = ends[child]
+                if child_end > end:
+                    child_end = end
+                if child_end > child_start:
+                    covered_ns += child_end - child_start
+                    cursor = child_end
+            self_ms = durations[parent] - covered_ns / 1_000_000
+        self_times[parent] = self_ms if self_ms > 0 else 0.0
+
+    def critical_path(root: int) -> set:
+        """Follow the child that finishes last (or runs longest) from the root."""
+        path = {root}
+        node = root
+        while children[node]:
+            node = max(children[node], key=lambda child: (ends[child] or 0, durations[child]))
+            path.add(node)
+        return path
+
+    def child_items(child_indexes: Sequence[int]) -> Sequence[Any]:
+        """Children in start order; repeated leaf siblings become one index list."""
+        leaves = [child for child in child_indexes if not children[child]]
+        if len(leaves) < collapse_threshold:
+            return child_indexes
+        groups: Dict[Tuple[str, str, str], List[int]] = {}
+        for child in leaves:
+            groups.setdefault((services[child], operations[child], resources[child]), []).append(child)
+        if all(len(group) < collapse_threshold for group in groups.values()):
+            return child_indexes
+        collapsed = {
+            child: group
+            for group in groups.values() if len(group) >= collapse_threshold
+            for child in group
+        }
+        items: List[Any] = []
+        for child in child_indexes:
+            group = collapsed.get(child)
+            if group is None:
+                items.append(child)
+            elif group[0] == child:
+                items.append(group)
+        return items
+
+    prefixes = [""]
+    all_lines: List[str] = []
+
+    def render_tree(root: int) -> int:
+        """Append the lines of the tree below ``root``; returns how many spans it showed."""
+        on_path = critical_path(root)
+        bottleneck = None
+        bottleneck_self_ms = -1.0
+        shown = 0
+
+        # Iterative depth-first walk; deep traces must not hit the recursion limit.
+        # Stacked spans, or groups of spans, and their indents are popped together.
+        stack: List[Any] = [root]
+        indents = [0]
+        while stack:
+            item = stack.pop()
+            indent = indents.pop()
+
+            if type(item) is list:
+                shown += len(item)
+                group_durations = [durations[span] for span in item]
+                error_count = 0
+                marker = ""
+                for span in item:
+                    if errors[span]:
+                        error_count += 1
+                    if span in on_path:
+                        marker = " [critical path]"
+                        if durations[span] > bottleneck_self_ms:
+                            bottleneck, bottleneck_self_ms = span, durations[span]
+                first = item[0]
+                error_str = f" ❌ {error_count} errors" if error_count else ""
+                total_ms = sum(group_durations)
+                all_lines.append(
+                    f"{prefixes[indent]}{services[first]} - {operations[first]} ×{len(item)} [{resources[first]}] "
+                    f"({total_ms:.2f}ms total, avg {total_ms / len(item):.2f}ms, "
+                    f"max {max(group_durations):.2f}ms){error_str}{marker}"
+                )
+                continue
+
+            shown += 1
+            duration, self_ms = durations[item], self_times[item]
+            shown_ms = f"{duration:.2f}"
+            line = (
+                f"{prefixes[indent]}{services[item]} - {operations[item]} ({shown_ms}ms, "
+                f"self {shown_ms if self_ms == duration else f'{self_ms:.2f}'}ms) "
+                f"{statuses[item]} {'❌' if errors[item] else ''}"
+            )
+            if item in on_path:
+                if self_ms > bottleneck_self_ms:
+                    bottleneck, bottleneck_self_ms = item, self_ms
+                if indent:
+                    line += " [critical path]"
+            all_lines.append(line)
+            if not indent and resources[item]:  # Only show resource for root spans
+                all_lines.append(f"  Resource: {resources[item]}")
+
+            child_indexes = children[item]
+            if child_indexes:
+                child_indent = indent + 1
+                if child_indent == len(prefixes):
+                    prefixes.append("  " * child_indent + "└─ ")
+                if len(child_indexes) >= collapse_threshold:
+                    child_indexes = child_items(child_indexes)
+                stack.extend(reversed(child_indexes))
+                indents.extend([child_indent] * len(child_indexes))
+
+        if bottleneck is not None and children[root]:
+            all_lines.append(
+                f"  Bottleneck: {services[bottleneck]} - {operations[bottleneck]} "
+                f"({bottleneck_self_ms:.2f}ms self time on the critical path)"
+            )
+        all_lines.append("")  # Blank line between traces
+        return shown
+
+    shown = 0
+    for root in root_indexes:
+        shown += render_tree(root)
+    if shown == span_count:
+        return all_lines
+
+    # No root leads to spans in, or below, a cycle of parent links
+    reached = [False] * span_count
+    pending = list(root_indexes)
+    while pending:
+        node = pending.pop()
+        reached[node] = True
+        pending.extend(children[node])
+    all_lines.append(
+        f"{reached.count(False)} span(s) in or below parent cycles, each cycle shown from one of its spans:"
+    )
+    all_lines.append("")
+    for index in range(span_count):
+        if reached[index]:
+            continue
+        # Climb to a span on the cycle, and cut the cycle above it
+        node, climbed = index, set()
+        while node not in climbed:
+            climbed.add(node)
+            node = parents[node]
+        parent = parents[node]
+        children[parent] = [child for child in children[parent] if child != node]
+        render_tree(node)
+        pending.append(node)
+        while pending:
+            node = pending.pop()
+            reached[node] = True
+            pending.extend(children[node])
+
+    return all_lines
+
+
+def format_traces_as_hierarchy(traces: Sequence[Mapping[str, Any]], collapse_threshold: int = 3) -> str:
     """Format traces as a hierarchical tree structure showing parent-child relationships.
 
+    Children are ordered by start time and each span shows its self time
+    (duration not covered by its children). Spans on the critical path, the
+    chain of last-finishing children from the root, are marked. Leaf siblings
+    with the same service, operation and resource (e.g. N+1 queries) are
+    collapsed into one aggregated line. Spans whose parent links form a cycle
+    are shown after the traces, each cycle from one of its spans.
+
     Args:
         traces: List of processed trace dictionaries
+        collapse_threshold: Minimum number of identical leaf siblings to collapse
 
     Returns:
         Formatted hierarchy string
@@ -723,51 +1144,5 @@ def format_traces_as_hierarchy(traces: List[Dict[str, Any]]) -> str:
     if not traces:
         return "No traces found"
 
-    # Build parent-child mapping
-    trace_map = {trace["span_id"]: trace for trace in traces}
-    root_traces = []
-    children_map = {}
-
-    for trace in traces:
-        parent_id = trace.get("parent_id")
-        if not parent_id or parent_id not in trace_map:
-            root_traces.append(trace)
-        else:
-            if parent_id not in children_map:
-                children_map[parent_id] = []
-            children_map[parent_id].append(trace)
-
-    def format_trace_node(trace: Dict[str, Any], indent: int = 0) -> List[str]:
-        """Recursively format a trace and its children."""
-        lines = []
-        prefix = "  " * indent + ("└─ " if indent > 0 else "")
-
-        duration = trace.get("duration_ms", 0)
-        status = trace.get("status", "")
-        error_indicator = "❌" if trace.get("error") else ""
-
-        service = trace.get("service", "unknown")
-        operation = trace.get("operation_name", "")
-        resource = trace.get("resource_name", "")
-
-        lines.append(
-            f"{prefix}{service} - {operation} ({duration:.2f}ms) {status} {error_indicator}"
-        )
-        if resource and indent == 0:  # Only show resource for root spans
-            lines.append(f"{'  ' * (indent + 1)}Resource: {resource}")
-
-        # Add children
-        span_id = trace["span_id"]
-        if span_id in children_map:
-            for child in children_map[span_id]:
-                lines.extend(format_trace_node(child, indent + 1))
-
-        return lines
-
-    # Format all root traces
-    all_lines = []
-    for root in root_traces:
-        all_lines.extend(format_trace_node(root))
-        all_lines.append("")  # Blank line between traces
-
-    return "\n".join(all_lines)
\ No newline at end of file
+    # Joined once the per-span lists built for the tree are released
+    return "\n".join(_hierarchy_lines(traces, collapse_threshold))
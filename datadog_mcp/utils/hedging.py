@@ -0,0 +1,185 @@
+"""
+Hedged requests for idempotent searches
+
+Metric queries and span searches occasionally take seconds longer than
+usual. With DD_MCP_HEDGE_PERCENTILE set (e.g. 95; default: 0,
+off), such a request that is still running after that percentile of the
+endpoint's recent latencies is sent a second time, and whichever attempt
+finishes first wins; the other is cancelled.
+
+Hedges spend rate-limit quota, so they are only sent while the endpoint is
+not throttling, while its last response left at least HEDGE_RESERVE of the
+rate-limit window unused, and up to DD_MCP_HEDGE_MAX_RATIO of its requests
+(default: 0.1).
+
+Log searches go through the synchronous SDK in a thread, which cannot be
+cancelled, so a hedged one would always cost two requests; they are not
+hedged.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, TypeVar
+
+import httpx
+
+from .fanout import retry_after
+from .orgs import org_scoped
+
+logger = logging.getLogger(__name__)
+
+HEDGE_PERCENTILE = float(os.getenv("DD_MCP_HEDGE_PERCENTILE", "0"))
+HEDGE_MAX_RATIO = float(os.getenv("DD_MCP_HEDGE_MAX_RATIO", "0.1"))
+
+# Fraction of the rate-limit window that must be left unused to hedge
+HEDGE_RESERVE = 0.2
+# Latencies observed per endpoint before it is hedged, and kept for percentiles
+MIN_SAMPLES = 20
+MAX_SAMPLES = 200
+# Hedge no sooner than this, however fast the endpoint usually is
+MIN_HEDGE_DELAY = 0.05
+
+T = TypeVar("T")
+
+
+@dataclass
+class HedgeStats:
+    """Counters for one endpoint."""
+
+    requests: int = 0
+    hedged: int = 0
+    hedge_won: int = 0
+
+
+class EndpointLatency:
+    """Recent latencies and rate-limit state of one endpoint."""
+
+    def __init__(self) -> None:
+        self.samples: Deque[float] = deque(maxlen=MAX_SAMPLES)
+        self.stats = HedgeStats()
+        self.remaining: Optional[int] = None
+        self.limit: Optional[int] = None
+        self.throttled_until = 0.0
+
+    def percentile(self, percentile: float) -> Optional[float]:
+        """The given percentile of recent latencies, or None with too few samples."""
+        if len(self.samples) < MIN_SAMPLES:
+            return None
+        ordered = sorted(self.samples)
+        index = min(int(len(ordered) * percentile / 100), len(ordered) - 1)
+        return ordered[index]
+
+    def can_hedge(self) -> bool:
+        """Whether a hedge fits the rate-limit budget."""
+        if time.monotonic() < self.throttled_until:
+            return False
+        if self.remaining is not None and self.limit and self.remaining < self.limit * HEDGE_RESERVE:
+            return False
+        return self.stats.hedged < self.stats.requests * HEDGE_MAX_RATIO
+
+    def observe(self, response: httpx.Response) -> None:
+        """Take the rate-limit state from a response's headers."""
+        try:
+            self.remaining = int(response.headers["X-RateLimit-Remaining"])
+            self.limit = int(response.headers["X-RateLimit-Limit"])
+        except (KeyError, ValueError):
+            pass
+        if response.status_code == 429:
+            self.throttle(retry_after(httpx.HTTPStatusError("", request=response.request, response=response)))
+
+    def throttle(self, seconds: Optional[float]) -> None:
+        self.throttled_until = max(self.throttled_until, time.monotonic() + (seconds or 1.0))
+
+
+class Hedger:
+    """Latency tracking and hedging per endpoint and org."""
+
+    def __init__(self, percentile: float = HEDGE_PERCENTILE):
+        self.percentile = percentile
+        self._endpoints: Dict[str, EndpointLatency] = {}
+
+    def endpoint(self, name: str) -> EndpointLatency:
+        """The endpoint's state in the org of the current tool call."""
+        name = org_scoped(name)
+        endpoint = self._endpoints.get(name)
+        if endpoint is None:
+            endpoint = self._endpoints[name] = EndpointLatency()
+        return endpoint
+
+    def event_hooks(self, name: str) -> Dict[str, List[Callable[[httpx.Response], Awaitable[None]]]]:
+        """httpx event hooks that keep the endpoint's rate-limit state current."""
+        endpoint = self.endpoint(name)
+
+        async def observe(response: httpx.Response) -> None:
+            endpoint.observe(response)
+
+        return {"response": [observe]}
+
+    async def _attempt(self, endpoint: EndpointLatency, attempt: Callable[[], Awaitable[T]]) -> T:
+        try:
+            return await attempt()
+        except Exception as e:
+            if retry_after(e) is not None or getattr(e, "status", None) == 429:
+                endpoint.throttle(retry_after(e))
+            raise
+
+    async def run(self, name: str, attempt: Callable[[], Awaitable[T]]) -> T:
+        """Await ``attempt()``, sending it again if it is slow for this endpoint.
+
+        Args:
+            name: Endpoint name, for latencies and rate-limit state
+            attempt: Issues the (idempotent) request; called once per attempt
+        """
+        endpoint = self.endpoint(name)
+        endpoint.stats.requests += 1
+        started = time.monotonic()
+        result = await self._race(name, endpoint, attempt)
+        # One sample per request, from its first attempt's start until it was answered.
+        # Timing attempts on their own would drop the slow ones cancelled after losing,
+        # and the percentile, and with it the hedge delay, would keep falling.
+        endpoint.samples.append(time.monotonic() - started)
+        return result
+
+    async def _race(self, name: str, endpoint: EndpointLatency, attempt: Callable[[], Awaitable[T]]) -> T:
+        delay = endpoint.percentile(self.percentile) if self.percentile > 0 else None
+        if delay is None:
+            return await self._attempt(endpoint, attempt)
+
+        first = asyncio.ensure_future(self._attempt(endpoint, attempt))
+        pending = {first}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=max(delay, MIN_HEDGE_DELAY))
+            if done:
+                return first.result()
+            if not endpoint.can_hedge():
+                return await first
+
+            logger.debug(f"{name} request slower than {delay:.3f}s, hedging it")
+            endpoint.stats.hedged += 1
+            second = asyncio.ensure_future(self._attempt(endpoint, attempt))
+            pending = {first, second}
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is second:
+                            endpoint.stats.hedge_won += 1
+                        return task.result()
+                    # The other attempt may still succeed
+                    error = error or task.exception()
+            raise error  # type: ignore[misc]
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Requests, hedges and hedges that won per endpoint."""
+        return {name: asdict(endpoint.stats) for name, endpoint in sorted(self._endpoints.items())}
+
+
+hedger = Hedger()
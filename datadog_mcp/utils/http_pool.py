@@ -0,0 +1,83 @@
+"""
+Connection pool shared by every Datadog request
+
+Fetches used to open a client, and with it new connections, per call, so a
+fan-out of 50 requests paid for 50 TCP and TLS handshakes. Every fetch now
+borrows one pooled transport that keeps connections to the API alive
+between calls.
+
+With DD_MCP_HTTP2=1 and the optional ``h2`` package installed
+(the ``http2`` extra), the pool negotiates HTTP/2, so concurrent
+requests multiplex over a single connection instead of needing one each.
+Without ``h2`` the setting is ignored with a warning and HTTP/1.1 is used.
+DD_MCP_HTTP_MAX_CONNECTIONS caps the pool's connections (default: 100).
+"""
+
+import asyncio
+import logging
+import os
+from typing import Optional
+
+import httpx
+
+try:
+    import h2
+except ImportError:  # optional: the pool then speaks HTTP/1.1 only
+    h2 = None
+
+logger = logging.getLogger(__name__)
+
+HTTP2_REQUESTED = os.getenv("DD_MCP_HTTP2", "").lower() in ("1", "true", "yes")
+HTTP2 = HTTP2_REQUESTED and h2 is not None
+MAX_CONNECTIONS = int(os.getenv("DD_MCP_HTTP_MAX_CONNECTIONS", "100"))
+
+# Idle connections kept open between bursts of requests, and for how long
+MAX_KEEPALIVE_CONNECTIONS = 20
+KEEPALIVE_EXPIRY = 30.0
+
+if HTTP2_REQUESTED and not HTTP2:
+    logger.warning("DD_MCP_HTTP2 is set but the h2 package is not installed; using HTTP/1.1")
+
+
+class SharedTransport(httpx.AsyncBaseTransport):
+    """Pooled transport borrowed by many clients; closing a client leaves the pool open.
+
+    Connections belong to the event loop they were opened on, so a new pool
+    is started when requests come from a different loop.
+    """
+
+    def __init__(self, http2: bool = HTTP2, max_connections: int = MAX_CONNECTIONS):
+        self.http2 = http2
+        self.max_connections = max_connections
+        self._pool: Optional[httpx.AsyncHTTPTransport] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _current_pool(self) -> httpx.AsyncHTTPTransport:
+        loop = asyncio.get_running_loop()
+        if self._pool is None or self._loop is not loop:
+            # A pool left behind on another loop cannot be closed from this one
+            self._pool = httpx.AsyncHTTPTransport(
+                http2=self.http2,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=KEEPALIVE_EXPIRY,
+                ),
+            )
+            self._loop = loop
+        return self._pool
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self._current_pool().handle_async_request(request)
+
+    async def aclose(self) -> None:
+        """Nothing to do: the pool outlives the clients borrowing it."""
+
+    async def close_pool(self) -> None:
+        """Close the pool's connections, e.g. at shutdown."""
+        pool, self._pool, self._loop = self._pool, None, None
+        if pool is not None:
+            await pool.aclose()
+
+
+shared_transport = SharedTransport()
@@ -0,0 +1,212 @@
+"""
+JSON encoding for tool output and decoding for large API responses
+"""
+
+import json
+import os
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple, Union
+
+try:
+    import ijson
+except ImportError:  # a dependency; without it responses are decoded in one piece and projected afterwards
+    ijson = None
+
+try:
+    import orjson
+except ImportError:  # optional (the speedups extra): the standard library encoder is used instead
+    orjson = None
+
+# Errors decode_stream raises for a malformed body, with and without ijson
+DECODE_ERRORS: Tuple[type, ...] = (json.JSONDecodeError,) if ijson is None else (json.JSONDecodeError, ijson.JSONError)
+
+# Indent tool JSON output; compact output is smaller and faster to produce
+PRETTY_JSON = os.getenv("DD_MCP_PRETTY_JSON", "").lower() in ("1", "true", "yes")
+
+
+def _to_json(value: Any) -> Any:
+    """Encoder hook for objects that know their JSON form, e.g. span and log records."""
+    to_dict = getattr(value, "to_dict", None)
+    if to_dict is None:
+        raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+    return to_dict()
+
+
+def dumps(value: Any, pretty: Optional[bool] = None) -> str:
+    """Serialize ``value`` to a JSON string.
+
+    Args:
+        value: Data to serialize; objects with a ``to_dict()`` method are converted
+        pretty: Indent the output (default: the DD_MCP_PRETTY_JSON setting)
+
+    Returns:
+        JSON text, encoded with orjson when it is installed
+    """
+    if pretty is None:
+        pretty = PRETTY_JSON
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if pretty else 0)
+        try:
+            return orjson.dumps(value, default=_to_json, option=option).decode()
+        except orjson.JSONEncodeError:
+            pass  # e.g. integers beyond 64 bits, which the standard library handles
+    if pretty:
+        return json.dumps(value, indent=2, ensure_ascii=False, default=_to_json)
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=_to_json)
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Parse a JSON document, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class JsonProjection:
+    """Subset of a JSON document to keep, given as dotted paths.
+
+    Lists are transparent: ``data.id`` keeps the ``id`` of every item of
+    ``data``. A path that stops at a key keeps that key's whole value, and a
+    last segment ending in ``*`` keeps every key with that prefix.
+    """
+
+    __slots__ = ("_children", "_prefixes")
+
+    def __init__(self, paths: Iterable[str] = ()):
+        self._children: Dict[str, Union["JsonProjection", object]] = {}
+        self._prefixes: Tuple[str, ...] = ()
+        for path in paths:
+            self._add(path.split("."))
+
+    def _add(self, segments: List[str]) -> None:
+        head, rest = segments[0], segments[1:]
+        if not rest:
+            if head.endswith("*"):
+                self._prefixes += (head[:-1],)
+            else:
+                self._children[head] = KEEP
+            return
+        child = self._children.get(head)
+        if child is KEEP:
+            return
+        if child is None:
+            child = self._children[head] = JsonProjection()
+        child._add(rest)
+
+    def child(self, key: str) -> Union["JsonProjection", object, None]:
+        """Projection for the value under ``key``: a JsonProjection, KEEP, or None to drop it."""
+        child = self._children.get(key)
+        if child is None and self._prefixes and key.startswith(self._prefixes):
+            return KEEP
+        return child
+
+    def paths(self) -> List[str]:
+        """The dotted paths this projection keeps, sorted."""
+        paths = [prefix + "*" for prefix in self._prefixes]
+        for key, child in self._children.items():
+            if child is KEEP:
+                paths.append(key)
+            else:
+                paths.extend(f"{key}.{path}" for path in child.paths())
+        return sorted(paths)
+
+    def __repr__(self) -> str:
+        return f"JsonProjection({self.paths()!r})"
+
+    def apply(self, value: Any) -> Any:
+        """Projected copy of an already decoded value."""
+        if isinstance(value, list):
+            return [self.apply(item) for item in value]
+        if not isinstance(value, dict):
+            return value
+        result = {}
+        for key, item in value.items():
+            child = self.child(key)
+            if child is KEEP:
+                result[key] = item
+            elif child is not None:
+                result[key] = child.apply(item)
+        return result
+
+
+# Keep a value and everything below it
+KEEP = object()
+
+
+class _ProjectingBuilder:
+    """Build the projected document from ijson basic_parse events."""
+
+    def __init__(self, projection: JsonProjection):
+        self.result: Any = None
+        # Open containers as [container, projection of its contents, current key]
+        self._stack: List[List[Any]] = []
+        # Projection of the next value; None drops it
+        self._next: Any = projection
+        self._skip_depth = 0
+
+    def _add(self, value: Any) -> None:
+        if not self._stack:
+            self.result = value
+            return
+        frame = self._stack[-1]
+        container = frame[0]
+        if type(container) is list:
+            container.append(value)
+            self._next = frame[1]
+        else:
+            container[frame[2]] = value
+
+    def event(self, event: str, value: Any) -> None:
+        if self._skip_depth:
+            if event == "start_map" or event == "start_array":
+                self._skip_depth += 1
+            elif event == "end_map" or event == "end_array":
+                self._skip_depth -= 1
+            return
+
+        if event == "map_key":
+            frame = self._stack[-1]
+            frame[2] = value
+            projection = frame[1]
+            self._next = KEEP if projection is KEEP else projection.child(value)
+        elif event == "end_map" or event == "end_array":
+            self._add(self._stack.pop()[0])
+        elif self._next is None:
+            # Value of a dropped key
+            if event == "start_map" or event == "start_array":
+                self._skip_depth = 1
+        elif event == "start_map":
+            self._stack.append([{}, self._next, None])
+        elif event == "start_array":
+            # Items of a list share the list's projection
+            self._stack.append([[], self._next, None])
+        else:
+            self._add(value)
+
+
+async def decode_stream(chunks: AsyncIterator[bytes], projection: JsonProjection) -> Any:
+    """Decode a JSON body from byte chunks, keeping only ``projection``.
+
+    With ijson installed the body is parsed incrementally, so the full
+    decoded document never exists in memory; otherwise it is decoded in one
+    piece and projected afterwards. A malformed body raises one of
+    DECODE_ERRORS.
+    """
+    if ijson is None:
+        body = bytearray()
+        async for chunk in chunks:
+            body += chunk
+        return projection.apply(json.loads(body))
+
+    builder = _ProjectingBuilder(projection)
+    events = ijson.sendable_list()
+    parser = ijson.basic_parse_coro(events, use_float=True)
+    handle = builder.event
+    async for chunk in chunks:
+        parser.send(chunk)
+        for event, value in events:
+            handle(event, value)
+        del events[:]
+    parser.close()
+    for event, value in events:
+        handle(event, value)
+    return builder.result
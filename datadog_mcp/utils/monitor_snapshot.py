@@ -0,0 +1,223 @@
+"""
+Background-maintained snapshot of all monitors
+
+The snapshot pages through every monitor once, then refreshes on an
+interval. The v1 monitors API has no modified-since filter, so each refresh
+re-lists the monitors, but only monitors that differ from the indexed copy
+are re-indexed. Queries by tag, scope tag, type, state and name are answered
+from in-memory indexes.
+
+The refreshes list every monitor page for the whole session and spend the
+org's rate limit, so the snapshot is opt-in: DD_MCP_MONITOR_SNAPSHOT_INTERVAL
+sets the refresh interval in seconds (default: 0, off; e.g. 120).
+"""
+
+import asyncio
+import logging
+import os
+import re
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from .datadog_client import fetch_monitors
+from .pagination import collect_pages_until_short
+
+logger = logging.getLogger(__name__)
+
+MONITOR_SNAPSHOT_INTERVAL = float(os.getenv("DD_MCP_MONITOR_SNAPSHOT_INTERVAL", "0"))
+
+# Largest page the monitors API returns
+PAGE_SIZE = 1000
+
+# Tag scopes in monitor queries, e.g. the "service:web,env:prod" in "avg:cpu{service:web,env:prod}"
+_SCOPE_PATTERN = re.compile(r"\{([^{}]*)\}")
+
+
+def _split_tags(tags: str) -> List[str]:
+    return [tag.strip() for tag in tags.split(",") if tag.strip()]
+
+
+def scope_tags(query: str) -> Set[str]:
+    """Tags a monitor query is scoped to (negated and wildcard scopes are ignored)."""
+    tags = set()
+    for scope in _SCOPE_PATTERN.findall(query or ""):
+        for tag in scope.split(","):
+            tag = tag.strip()
+            if tag and tag != "*" and not tag.startswith("!"):
+                tags.add(tag)
+    return tags
+
+
+class MonitorSnapshot:
+    """All monitors of the org, indexed for local filtering."""
+
+    def __init__(self) -> None:
+        # Each monitor as last indexed
+        self._monitors: Dict[Any, Dict[str, Any]] = {}
+        self._names: Dict[Any, str] = {}
+        self._by_tag: Dict[str, Set[Any]] = {}
+        self._by_scope: Dict[str, Set[Any]] = {}
+        self._by_type: Dict[str, Set[Any]] = {}
+        self._by_state: Dict[str, Set[Any]] = {}
+        # time.monotonic() of the last successful refresh
+        self.refreshed_at: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self._monitors)
+
+    def is_fresh(self, max_age: float) -> bool:
+        """Whether the snapshot was refreshed within ``max_age`` seconds."""
+        return self.refreshed_at is not None and time.monotonic() - self.refreshed_at <= max_age
+
+    def _index_keys(self, monitor: Dict[str, Any]) -> Iterable[Tuple[Dict[str, Set[Any]], str]]:
+        for tag in monitor.get("tags") or ():
+            yield self._by_tag, tag
+        for tag in scope_tags(monitor.get("query", "")):
+            yield self._by_scope, tag
+        yield self._by_type, str(monitor.get("type", "unknown")).lower()
+        yield self._by_state, str(monitor.get("overall_state", "unknown")).lower()
+
+    def _add(self, monitor_id: Any, monitor: Dict[str, Any]) -> None:
+        self._monitors[monitor_id] = monitor
+        self._names[monitor_id] = str(monitor.get("name", "")).lower()
+        for index, key in self._index_keys(monitor):
+            index.setdefault(key, set()).add(monitor_id)
+
+    def _remove(self, monitor_id: Any) -> None:
+        monitor = self._monitors.pop(monitor_id)
+        del self._names[monitor_id]
+        for index, key in self._index_keys(monitor):
+            ids = index.get(key)
+            if ids is not None:
+                ids.discard(monitor_id)
+                if not ids:
+                    del index[key]
+
+    def apply(self, monitors: List[Dict[str, Any]]) -> Dict[str, int]:
+        """Replace the snapshot contents with a full listing, re-indexing only what changed.
+
+        Returns:
+            Counts of added, updated and removed monitors
+        """
+        seen = set()
+        added = updated = 0
+        for monitor in monitors:
+            monitor_id = monitor.get("id")
+            if monitor_id is None:
+                continue
+            seen.add(monitor_id)
+            indexed = self._monitors.get(monitor_id)
+            if indexed is None:
+                self._add(monitor_id, monitor)
+                added += 1
+            elif indexed != monitor:
+                # Edits to tags, name or type need not bump `modified`
+                self._remove(monitor_id)
+                self._add(monitor_id, monitor)
+                updated += 1
+        removed = [monitor_id for monitor_id in self._monitors if monitor_id not in seen]
+        for monitor_id in removed:
+            self._remove(monitor_id)
+        self.refreshed_at = time.monotonic()
+        return {"added": added, "updated": updated, "removed": len(removed)}
+
+    def query(
+        self,
+        tags: str = "",
+        name: str = "",
+        monitor_tags: str = "",
+        state: str = "",
+        monitor_type: str = "",
+    ) -> List[Dict[str, Any]]:
+        """Monitors matching every given filter, ordered by id.
+
+        Args:
+            tags: Comma-separated scope tags the monitor query must include
+            name: Case-insensitive substring of the monitor name
+            monitor_tags: Comma-separated tags the monitor must have
+            state: Overall state (e.g. 'Alert', 'Warn', 'No Data', 'OK')
+            monitor_type: Monitor type (e.g. 'metric alert')
+        """
+        candidates: List[Set[Any]] = []
+        for tag in _split_tags(tags):
+            candidates.append(self._by_scope.get(tag, set()))
+        for tag in _split_tags(monitor_tags):
+            candidates.append(self._by_tag.get(tag, set()))
+        if state:
+            candidates.append(self._by_state.get(state.lower(), set()))
+        if monitor_type:
+            candidates.append(self._by_type.get(monitor_type.lower(), set()))
+
+        if candidates:
+            # Intersect starting from the most selective index
+            candidates.sort(key=len)
+            ids = set(candidates[0])
+            for other in candidates[1:]:
+                ids &= other
+        else:
+            ids = self._monitors.keys()
+
+        if name:
+            name = name.lower()
+            names = self._names
+            ids = [monitor_id for monitor_id in ids if name in names[monitor_id]]
+
+        return [self._monitors[monitor_id] for monitor_id in sorted(ids)]
+
+
+async def fetch_all_monitors(page_size: int = PAGE_SIZE) -> List[Dict[str, Any]]:
+    """Every monitor of the org, paging through the monitors API."""
+    return await collect_pages_until_short(
+        lambda page: fetch_monitors(page_size=page_size, page=page), page_size, max_items=None
+    )
+
+
+class MonitorSnapshotRefresher:
+    """Keep a MonitorSnapshot up to date from a background task."""
+
+    def __init__(self, snapshot: MonitorSnapshot, interval: float = MONITOR_SNAPSHOT_INTERVAL):
+        self.snapshot = snapshot
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def refresh(self) -> Dict[str, int]:
+        """List all monitors and apply the changes to the snapshot."""
+        started = time.perf_counter()
+        changes = self.snapshot.apply(await fetch_all_monitors())
+        logger.info(
+            f"Monitor snapshot refreshed in {time.perf_counter() - started:.2f}s: "
+            f"{len(self.snapshot)} monitors, {changes}"
+        )
+        return changes
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Monitor snapshot refresh failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run(), name="monitor-snapshot")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+monitor_snapshot = MonitorSnapshot()
+monitor_snapshot_refresher = MonitorSnapshotRefresher(monitor_snapshot)
+
+
+def snapshot_max_age() -> float:
+    """Oldest snapshot age still used to answer queries: two missed refreshes."""
+    return MONITOR_SNAPSHOT_INTERVAL * 3
@@ -0,0 +1,208 @@
+"""
+Negative caching of not-found lookups, with did-you-mean suggestions
+
+Agents guessing a metric or service name tend to retry the same wrong
+name. A 404 is remembered for DD_MCP_NOT_FOUND_TTL seconds (default: 60;
+0 disables it), so repeats are answered without a round trip. Suggestions
+come from the names seen in catalog responses, in this process or in the
+persistent response cache, and cost no API call.
+"""
+
+import asyncio
+import difflib
+import functools
+import inspect
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple, TypeVar
+
+import httpx
+
+from .orgs import org_scoped
+from .response_cache import get_response_cache
+
+logger = logging.getLogger(__name__)
+
+NOT_FOUND_TTL = float(os.getenv("DD_MCP_NOT_FOUND_TTL", "60"))
+
+# Not-found names remembered at most, oldest dropped first
+MAX_NOT_FOUND = 1000
+
+F = TypeVar("F", bound=Callable[..., Awaitable[Any]])
+
+
+@dataclass
+class NotFoundEntry:
+    """A name the API recently answered 404 for."""
+
+    error: httpx.HTTPStatusError
+    expires_at: float
+
+
+class NotFoundCache:
+    """Recently not-found names, keyed by kind and name, e.g. ("metric", "trace.http.requests").
+
+    Kinds are qualified by the org of the tool call, e.g. "eu:metric".
+    """
+
+    def __init__(self, ttl: float = NOT_FOUND_TTL, max_entries: int = MAX_NOT_FOUND):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: Dict[Tuple[str, str], NotFoundEntry] = {}
+
+    def add(self, key: Tuple[str, str], error: httpx.HTTPStatusError) -> None:
+        if self.ttl <= 0:
+            return
+        self._entries.pop(key, None)
+        self._entries[key] = NotFoundEntry(error, time.monotonic() + self.ttl)
+        while len(self._entries) > self.max_entries:
+            del self._entries[next(iter(self._entries))]
+
+    def get(self, key: Tuple[str, str]) -> Optional[NotFoundEntry]:
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        return entry
+
+    def is_missing(self, kind: str, name: str) -> bool:
+        """Whether a lookup of ``name`` recently came back 404."""
+        return self.get((org_scoped(kind), name)) is not None
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class NameCatalog:
+    """Names seen in catalog responses, by kind and org, for suggestions."""
+
+    def __init__(self) -> None:
+        self._names: Dict[str, Set[str]] = {}
+        # Cached functions whose stored responses list names: kind -> [(function, extract, scope)]
+        self._sources: Dict[str, List[Tuple[str, Callable[[Any], Iterable[str]], Callable[[], str]]]] = {}
+        self._seeded: Set[Tuple[str, str]] = set()
+
+    def add(self, kind: str, names: Iterable[str]) -> None:
+        self._names.setdefault(org_scoped(kind), set()).update(name for name in names if name)
+
+    def add_source(
+        self, kind: str, function: str, extract: Callable[[Any], Iterable[str]], scope: Callable[[], str]
+    ) -> None:
+        self._sources.setdefault(kind, []).append((function, extract, scope))
+
+    def names(self, kind: str) -> Set[str]:
+        """Known names of a kind seen so far in this process."""
+        return self._names.get(org_scoped(kind), set())
+
+    async def load_cached(self, kind: str) -> None:
+        """Add the names in persistently cached responses, once per function and scope.
+
+        The cache is read and decoded in a worker thread, off the event loop.
+        """
+        cache = get_response_cache()
+        if cache is None:
+            return
+        for function, extract, scope in self._sources.get(kind, ()):
+            seed_key = (function, scope())
+            if seed_key in self._seeded:
+                continue
+            self._seeded.add(seed_key)
+            self.add(kind, await asyncio.to_thread(
+                lambda: [name for value in cache.values_of(function, seed_key[1]) for name in extract(value)]
+            ))
+
+    async def suggest(self, kind: str, name: str, limit: int = 3) -> List[str]:
+        """Known names closest to ``name``, including those in persistently cached responses."""
+        await self.load_cached(kind)
+        names = self.names(kind)
+        if not names:
+            return []
+        return difflib.get_close_matches(name, names, n=limit, cutoff=0.6)
+
+    def clear(self) -> None:
+        self._names.clear()
+        self._seeded.clear()
+
+
+not_found_cache = NotFoundCache()
+name_catalog = NameCatalog()
+
+
+async def did_you_mean(kind: str, name: str) -> str:
+    """A ' Did you mean: ...?' hint for an unknown name, or an empty string."""
+    suggestions = await name_catalog.suggest(kind, name)
+    if not suggestions:
+        return ""
+    return f" Did you mean: {', '.join(suggestions)}?"
+
+
+def remember_names(
+    kind: str, extract: Callable[[Any], Iterable[str]], scope: Callable[[], str] = lambda: ""
+) -> Callable[[F], F]:
+    """Add the names listed in a catalog fetch's responses to the name catalog.
+
+    Args:
+        kind: Kind of the names, e.g. "metric"
+        extract: Returns the names in one response
+        scope: The response cache scope of the decorated function, to find
+            its persistently cached responses
+    """
+
+    def decorate(func: F) -> F:
+        name_catalog.add_source(kind, func.__name__, extract, scope)
+
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            value = await func(*args, **kwargs)
+            name_catalog.add(kind, extract(value))
+            return value
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
+
+
+def remember_not_found(
+    kind: str, name_arg: str, default: Optional[Callable[[], Any]] = None
+) -> Callable[[F], F]:
+    """Answer repeated lookups of a recently not-found name without a request.
+
+    Args:
+        kind: Kind of the looked-up name, e.g. "metric"
+        name_arg: Argument of the decorated function holding the name
+        default: Called for the result of a not-found lookup; without it
+            the 404 error is raised (again)
+    """
+
+    def decorate(func: F) -> F:
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            bound = signature.bind(*args, **kwargs)
+            name = bound.arguments[name_arg]
+            key = (org_scoped(kind), name)
+
+            entry = not_found_cache.get(key)
+            if entry is None:
+                try:
+                    return await func(*args, **kwargs)
+                except httpx.HTTPStatusError as e:
+                    if e.response.status_code != 404:
+                        raise
+                    logger.warning(f"{kind.capitalize()} '{name}' not found")
+                    not_found_cache.add(key, e)
+                    error = e
+            else:
+                logger.debug(f"{kind.capitalize()} '{name}' was not found recently, skipping the request")
+                error = entry.error
+
+            if default is not None:
+                return default()
+            raise error
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
@@ -0,0 +1,217 @@
+"""
+Datadog organizations served by one server process
+
+The org whose keys are in DD_API_KEY / DD_APP_KEY is the default one. More
+orgs, e.g. on another Datadog site, are listed in DD_MCP_ORGS and take their
+keys and site from variables suffixed with the upper-cased org name:
+
+    DD_MCP_ORGS=eu,staging
+    DD_API_KEY_EU=...  DD_APP_KEY_EU=...  DD_SITE_EU=datadoghq.eu
+    DD_API_KEY_STAGING=...  DD_APP_KEY_STAGING=...
+
+DD_API_URL_<ORG> overrides the site's API URL, as DD_API_URL does for the
+default org. The default org is read from the environment on first use, so
+importing the server (e.g. to list tools) needs no credentials.
+
+Tools take an optional ``org`` argument; each org gets its own connection
+pool, rate-limit and circuit breaker state, and response cache namespace.
+"""
+
+import contextvars
+import hashlib
+import logging
+import os
+import re
+from contextlib import contextmanager
+from dataclasses import dataclass, field, replace
+from types import MappingProxyType
+from typing import Dict, Iterator, List, Mapping, Optional
+
+from .http_pool import SharedTransport
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ORG = "default"
+DEFAULT_SITE = "datadoghq.com"
+
+
+def site_api_url(site: str) -> str:
+    """API base URL of a Datadog site, e.g. datadoghq.eu -> https://api.datadoghq.eu."""
+    return f"https://api.{site.strip().removeprefix('app.')}"
+
+
+DEFAULT_API_URL = site_api_url(DEFAULT_SITE)
+
+
+@dataclass(frozen=True)
+class Org:
+    """A Datadog org: where its API is and the keys to call it with.
+
+    The request headers and the response cache scope are computed once
+    here rather than on every request.
+    """
+
+    name: str
+    api_url: str
+    api_key: str
+    app_key: str
+    # Authentication headers, and the same with a JSON content type
+    headers: Mapping[str, str] = field(init=False, repr=False, compare=False)
+    json_headers: Mapping[str, str] = field(init=False, repr=False, compare=False)
+    # Cached responses belong to one API base URL and key pair
+    cache_scope: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        auth = {"DD-API-KEY": self.api_key, "DD-APPLICATION-KEY": self.app_key}
+        credentials = hashlib.sha256(f"{self.api_key}:{self.app_key}".encode()).hexdigest()[:16]
+        object.__setattr__(self, "headers", MappingProxyType(auth))
+        object.__setattr__(self, "json_headers", MappingProxyType({"Content-Type": "application/json", **auth}))
+        object.__setattr__(self, "cache_scope", f"{self.api_url}|{credentials}")
+
+    def at(self, api_url: str) -> "Org":
+        """The same org reached at another API base URL, e.g. a local stand-in."""
+        return replace(self, api_url=api_url.rstrip("/"))
+
+
+class UnknownOrgError(ValueError):
+    """A tool call named an org that is not configured."""
+
+
+def _org_from_env(name: str) -> Optional[Org]:
+    suffix = re.sub(r"[^A-Z0-9]", "_", name.upper())
+    api_key = os.getenv(f"DD_API_KEY_{suffix}")
+    app_key = os.getenv(f"DD_APP_KEY_{suffix}")
+    if not api_key or not app_key:
+        logger.error(f"Org '{name}' needs DD_API_KEY_{suffix} and DD_APP_KEY_{suffix}; ignoring it")
+        return None
+    api_url = os.getenv(f"DD_API_URL_{suffix}") or site_api_url(os.getenv(f"DD_SITE_{suffix}", DEFAULT_SITE))
+    return Org(name, api_url.rstrip("/"), api_key, app_key)
+
+
+class OrgRegistry:
+    """Orgs besides the default one, by name, each with its own connection pool."""
+
+    def __init__(self, orgs: Optional[List[Org]] = None):
+        self._orgs: Dict[str, Org] = {org.name: org for org in orgs or ()}
+        self._transports: Dict[str, SharedTransport] = {}
+
+    @classmethod
+    def from_env(cls) -> "OrgRegistry":
+        names = [name.strip() for name in os.getenv("DD_MCP_ORGS", "").split(",") if name.strip()]
+        orgs = [_org_from_env(name) for name in names if name != DEFAULT_ORG]
+        return cls([org for org in orgs if org is not None])
+
+    def names(self) -> List[str]:
+        """Org names a tool call may pass, the default org first."""
+        return [DEFAULT_ORG, *sorted(self._orgs)]
+
+    def get(self, name: str) -> Org:
+        try:
+            return self._orgs[name]
+        except KeyError:
+            raise UnknownOrgError(
+                f"Unknown org '{name}'; configured orgs: {', '.join(self.names())}"
+            ) from None
+
+    def transport(self, org: Org) -> SharedTransport:
+        """The org's connection pool, created on first use."""
+        transport = self._transports.get(org.name)
+        if transport is None:
+            transport = self._transports[org.name] = SharedTransport()
+        return transport
+
+    async def close(self) -> None:
+        """Close every org's connection pool."""
+        for transport in self._transports.values():
+            await transport.close_pool()
+
+
+org_registry = OrgRegistry.from_env()
+
+_default_org: Optional[Org] = None
+
+
+def _load_default_org() -> Org:
+    api_key = os.getenv("DD_API_KEY")
+    app_key = os.getenv("DD_APP_KEY")
+    if not api_key or not app_key:
+        logger.error("DD_API_KEY and DD_APP_KEY environment variables must be set")
+        raise ValueError("Datadog API credentials not configured")
+    # DD_API_URL overrides the site's URL, e.g. to target a local stand-in API
+    api_url = os.getenv("DD_API_URL") or site_api_url(os.getenv("DD_SITE", DEFAULT_SITE))
+    return Org(DEFAULT_ORG, api_url.rstrip("/"), api_key, app_key)
+
+
+def default_org() -> Org:
+    """The org of DD_API_KEY / DD_APP_KEY, read from the environment on first use.
+
+    Raises:
+        ValueError: If the credentials are not set
+    """
+    global _default_org
+    if _default_org is None:
+        _default_org = _load_default_org()
+    return _default_org
+
+
+def set_default_org(org: Optional[Org]) -> None:
+    """Replace the default org; with None it is read from the environment again on next use."""
+    global _default_org
+    _default_org = org
+
+
+@contextmanager
+def default_org_at(api_url: str) -> Iterator[Org]:
+    """Send the default org's requests to another API base URL inside the block, e.g. a local stand-in."""
+    previous = _default_org
+    set_default_org(default_org().at(api_url))
+    try:
+        yield default_org()
+    finally:
+        set_default_org(previous)
+
+
+# The org the current tool call is for; None for the default org
+_current_org: contextvars.ContextVar[Optional[Org]] = contextvars.ContextVar("datadog_org", default=None)
+
+
+def current_org() -> Optional[Org]:
+    """The org the current tool call asked for, or None for the default org."""
+    return _current_org.get()
+
+
+def active_org() -> Org:
+    """The org the Datadog requests of the current tool call go to."""
+    return _current_org.get() or default_org()
+
+
+def org_scoped(name: str) -> str:
+    """``name`` qualified by the current org, e.g. "eu:spans"; unchanged for the default org."""
+    org = _current_org.get()
+    return name if org is None else f"{org.name}:{name}"
+
+
+def org_context() -> contextvars.Context:
+    """An empty context whose Datadog requests still go to the current org.
+
+    For work shared by several tool calls, which must not inherit the
+    deadline or other per-call state of the one that happened to start it.
+    """
+    context = contextvars.Context()
+    context.run(_current_org.set, _current_org.get())
+    return context
+
+
+@contextmanager
+def use_org(name: Optional[str]) -> Iterator[Optional[Org]]:
+    """Send the Datadog requests made inside the block to the named org.
+
+    Raises:
+        UnknownOrgError: If no org of that name is configured
+    """
+    org = None if name in (None, "", DEFAULT_ORG) else org_registry.get(name)
+    token = _current_org.set(org)
+    try:
+        yield org
+    finally:
+        _current_org.reset(token)
@@ -0,0 +1,138 @@
+"""
+Fetching every page of a listing in one tool call
+
+Listing tools take ``all_pages=true`` to return a whole org's monitors,
+SLOs, teams or service definitions at once. Page-number endpoints that
+report their page count fetch the remaining pages concurrently once the
+first page is in; endpoints without a count are read a window of pages at
+a time until a short page marks the end. Either way requests go through
+the rate-limit-aware fan-out.
+
+DD_MCP_ALL_PAGES_MAX_ITEMS caps the items collected (default: 10000) and
+DD_MCP_OUTPUT_BUDGET the characters of merged output (default: 200000).
+Text output is cut at a line boundary; JSON output keeps as many whole
+items as fit, so it still parses.
+"""
+
+import math
+import os
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from .fanout import FANOUT_CONCURRENCY, fan_out
+
+ALL_PAGES_MAX_ITEMS = int(os.getenv("DD_MCP_ALL_PAGES_MAX_ITEMS", "10000"))
+OUTPUT_BUDGET = int(os.getenv("DD_MCP_OUTPUT_BUDGET", "200000"))
+
+
+def _raise_first_error(results: List[Any]) -> None:
+    for result in results:
+        if isinstance(result, Exception):
+            raise result
+
+
+async def collect_numbered_pages(
+    fetch_page: Callable[[int], Awaitable[Dict[str, Any]]],
+    max_items: Optional[int] = ALL_PAGES_MAX_ITEMS,
+) -> Tuple[List[Any], Dict[str, Any]]:
+    """Items of every page of a JSON:API listing with ``meta.pagination``.
+
+    Args:
+        fetch_page: Async function returning the response for a 0-indexed page number
+        max_items: Stop after this many items (None for no limit)
+
+    Returns:
+        The merged ``data`` items and the first page's response
+    """
+    first = await fetch_page(0)
+    items = list(first.get("data", []))
+    pagination = first.get("meta", {}).get("pagination", {})
+    total_pages = pagination.get("total_pages")
+    if total_pages is None and items and pagination.get("total_count") is not None:
+        total_pages = math.ceil(pagination["total_count"] / len(items))
+    if not items or not total_pages:
+        return items, first
+
+    if max_items is not None:
+        total_pages = min(total_pages, math.ceil(max_items / len(items)))
+    results = await fan_out(range(1, total_pages), fetch_page)
+    _raise_first_error(results)
+    for response in results:
+        items.extend(response.get("data", []))
+    return items[:max_items], first
+
+
+async def collect_pages_until_short(
+    fetch_page: Callable[[int], Awaitable[List[Any]]],
+    page_size: int,
+    max_items: Optional[int] = ALL_PAGES_MAX_ITEMS,
+    window: int = FANOUT_CONCURRENCY,
+) -> List[Any]:
+    """Items of every page of a listing that does not report its size.
+
+    The first page is fetched alone, so small listings cost one request;
+    after that ``window`` pages are requested at a time until one holds
+    fewer than ``page_size`` items.
+
+    Args:
+        fetch_page: Async function returning the items of a 0-indexed page
+        page_size: Items per full page
+        max_items: Stop after this many items (None for no limit)
+        window: Pages requested concurrently
+    """
+    items = list(await fetch_page(0))
+    if len(items) < page_size:
+        return items[:max_items]
+
+    page = 1
+    while max_items is None or len(items) < max_items:
+        results = await fan_out(range(page, page + window), fetch_page, concurrency=window)
+        _raise_first_error(results)
+        for batch in results:
+            items.extend(batch)
+            if len(batch) < page_size:
+                return items[:max_items]
+        page += window
+    return items[:max_items]
+
+
+def fit_output(text: str, budget: int = OUTPUT_BUDGET) -> str:
+    """Cut merged text output to the budget at a line boundary, saying so."""
+    if len(text) <= budget:
+        return text
+    cut = text.rfind("\n", 0, budget)
+    if cut <= 0:
+        cut = budget
+    return (
+        text[:cut]
+        + f"\n\n[Output truncated to {cut} of {len(text)} characters; narrow the filters to see the rest]"
+    )
+
+
+def fit_items(
+    items: List[Any], render: Callable[[List[Any]], str], budget: Optional[int] = None
+) -> Tuple[str, Optional[str]]:
+    """Render as many leading items as fit the budget, e.g. as JSON that must stay parseable.
+
+    Args:
+        items: Merged items, in output order
+        render: Returns the output for a list of items
+        budget: Most characters of output (default: DD_MCP_OUTPUT_BUDGET)
+
+    Returns:
+        The output, and a note saying how many items were left out (None if none were)
+    """
+    if budget is None:
+        budget = OUTPUT_BUDGET
+    text = render(items)
+    if len(text) <= budget:
+        return text, None
+    # Largest count known to fit, smallest known not to
+    fits, fits_text, too_many = 0, render([]), len(items)
+    while too_many - fits > 1:
+        count = (fits + too_many) // 2
+        text = render(items[:count])
+        if len(text) <= budget:
+            fits, fits_text = count, text
+        else:
+            too_many = count
+    return fits_text, f"[Output truncated to {fits} of {len(items)} items; narrow the filters to see the rest]"
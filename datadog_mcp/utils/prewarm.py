@@ -0,0 +1,180 @@
+"""
+Background prewarm of connections and catalogs after startup
+
+The first list_metrics, get_teams, list_service_definitions or list_monitors
+call of a session used to pay for opening connections and fetching the
+catalog. With DD_MCP_PREWARM set to a comma-separated list of catalogs
+(metrics, teams, service_definitions, monitors, or "all"; default: none),
+the server, once the MCP handshake completes, opens DD_MCP_PREWARM_CONNECTIONS
+pooled connections per org (default: 4) and then fetches those catalogs with
+the arguments the tools use by default. Catalogs are only prewarmed into
+the response cache (DD_MCP_CACHE_PATH): without it their pages would be
+fetched at every startup and then dropped, so only connections are opened.
+
+The prewarm runs at low priority: it sends one request at a time, and waits
+while any tool call is in progress before sending the next. A tool call
+that asks for a catalog the prewarm is fetching joins that request (see
+coalescing) instead of sending its own, and later ones are answered from
+the response cache it filled. Monitors are skipped while the monitor
+snapshot keeps them warm.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+
+from .datadog_client import (
+    METRICS_LIST_FIELDS,
+    fetch_metrics_list,
+    fetch_monitors,
+    fetch_service_definitions,
+    fetch_teams,
+    validate_api_key,
+)
+from .deadline import detach
+from .monitor_snapshot import MONITOR_SNAPSHOT_INTERVAL
+from .orgs import DEFAULT_ORG, current_org, org_registry, use_org
+from .response_cache import get_response_cache
+
+logger = logging.getLogger(__name__)
+
+# Each catalog's fetches, in order, with the arguments its tool uses by default
+CATALOGS: Dict[str, List[Callable[[], Awaitable[Any]]]] = {
+    "metrics": [
+        lambda: fetch_metrics_list(limit=50, fields=METRICS_LIST_FIELDS),
+        # What a metric name search scans, and the names behind suggestions
+        lambda: fetch_metrics_list(limit=1000, fields=METRICS_LIST_FIELDS),
+    ],
+    "teams": [lambda: fetch_teams(page_size=50, page_number=0)],
+    "service_definitions": [lambda: fetch_service_definitions(page_size=10, page_number=0)],
+    "monitors": [lambda: fetch_monitors(page_size=50, page=0)],
+}
+
+
+def _catalogs_from_env() -> List[str]:
+    names = [name.strip().lower() for name in os.getenv("DD_MCP_PREWARM", "").split(",") if name.strip()]
+    if "all" in names:
+        return list(CATALOGS)
+    unknown = [name for name in names if name not in CATALOGS]
+    if unknown:
+        logger.warning(f"Ignoring unknown DD_MCP_PREWARM catalogs: {', '.join(unknown)}")
+    return [name for name in CATALOGS if name in names]
+
+
+PREWARM_CATALOGS = _catalogs_from_env()
+PREWARM_CONNECTIONS = int(os.getenv("DD_MCP_PREWARM_CONNECTIONS", "4"))
+
+
+class Prewarmer:
+    """Warm connections and catalogs from a background task, yielding to tool calls."""
+
+    def __init__(self, catalogs: Optional[List[str]] = None, connections: int = PREWARM_CONNECTIONS):
+        self.catalogs = PREWARM_CATALOGS if catalogs is None else catalogs
+        self.connections = connections
+        self._task: Optional[asyncio.Task] = None
+        self._interactive = 0
+        # Set while no tool call is in progress; made on the loop the prewarm runs on
+        self._idle: Optional[asyncio.Event] = None
+        self._stats: Dict[str, Any] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.catalogs)
+
+    @contextmanager
+    def interactive(self) -> Iterator[None]:
+        """Mark a tool call in progress; the prewarm sends no new request until it ends."""
+        self._interactive += 1
+        if self._idle is not None:
+            self._idle.clear()
+        try:
+            yield
+        finally:
+            self._interactive -= 1
+            if not self._interactive and self._idle is not None:
+                self._idle.set()
+
+    async def _yield_to_tool_calls(self) -> None:
+        started = time.perf_counter()
+        while self._interactive:
+            await self._idle.wait()
+        self._stats["paused_s"] += time.perf_counter() - started
+
+    async def open_connections(self) -> None:
+        """Open pooled connections to the current org's API."""
+        await self._yield_to_tool_calls()
+        await asyncio.gather(*(validate_api_key() for _ in range(self.connections)))
+
+    async def load_catalog(self, catalog: str) -> None:
+        """Fetch one catalog, one request at a time."""
+        for fetch in CATALOGS[catalog]:
+            await self._yield_to_tool_calls()
+            await fetch()
+
+    def _steps(self) -> List[Tuple[str, Callable[[], Awaitable[None]]]]:
+        steps: List[Tuple[str, Callable[[], Awaitable[None]]]] = []
+        if self.connections > 0:
+            steps.append(("connections", self.open_connections))
+        if get_response_cache() is None:
+            return steps  # nothing would keep the fetched catalogs
+        for catalog in self.catalogs:
+            if catalog == "monitors" and current_org() is None and MONITOR_SNAPSHOT_INTERVAL > 0:
+                continue  # the monitor snapshot keeps the default org's monitors warm
+            steps.append((catalog, lambda catalog=catalog: self.load_catalog(catalog)))
+        return steps
+
+    async def run(self) -> Dict[str, Any]:
+        """Warm every org, then log what it took; failed steps are skipped."""
+        detach()  # started from a handler; must not inherit a tool call deadline
+        self._idle = asyncio.Event()
+        if not self._interactive:
+            self._idle.set()
+        self._stats = {"paused_s": 0.0, "failed": [], "steps": {}}
+        started = time.perf_counter()
+        if get_response_cache() is None:
+            logger.info("Prewarm opens connections only: catalogs need the response cache (DD_MCP_CACHE_PATH)")
+        for org in org_registry.names():
+            with use_org(org):
+                for step, warm in self._steps():
+                    step_started = time.perf_counter()
+                    name = step if org == DEFAULT_ORG else f"{org}:{step}"
+                    try:
+                        await warm()
+                    except asyncio.CancelledError:
+                        raise
+                    except Exception as e:
+                        logger.warning(f"Prewarm of {name} failed: {e}")
+                        self._stats["failed"].append(name)
+                        continue
+                    self._stats["steps"][name] = round(time.perf_counter() - step_started, 3)
+        self._stats["paused_s"] = round(self._stats["paused_s"], 3)
+        self._stats["total_s"] = round(time.perf_counter() - started, 3)
+        logger.info(f"Prewarm finished: {self._stats}")
+        return self._stats
+
+    def stats(self) -> Dict[str, Any]:
+        return dict(self._stats)
+
+    def start(self) -> None:
+        if self.enabled and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self.run(), name="prewarm")
+
+    async def wait(self) -> None:
+        """Wait for the prewarm started last to finish."""
+        if self._task is not None:
+            await asyncio.shield(self._task)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+prewarmer = Prewarmer()
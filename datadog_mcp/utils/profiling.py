@@ -0,0 +1,284 @@
+"""
+Opt-in profiling for slow tool calls
+
+When DD_MCP_PROFILE_THRESHOLD_MS is set, every tool call is measured and any
+call that takes longer than the threshold is captured to a rotating local
+directory: a cProfile dump (.prof) plus a JSON report with the per-phase
+breakdown (fetch, parse, extract, format) and tracemalloc allocation stats.
+A value that is not a number is ignored with a warning. tracemalloc only
+runs while profiled calls are in flight, unless it was already tracing.
+"""
+
+import asyncio
+import contextvars
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import re
+import tempfile
+import threading
+import time
+import tracemalloc
+from contextlib import asynccontextmanager, contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .circuit_breaker import circuit_breakers
+
+logger = logging.getLogger(__name__)
+
+
+def _threshold_from_env() -> Optional[float]:
+    value = os.getenv("DD_MCP_PROFILE_THRESHOLD_MS")
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        logger.warning(f"Ignoring DD_MCP_PROFILE_THRESHOLD_MS={value!r}, not a number; profiling is off")
+        return None
+
+
+# Profiling configuration loaded from environment
+PROFILE_THRESHOLD_MS = _threshold_from_env()
+PROFILE_DIR = os.getenv(
+    "DD_MCP_PROFILE_DIR",
+    os.path.join(tempfile.gettempdir(), "datadog-mcp-profiles"),
+)
+PROFILE_KEEP = int(os.getenv("DD_MCP_PROFILE_KEEP", "50"))
+
+# Only one cProfile profiler can be active per thread, so concurrent calls
+# share it on a first-come basis and the others record phase timings only.
+_profiler_lock = threading.Lock()
+_profiler_busy = False
+
+# Profiled calls in flight, and whether the first of them started tracemalloc
+_traced_calls = 0
+_started_tracing = False
+
+_current_call: contextvars.ContextVar[Optional["CallProfile"]] = contextvars.ContextVar(
+    "datadog_mcp_current_call", default=None
+)
+_current_phase: contextvars.ContextVar[Optional[List[Any]]] = contextvars.ContextVar(
+    "datadog_mcp_current_phase", default=None
+)
+
+
+def is_enabled() -> bool:
+    """Return True when slow-call profiling is configured."""
+    return PROFILE_THRESHOLD_MS is not None
+
+
+class CallProfile:
+    """Timing and allocation data collected for a single tool call."""
+
+    def __init__(self, tool_name: str, arguments: Optional[Dict[str, Any]] = None):
+        self.tool_name = tool_name
+        self.arguments = arguments or {}
+        self.started_at = datetime.now(timezone.utc)
+        self.phases: Dict[str, float] = {}
+        self.duration_ms = 0.0
+        self.profiler: Optional[cProfile.Profile] = None
+        self.memory_peak_bytes: Optional[int] = None
+        self.top_allocations: List[str] = []
+
+    def add_phase_time(self, name: str, seconds: float) -> None:
+        """Accumulate exclusive time spent in a phase."""
+        self.phases[name] = self.phases.get(name, 0.0) + seconds * 1000
+
+    def to_report(self) -> Dict[str, Any]:
+        """Build the JSON-serializable report for this call."""
+        accounted = sum(self.phases.values())
+        report = {
+            "tool": self.tool_name,
+            "arguments": self.arguments,
+            "started_at": self.started_at.isoformat(),
+            "duration_ms": round(self.duration_ms, 2),
+            "phases_ms": {name: round(ms, 2) for name, ms in self.phases.items()},
+            "unaccounted_ms": round(max(self.duration_ms - accounted, 0.0), 2),
+            "cprofile": self.profiler is not None,
+            "memory": {
+                "peak_bytes": self.memory_peak_bytes,
+                "top_allocations": self.top_allocations,
+            },
+            # Endpoint families failing fast when the call ended
+            "circuit_breakers": circuit_breakers.states(tripped_only=True),
+        }
+        if self.profiler is not None:
+            stream = io.StringIO()
+            stats = pstats.Stats(self.profiler, stream=stream)
+            stats.sort_stats("cumulative").print_stats(25)
+            report["top_functions"] = stream.getvalue().splitlines()
+        return report
+
+
+@contextmanager
+def phase(name: str):
+    """Attribute the time spent in the block to a named phase of the current call.
+
+    Phases are exclusive: time spent in a nested phase (e.g. "parse" inside
+    "fetch") is only counted once, against the innermost phase. Outside of a
+    profiled call this is a no-op.
+    """
+    call = _current_call.get()
+    if call is None:
+        yield
+        return
+
+    now = time.perf_counter()
+    parent = _current_phase.get()
+    if parent is not None:
+        call.add_phase_time(parent[0], now - parent[1])
+
+    frame = [name, now]
+    token = _current_phase.set(frame)
+    try:
+        yield
+    finally:
+        end = time.perf_counter()
+        call.add_phase_time(name, end - frame[1])
+        _current_phase.reset(token)
+        if parent is not None:
+            parent[1] = end
+
+
+def _acquire_profiler() -> Optional[cProfile.Profile]:
+    """Start a cProfile profiler unless another call already owns one."""
+    global _profiler_busy
+    with _profiler_lock:
+        if _profiler_busy:
+            return None
+        _profiler_busy = True
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Another profiling tool (e.g. a debugger) is already active
+        with _profiler_lock:
+            _profiler_busy = False
+        return None
+    return profiler
+
+
+def _release_profiler(profiler: cProfile.Profile) -> None:
+    """Stop a profiler obtained from _acquire_profiler."""
+    global _profiler_busy
+    profiler.disable()
+    with _profiler_lock:
+        _profiler_busy = False
+
+
+def _start_tracing() -> None:
+    """Trace allocations for a profiled call, starting tracemalloc if it is off."""
+    global _traced_calls, _started_tracing
+    with _profiler_lock:
+        if not _traced_calls and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _started_tracing = True
+        _traced_calls += 1
+        tracemalloc.reset_peak()
+
+
+def _stop_tracing() -> None:
+    """End a call's tracing; tracemalloc stops with the last call if it was started for them."""
+    global _traced_calls, _started_tracing
+    with _profiler_lock:
+        _traced_calls -= 1
+        if not _traced_calls and _started_tracing:
+            tracemalloc.stop()
+            _started_tracing = False
+
+
+def _capture_name(call: CallProfile) -> str:
+    """Build a filesystem-safe base name for a capture."""
+    stamp = call.started_at.strftime("%Y%m%dT%H%M%S%f")
+    tool = re.sub(r"[^A-Za-z0-9_-]", "_", call.tool_name)
+    return f"{stamp}-{tool}-{int(call.duration_ms)}ms"
+
+
+def _rotate(directory: Path, keep: int) -> None:
+    """Delete the oldest captures so that at most `keep` remain."""
+    reports = sorted(directory.glob("*.json"), key=lambda p: p.stat().st_mtime)
+    for report in reports[:max(len(reports) - keep, 0)]:
+        for path in (report, report.with_suffix(".prof")):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def write_capture(call: CallProfile, directory: Optional[str] = None, keep: Optional[int] = None) -> Path:
+    """Write a call's report (and cProfile dump) and rotate old captures.
+
+    Returns:
+        Path to the written JSON report
+    """
+    target = Path(directory or PROFILE_DIR)
+    target.mkdir(parents=True, exist_ok=True)
+
+    base = _capture_name(call)
+    report_path = target / f"{base}.json"
+    if call.profiler is not None:
+        call.profiler.dump_stats(str(target / f"{base}.prof"))
+    report_path.write_text(json.dumps(call.to_report(), indent=2, default=str))
+
+    _rotate(target, PROFILE_KEEP if keep is None else keep)
+    return report_path
+
+
+def _write_snapshot_capture(call: CallProfile, snapshot: tracemalloc.Snapshot) -> Path:
+    """Add the snapshot's top allocations to the call's report and write its capture."""
+    call.top_allocations = [str(stat) for stat in snapshot.statistics("lineno")[:10]]
+    return write_capture(call)
+
+
+@asynccontextmanager
+async def profile_tool_call(tool_name: str, arguments: Optional[Dict[str, Any]] = None):
+    """Profile a tool call and capture it if it exceeds the configured threshold.
+
+    Does nothing unless DD_MCP_PROFILE_THRESHOLD_MS is set. Note that cProfile
+    and tracemalloc are process-wide, so a capture may include work from other
+    tool calls that were running concurrently.
+    """
+    if not is_enabled():
+        yield None
+        return
+
+    threshold_ms = PROFILE_THRESHOLD_MS
+    call = CallProfile(tool_name, arguments)
+    call_token = _current_call.set(call)
+    phase_token = _current_phase.set(None)
+
+    _start_tracing()
+
+    call.profiler = _acquire_profiler()
+    start = time.perf_counter()
+    try:
+        yield call
+    finally:
+        call.duration_ms = (time.perf_counter() - start) * 1000
+        if call.profiler is not None:
+            _release_profiler(call.profiler)
+        _current_phase.reset(phase_token)
+        _current_call.reset(call_token)
+
+        snapshot = None
+        if call.duration_ms >= threshold_ms and tracemalloc.is_tracing():
+            _, call.memory_peak_bytes = tracemalloc.get_traced_memory()
+            snapshot = tracemalloc.take_snapshot()
+        _stop_tracing()
+
+        if snapshot is not None:
+            try:
+                # Building the report and writing files would block the event loop
+                report_path = await asyncio.to_thread(_write_snapshot_capture, call, snapshot)
+                logger.warning(
+                    f"Slow tool call {tool_name} took {call.duration_ms:.0f}ms, "
+                    f"profile written to {report_path}"
+                )
+            except Exception as e:
+                logger.error(f"Error writing profile for {tool_name}: {e}")
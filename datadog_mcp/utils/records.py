@@ -0,0 +1,213 @@
+"""
+Compact record types for extracted spans and logs
+"""
+
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+class Record(Mapping):
+    """Slotted row that reads like the dict it replaces.
+
+    Subclasses list their keys in ``_fields``. Records support ``get``,
+    ``[]``, ``in``, iteration and ``items()`` so formatters can take either
+    records or plain dicts; ``to_dict()`` builds a dict for JSON output.
+    """
+
+    __slots__ = ()
+    _fields: Tuple[str, ...] = ()
+    _field_set: frozenset = frozenset()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._field_set = frozenset(cls._fields)
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._field_set:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in self._field_set:
+            return getattr(self, key)
+        return default
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._field_set
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._fields)
+
+    def __len__(self) -> int:
+        return len(self._fields)
+
+    def items(self) -> List[Tuple[str, Any]]:
+        return [(field, getattr(self, field)) for field in self._fields]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dict copy of the record, e.g. for ``json.dumps``."""
+        return dict(self.items())
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+class SpanRecord(Record):
+    """One span extracted from the spans search API.
+
+    ``custom_attributes`` (the ``@``-prefixed attributes) is computed from
+    the event's attributes when read rather than copied for every span.
+    """
+
+    __slots__ = (
+        "trace_id", "span_id", "parent_id", "service", "resource_name", "operation_name",
+        "duration_ns", "duration_ms", "start_timestamp", "status", "error", "env", "tags",
+        "_attributes",
+    )
+    _fields = (
+        "trace_id", "span_id", "parent_id", "service", "resource_name", "operation_name",
+        "duration_ns", "duration_ms", "start_timestamp", "status", "error", "env", "tags",
+        "custom_attributes",
+    )
+
+    def __init__(
+        self,
+        trace_id: str,
+        span_id: str,
+        parent_id: Optional[str],
+        service: str,
+        resource_name: str,
+        operation_name: str,
+        duration_ns: int,
+        start_timestamp: Any,
+        status: str,
+        error: Any,
+        env: str,
+        tags: List[str],
+        attributes: Optional[Dict[str, Any]] = None,
+    ):
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.service = service
+        self.resource_name = resource_name
+        self.operation_name = operation_name
+        self.duration_ns = duration_ns
+        self.duration_ms = round(duration_ns / 1_000_000, 2)
+        self.start_timestamp = start_timestamp
+        self.status = status
+        self.error = error
+        self.env = env
+        self.tags = tags
+        self._attributes = attributes
+
+    @property
+    def custom_attributes(self) -> Dict[str, Any]:
+        attrs = self._attributes
+        if not attrs:
+            return {}
+        return {key: value for key, value in attrs.items() if key[:1] == "@"}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "service": self.service,
+            "resource_name": self.resource_name,
+            "operation_name": self.operation_name,
+            "duration_ns": self.duration_ns,
+            "duration_ms": self.duration_ms,
+            "start_timestamp": self.start_timestamp,
+            "status": self.status,
+            "error": self.error,
+            "env": self.env,
+            "tags": self.tags,
+            "custom_attributes": self.custom_attributes,
+        }
+
+
+class LogRecord(Record):
+    """One log extracted from the logs search API.
+
+    The core fields are slots; tags and plan fields, which vary per log, are
+    kept in an extra dict that is only retained when a log has any.
+    """
+
+    __slots__ = ("timestamp", "level", "service", "host", "message", "_extra")
+    _fields = ("timestamp", "level", "service", "host", "message")
+
+    def __init__(
+        self,
+        timestamp: str,
+        level: str,
+        service: str,
+        host: str,
+        message: str,
+        extra: Optional[Dict[str, Any]] = None,
+    ):
+        self.timestamp = timestamp
+        self.level = level
+        self.service = service
+        self.host = host
+        self.message = message
+        self._extra: Optional[Dict[str, Any]] = None
+        if extra:
+            if not extra.keys().isdisjoint(self._field_set):
+                self._promote_core_fields(extra)
+            self._extra = extra or None
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._field_set:
+            return getattr(self, key)
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in self._field_set:
+            return getattr(self, key)
+        if self._extra is None:
+            return default
+        return self._extra.get(key, default)
+
+    def _promote_core_fields(self, extra: Dict[str, Any]) -> None:
+        """Move extra entries for core fields (e.g. a level attribute) onto the slots."""
+        for field in self._fields:
+            if field in extra:
+                setattr(self, field, extra.pop(field))
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._field_set or (self._extra is not None and key in self._extra)
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self._fields
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self) -> int:
+        return len(self._fields) + (len(self._extra) if self._extra else 0)
+
+    def items(self) -> List[Tuple[str, Any]]:
+        items = [
+            ("timestamp", self.timestamp),
+            ("level", self.level),
+            ("service", self.service),
+            ("host", self.host),
+            ("message", self.message),
+        ]
+        if self._extra:
+            items.extend(self._extra.items())
+        return items
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {
+            "timestamp": self.timestamp,
+            "level": self.level,
+            "service": self.service,
+            "host": self.host,
+            "message": self.message,
+        }
+        if self._extra:
+            data.update(self._extra)
+        return data
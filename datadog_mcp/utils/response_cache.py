@@ -0,0 +1,367 @@
+"""
+Persistent cache for slow-changing Datadog catalogs
+
+The server is started once per agent session, so an in-memory cache would
+start cold every time. Responses of catalog fetches (metric names and tags,
+service definitions, teams, monitors) are kept in a local SQLite file with
+a TTL per function, a size cap with least-recently-used eviction, and a
+version per entry so entries written by another release are ignored.
+
+Expired entries are still useful while Datadog is slow or failing. For
+DD_MCP_CACHE_SWR_SECONDS past expiry (default: 300) they are served at once
+while a background request refreshes them (stale-while-revalidate). For
+DD_MCP_CACHE_STALE_IF_ERROR_SECONDS (default: 3600) they are served when the
+request fails with a 5xx, 429 or connection error, or takes longer than
+DD_MCP_CACHE_STALE_TIMEOUT seconds (default: 5). Tool output then says how
+old the data is.
+
+Set DD_MCP_CACHE_PATH to a file to enable the cache (":memory:" keeps it
+for the process only); DD_MCP_CACHE_MAX_MB caps its size (default: 64).
+"""
+
+import asyncio
+import functools
+import inspect
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from importlib import metadata
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
+
+import httpx
+
+from .coalescing import _freeze
+from .deadline import detach
+from .json_codec import dumps
+
+logger = logging.getLogger(__name__)
+
+CACHE_PATH = os.getenv("DD_MCP_CACHE_PATH", "")
+CACHE_MAX_BYTES = int(float(os.getenv("DD_MCP_CACHE_MAX_MB", "64")) * 1024 * 1024)
+CACHE_SWR_SECONDS = float(os.getenv("DD_MCP_CACHE_SWR_SECONDS", "300"))
+CACHE_STALE_IF_ERROR_SECONDS = float(os.getenv("DD_MCP_CACHE_STALE_IF_ERROR_SECONDS", "3600"))
+CACHE_STALE_TIMEOUT = float(os.getenv("DD_MCP_CACHE_STALE_TIMEOUT", "5"))
+
+# Bump when the stored form of cached values changes
+CACHE_FORMAT = 1
+
+F = TypeVar("F", bound=Callable[..., Awaitable[Any]])
+
+
+def _package_version() -> str:
+    try:
+        return metadata.version("datadog-mcp")
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+@dataclass
+class CacheEntry:
+    """A cached value and when it was stored (wall-clock seconds)."""
+
+    value: Any
+    stored_at: float
+    expires_at: float
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.stored_at
+
+    @property
+    def fresh(self) -> bool:
+        return time.time() < self.expires_at
+
+    @property
+    def expired_for(self) -> float:
+        """Seconds since the entry expired (negative while fresh)."""
+        return time.time() - self.expires_at
+
+
+class ResponseCache:
+    """Key/value store of JSON responses in SQLite, safe to use from several threads."""
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int = CACHE_MAX_BYTES,
+        version: str = "",
+        retention: float = max(CACHE_SWR_SECONDS, CACHE_STALE_IF_ERROR_SECONDS),
+    ):
+        """Open or create the cache file.
+
+        Args:
+            path: SQLite database file, or ":memory:"
+            max_bytes: Size cap of the cached values
+            version: Entries written under another version are dropped
+            retention: Seconds past expiry an entry is kept for serving stale data
+        """
+        self.max_bytes = max_bytes
+        self.version = version or f"{CACHE_FORMAT}/{_package_version()}"
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.executescript(
+            """
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                version TEXT NOT NULL,
+                stored_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                size INTEGER NOT NULL,
+                value TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at);
+            """
+        )
+        with self._lock:
+            self._db.execute(
+                "DELETE FROM entries WHERE version != ? OR expires_at < ?",
+                (self.version, time.time() - retention),
+            )
+            self._size = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    @property
+    def size(self) -> int:
+        """Bytes of cached values."""
+        return self._size
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """The entry stored under ``key`` by this version, fresh or not."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value, stored_at, expires_at FROM entries WHERE key = ? AND version = ?",
+                (key, self.version),
+            ).fetchone()
+            if row is not None:
+                self._db.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        if row is None:
+            return None
+        return CacheEntry(json.loads(row[0]), row[1], row[2])
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        """Store ``value`` for ``ttl`` seconds, evicting the least recently used entries beyond the size cap."""
+        text = dumps(value, pretty=False)
+        size = len(text)
+        if size > self.max_bytes // 4:
+            logger.debug(f"Not caching {key}: {size} bytes")
+            return
+        now = time.time()
+        with self._lock:
+            old = self._db.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, self.version, now, now + ttl, now, size, text),
+            )
+            self._size += size - (old[0] if old else 0)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        rows = self._db.execute("SELECT key, size FROM entries ORDER BY accessed_at").fetchall()
+        evicted = []
+        for key, size in rows:
+            if self._size <= self.max_bytes * 0.9:
+                break
+            evicted.append((key,))
+            self._size -= size
+        self._db.executemany("DELETE FROM entries WHERE key = ?", evicted)
+        logger.debug(f"Evicted {len(evicted)} cache entries")
+
+    def values_of(self, name: str, scope: str) -> Iterator[Any]:
+        """Every stored value of the cached function ``name`` within ``scope``, fresh or not.
+
+        Keys start with "<name>/<version>|<scope>|", so only the function's
+        rows are read, by a range scan of the key index.
+        """
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT value FROM entries WHERE key >= ? AND key < ? AND instr(key, ?) > 0 AND version = ?",
+                (f"{name}/", f"{name}0", f"|{scope}|", self.version),
+            ).fetchall()
+        for (value,) in rows:
+            yield json.loads(value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM entries")
+            self._size = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+_cache: Optional[ResponseCache] = None
+_cache_failed = False
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """The process-wide cache, opened on first use; None when disabled."""
+    global _cache, _cache_failed
+    if _cache is None and CACHE_PATH and not _cache_failed:
+        try:
+            _cache = ResponseCache(CACHE_PATH)
+            logger.info(f"Response cache at {CACHE_PATH}: {len(_cache)} entries")
+        except (sqlite3.Error, OSError) as e:
+            _cache_failed = True
+            logger.warning(f"Response cache disabled, cannot open {CACHE_PATH}: {e}")
+    return _cache
+
+
+_stale_notes: ContextVar[Optional[List[str]]] = ContextVar("stale_notes", default=None)
+
+
+@contextmanager
+def collect_stale_notes() -> Iterator[List[str]]:
+    """Collect a note for every stale response served within the block, e.g. one tool call."""
+    notes: List[str] = []
+    token = _stale_notes.set(notes)
+    try:
+        yield notes
+    finally:
+        _stale_notes.reset(token)
+
+
+def _format_age(seconds: float) -> str:
+    seconds = max(int(seconds), 0)
+    if seconds < 60:
+        return f"{seconds}s"
+    if seconds < 3600:
+        return f"{seconds // 60}m {seconds % 60}s"
+    return f"{seconds // 3600}h {seconds % 3600 // 60}m"
+
+
+def _note_stale(name: str, entry: CacheEntry, reason: str) -> None:
+    note = f"{name} data is {_format_age(entry.age)} old ({reason})"
+    logger.info(f"Serving stale response: {note}")
+    notes = _stale_notes.get()
+    if notes is not None and note not in notes:
+        notes.append(note)
+
+
+def _is_upstream_failure(error: BaseException) -> bool:
+    """Whether a failed request is Datadog's trouble rather than a bad request."""
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+        return status >= 500 or status == 429
+    return isinstance(error, httpx.TransportError)
+
+
+def _store(cache: ResponseCache, key: str, name: str, value: Any, ttl: float) -> None:
+    try:
+        cache.set(key, value, ttl)
+    except (sqlite3.Error, TypeError, ValueError) as e:
+        logger.warning(f"Could not cache {name} response: {e}")
+
+
+# Refreshes in flight, by (event loop, cache key)
+_refreshing: Dict[Tuple[int, str], asyncio.Future] = {}
+
+
+def _refresh(
+    cache: ResponseCache, key: str, name: str, call: Callable[[], Awaitable[Any]], ttl: float
+) -> asyncio.Future:
+    """Fetch and store a fresh value in a task of its own; one per key at a time."""
+    refresh_key = (id(asyncio.get_running_loop()), key)
+    task = _refreshing.get(refresh_key)
+    if task is None:
+        async def run() -> Any:
+            # The refresh outlives the tool call that started it
+            detach()
+            value = await call()
+            await asyncio.to_thread(_store, cache, key, name, value, ttl)
+            return value
+
+        task = asyncio.ensure_future(run())
+        _refreshing[refresh_key] = task
+        task.add_done_callback(functools.partial(_refreshed, refresh_key, name))
+    return task
+
+
+def _refreshed(refresh_key: Tuple[int, str], name: str, task: asyncio.Future) -> None:
+    if _refreshing.get(refresh_key) is task:
+        del _refreshing[refresh_key]
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning(f"Refreshing cached {name} response failed: {task.exception()}")
+
+
+def cached(
+    ttl: float, scope: Callable[[], str] = lambda: "", version: int = 1, revalidate_in_background: bool = True
+) -> Callable[[F], F]:
+    """Serve an async fetch function from the response cache for ``ttl`` seconds.
+
+    Args:
+        ttl: Seconds a response is served without asking Datadog again
+        scope: Returns what besides the arguments distinguishes responses,
+            e.g. the API URL and credentials in use
+        version: Bump when the function's return value changes shape
+        revalidate_in_background: Serve recently expired responses while
+            refreshing them; off for data that must be current, e.g. alert
+            states, which are then only served stale when Datadog fails
+    """
+
+    def decorate(func: F) -> F:
+        signature = inspect.signature(func)
+        name = func.__name__
+
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            cache = get_response_cache()
+            if cache is None:
+                return await func(*args, **kwargs)
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = f"{name}/{version}|{scope()}|{_freeze(tuple(bound.arguments.items()))!r}"
+
+            # SQLite reads and writes (and evictions) run off the event loop
+            entry = await asyncio.to_thread(cache.get, key)
+            if entry is not None and entry.fresh:
+                cache.hits += 1
+                return entry.value
+
+            call = functools.partial(func, *args, **kwargs)
+            if revalidate_in_background and entry is not None and entry.expired_for <= CACHE_SWR_SECONDS:
+                # Stale-while-revalidate
+                cache.stale_hits += 1
+                _refresh(cache, key, name, call, ttl)
+                _note_stale(name, entry, "refreshing in the background")
+                return entry.value
+
+            cache.misses += 1
+            if entry is None or entry.expired_for > CACHE_STALE_IF_ERROR_SECONDS:
+                value = await call()
+                await asyncio.to_thread(_store, cache, key, name, value, ttl)
+                return value
+
+            # Stale-if-error: the fetch carries on in the background if it is only slow
+            try:
+                return await asyncio.wait_for(
+                    asyncio.shield(_refresh(cache, key, name, call, ttl)), CACHE_STALE_TIMEOUT
+                )
+            except asyncio.TimeoutError:
+                _note_stale(name, entry, f"Datadog did not respond within {CACHE_STALE_TIMEOUT:g}s")
+            except Exception as e:
+                if not _is_upstream_failure(e):
+                    raise
+                _note_stale(name, entry, f"Datadog request failed: {e}")
+            cache.stale_hits += 1
+            return entry.value
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
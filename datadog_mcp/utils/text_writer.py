@@ -0,0 +1,49 @@
+"""
+Text output builder
+"""
+
+import io
+from typing import Iterable
+
+
+class TextWriter:
+    """Accumulate tool output in a single buffer.
+
+    Building output with ``content += ...`` copies the text built so far
+    whenever the string cannot be resized in place. A shared buffer keeps
+    rendering linear in the number of rows.
+    """
+
+    def __init__(self) -> None:
+        self._buffer = io.StringIO()
+        self._write = self._buffer.write
+
+    def write(self, *parts: str) -> "TextWriter":
+        """Append text as-is."""
+        write = self._write
+        for part in parts:
+            write(part)
+        return self
+
+    def line(self, text: str = "") -> "TextWriter":
+        """Append text followed by a newline."""
+        self._write(text)
+        self._write("\n")
+        return self
+
+    def lines(self, lines: Iterable[str]) -> "TextWriter":
+        """Append each line followed by a newline."""
+        write = self._write
+        for text in lines:
+            write(text)
+            write("\n")
+        return self
+
+    def heading(self, title: str, underline: str = "=") -> "TextWriter":
+        """Append a title underlined to the length of its last line, plus a blank line."""
+        last_line = title.rsplit("\n", 1)[-1]
+        return self.write(title, "\n", underline * len(last_line), "\n\n")
+
+    def getvalue(self) -> str:
+        """Return the text written so far."""
+        return self._buffer.getvalue()
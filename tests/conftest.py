@@ -99,4 +99,35 @@ def sample_teams_data():
                 "teams": ["team-123"]
             }
         ]
-    }
\ No newline at end of file
+    }
+
+@pytest.fixture(scope="module")
+def fake_datadog_server():
+    """Run the offline Datadog API stand-in for the duration of a test module"""
+    from tests.fake_datadog import FakeDatadogConfig, FakeDatadogServer
+
+    config = FakeDatadogConfig(
+        logs=300, traces=10, spans_per_trace=30, metrics=500,
+        monitors=120, slos=30, teams=25, service_definitions=45, pipeline_events=300,
+    )
+    with FakeDatadogServer(config) as server:
+        yield server
+
+
+@pytest.fixture
+def fake_datadog(fake_datadog_server):
+    """Point the Datadog client at the offline API stand-in"""
+    from datadog_mcp.utils.orgs import default_org_at
+
+    with default_org_at(fake_datadog_server.url):
+        yield fake_datadog_server
+
+
+@pytest.fixture(autouse=True)
+def closed_circuit_breakers():
+    """Start every test with closed circuit breakers, whatever earlier tests broke"""
+    from datadog_mcp.utils.circuit_breaker import circuit_breakers
+
+    circuit_breakers.reset()
+    yield
+    circuit_breakers.reset()
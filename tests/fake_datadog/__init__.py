@@ -0,0 +1,108 @@
+"""
+Offline stand-in for the Datadog API
+
+Usage in-process (a real socket server on a background thread, so connection
+pooling and concurrency behave like the real thing):
+
+    with FakeDatadogServer(FakeDatadogConfig(latency=0.05)) as fake, default_org_at(fake.url):
+        ...
+
+or as a subprocess, e.g. for load tests:
+
+    python -m tests.fake_datadog --port 8126 --latency 0.05 --rate-limit 100
+"""
+
+import json
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from dataclasses import asdict
+from typing import Any, Dict, Optional
+
+from .app import FakeDatadogConfig, create_app, endpoint_family
+
+__all__ = ["FakeDatadogConfig", "FakeDatadogServer", "create_app", "endpoint_family"]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class FakeDatadogServer:
+    """Run the fake Datadog API on localhost, in a thread or a subprocess."""
+
+    def __init__(
+        self,
+        config: Optional[FakeDatadogConfig] = None,
+        port: Optional[int] = None,
+        subprocess_mode: bool = False,
+    ):
+        self.config = config or FakeDatadogConfig()
+        self.port = port or _free_port()
+        self.subprocess_mode = subprocess_mode
+        self.app = None
+        self._server = None
+        self._thread: Optional[threading.Thread] = None
+        self._process: Optional[subprocess.Popen] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def start(self) -> "FakeDatadogServer":
+        if self.subprocess_mode:
+            self._process = subprocess.Popen(
+                [sys.executable, "-m", "tests.fake_datadog", "--port", str(self.port),
+                 "--config", json.dumps(asdict(self.config))],
+            )
+        else:
+            import uvicorn
+
+            self.app = create_app(self.config)
+            uv_config = uvicorn.Config(
+                self.app, host="127.0.0.1", port=self.port, log_level="warning",
+                lifespan="off", backlog=4096,
+            )
+            self._server = uvicorn.Server(uv_config)
+            self._thread = threading.Thread(target=self._server.run, daemon=True)
+            self._thread.start()
+        self._wait_ready()
+        return self
+
+    def _wait_ready(self, timeout: float = 30.0) -> None:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self._process is not None and self._process.poll() is not None:
+                raise RuntimeError("Fake Datadog API subprocess exited during startup")
+            try:
+                with urllib.request.urlopen(f"{self.url}/_fake/stats", timeout=1):
+                    return
+            except OSError:
+                time.sleep(0.05)
+        raise RuntimeError("Fake Datadog API did not start in time")
+
+    def stats(self) -> Dict[str, Any]:
+        """Request statistics (per endpoint family) collected by the server."""
+        with urllib.request.urlopen(f"{self.url}/_fake/stats", timeout=5) as response:
+            return json.loads(response.read())
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.should_exit = True
+            self._thread.join(timeout=10)
+            self._server = None
+        if self._process is not None:
+            self._process.terminate()
+            self._process.wait(timeout=10)
+            self._process = None
+
+    def __enter__(self) -> "FakeDatadogServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
@@ -0,0 +1,42 @@
+"""
+Run the fake Datadog API as a standalone server
+
+    python -m tests.fake_datadog --port 8126 --latency 0.05 --logs 5000
+"""
+
+import argparse
+import json
+from dataclasses import fields
+
+import uvicorn
+
+from .app import FakeDatadogConfig, create_app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline stand-in for the Datadog API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8126)
+    parser.add_argument("--config", help="Full FakeDatadogConfig as JSON (overrides other options)")
+    for config_field in fields(FakeDatadogConfig):
+        if config_field.type in ("int", "float", int, float):
+            cast = float if config_field.type in ("float", float) else int
+            parser.add_argument(f"--{config_field.name.replace('_', '-')}", type=cast, default=None)
+    args = parser.parse_args()
+
+    if args.config:
+        config = FakeDatadogConfig(**json.loads(args.config))
+    else:
+        overrides = {
+            f.name: getattr(args, f.name)
+            for f in fields(FakeDatadogConfig)
+            if getattr(args, f.name, None) is not None
+        }
+        config = FakeDatadogConfig(**overrides)
+
+    print(f"Fake Datadog API listening on http://{args.host}:{args.port}", flush=True)
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning", backlog=4096)
+
+
+if __name__ == "__main__":
+    main()
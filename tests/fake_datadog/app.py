@@ -0,0 +1,498 @@
+"""
+Fake Datadog API application
+
+A Starlette app serving the subset of the Datadog API used by datadog_client,
+backed by the synthetic generators. Latency, rate limiting, error injection
+and dataset sizes are all configurable through FakeDatadogConfig.
+"""
+
+import asyncio
+import base64
+import hashlib
+import random
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+from . import generators
+
+
+@dataclass
+class FakeDatadogConfig:
+    """Behaviour and dataset sizes of the fake Datadog API."""
+
+    seed: int = 0
+    # Latency added to every request, in seconds, plus uniform random jitter
+    latency: float = 0.0
+    latency_jitter: float = 0.0
+    # Added to the first request on each new connection, like a TLS handshake
+    connect_latency: float = 0.0
+    # Per endpoint family latency overrides (see ENDPOINT_FAMILIES)
+    family_latency: Dict[str, float] = field(default_factory=dict)
+    # Requests allowed per rate_limit_period seconds per endpoint family (0 = unlimited)
+    rate_limit: int = 0
+    rate_limit_period: float = 10.0
+    # Fraction of requests answered with a 500
+    error_rate: float = 0.0
+    # Fraction of requests delayed by a further slow_latency seconds (tail latency)
+    slow_rate: float = 0.0
+    slow_latency: float = 0.0
+    # Dataset sizes
+    logs: int = 1000
+    log_extra_attributes: int = 10
+    traces: int = 50
+    spans_per_trace: int = 40
+    span_extra_attributes: int = 10
+    metrics: int = 2000
+    metric_points: int = 60
+    metric_tag_fields: int = 8
+    metric_tag_values: int = 25
+    monitors: int = 500
+    slos: int = 100
+    teams: int = 40
+    members_per_team: int = 8
+    service_definitions: int = 200
+    pipeline_events: int = 2000
+    require_auth: bool = True
+    # Send ETags with monitor and service definition responses and honour If-None-Match
+    etags: bool = False
+
+
+ENDPOINT_FAMILIES = [
+    ("/api/v2/logs", "logs"),
+    ("/api/v2/spans", "spans"),
+    ("/api/v1/query", "metrics_query"),
+    ("/api/v2/metrics", "metrics_catalog"),
+    ("/api/v1/monitor", "monitors"),
+    ("/api/v1/slo", "slos"),
+    ("/api/v2/team", "teams"),
+    ("/api/v2/services/definitions", "service_definitions"),
+    ("/api/v2/ci", "ci"),
+]
+
+
+def endpoint_family(path: str) -> str:
+    """Map a request path to its endpoint family."""
+    for prefix, family in ENDPOINT_FAMILIES:
+        if path.startswith(prefix):
+            return family
+    return "other"
+
+
+def _encode_cursor(offset: int) -> str:
+    return base64.urlsafe_b64encode(f"offset:{offset}".encode()).decode()
+
+
+def _decode_cursor(cursor: Optional[str]) -> int:
+    if not cursor:
+        return 0
+    try:
+        return int(base64.urlsafe_b64decode(cursor.encode()).decode().split(":", 1)[1])
+    except (ValueError, IndexError):
+        return 0
+
+
+def _error(status: int, message: str, headers: Optional[Dict[str, str]] = None) -> JSONResponse:
+    return JSONResponse({"errors": [message]}, status_code=status, headers=headers)
+
+
+def _query_terms(query: Optional[str]) -> List[Tuple[str, str]]:
+    """Parse a search query into (key, value) terms; free text uses key ''."""
+    terms = []
+    for raw in (query or "*").split(" AND "):
+        raw = raw.strip()
+        if not raw or raw == "*":
+            continue
+        if ":" in raw:
+            key, value = raw.split(":", 1)
+            terms.append((key.lstrip("@"), value.strip('"')))
+        else:
+            terms.append(("", raw))
+    return terms
+
+
+def _event_matches(attributes: Dict[str, Any], terms: List[Tuple[str, str]]) -> bool:
+    """Evaluate parsed query terms against an event's attributes and tags."""
+    tags = attributes.get("tags", [])
+    nested = attributes.get("attributes", {})
+    for key, value in terms:
+        if not key:
+            if value.lower() not in str(attributes.get("message", "")).lower():
+                return False
+            continue
+        candidate = attributes.get(key, nested.get(key) if isinstance(nested, dict) else None)
+        if candidate is not None:
+            if str(candidate) != value and value != "*":
+                return False
+        elif f"{key}:{value}" not in tags:
+            return False
+    return True
+
+
+class FakeDatadogState:
+    """Datasets, rate-limit windows and request statistics for one app instance."""
+
+    def __init__(self, config: FakeDatadogConfig):
+        self.config = config
+        self.rng = random.Random(config.seed)
+        seed = config.seed
+        self.logs = generators.generate_logs(config.logs, seed, config.log_extra_attributes)
+        self.spans = generators.generate_spans(
+            config.traces, config.spans_per_trace, seed, config.span_extra_attributes
+        )
+        self.spans_by_trace: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for span in self.spans:
+            self.spans_by_trace[span["attributes"]["trace_id"]].append(span)
+        self.metrics = generators.generate_metric_names(config.metrics, seed)
+        self.metric_names = {m["id"] for m in self.metrics}
+        self.monitors = generators.generate_monitors(config.monitors, seed)
+        self.slos = generators.generate_slos(config.slos, seed)
+        self.slos_by_id = {slo["id"]: slo for slo in self.slos}
+        self.teams = generators.generate_teams(config.teams, seed)
+        self.team_ids = {team["id"] for team in self.teams}
+        self.service_definitions = generators.generate_service_definitions(config.service_definitions, seed)
+        self.service_definitions_by_name = {
+            d["attributes"]["service"]["name"]: d for d in self.service_definitions
+        }
+        self.pipeline_events = generators.generate_pipeline_events(config.pipeline_events, seed=seed)
+
+        self.requests: Counter = Counter()
+        self.throttled: Counter = Counter()
+        self.errors: Counter = Counter()
+        self.not_modified: Counter = Counter()
+        self.connections: Set[Tuple[str, int]] = set()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._windows: Dict[str, Tuple[float, int]] = {}
+
+    def check_rate_limit(self, family: str) -> Optional[JSONResponse]:
+        """Apply a fixed-window rate limit per endpoint family, like Datadog."""
+        limit = self.config.rate_limit
+        if not limit:
+            return None
+        period = self.config.rate_limit_period
+        now = time.monotonic()
+        window_start, count = self._windows.get(family, (now, 0))
+        if now - window_start >= period:
+            window_start, count = now, 0
+        count += 1
+        self._windows[family] = (window_start, count)
+        reset = max(int(window_start + period - now), 1)
+        headers = {
+            "X-RateLimit-Limit": str(limit),
+            "X-RateLimit-Period": str(int(period)),
+            "X-RateLimit-Remaining": str(max(limit - count, 0)),
+            "X-RateLimit-Reset": str(reset),
+            "X-RateLimit-Name": family,
+        }
+        if count > limit:
+            self.throttled[family] += 1
+            return _error(429, "Too many requests", {**headers, "Retry-After": str(reset)})
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        """Return request statistics collected so far."""
+        return {
+            "requests": dict(self.requests),
+            "throttled": dict(self.throttled),
+            "errors": dict(self.errors),
+            "not_modified": dict(self.not_modified),
+            "connections": len(self.connections),
+            "max_in_flight": self.max_in_flight,
+        }
+
+
+def create_app(config: Optional[FakeDatadogConfig] = None) -> Starlette:
+    """Create the fake Datadog API application."""
+    config = config or FakeDatadogConfig()
+    state = FakeDatadogState(config)
+
+    async def simulate(request: Request) -> Optional[JSONResponse]:
+        """Apply auth, rate limits, latency and error injection."""
+        family = endpoint_family(request.url.path)
+        state.requests[family] += 1
+        peer = (request.client.host, request.client.port) if request.client else ("", 0)
+        new_connection = peer not in state.connections
+        state.connections.add(peer)
+        if config.require_auth and not request.headers.get("DD-API-KEY"):
+            return _error(403, "Forbidden")
+        throttled = state.check_rate_limit(family)
+        if throttled is not None:
+            return throttled
+        delay = config.family_latency.get(family, config.latency)
+        if new_connection:
+            delay += config.connect_latency
+        if config.latency_jitter:
+            delay += state.rng.uniform(0, config.latency_jitter)
+        if config.slow_rate and state.rng.random() < config.slow_rate:
+            delay += config.slow_latency
+        if delay:
+            await asyncio.sleep(delay)
+        if config.error_rate and state.rng.random() < config.error_rate:
+            state.errors[family] += 1
+            return _error(500, "Internal Server Error")
+        return None
+
+    def validated(request: Request, payload: Any) -> Response:
+        """Answer with an ETag, or with a 304 when the client already has this payload."""
+        response = JSONResponse(payload)
+        if not config.etags:
+            return response
+        etag = f'"{hashlib.sha1(response.body).hexdigest()}"'
+        if request.headers.get("If-None-Match") == etag:
+            state.not_modified[endpoint_family(request.url.path)] += 1
+            return Response(status_code=304, headers={"ETag": etag})
+        response.headers["ETag"] = etag
+        return response
+
+    def endpoint(handler):
+        async def wrapped(request: Request):
+            state.in_flight += 1
+            state.max_in_flight = max(state.max_in_flight, state.in_flight)
+            try:
+                rejected = await simulate(request)
+                if rejected is not None:
+                    return rejected
+                return await handler(request)
+            finally:
+                state.in_flight -= 1
+        return wrapped
+
+    async def logs_search(request: Request):
+        body = await request.json()
+        terms = _query_terms(body.get("filter", {}).get("query"))
+        page = body.get("page") or {}
+        limit = min(int(page.get("limit") or 10), 1000)
+        offset = _decode_cursor(page.get("cursor"))
+        matching = [log for log in state.logs if _event_matches(log["attributes"], terms)]
+        data = matching[offset:offset + limit]
+        meta: Dict[str, Any] = {"elapsed": 12, "request_id": "fake", "status": "done"}
+        links = {}
+        if offset + limit < len(matching):
+            meta["page"] = {"after": _encode_cursor(offset + limit)}
+            links["next"] = f"{request.url}?page[cursor]={meta['page']['after']}"
+        return JSONResponse({"data": data, "meta": meta, "links": links})
+
+    async def logs_aggregate(request: Request):
+        body = await request.json()
+        terms = _query_terms(body.get("filter", {}).get("query"))
+        group_by = (body.get("group_by") or [{}])[0]
+        facet = group_by.get("facet", "service")
+        limit = int(group_by.get("limit") or 10)
+        counts: Counter = Counter()
+        for log in state.logs:
+            attributes = log["attributes"]
+            if not _event_matches(attributes, terms):
+                continue
+            value = attributes.get(facet, attributes["attributes"].get(facet))
+            if value is not None and not isinstance(value, (dict, list)):
+                counts[str(value)] += 1
+        buckets = [{"by": {facet: value}, "computes": {"c0": count}} for value, count in counts.most_common(limit)]
+        return JSONResponse({"data": {"buckets": buckets}, "meta": {"elapsed": 5, "status": "done"}})
+
+    async def spans_search(request: Request):
+        body = await request.json()
+        attributes = body.get("data", {}).get("attributes", {})
+        terms = _query_terms(attributes.get("filter", {}).get("query"))
+        page = attributes.get("page") or {}
+        limit = min(int(page.get("limit") or 10), 1000)
+        offset = _decode_cursor(page.get("cursor"))
+        trace_ids = [value for key, value in terms if key == "trace_id"]
+        if trace_ids:
+            candidates = state.spans_by_trace.get(trace_ids[0], [])
+            terms = [(k, v) for k, v in terms if k != "trace_id"]
+        else:
+            candidates = state.spans
+        matching = [span for span in candidates if _event_matches(span["attributes"], terms)]
+        data = matching[offset:offset + limit]
+        meta: Dict[str, Any] = {"elapsed": 20, "request_id": "fake", "status": "done"}
+        if offset + limit < len(matching):
+            meta["page"] = {"after": _encode_cursor(offset + limit)}
+        return JSONResponse({"data": data, "meta": meta})
+
+    async def metrics_query(request: Request):
+        query = request.query_params.get("query", "")
+        if ":" not in query:
+            return _error(400, "Invalid query")
+        metric_name = query.split(":", 1)[1].split("{", 1)[0]
+        group_by: List[str] = []
+        if " by {" in query:
+            group_by = query.split(" by {", 1)[1].rstrip("}").split(",")
+        series_count = 1
+        if group_by:
+            series_count = min(config.metric_tag_values ** len(group_by), 2000)
+        series = generators.generate_metric_series(
+            metric_name, series_count, config.metric_points, config.seed, group_by
+        )
+        return JSONResponse({
+            "status": "ok",
+            "res_type": "time_series",
+            "query": query,
+            "from_date": int(request.query_params.get("from", 0)) * 1000,
+            "to_date": int(request.query_params.get("to", 0)) * 1000,
+            "series": series,
+            "message": "",
+            "group_by": group_by,
+        })
+
+    async def metrics_list(request: Request):
+        size = min(int(request.query_params.get("page[size]", 10000)), 10000)
+        offset = _decode_cursor(request.query_params.get("page[cursor]"))
+        tag_filter = request.query_params.get("filter[tags]")
+        metrics = state.metrics
+        if tag_filter:
+            namespace = tag_filter.split(":", 1)[0]
+            metrics = [m for m in metrics if m["id"].startswith(namespace)]
+        data = metrics[offset:offset + size]
+        pagination: Dict[str, Any] = {}
+        if offset + size < len(metrics):
+            pagination["next_cursor"] = _encode_cursor(offset + size)
+        return JSONResponse({"data": data, "meta": {"pagination": pagination}})
+
+    async def metric_all_tags(request: Request):
+        metric_name = request.path_params["metric_name"]
+        if metric_name not in state.metric_names:
+            return _error(404, f"Metric '{metric_name}' not found")
+        tags = generators.generate_metric_tags(
+            metric_name, config.metric_tag_fields, config.metric_tag_values, config.seed
+        )
+        return JSONResponse({"data": {"id": metric_name, "type": "metrics", "attributes": {"tags": tags}}})
+
+    async def monitors_list(request: Request):
+        params = request.query_params
+        page = int(params.get("page", 0))
+        page_size = min(int(params.get("page_size", 100)), 1000)
+        name = params.get("name", "").lower()
+        tags = [t for t in params.get("tags", "").split(",") if t]
+        monitor_tags = [t for t in params.get("monitor_tags", "").split(",") if t]
+        monitors = [
+            m for m in state.monitors
+            if (not name or name in m["name"].lower())
+            and all(t in m["tags"] for t in tags + monitor_tags)
+        ]
+        start = page * page_size
+        return validated(request, monitors[start:start + page_size])
+
+    async def slos_list(request: Request):
+        params = request.query_params
+        limit = min(int(params.get("limit", 1000)), 1000)
+        offset = int(params.get("offset", 0))
+        query = params.get("query", "").lower()
+        tags_query = [t for t in params.get("tags_query", "").split(",") if t]
+        slos = [
+            s for s in state.slos
+            if (not query or query in s["name"].lower() or query in s["description"].lower())
+            and all(t in s["tags"] for t in tags_query)
+        ]
+        return JSONResponse({"data": slos[offset:offset + limit], "errors": [], "metadata": {
+            "page": {"total_count": len(slos), "total_filtered_count": len(slos)},
+        }})
+
+    async def slo_details(request: Request):
+        slo = state.slos_by_id.get(request.path_params["slo_id"])
+        if slo is None:
+            return _error(404, "SLO not found")
+        return JSONResponse({"data": slo, "errors": []})
+
+    async def slo_history(request: Request):
+        slo = state.slos_by_id.get(request.path_params["slo_id"])
+        if slo is None:
+            return _error(404, "SLO not found")
+        from_ts = int(request.query_params.get("from_ts", 0))
+        to_ts = int(request.query_params.get("to_ts", 0))
+        return JSONResponse(generators.generate_slo_history(slo, from_ts, to_ts, config.seed))
+
+    def _page_number_response(items: List[Dict[str, Any]], request: Request, default_size: int):
+        size = int(request.query_params.get("page[size]", default_size))
+        number = int(request.query_params.get("page[number]", 0))
+        start = number * size
+        total_pages = (len(items) + size - 1) // size if size else 0
+        return {
+            "data": items[start:start + size],
+            "meta": {"pagination": {
+                "total_count": len(items),
+                "total_pages": total_pages,
+                "page_number": number,
+                "page_size": size,
+            }},
+        }
+
+    async def validate(request: Request):
+        return JSONResponse({"valid": True})
+
+    async def teams_list(request: Request):
+        return JSONResponse(_page_number_response(state.teams, request, 10))
+
+    async def team_memberships(request: Request):
+        team_id = request.path_params["team_id"]
+        if team_id not in state.team_ids:
+            return _error(404, "Team not found")
+        members = generators.generate_team_memberships(team_id, config.members_per_team, config.seed)
+        return JSONResponse({"data": members})
+
+    async def service_definitions_list(request: Request):
+        definitions = state.service_definitions
+        schema_version = request.query_params.get("filter[schema_version]")
+        if schema_version:
+            definitions = [d for d in definitions if d["attributes"]["schema-version"] == schema_version]
+        return validated(request, _page_number_response(definitions, request, 10))
+
+    async def service_definition(request: Request):
+        definition = state.service_definitions_by_name.get(request.path_params["service_name"])
+        if definition is None:
+            return _error(404, "Service definition not found")
+        return validated(request, {"data": definition})
+
+    async def ci_pipelines_search(request: Request):
+        body = await request.json()
+        terms = _query_terms(body.get("filter", {}).get("query"))
+        page = body.get("page") or {}
+        limit = min(int(page.get("limit") or 10), 5000)
+        offset = _decode_cursor(page.get("cursor"))
+        matching = []
+        for event in state.pipeline_events:
+            attributes = event["attributes"]["attributes"]
+            flat = {
+                "git.repository.name": attributes["git"]["repository"]["name"],
+                "ci.pipeline.name": attributes["ci"]["pipeline"]["name"],
+            }
+            if all(flat.get(key) == value for key, value in terms):
+                matching.append(event)
+        data = matching[offset:offset + limit]
+        meta: Dict[str, Any] = {}
+        if offset + limit < len(matching):
+            meta["page"] = {"after": _encode_cursor(offset + limit)}
+        return JSONResponse({"data": data, "meta": meta})
+
+    async def fake_stats(request: Request):
+        return JSONResponse(state.stats())
+
+    routes = [
+        Route("/api/v2/logs/events/search", endpoint(logs_search), methods=["POST"]),
+        Route("/api/v2/logs/analytics/aggregate", endpoint(logs_aggregate), methods=["POST"]),
+        Route("/api/v2/spans/events/search", endpoint(spans_search), methods=["POST"]),
+        Route("/api/v1/query", endpoint(metrics_query), methods=["GET"]),
+        Route("/api/v2/metrics", endpoint(metrics_list), methods=["GET"]),
+        Route("/api/v2/metrics/{metric_name:path}/all-tags", endpoint(metric_all_tags), methods=["GET"]),
+        Route("/api/v1/validate", endpoint(validate), methods=["GET"]),
+        Route("/api/v1/monitor", endpoint(monitors_list), methods=["GET"]),
+        Route("/api/v1/slo", endpoint(slos_list), methods=["GET"]),
+        Route("/api/v1/slo/{slo_id}", endpoint(slo_details), methods=["GET"]),
+        Route("/api/v1/slo/{slo_id}/history", endpoint(slo_history), methods=["GET"]),
+        Route("/api/v2/team", endpoint(teams_list), methods=["GET"]),
+        Route("/api/v2/team/{team_id}/memberships", endpoint(team_memberships), methods=["GET"]),
+        Route("/api/v2/services/definitions", endpoint(service_definitions_list), methods=["GET"]),
+        Route("/api/v2/services/definitions/{service_name}", endpoint(service_definition), methods=["GET"]),
+        Route("/api/v2/ci/pipelines/events/search", endpoint(ci_pipelines_search), methods=["POST"]),
+        Route("/_fake/stats", fake_stats, methods=["GET"]),
+    ]
+
+    app = Starlette(routes=routes)
+    app.state.fake = state
+    return app
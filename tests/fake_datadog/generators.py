@@ -0,0 +1,463 @@
+"""
+Synthetic Datadog payload generators
+
+Deterministic (seeded) generators for the raw API shapes consumed by
+datadog_client and the formatters. Shared by the fake API server and the
+benchmark suite so both exercise realistic, production-sized data.
+"""
+
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+SERVICES = [
+    "web-api", "checkout", "payments", "search", "auth", "notifications",
+    "inventory", "orders", "recommendations", "gateway", "billing", "reporting",
+]
+ENVS = ["prod", "staging", "dev"]
+REGIONS = ["us-east-1", "us-west-2", "eu-west-1"]
+TEAMS = ["payments", "platform", "search", "identity", "growth", "data"]
+LOG_LEVELS = ["info", "info", "info", "warn", "error", "debug"]
+OPERATIONS = [
+    "http.request", "db.query", "redis.command", "grpc.client", "aws.sqs", "template.render",
+]
+RESOURCES = [
+    "GET /api/users", "POST /api/orders", "GET /api/orders/{id}", "SELECT * FROM users WHERE id = ?",
+    "GET session:*", "PUT /api/cart", "publish order.created", "render checkout.html",
+]
+MONITOR_TYPES = ["metric alert", "query alert", "log alert", "service check", "composite", "trace-analytics alert"]
+MONITOR_STATES = ["OK", "OK", "OK", "Alert", "Warn", "No Data"]
+METRIC_NAMESPACES = ["system", "aws.lambda", "aws.apigateway", "trace.http.request", "kubernetes", "postgresql", "redis"]
+METRIC_SUFFIXES = ["count", "errors", "duration", "hits", "cpu.user", "mem.used", "latency.p99", "bytes.sent"]
+LANGUAGES = ["python", "go", "java", "node", "ruby"]
+
+BASE_TIME = datetime(2025, 7, 1, 12, 0, 0, tzinfo=timezone.utc)
+
+
+def _isoformat(dt: datetime) -> str:
+    """Format a datetime like the Datadog API (millisecond precision, Z suffix)."""
+    return dt.strftime("%Y-%m-%dT%H:%M:%S.") + f"{dt.microsecond // 1000:03d}Z"
+
+
+def _hex_id(rng: random.Random, length: int = 16) -> str:
+    """Generate a random hex identifier."""
+    return "".join(rng.choice("0123456789abcdef") for _ in range(length))
+
+
+def _tags(rng: random.Random, service: str) -> List[str]:
+    """Generate a realistic tag list."""
+    return [
+        f"env:{rng.choice(ENVS)}",
+        f"service:{service}",
+        f"region:{rng.choice(REGIONS)}",
+        f"team:{rng.choice(TEAMS)}",
+        f"owner:{rng.choice(TEAMS)}",
+        f"version:1.{rng.randint(0, 40)}.{rng.randint(0, 9)}",
+        f"source:{rng.choice(['python', 'lambda', 'nginx'])}",
+        f"pod_name:{service}-{_hex_id(rng, 8)}",
+        f"kube_namespace:{rng.choice(TEAMS)}",
+        f"availability-zone:{rng.choice(REGIONS)}{rng.choice('abc')}",
+    ]
+
+
+def generate_log_event(rng: random.Random, index: int, extra_attributes: int = 10) -> Dict[str, Any]:
+    """Generate a single log event in the logs search API format."""
+    service = rng.choice(SERVICES)
+    timestamp = BASE_TIME - timedelta(seconds=index * 3, milliseconds=rng.randint(0, 999))
+
+    attributes: Dict[str, Any] = {
+        "environment": rng.choice(ENVS),
+        "duration": rng.randint(1_000_000, 900_000_000),
+        "lambda": {
+            "name": f"{service}-handler",
+            "arn": f"arn:aws:lambda:{rng.choice(REGIONS)}:123456789012:function:{service}-handler",
+            "request_id": _hex_id(rng, 32),
+        },
+        "aws": {
+            "awslogs": {
+                "logGroup": f"/aws/lambda/{service}-handler",
+                "logStream": f"2025/07/01/[$LATEST]{_hex_id(rng, 32)}",
+                "owner": "123456789012",
+            },
+            "function_version": "$LATEST",
+            "invoked_function_arn": f"arn:aws:lambda:us-east-1:123456789012:function:{service}",
+        },
+        "http": {
+            "method": rng.choice(["GET", "POST", "PUT"]),
+            "status_code": rng.choice([200, 200, 201, 404, 500]),
+            "url_details": {"path": rng.choice(RESOURCES), "host": f"{service}.internal"},
+            "useragent": "Mozilla/5.0 (X11; Linux x86_64)",
+        },
+        "usr": {"id": rng.randint(1, 100000)},
+        "request_headers": {f"x-header-{i}": _hex_id(rng, 12) for i in range(6)},
+        "breadcrumbs": [f"step-{i}" for i in range(rng.randint(2, 8))],
+        "level": rng.choice(LOG_LEVELS).upper(),
+    }
+    if index % 7 == 0:
+        attributes["task_type_stats"] = {
+            "ingest": rng.randint(0, 20),
+            "transform": rng.randint(0, 20),
+            "export": 0,
+        }
+    for i in range(extra_attributes):
+        attributes[f"custom_{i}"] = f"value-{rng.randint(0, 10_000)}"
+
+    return {
+        "id": _hex_id(rng, 24),
+        "type": "log",
+        "attributes": {
+            "timestamp": _isoformat(timestamp),
+            "status": rng.choice(LOG_LEVELS),
+            "service": service,
+            "host": f"ip-10-0-{rng.randint(0, 255)}-{rng.randint(0, 255)}",
+            "message": f"{rng.choice(['Processed', 'Received', 'Failed to process', 'Retrying'])} "
+                       f"request {_hex_id(rng, 8)} in {rng.randint(1, 5000)}ms "
+                       + "x" * rng.randint(0, 200),
+            "tags": _tags(rng, service),
+            "attributes": attributes,
+        },
+    }
+
+
+def generate_logs(count: int, seed: int = 0, extra_attributes: int = 10) -> List[Dict[str, Any]]:
+    """Generate `count` log events."""
+    rng = random.Random(seed)
+    return [generate_log_event(rng, i, extra_attributes) for i in range(count)]
+
+
+def generate_trace(
+    rng: random.Random,
+    trace_index: int,
+    span_count: int,
+    extra_attributes: int = 10,
+    max_depth: int = 6,
+) -> List[Dict[str, Any]]:
+    """Generate the spans of one trace in the spans search API format.
+
+    Spans form a tree of bounded depth rooted at a single http.request span;
+    repeated db.query siblings are included to mimic N+1 query patterns.
+    """
+    trace_id = str(rng.getrandbits(63))
+    root_service = rng.choice(SERVICES)
+    start = BASE_TIME - timedelta(seconds=trace_index * 5)
+    env = rng.choice(ENVS)
+
+    spans: List[Dict[str, Any]] = []
+    depths: List[int] = []
+    for i in range(span_count):
+        span_id = str(rng.getrandbits(63))
+        if i == 0:
+            parent_id = "0"
+            depth = 0
+            service, operation, resource = root_service, "http.request", rng.choice(RESOURCES[:3])
+            offset_ms, duration_ms = 0, rng.randint(200, 3000)
+        else:
+            parent_index = rng.randrange(i)
+            while depths[parent_index] >= max_depth:
+                parent_index = rng.randrange(i)
+            parent = spans[parent_index]["attributes"]
+            parent_id = parent["span_id"]
+            depth = depths[parent_index] + 1
+            service = rng.choice(SERVICES)
+            operation = rng.choice(OPERATIONS)
+            resource = rng.choice(RESOURCES)
+            offset_ms = rng.randint(0, 100)
+            duration_ms = rng.randint(1, 150)
+        depths.append(depth)
+
+        span_start = start + timedelta(milliseconds=offset_ms)
+        span_end = span_start + timedelta(milliseconds=duration_ms)
+        error = 1 if rng.random() < 0.05 else 0
+        attributes: Dict[str, Any] = {
+            "trace_id": trace_id,
+            "span_id": span_id,
+            "parent_id": parent_id,
+            "service": service,
+            "resource_name": resource,
+            "operation_name": operation,
+            "start_timestamp": _isoformat(span_start),
+            "end_timestamp": _isoformat(span_end),
+            "status": "error" if error else "ok",
+            "error": error,
+            "env": env,
+            "host": f"ip-10-0-{rng.randint(0, 255)}-{rng.randint(0, 255)}",
+            "type": "web" if operation == "http.request" else "db",
+            "tags": _tags(rng, service),
+            "@http.method": rng.choice(["GET", "POST"]),
+            "@http.status_code": rng.choice(["200", "200", "500"]),
+            "@peer.hostname": f"{service}.internal",
+            "custom": {"region": rng.choice(REGIONS), "retries": rng.randint(0, 3)},
+        }
+        for j in range(extra_attributes):
+            attributes[f"meta_{j}"] = f"value-{rng.randint(0, 10_000)}"
+        spans.append({"id": span_id, "type": "spans", "attributes": attributes})
+    return spans
+
+
+def generate_spans(
+    trace_count: int,
+    spans_per_trace: int,
+    seed: int = 0,
+    extra_attributes: int = 10,
+) -> List[Dict[str, Any]]:
+    """Generate `trace_count` traces of `spans_per_trace` spans each, flattened."""
+    rng = random.Random(seed)
+    spans: List[Dict[str, Any]] = []
+    for i in range(trace_count):
+        spans.extend(generate_trace(rng, i, spans_per_trace, extra_attributes))
+    return spans
+
+
+def generate_metric_series(
+    metric_name: str,
+    series_count: int,
+    points: int = 60,
+    seed: int = 0,
+    group_by: Optional[List[str]] = None,
+    interval_s: int = 60,
+) -> List[Dict[str, Any]]:
+    """Generate timeseries in the /api/v1/query `series` format."""
+    rng = random.Random(seed)
+    group_by = group_by or []
+    end_ms = int(BASE_TIME.timestamp() * 1000)
+    series = []
+    for i in range(series_count):
+        scope_tags = [f"{field}:{field}-{i}" for field in group_by] or ["*"]
+        pointlist = []
+        value = rng.uniform(0, 100)
+        for p in range(points):
+            value = max(0.0, value + rng.uniform(-5, 5))
+            timestamp = end_ms - (points - p) * interval_s * 1000
+            pointlist.append([float(timestamp), None if rng.random() < 0.01 else round(value, 4)])
+        series.append({
+            "metric": metric_name,
+            "display_name": metric_name,
+            "aggr": "avg",
+            "scope": ",".join(scope_tags),
+            "tag_set": scope_tags if group_by else [],
+            "expression": f"avg:{metric_name}{{{','.join(scope_tags)}}}",
+            "pointlist": pointlist,
+            "length": points,
+            "interval": interval_s,
+            "start": pointlist[0][0] if pointlist else 0,
+            "end": pointlist[-1][0] if pointlist else 0,
+            "unit": [{"family": "time", "name": "millisecond", "short_name": "ms", "plural": "milliseconds", "scale_factor": 0.001}, None],
+        })
+    return series
+
+
+def generate_metric_names(count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """Generate metric catalog entries in the /api/v2/metrics format."""
+    rng = random.Random(seed)
+    metrics = []
+    for i in range(count):
+        name = f"{rng.choice(METRIC_NAMESPACES)}.{rng.choice(METRIC_SUFFIXES)}.m{i}"
+        metrics.append({
+            "id": name,
+            "type": "metrics",
+            "attributes": {
+                "description": f"Synthetic metric {i}",
+                "unit": rng.choice(["", "millisecond", "byte", "request"]),
+            },
+        })
+    return metrics
+
+
+def generate_metric_tags(metric_name: str, fields: int = 8, values_per_field: int = 25, seed: int = 0) -> List[str]:
+    """Generate the tag list for /api/v2/metrics/{name}/all-tags."""
+    rng = random.Random(f"{seed}:{metric_name}")
+    field_names = ["service", "env", "region", "host", "team", "version", "availability-zone", "account"]
+    tags = []
+    for field in field_names[:fields]:
+        for v in range(values_per_field):
+            tags.append(f"{field}:{field}-{v}-{_hex_id(rng, 4)}")
+    return tags
+
+
+def generate_monitors(count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """Generate monitors in the /api/v1/monitor format."""
+    rng = random.Random(seed)
+    monitors = []
+    for i in range(count):
+        service = rng.choice(SERVICES)
+        modified = BASE_TIME - timedelta(minutes=rng.randint(0, 60 * 24 * 30))
+        monitors.append({
+            "id": 100000 + i,
+            "name": f"[{service}] {rng.choice(['High error rate', 'Latency p99', 'Queue depth', 'CPU usage'])} #{i}",
+            "type": rng.choice(MONITOR_TYPES),
+            "query": f"avg(last_5m):avg:trace.http.request.errors{{service:{service}}} > 5",
+            "message": f"Notify @slack-{rng.choice(TEAMS)}",
+            "tags": [f"team:{rng.choice(TEAMS)}", f"service:{service}", f"env:{rng.choice(ENVS)}"],
+            "overall_state": rng.choice(MONITOR_STATES),
+            "created": _isoformat(modified - timedelta(days=30)),
+            "modified": _isoformat(modified),
+            "priority": rng.choice([None, 1, 2, 3, 4, 5]),
+            "options": {"thresholds": {"critical": 5, "warning": 3}, "notify_no_data": False},
+        })
+    return monitors
+
+
+def generate_slos(count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """Generate SLOs in the /api/v1/slo format."""
+    rng = random.Random(seed)
+    slos = []
+    for i in range(count):
+        service = rng.choice(SERVICES)
+        target = rng.choice([99.0, 99.5, 99.9, 99.95])
+        slos.append({
+            "id": _hex_id(rng, 32),
+            "name": f"{service} availability #{i}",
+            "description": f"Availability of the {service} API",
+            "type": rng.choice(["metric", "monitor"]),
+            "tags": [f"team:{rng.choice(TEAMS)}", f"service:{service}"],
+            "thresholds": [
+                {"timeframe": "30d", "target": target, "warning": round(target + (100 - target) / 2, 3)},
+                {"timeframe": "7d", "target": target},
+            ],
+            "query": {
+                "numerator": f"sum:trace.http.request.hits{{service:{service},!http.status_class:5xx}}.as_count()",
+                "denominator": f"sum:trace.http.request.hits{{service:{service}}}.as_count()",
+            },
+            "created_at": int((BASE_TIME - timedelta(days=90)).timestamp()),
+            "modified_at": int((BASE_TIME - timedelta(days=rng.randint(0, 30))).timestamp()),
+        })
+    return slos
+
+
+def generate_slo_history(slo: Dict[str, Any], from_ts: int, to_ts: int, seed: int = 0) -> Dict[str, Any]:
+    """Generate an SLO history response body for /api/v1/slo/{id}/history."""
+    rng = random.Random(f"{seed}:{slo['id']}:{from_ts}:{to_ts}")
+    target = slo["thresholds"][0]["target"]
+    sli = min(100.0, max(90.0, target + rng.uniform(-0.5, 0.3)))
+    allowed = 100 - target
+    budget_remaining = ((sli - target) / allowed * 100) if allowed else 0.0
+    return {
+        "data": {
+            "from_ts": from_ts,
+            "to_ts": to_ts,
+            "type": slo.get("type", "metric"),
+            "thresholds": {t["timeframe"]: t for t in slo["thresholds"]},
+            "overall": {
+                "name": slo["name"],
+                "sli_value": round(sli, 5),
+                "span_precision": 2,
+                "error_budget_remaining": {"custom": round(budget_remaining, 4)},
+                "errors": None,
+            },
+            "series": {
+                "numerator": {"sum": 100000.0 * sli / 100, "count": 1},
+                "denominator": {"sum": 100000.0, "count": 1},
+            },
+        },
+        "errors": None,
+    }
+
+
+def generate_teams(count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """Generate teams in the /api/v2/team format."""
+    rng = random.Random(seed)
+    teams = []
+    for i in range(count):
+        name = f"{rng.choice(TEAMS).title()} Team {i}"
+        teams.append({
+            "id": f"team-{_hex_id(rng, 12)}",
+            "type": "team",
+            "attributes": {
+                "name": name,
+                "handle": name.lower().replace(" ", "-"),
+                "description": f"Synthetic team {i}",
+                "created_at": _isoformat(BASE_TIME - timedelta(days=rng.randint(30, 900))),
+                "user_count": rng.randint(1, 30),
+            },
+        })
+    return teams
+
+
+def generate_team_memberships(team_id: str, count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """Generate memberships in the /api/v2/team/{id}/memberships format."""
+    rng = random.Random(f"{seed}:{team_id}")
+    return [
+        {
+            "id": f"membership-{_hex_id(rng, 12)}",
+            "type": "team_memberships",
+            "attributes": {
+                "role": rng.choice(["admin", None, None]) or "member",
+                "position": rng.choice(["", "Engineer", "Manager", "SRE"]),
+                "created_at": _isoformat(BASE_TIME - timedelta(days=rng.randint(1, 400))),
+            },
+            "relationships": {"user": {"data": {"id": f"user-{_hex_id(rng, 12)}", "type": "users"}}},
+        }
+        for _ in range(count)
+    ]
+
+
+def generate_service_definitions(count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """Generate service definitions in the /api/v2/services/definitions format."""
+    rng = random.Random(seed)
+    definitions = []
+    for i in range(count):
+        name = f"{rng.choice(SERVICES)}-{i}"
+        team = rng.choice(TEAMS)
+        definitions.append({
+            "id": _hex_id(rng, 32),
+            "type": "service-definition",
+            "attributes": {
+                "meta": {"last-modified-time": _isoformat(BASE_TIME - timedelta(days=rng.randint(0, 100)))},
+                "schema-version": "v2.2",
+                "service": {
+                    "schema-version": "v2.2",
+                    "dd-service": name,
+                    "name": name,
+                    "team": team,
+                    "description": f"Synthetic service {name} owned by {team}",
+                    "tier": rng.choice(["1", "2", "3"]),
+                    "type": rng.choice(["web", "db", "queue"]),
+                    "languages": [rng.choice(LANGUAGES)],
+                    "contacts": [
+                        {"type": "slack", "name": f"#{team}", "contact": f"https://slack.example.com/{team}"},
+                        {"type": "email", "name": f"{team} on-call", "contact": f"{team}@example.com"},
+                    ],
+                    "links": [
+                        {"name": "Runbook", "type": "runbook", "url": f"https://wiki.example.com/{name}/runbook"},
+                        {"name": "Source", "type": "repo", "url": f"https://github.com/example/{name}"},
+                        {"name": "Dashboard", "type": "dashboard", "url": f"https://app.datadoghq.com/dash/{i}"},
+                    ],
+                    "tags": [f"team:{team}", f"tier:{rng.randint(1, 3)}"],
+                    "integrations": {
+                        "pagerduty": {"service-url": f"https://example.pagerduty.com/service-directory/P{i:05d}"},
+                        "opsgenie": {"service-url": f"https://example.app.opsgenie.com/service/{_hex_id(rng, 8)}", "region": "US"},
+                    },
+                    "extensions": {"example/deploy": {"strategy": rng.choice(["canary", "blue-green"])}},
+                },
+            },
+        })
+    return definitions
+
+
+def generate_pipeline_events(count: int, repositories: int = 20, seed: int = 0) -> List[Dict[str, Any]]:
+    """Generate CI pipeline events in the CI Visibility search format."""
+    rng = random.Random(seed)
+    repos = [f"example/repo-{r}" for r in range(repositories)]
+    pipelines = ["build_deploy", "run-tests", "run-sast-tooling", "release"]
+    events = []
+    for i in range(count):
+        repo = rng.choice(repos)
+        pipeline = rng.choice(pipelines)
+        events.append({
+            "id": _hex_id(rng, 24),
+            "type": "cipipeline",
+            "attributes": {
+                "attributes": {
+                    "ci": {
+                        "pipeline": {
+                            "name": pipeline,
+                            "fingerprint": f"{repo}:{pipeline}".encode().hex()[:32],
+                            "id": _hex_id(rng, 16),
+                        },
+                        "status": rng.choice(["success", "error"]),
+                    },
+                    "git": {"repository": {"name": repo}, "branch": "main"},
+                },
+            },
+        })
+    return events
@@ -0,0 +1,85 @@
+"""
+Tests for the benchmark harness
+"""
+
+import pytest
+from benchmarks.cases import build_cases, select_cases
+from benchmarks.harness import BenchmarkCase, compare, load_baselines, run_case, save_baselines
+
+
+def make_result(name="extract_log_info", scale="small", items_per_s=1000.0, peak=1000):
+    return {
+        "name": name,
+        "scale": scale,
+        "items": 100,
+        "best_s": 100 / items_per_s,
+        "median_s": 100 / items_per_s,
+        "items_per_s": items_per_s,
+        "peak_memory_bytes": peak,
+    }
+
+
+class TestHarness:
+    """Test timing, baselines and regression detection"""
+
+    def test_run_case(self):
+        """Test that a case is timed and its peak memory measured"""
+        case = BenchmarkCase("alloc", "tiny", 10, setup=lambda: 10, func=lambda n: [bytearray(1024) for _ in range(n)])
+        result = run_case(case, repeat=2)
+        assert result["items_per_s"] > 0
+        assert result["best_s"] <= result["median_s"]
+        assert result["peak_memory_bytes"] >= 10 * 1024
+
+    def test_run_async_case(self):
+        """Test that coroutine functions are awaited"""
+        async def func(value):
+            return value
+
+        result = run_case(BenchmarkCase("async", "tiny", 1, setup=lambda: 1, func=func), repeat=1)
+        assert result["items_per_s"] > 0
+
+    def test_compare_flags_regressions(self, tmp_path):
+        """Test that only throughput drops beyond the threshold count as regressions"""
+        path = tmp_path / "baselines.json"
+        save_baselines([make_result(), make_result(scale="large")], path)
+        baselines = load_baselines(path)
+
+        results = compare(
+            [make_result(items_per_s=800.0), make_result(scale="large", items_per_s=700.0),
+             make_result(scale="new")],
+            baselines,
+            threshold=0.25,
+        )
+        assert results[0]["regressed"] is False
+        assert results[0]["throughput_change"] == pytest.approx(-0.2)
+        assert results[1]["regressed"] is True
+        assert results[2]["throughput_change"] is None
+        assert results[2]["regressed"] is False
+
+    def test_missing_baselines(self, tmp_path):
+        """Test that a missing baselines file is treated as empty"""
+        assert load_baselines(tmp_path / "missing.json") == {"environment": {}, "results": {}}
+
+
+class TestCases:
+    """Test the benchmark case definitions"""
+
+    def test_cases_have_unique_keys(self):
+        """Test that every case can be stored as a separate baseline"""
+        keys = [case.key for case in build_cases()]
+        assert len(keys) == len(set(keys))
+
+    def test_select_cases(self):
+        """Test filtering cases by name"""
+        selected = select_cases(build_cases(), ["format_metrics_table[small]"])
+        assert [case.key for case in selected] == ["format_metrics_table[small]"]
+
+    def test_listing_case_runs(self):
+        """Test that listing cases run the tool against in-memory data"""
+        case = select_cases(build_cases(), ["list_monitors.table[small]"])[0]
+        result = run_case(case, repeat=1)
+        assert result["items"] == 100
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
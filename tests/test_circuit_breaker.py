@@ -0,0 +1,209 @@
+"""
+Tests for the per-endpoint-family circuit breakers
+"""
+
+import time
+from unittest.mock import patch
+
+import httpx
+import pytest
+from datadog_mcp import server
+from datadog_mcp.utils import datadog_client
+from datadog_mcp.utils.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitBreakerTransport,
+    CircuitOpenError,
+    circuit_breakers,
+    endpoint_family,
+    guarded,
+    is_failure,
+    is_timeout,
+)
+from datadog_mcp.utils.deadline import deadline
+from datadog_mcp.utils.orgs import default_org_at
+from tests.fake_datadog import FakeDatadogConfig, FakeDatadogServer
+
+
+def status_error(status):
+    request = httpx.Request("GET", "http://x")
+    response = httpx.Response(status, request=request)
+    return httpx.HTTPStatusError("error", request=request, response=response)
+
+
+class TestCircuitBreaker:
+    """Test the closed, open and half-open states"""
+
+    def test_opens_after_consecutive_failures(self):
+        """Test that only consecutive failures open the breaker"""
+        breaker = CircuitBreaker("spans", failures=3, reset_seconds=30)
+        for failed in (True, True, False, True, True):
+            breaker.check()
+            breaker.record(failed)
+        assert breaker.state == CLOSED
+
+        breaker.check()
+        breaker.record(True)
+        assert breaker.state == OPEN
+        with pytest.raises(CircuitOpenError, match="spans endpoints are failing"):
+            breaker.check()
+
+    def test_half_open_probe(self):
+        """Test that one probe is let through once the reset period is over"""
+        breaker = CircuitBreaker("spans", failures=1, reset_seconds=30)
+        breaker.check()
+        breaker.record(True)
+
+        with patch("datadog_mcp.utils.circuit_breaker.time.monotonic", return_value=time.monotonic() + 31):
+            breaker.check()
+            assert breaker.state == HALF_OPEN
+            with pytest.raises(CircuitOpenError):
+                breaker.check()
+            breaker.record(True)
+        assert breaker.state == OPEN
+        assert breaker.opened == 2
+
+        with patch("datadog_mcp.utils.circuit_breaker.time.monotonic", return_value=time.monotonic() + 62):
+            breaker.check()
+            breaker.record(False)
+        assert breaker.state == CLOSED
+        breaker.check()
+
+    def test_cancelled_probe_is_released(self):
+        """Test that a probe ending without an outcome lets another probe through"""
+        breaker = CircuitBreaker("spans", failures=1, reset_seconds=0)
+        breaker.check()
+        breaker.record(True)
+        breaker.check()
+        breaker.release()
+        breaker.check()
+
+    def test_disabled(self):
+        """Test that a threshold of 0 never opens the breaker"""
+        breaker = CircuitBreaker("spans", failures=0)
+        for _ in range(10):
+            breaker.check()
+            breaker.record(True)
+        assert breaker.state == CLOSED
+
+    def test_what_counts_as_failure(self):
+        """Test that only 5xx, connection errors and timeouts count"""
+        assert is_failure(status_error(503))
+        assert is_failure(httpx.ReadTimeout("slow"))
+        assert is_failure(httpx.ConnectError("down"))
+        assert not is_failure(status_error(404))
+        assert not is_failure(status_error(429))
+        assert not is_failure(ValueError("bad argument"))
+        assert is_timeout(httpx.ReadTimeout("slow"))
+        assert not is_timeout(httpx.ConnectError("down"))
+
+    def test_endpoint_families(self):
+        """Test mapping request paths to families"""
+        assert endpoint_family("/api/v2/spans/events/search") == "spans"
+        assert endpoint_family("/api/v1/query") == "metrics_query"
+        assert endpoint_family("/api/v2/metrics/system.cpu.user/all-tags") == "metrics_catalog"
+        assert endpoint_family("/api/v1/slo/abc/history") == "slos"
+        assert endpoint_family("/api/v1/unknown") == "other"
+
+    @pytest.mark.asyncio
+    async def test_guarded_sdk_calls(self):
+        """Test that SDK errors with a 5xx status trip the logs breaker"""
+        class ApiException(Exception):
+            status = 502
+
+        async def failing():
+            raise ApiException()
+
+        breaker = circuit_breakers.get("logs")
+        breaker.threshold = 2
+        for _ in range(2):
+            with pytest.raises(ApiException):
+                await guarded("logs", failing)
+        with pytest.raises(CircuitOpenError):
+            await guarded("logs", failing)
+
+    @pytest.mark.asyncio
+    async def test_deadline_timeouts_are_not_failures(self):
+        """Test that requests timing out at the tool call's deadline leave the breaker closed"""
+        async def sdk_call():
+            time.sleep(0.1)  # an SDK thread running past the deadline
+            raise TimeoutError("read timed out")
+
+        class SlowTransport(httpx.AsyncBaseTransport):
+            async def handle_async_request(self, request):
+                time.sleep(0.1)
+                raise httpx.ReadTimeout("read timed out", request=request)
+
+        transport = CircuitBreakerTransport(SlowTransport())
+        request = httpx.Request("POST", "http://x/api/v2/spans/events/search")
+        for family in ("logs", "spans"):
+            circuit_breakers.get(family).threshold = 1
+        with pytest.raises(TimeoutError):
+            async with deadline(0.05):
+                await guarded("logs", sdk_call)
+        with pytest.raises(httpx.ReadTimeout):
+            async with deadline(0.05):
+                await transport.handle_async_request(request)
+        assert circuit_breakers.states(tripped_only=True) == {}
+
+        # Without a deadline the same timeouts are the endpoint's
+        with pytest.raises(httpx.ReadTimeout):
+            await transport.handle_async_request(request)
+        assert circuit_breakers.get("spans").state == OPEN
+
+
+class TestBreakerTransport:
+    """Test breakers in the HTTP layer against the fake API"""
+
+    @pytest.mark.asyncio
+    async def test_failing_family_fails_fast(self):
+        """Test that a failing family stops being sent requests"""
+        config = FakeDatadogConfig(slos=5, error_rate=1.0)
+        with FakeDatadogServer(config) as fake:
+            with default_org_at(fake.url):
+                for _ in range(5):
+                    with pytest.raises(httpx.HTTPStatusError):
+                        await datadog_client.fetch_slos()
+                started = time.monotonic()
+                with pytest.raises(CircuitOpenError):
+                    await datadog_client.fetch_slos()
+                assert time.monotonic() - started < 0.1
+            stats = fake.stats()
+
+        assert stats["requests"]["slos"] == 5
+        assert circuit_breakers.states()["slos"]["state"] == OPEN
+
+    @pytest.mark.asyncio
+    async def test_timeouts_open_the_breaker(self):
+        """Test that requests timing out count as failures"""
+        config = FakeDatadogConfig(family_latency={"spans": 1.0})
+        with FakeDatadogServer(config) as fake:
+            with default_org_at(fake.url), \
+                    patch.object(datadog_client, "request_timeout", return_value=0.05):
+                breaker = circuit_breakers.get("spans")
+                breaker.threshold = 2
+                for _ in range(2):
+                    with pytest.raises(httpx.ReadTimeout):
+                        await datadog_client.fetch_traces(query="*")
+                with pytest.raises(CircuitOpenError):
+                    await datadog_client.fetch_traces(query="*")
+        assert breaker.state == OPEN
+
+    @pytest.mark.asyncio
+    async def test_tool_error_reports_breaker_state(self):
+        """Test that tool errors name the open breakers"""
+        config = FakeDatadogConfig(slos=5, error_rate=1.0)
+        with FakeDatadogServer(config) as fake:
+            with default_org_at(fake.url):
+                for _ in range(5):
+                    await server.handle_call_tool("list_slos", {})
+                result = await server.handle_call_tool("list_slos", {})
+        texts = [content.text for content in result]
+        assert "slos endpoints are failing" in texts[0]
+        assert texts[-1].startswith("Circuit breakers: slos open (retrying in ")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
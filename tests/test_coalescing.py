@@ -0,0 +1,161 @@
+"""
+Tests for single-flight coalescing of concurrent fetches
+"""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from datadog_mcp.utils import datadog_client
+from datadog_mcp.utils.coalescing import coalesce, single_flight
+from datadog_mcp.utils.deadline import DeadlineExceeded, deadline, remaining
+from datadog_mcp.utils.orgs import Org, active_org, org_registry, use_org
+
+
+def make_fetch(delay=0.01, fail=False):
+    calls = []
+
+    @coalesce
+    async def fetch_things(name, filters=None, limit=50):
+        calls.append((name, filters, limit))
+        await asyncio.sleep(delay)
+        if fail:
+            raise RuntimeError("upstream failed")
+        return {"name": name, "filters": filters, "limit": limit}
+
+    return fetch_things, calls
+
+
+class TestCoalesce:
+    """Test sharing in-flight calls"""
+
+    @pytest.fixture(autouse=True)
+    def reset_stats(self):
+        single_flight.reset_stats()
+        yield
+        single_flight.reset_stats()
+
+    @pytest.mark.asyncio
+    async def test_identical_concurrent_calls_share_one_request(self):
+        """Test that identical concurrent calls run once and share the result"""
+        fetch, calls = make_fetch()
+        results = await asyncio.gather(
+            fetch("a", {"env": "prod", "service": "web"}),
+            fetch("a", filters={"service": "web", "env": "prod"}),  # same filters, other order
+            fetch(name="a", filters={"env": "prod", "service": "web"}, limit=50),  # explicit default
+        )
+        assert len(calls) == 1
+        assert results[0] is results[1] is results[2]
+        assert single_flight.stats()["fetch_things"] == {"calls": 3, "executed": 1, "saved": 2}
+
+    @pytest.mark.asyncio
+    async def test_different_or_sequential_calls_run_separately(self):
+        """Test that only identical calls that overlap in time are coalesced"""
+        fetch, calls = make_fetch()
+        await asyncio.gather(fetch("a"), fetch("b"), fetch("a", limit=10))
+        await fetch("a")
+        assert len(calls) == 4
+
+    @pytest.mark.asyncio
+    async def test_errors_reach_every_caller(self):
+        """Test that a failed request raises in every waiting caller"""
+        fetch, calls = make_fetch(fail=True)
+        results = await asyncio.gather(fetch("a"), fetch("a"), return_exceptions=True)
+        assert len(calls) == 1
+        assert all(isinstance(result, RuntimeError) for result in results)
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_others(self):
+        """Test that the shared request survives the cancellation of its first caller"""
+        fetch, calls = make_fetch(delay=0.05)
+        first = asyncio.ensure_future(fetch("a"))
+        second = asyncio.ensure_future(fetch("a"))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        assert (await second)["name"] == "a"
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_shared_request_is_cancelled_with_its_last_caller(self):
+        """Test that the shared request is aborted once every caller is cancelled"""
+        finished = []
+
+        @coalesce
+        async def fetch_slowly(name):
+            await asyncio.sleep(0.2)
+            finished.append(name)
+
+        callers = [asyncio.ensure_future(fetch_slowly("a")) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        for caller in callers:
+            caller.cancel()
+        await asyncio.gather(*callers, return_exceptions=True)
+        await asyncio.sleep(0.3)
+        assert finished == []
+
+    @pytest.mark.asyncio
+    async def test_shared_request_ignores_its_first_callers_deadline(self):
+        """Test that a caller with a short deadline does not cut the request short for the others"""
+        seen = []
+
+        @coalesce
+        async def fetch_slowly(name):
+            seen.append(remaining())
+            await asyncio.sleep(0.1)
+            return name
+
+        async def impatient():
+            async with deadline(0.03):
+                return await fetch_slowly("a")
+
+        first = asyncio.ensure_future(impatient())
+        await asyncio.sleep(0.01)
+        second = asyncio.ensure_future(fetch_slowly("a"))
+        with pytest.raises(DeadlineExceeded):
+            await first
+        assert await second == "a"
+        assert seen == [None]
+
+    @pytest.mark.asyncio
+    async def test_calls_for_other_orgs_are_not_shared(self):
+        """Test that orgs with the same scope still get requests of their own, each sent for its org"""
+        seen = []
+
+        @coalesce
+        async def fetch_things(name):
+            seen.append(active_org().name)
+            await asyncio.sleep(0.01)
+            return name
+
+        async def fetch_for(org):
+            with use_org(org):
+                return await fetch_things("a")
+
+        orgs = {name: Org(name, "http://datadog", "key", "app") for name in ("eu", "staging")}
+        with patch.dict(org_registry._orgs, orgs):
+            await asyncio.gather(fetch_for("eu"), fetch_for("staging"), fetch_for("eu"))
+        assert sorted(seen) == ["eu", "staging"]
+
+    @pytest.mark.asyncio
+    async def test_unhashable_arguments_are_not_coalesced(self):
+        """Test that calls whose arguments cannot be keyed run on their own"""
+        fetch, calls = make_fetch()
+        await asyncio.gather(fetch(bytearray(b"a")), fetch(bytearray(b"a")))
+        assert len(calls) == 2
+
+
+class TestCoalescedClient:
+    """Test coalescing of the Datadog client against the offline API stand-in"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_fetches(self, fake_datadog):
+        """Test that identical concurrent fetches send one upstream request"""
+        before = sum(fake_datadog.stats()["requests"].values())
+        results = await asyncio.gather(*(datadog_client.fetch_monitors() for _ in range(5)))
+        after = sum(fake_datadog.stats()["requests"].values())
+        assert after - before == 1
+        assert all(result is results[0] for result in results)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,171 @@
+"""
+Tests for conditional requests of service definitions and monitors
+"""
+
+import json
+from unittest.mock import patch
+
+import httpx
+import pytest
+from datadog_mcp.tools import get_service_definition
+from datadog_mcp.utils import datadog_client
+from datadog_mcp.utils.conditional import (
+    ValidatedDocument,
+    ValidatorStore,
+    conditional_get,
+    format_once,
+    validator_store,
+)
+from datadog_mcp.utils.orgs import default_org_at
+from tests.fake_datadog import FakeDatadogConfig, FakeDatadogServer
+
+HEADERS = {"DD-API-KEY": "x", "DD-APPLICATION-KEY": "y"}
+
+
+def make_request(**arguments):
+    class Request:
+        pass
+
+    request = Request()
+    request.arguments = arguments
+    return request
+
+
+@pytest.fixture(autouse=True)
+def empty_store():
+    """Start every test without stored documents"""
+    validator_store.clear()
+    yield
+    validator_store.clear()
+
+
+class TestConditionalGet:
+    """Test validators, body hashes and parse skipping"""
+
+    @pytest.mark.asyncio
+    async def test_validators_are_sent_back(self):
+        """Test that ETag and Last-Modified come back as conditional headers"""
+        seen = []
+
+        def handler(request):
+            seen.append(request.headers)
+            if request.headers.get("If-None-Match") == '"v1"':
+                return httpx.Response(304)
+            return httpx.Response(
+                200, json={"data": [1]}, headers={"ETag": '"v1"', "Last-Modified": "Mon, 19 Oct 2026 10:00:00 GMT"}
+            )
+
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            first = await conditional_get(client, "http://dd/api/v1/monitor", HEADERS, {"page": 0})
+            second = await conditional_get(client, "http://dd/api/v1/monitor", HEADERS, {"page": 0})
+
+        assert first == {"data": [1]}
+        assert second is first
+        assert "If-None-Match" not in seen[0]
+        assert seen[1]["If-None-Match"] == '"v1"'
+        assert seen[1]["If-Modified-Since"] == "Mon, 19 Oct 2026 10:00:00 GMT"
+        assert validator_store.not_modified == 1
+
+    @pytest.mark.asyncio
+    async def test_unchanged_body_is_not_parsed_again(self):
+        """Test the body hash fallback for responses without validators"""
+        bodies = [b'{"data": [1]}', b'{"data": [1]}', b'{"data": [2]}']
+
+        def handler(request):
+            return httpx.Response(200, content=bodies.pop(0))
+
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            with patch("datadog_mcp.utils.conditional.loads", wraps=json.loads) as loads:
+                first = await conditional_get(client, "http://dd/x", HEADERS)
+                second = await conditional_get(client, "http://dd/x", HEADERS)
+                third = await conditional_get(client, "http://dd/x", HEADERS)
+
+        assert second is first
+        assert third == {"data": [2]}
+        assert loads.call_count == 2
+        assert (validator_store.unchanged, validator_store.changed) == (1, 2)
+
+    @pytest.mark.asyncio
+    async def test_documents_are_kept_per_query_and_keys(self):
+        """Test that documents of other pages or credentials are not reused"""
+        def handler(request):
+            return httpx.Response(200, json={"page": request.url.params.get("page")})
+
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            page0 = await conditional_get(client, "http://dd/x", HEADERS, {"page": 0})
+            page1 = await conditional_get(client, "http://dd/x", HEADERS, {"page": 1})
+            other = await conditional_get(client, "http://dd/x", {**HEADERS, "DD-API-KEY": "z"}, {"page": 0})
+
+        assert page0 == {"page": "0"} and page1 == {"page": "1"}
+        assert other is not page0
+        assert len(validator_store) == 3
+
+    def test_store_is_bounded(self):
+        """Test that the least recently used documents are dropped"""
+        store = ValidatorStore(max_entries=2)
+        for key in "abc":
+            store.put(key, ValidatedDocument("digest", key))
+        assert store.get("a") is None
+        assert store.get("c").value == "c"
+
+    def test_format_once(self):
+        """Test that text is reused only for the very same document"""
+        document, renders = {"data": 1}, []
+
+        def render():
+            renders.append(1)
+            return "text"
+
+        assert format_once(document, "table", render) == "text"
+        assert format_once(document, "table", render) == "text"
+        format_once(document, "json", render)
+        format_once({"data": 1}, "table", render)
+        assert len(renders) == 3
+
+
+class TestConditionalFetches:
+    """Test the service definition and monitor fetches against the fake API"""
+
+    @pytest.mark.asyncio
+    async def test_service_definition_not_modified(self):
+        """Test that a repeated service definition fetch is answered with a 304"""
+        config = FakeDatadogConfig(service_definitions=5, etags=True)
+        with FakeDatadogServer(config) as server:
+            with default_org_at(server.url):
+                listing = await datadog_client.fetch_service_definitions()
+                name = listing["data"][0]["attributes"]["service"]["name"]
+                first = await datadog_client.fetch_service_definition(name)
+                second = await datadog_client.fetch_service_definition(name)
+                again = await datadog_client.fetch_service_definitions()
+            stats = server.stats()
+
+        assert second is first
+        assert again is listing
+        assert stats["not_modified"]["service_definitions"] == 2
+
+    @pytest.mark.asyncio
+    async def test_monitors_without_validators(self, fake_datadog):
+        """Test that unchanged monitor pages are reused without validators"""
+        first = await datadog_client.fetch_monitors(page_size=50)
+        second = await datadog_client.fetch_monitors(page_size=50)
+        assert second is first
+        assert validator_store.unchanged == 1
+
+    @pytest.mark.asyncio
+    async def test_tool_formats_unchanged_definition_once(self, fake_datadog):
+        """Test that get_service_definition reuses the text of an unchanged definition"""
+        listing = await datadog_client.fetch_service_definitions()
+        name = listing["data"][0]["attributes"]["service"]["name"]
+        with patch.object(
+            get_service_definition, "_format_service_definition",
+            wraps=get_service_definition._format_service_definition,
+        ) as render:
+            first = await get_service_definition.handle_call(make_request(service_name=name))
+            second = await get_service_definition.handle_call(make_request(service_name=name))
+        assert first.content[0].text == second.content[0].text
+        assert f"Service Definition: {name}" in first.content[0].text
+        assert render.call_count == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
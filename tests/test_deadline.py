@@ -0,0 +1,110 @@
+"""
+Tests for tool call deadlines and cancellation
+"""
+
+import asyncio
+import time
+from unittest.mock import patch
+
+import pytest
+from datadog_mcp import server
+from datadog_mcp.tools import list_monitors
+from datadog_mcp.utils.deadline import (
+    HTTP_TIMEOUT,
+    DeadlineExceeded,
+    deadline,
+    detach,
+    remaining,
+    request_timeout,
+)
+from datadog_mcp.utils.monitor_snapshot import MonitorSnapshot
+from datadog_mcp.utils.orgs import default_org_at
+from tests.fake_datadog import FakeDatadogConfig, FakeDatadogServer
+
+
+class TestDeadline:
+    """Test deadlines and the request timeouts derived from them"""
+
+    @pytest.mark.asyncio
+    async def test_slow_work_is_cancelled(self):
+        """Test that work running past the deadline is cancelled"""
+        with pytest.raises(DeadlineExceeded) as error:
+            async with deadline(0.05):
+                await asyncio.sleep(1)
+        assert str(error.value) == "did not finish within 0.05s"
+
+    @pytest.mark.asyncio
+    async def test_request_timeout_is_capped_by_deadline(self):
+        """Test that requests get at most what is left of the deadline"""
+        assert remaining() is None
+        assert request_timeout() == HTTP_TIMEOUT
+        async with deadline(2):
+            assert 0 < request_timeout() <= 2
+            async with deadline(60):
+                # The enclosing deadline is due sooner
+                assert request_timeout() <= 2
+        assert remaining() is None
+
+    @pytest.mark.asyncio
+    async def test_no_deadline(self):
+        """Test that a timeout of 0 sets no deadline"""
+        async with deadline(0):
+            assert remaining() is None
+
+    @pytest.mark.asyncio
+    async def test_detached_task_outlives_deadline(self):
+        """Test that background work can drop the deadline it was started under"""
+        async def background():
+            detach()
+            await asyncio.sleep(0.1)
+            return remaining()
+
+        async with deadline(0.05):
+            task = asyncio.ensure_future(background())
+        assert await task is None
+
+    @pytest.mark.asyncio
+    async def test_timeouts_that_are_not_the_deadline_pass_through(self):
+        """Test that other timeouts inside a deadline keep their type"""
+        with pytest.raises(TimeoutError) as error:
+            async with deadline(5):
+                await asyncio.wait_for(asyncio.sleep(1), 0.01)
+        assert not isinstance(error.value, DeadlineExceeded)
+
+
+class TestToolCallDeadline:
+    """Test deadlines and cancellation of tool calls against the fake API"""
+
+    @pytest.mark.asyncio
+    async def test_slow_tool_call_hits_deadline(self):
+        """Test that a tool call stuck on a slow endpoint returns at its deadline"""
+        config = FakeDatadogConfig(monitors=10, family_latency={"monitors": 2})
+        with FakeDatadogServer(config) as fake:
+            with default_org_at(fake.url), \
+                    patch.object(server, "TOOL_TIMEOUT", 0.2), \
+                    patch.object(list_monitors, "monitor_snapshot", MonitorSnapshot()):
+                started = time.monotonic()
+                result = await server.handle_call_tool("list_monitors", {})
+                elapsed = time.monotonic() - started
+        assert elapsed < 1.5
+        assert "did not finish within 0.2s" in result[0].text
+
+    @pytest.mark.asyncio
+    async def test_cancelled_tool_call_aborts_requests(self):
+        """Test that cancelling a tool call aborts its Datadog request"""
+        config = FakeDatadogConfig(slos=5, family_latency={"slos": 0.5})
+        with FakeDatadogServer(config) as fake:
+            with default_org_at(fake.url):
+                call = asyncio.ensure_future(server.handle_call_tool("list_slos", {}))
+                await asyncio.sleep(0.1)
+                started = time.monotonic()
+                call.cancel()
+                with pytest.raises(asyncio.CancelledError):
+                    await call
+                # Cancellation does not wait for the slow response
+                assert time.monotonic() - started < 0.2
+            assert fake.stats()["requests"]["slos"] == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,208 @@
+"""
+End-to-end tests of the Datadog client against the offline API stand-in
+"""
+
+import time
+import pytest
+import httpx
+from unittest.mock import MagicMock
+from datadog_mcp.utils import datadog_client
+from datadog_mcp.tools import get_logs, get_traces, list_monitors, get_teams
+from datadog_mcp.utils.orgs import default_org_at
+from tests.fake_datadog import FakeDatadogConfig, FakeDatadogServer
+
+
+def make_request(**arguments):
+    request = MagicMock()
+    request.arguments = arguments
+    return request
+
+
+class TestClientAgainstFakeApi:
+    """Exercise every fetch_* function over real HTTP"""
+
+    @pytest.mark.asyncio
+    async def test_fetch_logs_paginates(self, fake_datadog):
+        """Test logs search through the SDK with cursor pagination"""
+        first = await datadog_client.fetch_logs(limit=100)
+        assert len(first["data"]) == 100
+        cursor = first["meta"]["page"]["after"]
+
+        second = await datadog_client.fetch_logs(limit=100, cursor=cursor)
+        assert len(second["data"]) == 100
+        assert first["data"][0]["id"] != second["data"][0]["id"]
+
+    @pytest.mark.asyncio
+    async def test_fetch_logs_filter_values(self, fake_datadog):
+        """Test logs aggregation by facet"""
+        result = await datadog_client.fetch_logs_filter_values(field_name="service", limit=5)
+        assert 0 < result["total_values"] <= 5
+        counts = [v["count"] for v in result["values"]]
+        assert counts == sorted(counts, reverse=True)
+
+    @pytest.mark.asyncio
+    async def test_fetch_traces_and_children(self, fake_datadog):
+        """Test spans search and trace_id lookups"""
+        result = await datadog_client.fetch_traces(limit=5)
+        assert len(result["data"]) == 5
+
+        trace_id = result["data"][0]["attributes"]["trace_id"]
+        children = await datadog_client.fetch_traces(query=f"trace_id:{trace_id}", limit=1000)
+        assert len(children["data"]) == 30
+        assert {s["attributes"]["trace_id"] for s in children["data"]} == {trace_id}
+
+    @pytest.mark.asyncio
+    async def test_fetch_metrics_grouped(self, fake_datadog):
+        """Test metric queries with a group by clause"""
+        result = await datadog_client.fetch_metrics("system.cpu.user", aggregation_by=["host"])
+        assert len(result["series"]) == 25
+        assert result["series"][0]["pointlist"]
+
+    @pytest.mark.asyncio
+    async def test_fetch_metrics_list_and_tags(self, fake_datadog):
+        """Test the metrics catalog, tag lookups and 404 handling"""
+        page = await datadog_client.fetch_metrics_list(limit=200)
+        assert len(page["data"]) == 200
+        assert page["meta"]["pagination"]["next_cursor"]
+
+        metric_name = page["data"][0]["id"]
+        fields = await datadog_client.fetch_metric_available_fields(metric_name)
+        assert "service" in fields
+        values = await datadog_client.fetch_metric_field_values(metric_name, "env")
+        assert len(values) == 25
+
+        assert await datadog_client.fetch_metric_available_fields("no.such.metric") == []
+
+    @pytest.mark.asyncio
+    async def test_fetch_monitors_and_slos(self, fake_datadog):
+        """Test monitors and SLO endpoints including history"""
+        monitors = await datadog_client.fetch_monitors(page_size=50, page=2)
+        assert len(monitors) == 20
+
+        slos = await datadog_client.fetch_slos(limit=10, offset=25)
+        assert len(slos) == 5
+
+        details = await datadog_client.fetch_slo_details(slos[0]["id"])
+        assert details["id"] == slos[0]["id"]
+        history = await datadog_client.fetch_slo_history(slos[0]["id"], 0, 3600)
+        assert "sli_value" in history["overall"]
+
+    @pytest.mark.asyncio
+    async def test_fetch_teams_and_service_definitions(self, fake_datadog):
+        """Test page-number paginated endpoints"""
+        teams = await datadog_client.fetch_teams(page_size=10, page_number=2)
+        assert len(teams["data"]) == 5
+        assert teams["meta"]["pagination"]["total_pages"] == 3
+
+        members = await datadog_client.fetch_team_memberships(teams["data"][0]["id"])
+        assert len(members) == 8
+
+        definitions = await datadog_client.fetch_service_definitions(page_size=20, page_number=2)
+        assert len(definitions["data"]) == 5
+        name = definitions["data"][0]["attributes"]["service"]["name"]
+        definition = await datadog_client.fetch_service_definition(name)
+        assert definition["data"]["attributes"]["service"]["name"] == name
+
+        with pytest.raises(httpx.HTTPStatusError):
+            await datadog_client.fetch_service_definition("no-such-service")
+
+    @pytest.mark.asyncio
+    async def test_fetch_ci_pipelines(self, fake_datadog):
+        """Test CI pipeline events search"""
+        result = await datadog_client.fetch_ci_pipelines(repository="example/repo-1", limit=1000)
+        assert result["data"]
+        for event in result["data"]:
+            assert event["attributes"]["attributes"]["git"]["repository"]["name"] == "example/repo-1"
+
+
+class TestToolsAgainstFakeApi:
+    """Run tool handlers end to end"""
+
+    @pytest.mark.asyncio
+    async def test_get_logs_tool(self, fake_datadog):
+        """Test get_logs table output over real HTTP"""
+        result = await get_logs.handle_call(make_request(limit=50, format="table"))
+        assert result.isError is False
+        assert "Found: 50 logs" in result.content[0].text
+
+    @pytest.mark.asyncio
+    async def test_get_traces_tool_with_children(self, fake_datadog):
+        """Test get_traces fetching child spans for each root span"""
+        result = await get_traces.handle_call(make_request(
+            limit=2, format="text", include_children=True, filters={"parent_id": "0"},
+        ))
+        assert result.isError is False
+        assert "Found: 60 traces" in result.content[0].text
+
+    @pytest.mark.asyncio
+    async def test_list_monitors_tool(self, fake_datadog):
+        """Test list_monitors summary output"""
+        result = await list_monitors.handle_call(make_request(page_size=1000, format="summary"))
+        assert result.isError is False
+        assert "Found 120 monitors" in result.content[0].text
+
+    @pytest.mark.asyncio
+    async def test_get_teams_tool(self, fake_datadog):
+        """Test get_teams with page-number pagination metadata"""
+        result = await get_teams.handle_call(make_request(page_size=10, format="table"))
+        assert result.isError is False
+        assert "Found 25 team(s) total" in result.content[0].text
+
+
+class TestFakeApiBehaviour:
+    """Test configurable latency, rate limits and error injection"""
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_returns_429(self):
+        """Test that exceeding the per-family rate limit returns 429 with headers"""
+        config = FakeDatadogConfig(rate_limit=3, rate_limit_period=60, monitors=10)
+        with FakeDatadogServer(config) as server:
+            with default_org_at(server.url):
+                for _ in range(3):
+                    await datadog_client.fetch_monitors()
+                with pytest.raises(httpx.HTTPStatusError) as exc_info:
+                    await datadog_client.fetch_monitors()
+
+            response = exc_info.value.response
+            assert response.status_code == 429
+            assert response.headers["X-RateLimit-Remaining"] == "0"
+            assert "Retry-After" in response.headers
+            assert server.stats()["throttled"] == {"monitors": 1}
+
+    @pytest.mark.asyncio
+    async def test_family_latency(self):
+        """Test that latency can be injected for a single endpoint family"""
+        config = FakeDatadogConfig(family_latency={"slos": 0.2}, slos=5)
+        with FakeDatadogServer(config) as server:
+            with default_org_at(server.url):
+                start = time.perf_counter()
+                await datadog_client.fetch_monitors()
+                fast = time.perf_counter() - start
+
+                start = time.perf_counter()
+                await datadog_client.fetch_slos()
+                slow = time.perf_counter() - start
+
+        assert slow >= 0.2
+        assert fast < 0.2
+
+    @pytest.mark.asyncio
+    async def test_error_injection(self):
+        """Test that injected server errors surface as HTTP errors"""
+        config = FakeDatadogConfig(error_rate=1.0, teams=5)
+        with FakeDatadogServer(config) as server:
+            with default_org_at(server.url):
+                with pytest.raises(httpx.HTTPStatusError) as exc_info:
+                    await datadog_client.fetch_teams()
+        assert exc_info.value.response.status_code == 500
+
+    def test_subprocess_mode(self):
+        """Test running the stand-in as a separate process"""
+        config = FakeDatadogConfig(monitors=7)
+        with FakeDatadogServer(config, subprocess_mode=True) as server:
+            response = httpx.get(f"{server.url}/api/v1/monitor", headers={"DD-API-KEY": "x"})
+            assert len(response.json()) == 7
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,160 @@
+"""
+Tests for hedged requests
+"""
+
+import asyncio
+import time
+from unittest.mock import patch
+
+import httpx
+import pytest
+from datadog_mcp.utils import datadog_client, hedging
+from datadog_mcp.utils.hedging import MIN_SAMPLES, Hedger
+from datadog_mcp.utils.orgs import default_org_at
+from tests.fake_datadog import FakeDatadogConfig, FakeDatadogServer
+
+
+def warmed_hedger(latency=0.01, percentile=90):
+    hedger = Hedger(percentile=percentile)
+    hedger.endpoint("search").samples.extend([latency] * MIN_SAMPLES)
+    return hedger
+
+
+def make_attempt(*delays, fail=()):
+    """An attempt whose n-th call takes delays[n] seconds; calls in ``fail`` raise"""
+    calls, cancelled = [], []
+
+    async def attempt():
+        number = len(calls)
+        calls.append(number)
+        try:
+            await asyncio.sleep(delays[number])
+        except asyncio.CancelledError:
+            cancelled.append(number)
+            raise
+        if number in fail:
+            raise RuntimeError(f"attempt {number} failed")
+        return number
+
+    return attempt, calls, cancelled
+
+
+class TestHedger:
+    """Test when a request is hedged and which attempt wins"""
+
+    @pytest.mark.asyncio
+    async def test_no_hedging_without_enough_samples(self):
+        """Test that an endpoint is not hedged before its latency is known"""
+        hedger = Hedger(percentile=90)
+        attempt, calls, _ = make_attempt(0.1)
+        assert await hedger.run("search", attempt) == 0
+        assert calls == [0]
+        assert len(hedger.endpoint("search").samples) == 1
+
+    @pytest.mark.asyncio
+    async def test_slow_request_is_hedged(self):
+        """Test that the second attempt wins over a slow first one, which is cancelled"""
+        hedger = warmed_hedger()
+        attempt, calls, cancelled = make_attempt(1.0, 0.01)
+        started = time.monotonic()
+        assert await hedger.run("search", attempt) == 1
+        assert time.monotonic() - started < 0.5
+        await asyncio.sleep(0.01)
+        assert cancelled == [0]
+        assert hedger.stats()["search"] == {"requests": 1, "hedged": 1, "hedge_won": 1}
+
+    @pytest.mark.asyncio
+    async def test_hedged_latency_counts_from_first_attempt(self):
+        """Test that a hedged request is sampled from its first attempt, not as the fast winner alone"""
+        hedger = warmed_hedger(latency=0.1)
+        attempt, _, cancelled = make_attempt(1.0, 0.01)
+        assert await hedger.run("search", attempt) == 1
+        await asyncio.sleep(0.01)
+        assert cancelled == [0]
+        samples = hedger.endpoint("search").samples
+        assert len(samples) == MIN_SAMPLES + 1
+        assert samples[-1] >= 0.1
+
+    @pytest.mark.asyncio
+    async def test_fast_request_is_not_hedged(self):
+        """Test that a request finishing within the percentile is sent once"""
+        hedger = warmed_hedger(latency=0.2)
+        attempt, calls, _ = make_attempt(0.01)
+        assert await hedger.run("search", attempt) == 0
+        assert calls == [0]
+
+    @pytest.mark.asyncio
+    async def test_failed_attempt_waits_for_the_other(self):
+        """Test that a failing attempt does not fail a request the other attempt completes"""
+        hedger = warmed_hedger()
+        attempt, _, _ = make_attempt(0.2, 0.01, fail={1})
+        assert await hedger.run("search", attempt) == 0
+
+        hedger = warmed_hedger()
+        attempt, _, _ = make_attempt(0.2, 0.01, fail={0, 1})
+        with pytest.raises(RuntimeError, match="attempt 1 failed"):
+            await hedger.run("search", attempt)
+
+    @pytest.mark.asyncio
+    async def test_no_hedging_while_throttled(self):
+        """Test that a throttled endpoint is not sent hedges"""
+        hedger = warmed_hedger()
+        request = httpx.Request("POST", "http://x")
+        hedger.endpoint("search").observe(httpx.Response(429, headers={"Retry-After": "10"}, request=request))
+        attempt, calls, _ = make_attempt(0.1)
+        assert await hedger.run("search", attempt) == 0
+        assert calls == [0]
+
+    @pytest.mark.asyncio
+    async def test_no_hedging_when_rate_limit_budget_is_low(self):
+        """Test that hedges keep a reserve of the rate-limit window"""
+        hedger = warmed_hedger()
+        request = httpx.Request("POST", "http://x")
+        headers = {"X-RateLimit-Remaining": "5", "X-RateLimit-Limit": "100"}
+        hedger.endpoint("search").observe(httpx.Response(200, headers=headers, request=request))
+        attempt, calls, _ = make_attempt(0.1)
+        await hedger.run("search", attempt)
+        assert calls == [0]
+
+    @pytest.mark.asyncio
+    async def test_hedges_are_capped_by_ratio(self):
+        """Test that at most HEDGE_MAX_RATIO of requests are hedged"""
+        hedger = warmed_hedger()
+        with patch.object(hedging, "HEDGE_MAX_RATIO", 0.5):
+            for _ in range(4):
+                attempt, _, _ = make_attempt(0.08, 0.01)
+                await hedger.run("search", attempt)
+        assert hedger.stats()["search"]["hedged"] == 2
+
+
+class TestHedgedClient:
+    """Test hedged metric queries against the fake API"""
+
+    async def run_queries(self, hedger, count=20):
+        """Total latency of sequential metric queries against an API with a slow tail"""
+        config = FakeDatadogConfig(seed=1, metrics=50, slow_rate=0.2, slow_latency=0.5)
+        with FakeDatadogServer(config) as server:
+            with default_org_at(server.url), \
+                    patch.object(datadog_client, "hedger", hedger), \
+                    patch.object(hedging, "HEDGE_MAX_RATIO", 1.0):
+                started = time.monotonic()
+                for _ in range(count):
+                    result = await datadog_client.fetch_metrics("system.cpu.user")
+                    assert result["series"]
+                return time.monotonic() - started
+
+    @pytest.mark.asyncio
+    async def test_slow_metric_queries_are_hedged(self):
+        """Test that occasional slow responses are cut short by hedges"""
+        unhedged = await self.run_queries(Hedger(percentile=0))
+
+        hedger = Hedger(percentile=80)
+        hedger.endpoint("metrics_query").samples.extend([0.02] * MIN_SAMPLES)
+        hedged = await self.run_queries(hedger)
+
+        assert hedger.stats()["metrics_query"]["hedge_won"] > 0
+        assert hedged < unhedged * 0.75
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,81 @@
+"""
+Tests for the shared connection pool
+"""
+
+import argparse
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from benchmarks.fanout import format_report, run_benchmark
+from datadog_mcp.utils import datadog_client
+from datadog_mcp.utils.http_pool import SharedTransport
+from datadog_mcp.utils.orgs import default_org_at
+from tests.fake_datadog import FakeDatadogConfig, FakeDatadogServer
+
+
+class TestSharedTransport:
+    """Test that fetches share connections"""
+
+    @pytest.mark.asyncio
+    async def test_fetches_reuse_connections(self):
+        """Test that sequential fetches go over one kept-alive connection"""
+        transport = SharedTransport(http2=False)
+        with FakeDatadogServer(FakeDatadogConfig(teams=5)) as fake:
+            with default_org_at(fake.url), \
+                    patch.object(datadog_client, "shared_transport", transport):
+                for _ in range(3):
+                    await datadog_client.fetch_teams()
+                await transport.close_pool()
+            stats = fake.stats()
+        assert stats["requests"]["teams"] == 3
+        assert stats["connections"] == 1
+
+    @pytest.mark.asyncio
+    async def test_closing_a_client_keeps_the_pool(self):
+        """Test that a client borrowing the pool does not close it"""
+        transport = SharedTransport(http2=False)
+        with FakeDatadogServer(FakeDatadogConfig(teams=5)) as fake:
+            with default_org_at(fake.url), \
+                    patch.object(datadog_client, "shared_transport", transport):
+                async with datadog_client._http_client() as client:
+                    await client.get(f"{fake.url}/_fake/stats")
+                pool = transport._current_pool()
+                async with datadog_client._http_client() as client:
+                    await client.get(f"{fake.url}/_fake/stats")
+                assert transport._current_pool() is pool
+                await transport.close_pool()
+                assert transport._pool is None
+
+    def test_new_pool_per_event_loop(self):
+        """Test that connections are not shared across event loops"""
+        transport = SharedTransport(http2=False)
+
+        async def current():
+            return transport._current_pool()
+
+        first = asyncio.run(current())
+        second = asyncio.run(current())
+        assert first is not second
+
+
+class TestFanoutBenchmark:
+    """Test the fan-out benchmark against the fake API"""
+
+    @pytest.mark.asyncio
+    async def test_pooled_fanout_opens_fewer_connections(self):
+        """Test that the pooled mode opens connections once, not per round"""
+        args = argparse.Namespace(
+            requests=10, rounds=3, latency=0.0, connect_latency=0.0,
+            modes=["per-call", "pooled", "http2"], api_url=None,
+        )
+        report = await run_benchmark(args)
+        modes = report["modes"]
+        assert modes["per-call"]["connections"] == 30
+        assert modes["pooled"]["connections"] <= 10
+        assert modes["http2"] is None or modes["http2"]["connections"] <= 1
+        assert "10-way fan-out" in format_report(report)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,131 @@
+"""
+Tests for JSON encoding, projection and streaming decoding
+"""
+
+import json
+
+import pytest
+from datadog_mcp.utils import datadog_client, json_codec
+from datadog_mcp.utils.formatters import TRACE_EVENT_FIELDS, extract_trace_info
+from datadog_mcp.utils.json_codec import JsonProjection, decode_stream, dumps
+from datadog_mcp.utils.records import LogRecord
+
+DOCUMENT = {
+    "data": [
+        {"id": "a", "attributes": {"service": "web", "@http.method": "GET", "big": {"x": [1, 2]}}},
+        {"id": "b", "attributes": {"service": "db", "nested": {"keep": 1.5, "drop": None}}},
+    ],
+    "meta": {"page": {"after": "cursor"}},
+    "links": {"next": "url"},
+}
+PROJECTION = JsonProjection(["data.id", "data.attributes.service", "data.attributes.@*", "data.attributes.nested.keep", "meta"])
+EXPECTED = {
+    "data": [
+        {"id": "a", "attributes": {"service": "web", "@http.method": "GET"}},
+        {"id": "b", "attributes": {"service": "db", "nested": {"keep": 1.5}}},
+    ],
+    "meta": {"page": {"after": "cursor"}},
+}
+
+
+async def chunked(data, size=7):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+class TestJsonProjection:
+    """Test projecting decoded and streamed documents"""
+
+    def test_apply(self):
+        """Test projecting an already decoded document"""
+        assert PROJECTION.apply(DOCUMENT) == EXPECTED
+
+    @pytest.mark.asyncio
+    async def test_decode_stream(self):
+        """Test incremental decoding across arbitrary chunk boundaries"""
+        pytest.importorskip("ijson")
+        body = json.dumps(DOCUMENT).encode()
+        assert await decode_stream(chunked(body), PROJECTION) == EXPECTED
+
+    @pytest.mark.asyncio
+    async def test_decode_stream_without_ijson(self, monkeypatch):
+        """Test that the fallback decodes the whole body and projects it"""
+        monkeypatch.setattr(json_codec, "ijson", None)
+        body = json.dumps(DOCUMENT).encode()
+        assert await decode_stream(chunked(body), PROJECTION) == EXPECTED
+
+    @pytest.mark.asyncio
+    async def test_malformed_body(self, monkeypatch):
+        """Test that a truncated body raises one of DECODE_ERRORS, with or without ijson"""
+        body = json.dumps(DOCUMENT).encode()[:-10]
+        with pytest.raises(json_codec.DECODE_ERRORS):
+            await decode_stream(chunked(body), PROJECTION)
+        monkeypatch.setattr(json_codec, "ijson", None)
+        with pytest.raises(json_codec.DECODE_ERRORS):
+            await decode_stream(chunked(body), PROJECTION)
+
+
+class TestDumps:
+    """Test the JSON encoder used for tool output"""
+
+    @pytest.fixture(params=["orjson", "stdlib"])
+    def encoder(self, request, monkeypatch):
+        if request.param == "orjson":
+            pytest.importorskip("orjson")
+        else:
+            monkeypatch.setattr(json_codec, "orjson", None)
+        return request.param
+
+    def test_compact_by_default(self, encoder):
+        """Test that output has no whitespace unless pretty output is requested"""
+        assert dumps({"a": [1, 2.5, None], "b": "é"}) == '{"a":[1,2.5,null],"b":"é"}'
+
+    def test_pretty(self, encoder):
+        """Test indented output"""
+        assert dumps({"a": [1]}, pretty=True) == '{\n  "a": [\n    1\n  ]\n}'
+
+    def test_pretty_setting(self, encoder, monkeypatch):
+        """Test that DD_MCP_PRETTY_JSON sets the default"""
+        monkeypatch.setattr(json_codec, "PRETTY_JSON", True)
+        assert dumps({"a": 1}) == '{\n  "a": 1\n}'
+
+    def test_records(self, encoder):
+        """Test that records are serialized through to_dict()"""
+        log = LogRecord("t", "info", "web", "h", "m", {"tags": "env:prod"})
+        assert json.loads(dumps({"logs": [log]})) == {"logs": [log.to_dict()]}
+
+    def test_large_integers(self, encoder):
+        """Test integers beyond 64 bits"""
+        assert json.loads(dumps({"id": 2 ** 70})) == {"id": 2 ** 70}
+
+    def test_unserializable(self, encoder):
+        """Test that unknown objects still raise TypeError"""
+        with pytest.raises(TypeError):
+            dumps({"x": object()})
+
+
+class TestProjectedFetch:
+    """Test projected fetches against the offline API stand-in"""
+
+    @pytest.mark.asyncio
+    async def test_fetch_traces_with_fields(self, fake_datadog):
+        """Test that projected spans extract the same as full spans"""
+        full = await datadog_client.fetch_traces(limit=50)
+        projected = await datadog_client.fetch_traces(limit=50, fields=TRACE_EVENT_FIELDS)
+        assert projected["meta"] == full["meta"]
+        assert [span.to_dict() for span in extract_trace_info(projected["data"])] == [
+            span.to_dict() for span in extract_trace_info(full["data"])
+        ]
+
+    @pytest.mark.asyncio
+    async def test_fetch_metrics_list_with_fields(self, fake_datadog):
+        """Test that a projected metrics page keeps ids and pagination"""
+        fields = JsonProjection(["data.id", "meta"])
+        page = await datadog_client.fetch_metrics_list(limit=20, fields=fields)
+        assert len(page["data"]) == 20
+        assert set(page["data"][0]) == {"id"}
+        assert "meta" in page
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,62 @@
+"""
+Tests for the load test harness
+"""
+
+import argparse
+import pytest
+from benchmarks.loadtest import CallStats, format_report, percentile, run_loadtest, summarize
+
+
+class TestReport:
+    """Test latency statistics and the report"""
+
+    def test_percentile(self):
+        """Test nearest-rank percentiles"""
+        values = list(range(1, 101))
+        assert percentile(values, 50) == 50
+        assert percentile(values, 99) == 99
+        assert percentile(values, 100) == 100
+        assert percentile([], 50) is None
+
+    def test_summarize(self):
+        """Test per-tool statistics, throughput and memory growth"""
+        stats = CallStats()
+        for latency in (0.1, 0.2, 0.3):
+            stats.record("get_logs", latency, ok=True)
+        stats.record("list_monitors", 0.5, ok=False)
+        samples = [
+            {"t": 1.0, "loop_lag_max_ms": 2.0, "loop_lag_p99_ms": 1.0, "rss_bytes": 100},
+            {"t": 2.0, "loop_lag_max_ms": 9.0, "loop_lag_p99_ms": 5.0, "rss_bytes": 150},
+        ]
+
+        report = summarize(stats, elapsed=2.0, server_samples=samples, interval=1.0)
+        assert report["total_calls"] == 4
+        assert report["total_errors"] == 1
+        assert report["throughput_per_s"] == 2.0
+        assert report["tools"]["get_logs"]["p50_ms"] == pytest.approx(200)
+        assert report["tools"]["list_monitors"]["errors"] == 1
+        assert report["event_loop_lag"]["max_ms"] == 9.0
+        assert report["memory"]["rss_growth_bytes"] == 50
+        assert "get_logs" in format_report(report, baseline=report)
+
+
+class TestLoadTest:
+    """Run the harness against the offline API stand-in"""
+
+    @pytest.mark.asyncio
+    async def test_memory_transport(self, fake_datadog):
+        """Test a short in-process run through the MCP session"""
+        args = argparse.Namespace(
+            transport="memory", agents=3, duration=1.0, think_time=0.0, seed=0,
+            sample_interval=0.25, api_url=None,
+        )
+        report = await run_loadtest(args, fake_datadog.config, fake_datadog.url)
+
+        assert report["total_calls"] > 0
+        assert report["total_errors"] == 0
+        assert report["server_samples"]
+        assert report["config"]["agents"] == 3
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
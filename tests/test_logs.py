@@ -267,6 +267,77 @@ class TestLogFormatting:
         assert parsed[0]["service"] == "service1"
 
 
+class TestLogExtraction:
+    """Test extraction plans for log events"""
+
+    def make_event(self):
+        return {
+            "attributes": {
+                "timestamp": "2023-01-01T12:00:00Z",
+                "status": "info",
+                "service": "checkout",
+                "host": "host-1",
+                "message": "Processed order",
+                "tags": ["env:prod", "team:payments"],
+                "attributes": {
+                    "level": "WARN",
+                    "duration": 1500,
+                    "lambda": {"name": "checkout-handler", "arn": "arn:aws:lambda:fn"},
+                    "aws": {"awslogs": {"logGroup": "/aws/lambda/checkout", "logStream": "s" * 60}},
+                    "task_type_stats": {"ingest": 2, "export": 0},
+                    "usr": {"id": 7},
+                    "http": {"method": "GET", "status_code": 200, "url": "/", "host": "h"},
+                    "retries": 3,
+                },
+            }
+        }
+
+    def test_default_plan(self):
+        """Test that nested fields, transforms and extra attributes are extracted"""
+        from datadog_mcp.utils.formatters import extract_log_info
+
+        log = extract_log_info([self.make_event()])[0]
+        assert log["level"] == "WARN"
+        assert log["duration"] == "1500"
+        assert log["function"] == "checkout-handler"
+        assert log["lambda_arn"] == "arn:aws:lambda:fn"
+        assert log["log_group"] == "/aws/lambda/checkout"
+        assert log["log_stream"] == "s" * 47 + "..."
+        assert log["task_stats"] == "ingest:2"
+        assert log["total_tasks"] == "2"
+        assert log["attr_usr"] == "{'id': 7}"
+        assert log["attr_retries"] == "3"
+        assert "attr_http" not in log  # dicts with more than 3 keys are skipped
+        assert "attr_lambda" not in log
+
+    def test_table_plan_skips_extras(self):
+        """Test that the table plan only extracts what the table shows"""
+        from datadog_mcp.utils.formatters import TABLE_LOG_PLAN, extract_log_info
+
+        log = extract_log_info([self.make_event()], TABLE_LOG_PLAN)[0]
+        assert log["level"] == "WARN"
+        assert set(log) == {"timestamp", "level", "service", "host", "message", "tags"}
+
+    def test_custom_plan(self):
+        """Test a plan with custom fields and tag prefixes"""
+        from datadog_mcp.utils.formatters import LogExtractionPlan, extract_log_info
+
+        plan = LogExtractionPlan(fields=[("method", "http.method")], tag_prefixes=["team:"], extra_attributes=False)
+        event = {"content": self.make_event()["attributes"]}
+        log = extract_log_info([event], plan)[0]
+        assert log["method"] == "GET"
+        assert log["tags"] == "team:payments"
+        assert "duration" not in log
+
+    def test_content_tags_match_by_key(self):
+        """Test that content-format tags are kept by tag key, not substring"""
+        from datadog_mcp.utils.formatters import extract_log_info
+
+        event = {"content": {"tags": ["env:prod", "datasource:x", "region:us-east-1", "service:web"]}}
+        log = extract_log_info([event])[0]
+        assert log["tags"] == "env:prod, region:us-east-1"
+
+
 class TestLogFiltering:
     """Test log filtering functionality"""
     
@@ -0,0 +1,152 @@
+"""
+Tests for the in-memory monitor snapshot
+"""
+
+from unittest.mock import patch
+
+import pytest
+from datadog_mcp.tools import list_monitors
+from datadog_mcp.utils import monitor_snapshot as snapshot_module
+from datadog_mcp.utils.monitor_snapshot import (
+    MonitorSnapshot,
+    MonitorSnapshotRefresher,
+    fetch_all_monitors,
+    scope_tags,
+)
+from tests.fake_datadog.generators import generate_monitors
+
+
+def make_monitor(monitor_id, name="CPU high", state="OK", monitor_type="metric alert",
+                 tags=("team:payments",), query="avg:cpu{service:web,env:prod}", modified="t0"):
+    return {
+        "id": monitor_id,
+        "name": name,
+        "type": monitor_type,
+        "overall_state": state,
+        "tags": list(tags),
+        "query": query,
+        "modified": modified,
+    }
+
+
+class TestMonitorSnapshot:
+    """Test indexing and querying of the snapshot"""
+
+    def test_scope_tags(self):
+        """Test that scope tags are read from every query scope, skipping negations and wildcards"""
+        assert scope_tags("avg:a{service:web, env:prod} / avg:b{*} - avg:c{!env:dev}") == {
+            "service:web", "env:prod",
+        }
+
+    def test_query_combines_filters(self):
+        """Test that all filters must match and results are ordered by id"""
+        snapshot = MonitorSnapshot()
+        snapshot.apply([
+            make_monitor(3, state="Alert"),
+            make_monitor(1, state="Alert", name="Payments latency"),
+            make_monitor(2, state="OK"),
+            make_monitor(4, state="Alert", tags=("team:search",)),
+            make_monitor(5, state="Alert", monitor_type="log alert", query="logs(\"x\")"),
+        ])
+
+        alerting = snapshot.query(monitor_tags="team:payments", state="alert")
+        assert [m["id"] for m in alerting] == [1, 3, 5]
+        assert [m["id"] for m in snapshot.query(state="Alert", monitor_type="Metric Alert", tags="env:prod")] == [1, 3, 4]
+        assert [m["id"] for m in snapshot.query(name="LATENCY")] == [1]
+        assert snapshot.query(monitor_tags="team:payments,team:search") == []
+        assert len(snapshot.query()) == 5
+
+    def test_apply_reindexes_only_changes(self):
+        """Test that refreshes add, update and remove monitors incrementally"""
+        snapshot = MonitorSnapshot()
+        assert not snapshot.is_fresh(60)
+        snapshot.apply([make_monitor(1), make_monitor(2), make_monitor(3)])
+        assert snapshot.is_fresh(60)
+
+        changes = snapshot.apply([
+            make_monitor(1),
+            make_monitor(2, state="Alert", modified="t1"),
+            make_monitor(4),
+        ])
+        assert changes == {"added": 1, "updated": 1, "removed": 1}
+        assert [m["id"] for m in snapshot.query(state="OK")] == [1, 4]
+        assert [m["id"] for m in snapshot.query(state="Alert")] == [2]
+        assert len(snapshot) == 3
+        # Emptied index entries are dropped
+        snapshot.apply([])
+        assert snapshot._by_state == {} and snapshot._by_tag == {}
+
+    def test_edits_without_modified_bump_are_reindexed(self):
+        """Test that a monitor is re-indexed when any field changes, not only modified or state"""
+        snapshot = MonitorSnapshot()
+        snapshot.apply([make_monitor(1)])
+        changes = snapshot.apply([make_monitor(1, name="Disk full", tags=("team:search",))])
+        assert changes == {"added": 0, "updated": 1, "removed": 0}
+        assert snapshot.query(monitor_tags="team:payments") == []
+        assert [m["id"] for m in snapshot.query(monitor_tags="team:search", name="disk")] == [1]
+        assert snapshot.apply([make_monitor(1, name="Disk full", tags=("team:search",))])["updated"] == 0
+
+    def test_query_matches_linear_scan(self):
+        """Test index answers against a plain filter over generated monitors"""
+        monitors = generate_monitors(2000, seed=7)
+        snapshot = MonitorSnapshot()
+        snapshot.apply(monitors)
+        expected = sorted(
+            m["id"] for m in monitors
+            if m["overall_state"] == "Alert" and "team:payments" in m["tags"] and "#1" in m["name"]
+        )
+        found = snapshot.query(monitor_tags="team:payments", state="Alert", name="#1")
+        assert [m["id"] for m in found] == expected
+
+
+class TestSnapshotRefresh:
+    """Test loading the snapshot from the monitors API"""
+
+    @pytest.mark.asyncio
+    async def test_fetch_all_monitors_pages_through(self, fake_datadog):
+        """Test that every page of monitors is fetched"""
+        monitors = await fetch_all_monitors(page_size=50)
+        assert len(monitors) == 120
+        assert len({m["id"] for m in monitors}) == 120
+
+    @pytest.mark.asyncio
+    async def test_refresh_and_list_monitors_from_snapshot(self, fake_datadog):
+        """Test that list_monitors answers from a fresh snapshot without calling the API"""
+        snapshot = MonitorSnapshot()
+        changes = await MonitorSnapshotRefresher(snapshot).refresh()
+        assert changes["added"] == 120
+
+        class Request:
+            arguments = {"state": "Alert", "format": "summary"}
+
+        expected = len(snapshot.query(state="Alert"))
+        before = sum(fake_datadog.stats()["requests"].values())
+        with patch.object(list_monitors, "monitor_snapshot", snapshot), \
+                patch.object(snapshot_module, "MONITOR_SNAPSHOT_INTERVAL", 120):
+            result = await list_monitors.handle_call(Request())
+        assert sum(fake_datadog.stats()["requests"].values()) == before
+        text = result.content[0].text
+        assert text.startswith(f"Found {expected} monitors matching filters: state: 'Alert'")
+        assert "Alert: " in text and "OK: " not in text
+
+    @pytest.mark.asyncio
+    async def test_stale_snapshot_falls_back_to_api(self):
+        """Test that list_monitors fetches from the API when the snapshot is not fresh"""
+        class Request:
+            arguments = {"state": "alert", "format": "json"}
+
+        monitors = [make_monitor(1, state="Alert"), make_monitor(2, state="OK")]
+        with patch.object(list_monitors, "fetch_monitors", return_value=monitors) as fetch, \
+                patch.object(list_monitors, "monitor_snapshot", MonitorSnapshot()):
+            result = await list_monitors.handle_call(Request())
+        fetch.assert_called_once()
+        assert '"id":1' in result.content[0].text and '"id":2' not in result.content[0].text
+
+    def test_snapshot_age_limit_follows_interval(self):
+        """Test that a snapshot is served until three refresh intervals have passed"""
+        with patch.object(snapshot_module, "MONITOR_SNAPSHOT_INTERVAL", 10):
+            assert snapshot_module.snapshot_max_age() == 30
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
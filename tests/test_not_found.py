@@ -0,0 +1,138 @@
+"""
+Tests for negative caching of not-found lookups and did-you-mean suggestions
+"""
+
+import json
+from unittest.mock import patch
+
+import httpx
+import pytest
+from datadog_mcp.tools import get_metric_field_values, get_metric_fields, get_service_definition
+from datadog_mcp.utils import datadog_client, response_cache
+from datadog_mcp.utils.not_found import NameCatalog, NotFoundCache, name_catalog, not_found_cache
+from datadog_mcp.utils.response_cache import ResponseCache
+
+
+def make_request(**arguments):
+    class Request:
+        pass
+
+    request = Request()
+    request.arguments = arguments
+    return request
+
+
+def not_found_error():
+    request = httpx.Request("GET", "http://x")
+    response = httpx.Response(404, request=request)
+    return httpx.HTTPStatusError("not found", request=request, response=response)
+
+
+@pytest.fixture(autouse=True)
+def forget_names():
+    """Start every test without remembered names"""
+    not_found_cache.clear()
+    name_catalog.clear()
+    yield
+    not_found_cache.clear()
+    name_catalog.clear()
+
+
+class TestNotFoundCache:
+    """Test remembering and expiring not-found names"""
+
+    def test_expiry_and_bound(self):
+        """Test that entries expire and the oldest are dropped first"""
+        cache = NotFoundCache(ttl=60, max_entries=2)
+        cache.add(("metric", "a"), not_found_error())
+        cache.add(("metric", "b"), not_found_error())
+        cache.add(("metric", "c"), not_found_error())
+        assert not cache.is_missing("metric", "a")
+        assert cache.is_missing("metric", "c")
+
+        with patch("datadog_mcp.utils.not_found.time.monotonic", return_value=1e12):
+            assert not cache.is_missing("metric", "c")
+
+    def test_disabled(self):
+        """Test that a TTL of 0 remembers nothing"""
+        cache = NotFoundCache(ttl=0)
+        cache.add(("metric", "a"), not_found_error())
+        assert not cache.is_missing("metric", "a")
+
+    @pytest.mark.asyncio
+    async def test_suggestions(self):
+        """Test close matches among known names"""
+        catalog = NameCatalog()
+        catalog.add("service", ["checkout-api", "checkout-worker", "billing"])
+        assert (await catalog.suggest("service", "chekout-api"))[0] == "checkout-api"
+        assert await catalog.suggest("service", "zzz") == []
+        assert await catalog.suggest("metric", "checkout-api") == []
+
+
+class TestNotFoundLookups:
+    """Test not-found lookups against the fake API"""
+
+    @pytest.mark.asyncio
+    async def test_repeated_missing_metric_skips_request(self, fake_datadog):
+        """Test that a metric that was just not found is not requested again"""
+        before = fake_datadog.stats()["requests"].get("metrics_catalog", 0)
+        assert await datadog_client.fetch_metric_available_fields("no.such.metric") == []
+        assert await datadog_client.fetch_metric_field_values("no.such.metric", "env") == []
+        assert await datadog_client.fetch_metric_available_fields("no.such.metric") == []
+        assert fake_datadog.stats()["requests"]["metrics_catalog"] - before == 1
+
+    @pytest.mark.asyncio
+    async def test_repeated_missing_service_raises_again(self, fake_datadog):
+        """Test that a remembered missing service still raises its 404"""
+        before = fake_datadog.stats()["requests"].get("service_definitions", 0)
+        for _ in range(2):
+            with pytest.raises(httpx.HTTPStatusError) as error:
+                await datadog_client.fetch_service_definition("no-such-service")
+            assert error.value.response.status_code == 404
+        assert fake_datadog.stats()["requests"]["service_definitions"] - before == 1
+
+    @pytest.mark.asyncio
+    async def test_missing_metric_suggestions(self, fake_datadog):
+        """Test that the metric tools name the missing metric and suggest listed ones"""
+        page = await datadog_client.fetch_metrics_list(limit=500)
+        known = page["data"][0]["id"]
+        typo = known[:-1] + "x"
+
+        result = await get_metric_fields.handle_call(make_request(metric_name=typo))
+        text = result.content[0].text
+        assert f"Metric '{typo}' not found. Did you mean: " in text
+        assert known in text
+
+        values = await get_metric_field_values.handle_call(
+            make_request(metric_name=typo, field_name="env", format="json")
+        )
+        answer = json.loads(values.content[0].text)
+        assert answer["not_found"] is True
+        assert known in answer["suggestions"]
+
+        found = await get_metric_fields.handle_call(make_request(metric_name=known))
+        assert "not found" not in found.content[0].text
+
+    @pytest.mark.asyncio
+    async def test_missing_service_suggestions_from_persistent_cache(self, fake_datadog):
+        """Test suggestions drawn from cached listings of an earlier process"""
+        cache = ResponseCache(":memory:")
+        with patch.object(response_cache, "_cache", cache):
+            listing = await datadog_client.fetch_service_definitions(page_size=10)
+            known = listing["data"][0]["attributes"]["service"]["name"]
+            # A restart forgets the names seen in memory, not the cached responses
+            name_catalog.clear()
+            before = fake_datadog.stats()["requests"]["service_definitions"]
+
+            result = await get_service_definition.handle_call(make_request(service_name=known + "s"))
+            assert fake_datadog.stats()["requests"]["service_definitions"] - before == 1
+        cache.close()
+
+        assert result.isError
+        text = result.content[0].text
+        assert text.startswith(f"No service definition found for '{known}s'. Did you mean: ")
+        assert known in text
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
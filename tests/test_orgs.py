@@ -0,0 +1,143 @@
+"""
+Tests for serving several Datadog orgs from one process
+"""
+
+import asyncio
+import os
+from unittest.mock import patch
+
+import pytest
+from datadog_mcp import server
+from datadog_mcp.utils import datadog_client
+from datadog_mcp.utils.circuit_breaker import OPEN, circuit_breakers
+from datadog_mcp.utils.coalescing import single_flight
+from datadog_mcp.utils.orgs import (
+    Org,
+    OrgRegistry,
+    UnknownOrgError,
+    current_org,
+    default_org_at,
+    org_registry,
+    org_scoped,
+    site_api_url,
+    use_org,
+)
+from tests.fake_datadog import FakeDatadogConfig, FakeDatadogServer
+
+
+def eu_org(url):
+    return patch.dict(org_registry._orgs, {"eu": Org("eu", url, "eu_key", "eu_app")})
+
+
+class TestOrgRegistry:
+    """Test org configuration and selection"""
+
+    def test_site_api_url(self):
+        """Test API URLs of Datadog sites"""
+        assert site_api_url("datadoghq.eu") == "https://api.datadoghq.eu"
+        assert site_api_url("us5.datadoghq.com") == "https://api.us5.datadoghq.com"
+
+    def test_from_env(self):
+        """Test orgs configured through suffixed variables; incomplete ones are skipped"""
+        env = {
+            "DD_MCP_ORGS": "eu, us-3, broken",
+            "DD_API_KEY_EU": "k1", "DD_APP_KEY_EU": "a1", "DD_SITE_EU": "datadoghq.eu",
+            "DD_API_KEY_US_3": "k2", "DD_APP_KEY_US_3": "a2", "DD_API_URL_US_3": "http://127.0.0.1:9/",
+            "DD_API_KEY_BROKEN": "k3",
+        }
+        with patch.dict(os.environ, env):
+            registry = OrgRegistry.from_env()
+        assert registry.names() == ["default", "eu", "us-3"]
+        assert registry.get("eu").api_url == "https://api.datadoghq.eu"
+        assert registry.get("us-3").api_url == "http://127.0.0.1:9"
+        with pytest.raises(UnknownOrgError, match="configured orgs: default, eu, us-3"):
+            registry.get("broken")
+
+    def test_use_org(self):
+        """Test that the selected org is current only inside the block"""
+        with eu_org("http://eu"):
+            with use_org("eu") as org:
+                assert current_org() is org
+                assert org_scoped("spans") == "eu:spans"
+                eu_scope = datadog_client._cache_scope()
+            with use_org("default"):
+                assert current_org() is None
+                assert org_scoped("spans") == "spans"
+                assert datadog_client._cache_scope() != eu_scope
+        assert current_org() is None
+        with pytest.raises(UnknownOrgError):
+            with use_org("eu"):
+                pass
+
+    def test_settings_are_computed_once(self):
+        """Test that headers are precomputed and the SDK configuration is reused per org"""
+        org = Org("eu", "https://api.datadoghq.eu", "k", "a")
+        assert org.json_headers == {"Content-Type": "application/json", "DD-API-KEY": "k", "DD-APPLICATION-KEY": "a"}
+        with pytest.raises(TypeError):
+            org.headers["DD-API-KEY"] = "other"
+
+        with patch.dict(org_registry._orgs, {"eu": org}), use_org("eu"):
+            first = datadog_client.get_datadog_configuration()
+            second = datadog_client.get_datadog_configuration()
+        assert first is not second
+        assert first.api_key is second.api_key
+        assert first.host == "https://api.datadoghq.eu"
+        assert first.api_key["apiKeyAuth"] == "k"
+        assert first.request_timeout is not None
+
+
+class TestOrgToolCalls:
+    """Test tool calls routed to orgs on separate fake APIs"""
+
+    @pytest.mark.asyncio
+    async def test_calls_go_to_the_named_org(self):
+        """Test that the org argument picks the API, and the default org is unchanged"""
+        config = FakeDatadogConfig(slos=5, family_latency={"slos": 0.05})
+        with FakeDatadogServer(config) as us, FakeDatadogServer(config) as eu:
+            with default_org_at(us.url), eu_org(eu.url):
+                before = single_flight.stats().get("fetch_slos", {}).get("executed", 0)
+                # Identical concurrent calls for different orgs must not share a request
+                await asyncio.gather(
+                    server.handle_call_tool("list_slos", {}),
+                    server.handle_call_tool("list_slos", {"org": "eu"}),
+                )
+                await server.handle_call_tool("list_slos", {"org": "eu"})
+            us_stats, eu_stats = us.stats(), eu.stats()
+        assert single_flight.stats()["fetch_slos"]["executed"] - before == 3
+        assert us_stats["requests"]["slos"] == 1
+        assert eu_stats["requests"]["slos"] == 2
+        # Each org is served over its own connection pool
+        assert us_stats["connections"] == 1
+        assert eu_stats["connections"] == 1
+
+    @pytest.mark.asyncio
+    async def test_breakers_are_per_org(self):
+        """Test that a failing org does not open the default org's breakers"""
+        with FakeDatadogServer(FakeDatadogConfig(slos=5, error_rate=1.0)) as eu, eu_org(eu.url):
+            for _ in range(5):
+                await server.handle_call_tool("list_slos", {"org": "eu"})
+            result = await server.handle_call_tool("list_slos", {"org": "eu"})
+        assert "eu:slos endpoints are failing" in result[0].text
+        states = circuit_breakers.states()
+        assert states["eu:slos"]["state"] == OPEN
+        assert "slos" not in states
+
+    @pytest.mark.asyncio
+    async def test_unknown_org(self):
+        """Test that an unknown org is reported without calling Datadog"""
+        result = await server.handle_call_tool("list_slos", {"org": "mars"})
+        assert result[0].text == "Error: Unknown org 'mars'; configured orgs: default"
+
+    @pytest.mark.asyncio
+    async def test_org_argument_is_listed_when_orgs_are_configured(self):
+        """Test that tools only take an org argument when there is a choice"""
+        tools = await server.handle_list_tools()
+        assert all("org" not in tool.inputSchema.get("properties", {}) for tool in tools)
+        with eu_org("http://eu"):
+            tools = await server.handle_list_tools()
+        for tool in tools:
+            assert tool.inputSchema["properties"]["org"]["enum"] == ["default", "eu"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,157 @@
+"""
+Tests for all_pages listings
+"""
+
+import json
+from unittest.mock import patch
+
+import pytest
+from datadog_mcp.tools import get_teams, list_monitors, list_service_definitions, list_slos
+from datadog_mcp.utils import datadog_client, pagination
+from datadog_mcp.utils.monitor_snapshot import MonitorSnapshot
+from datadog_mcp.utils.orgs import default_org_at
+from datadog_mcp.utils.json_codec import dumps
+from datadog_mcp.utils.pagination import collect_numbered_pages, collect_pages_until_short, fit_items, fit_output
+from tests.fake_datadog import FakeDatadogConfig, FakeDatadogServer
+
+
+def make_request(**arguments):
+    class Request:
+        pass
+
+    request = Request()
+    request.arguments = arguments
+    return request
+
+
+class TestCollectPages:
+    """Test the page collection helpers"""
+
+    @pytest.mark.asyncio
+    async def test_numbered_pages_fetch_rest_after_first(self, fake_datadog):
+        """Test that every page of a page-number endpoint is merged in order"""
+        items, first = await collect_numbered_pages(
+            lambda number: datadog_client.fetch_teams(page_size=10, page_number=number)
+        )
+        assert len(items) == 25
+        assert len({team["id"] for team in items}) == 25
+        assert first["meta"]["pagination"]["total_pages"] == 3
+
+        capped, _ = await collect_numbered_pages(
+            lambda number: datadog_client.fetch_teams(page_size=10, page_number=number), max_items=15
+        )
+        assert len(capped) == 15
+
+    @pytest.mark.asyncio
+    async def test_pages_until_short(self):
+        """Test windowed fetching of a listing without a total"""
+        requested = []
+
+        async def fetch_page(page):
+            requested.append(page)
+            return list(range(page * 10, min(page * 10 + 10, 95)))
+
+        assert await collect_pages_until_short(fetch_page, 10, window=4) == list(range(95))
+        # Page 0 alone, then windows of 4 pages: 1-4 and 5-8; page 9 is the short one
+        assert sorted(requested) == list(range(0, 13))
+
+        requested.clear()
+        assert await collect_pages_until_short(fetch_page, 100, window=4) == list(range(10))
+        assert requested == [0]
+
+    @pytest.mark.asyncio
+    async def test_pages_until_short_respects_max_items(self):
+        """Test that collection stops once enough items are in"""
+        async def fetch_page(page):
+            return [page] * 10
+
+        items = await collect_pages_until_short(fetch_page, 10, max_items=25, window=2)
+        assert items == [0] * 10 + [1] * 10 + [2] * 5
+
+    def test_fit_output(self):
+        """Test cutting text at a line boundary with a note"""
+        text = "\n".join(f"line {i}" for i in range(100))
+        assert fit_output(text, budget=len(text)) == text
+        fitted = fit_output(text, budget=30)
+        assert fitted.startswith("line 0\nline 1\nline 2\nline 3\n")
+        assert "[Output truncated to" in fitted
+        assert "line 5" not in fitted
+
+    def test_fit_items(self):
+        """Test keeping the leading items that fit, so JSON output still parses"""
+        items = [{"id": i, "name": f"item {i}"} for i in range(100)]
+        text, note = fit_items(items, dumps, budget=10_000)
+        assert json.loads(text) == items and note is None
+        text, note = fit_items(items, dumps, budget=300)
+        kept = json.loads(text)
+        assert len(text) <= 300
+        assert kept == items[:len(kept)]
+        assert len(dumps(items[:len(kept) + 1])) > 300
+        assert note.startswith(f"[Output truncated to {len(kept)} of 100 items")
+
+
+class TestAllPagesTools:
+    """Test all_pages in the listing tools"""
+
+    @pytest.mark.asyncio
+    async def test_list_monitors_all_pages(self):
+        """Test that list_monitors merges every page from the API"""
+        config = FakeDatadogConfig(monitors=2500)
+        with FakeDatadogServer(config) as server:
+            with default_org_at(server.url), \
+                    patch.object(list_monitors, "monitor_snapshot", MonitorSnapshot()), \
+                    patch.object(pagination, "OUTPUT_BUDGET", 10_000_000):
+                result = await list_monitors.handle_call(make_request(all_pages=True, format="json"))
+            stats = server.stats()
+        monitors = json.loads(result.content[0].text)
+        assert len(monitors) == 2500
+        assert len({m["id"] for m in monitors}) == 2500
+        assert stats["requests"]["monitors"] <= 1 + 8
+
+    @pytest.mark.asyncio
+    async def test_list_slos_all_pages(self, fake_datadog):
+        """Test that list_slos returns every SLO without paging hints"""
+        result = await list_slos.handle_call(make_request(all_pages=True, format="table"))
+        text = result.content[0].text
+        assert "| Total: 30\n" in text
+        assert "limit" not in text.split("\n")[0]
+
+    @pytest.mark.asyncio
+    async def test_get_teams_all_pages(self, fake_datadog):
+        """Test that get_teams returns every team, with or without members"""
+        result = await get_teams.handle_call(make_request(all_pages=True, format="json", include_members=False))
+        text = result.content[0].text
+        assert text.startswith("Found 25 team(s) total\n")
+        assert "page_number=" not in text
+
+        detailed = await get_teams.handle_call(make_request(all_pages=True, format="detailed"))
+        assert detailed.content[0].text.count("Members") >= 25
+
+    @pytest.mark.asyncio
+    async def test_list_service_definitions_all_pages(self, fake_datadog):
+        """Test that list_service_definitions merges every page"""
+        result = await list_service_definitions.handle_call(make_request(all_pages=True, format="json"))
+        assert len(json.loads(result.content[0].text)["data"]) == 45
+
+        table = await list_service_definitions.handle_call(make_request(all_pages=True))
+        assert "| All pages (45 shown)" in table.content[0].text
+        assert "next page" not in table.content[0].text
+
+    @pytest.mark.asyncio
+    async def test_json_output_is_held_to_the_budget(self, fake_datadog):
+        """Test that all_pages JSON is cut to whole items within DD_MCP_OUTPUT_BUDGET"""
+        with patch.object(pagination, "OUTPUT_BUDGET", 2000), patch.object(get_teams, "OUTPUT_BUDGET", 2000):
+            slos = await list_slos.handle_call(make_request(all_pages=True, format="json"))
+            definitions = await list_service_definitions.handle_call(make_request(all_pages=True, format="json"))
+            teams = await get_teams.handle_call(make_request(all_pages=True, format="json", include_members=False))
+        for result in (slos, definitions, teams):
+            text = result.content[0].text
+            assert len(text) <= 2000
+            assert result.content[1].text.startswith("[Output truncated to")
+        assert 0 < len(json.loads(slos.content[0].text)) < 30
+        assert 0 < len(json.loads(definitions.content[0].text)["data"]) < 45
+        assert teams.content[0].text.startswith("Found 25 team(s) total\n")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
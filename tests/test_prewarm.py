@@ -0,0 +1,110 @@
+"""
+Tests for the background prewarm of connections and catalogs
+"""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from datadog_mcp import server
+from datadog_mcp.utils import prewarm as prewarm_module
+from datadog_mcp.utils import response_cache
+from datadog_mcp.utils.orgs import default_org_at
+from datadog_mcp.utils.prewarm import CATALOGS, Prewarmer
+from datadog_mcp.utils.response_cache import ResponseCache
+from tests.fake_datadog import FakeDatadogConfig, FakeDatadogServer
+
+
+@pytest.fixture
+def memory_cache():
+    """Enable an in-memory response cache for one test"""
+    cache = ResponseCache(":memory:")
+    with patch.object(response_cache, "_cache", cache):
+        yield cache
+    cache.close()
+
+
+class TestPrewarm:
+    """Test what the prewarm fetches and how it yields to tool calls"""
+
+    @pytest.mark.asyncio
+    async def test_handshake_starts_prewarm_of_catalogs(self, memory_cache):
+        """Test that the initialized notification warms connections and every catalog"""
+        warm = Prewarmer(catalogs=list(CATALOGS), connections=2)
+        with FakeDatadogServer(FakeDatadogConfig(teams=5)) as fake, default_org_at(fake.url), \
+                patch.object(prewarm_module, "MONITOR_SNAPSHOT_INTERVAL", 0), \
+                patch.object(server, "prewarmer", warm):
+            await server.handle_initialized(None)
+            await warm.wait()
+            warmed = fake.stats()
+            result = await server.handle_call_tool("list_service_definitions", {})
+            after = fake.stats()
+        assert warmed["requests"] == {
+            "other": 2, "metrics_catalog": 2, "teams": 1, "service_definitions": 1, "monitors": 1,
+        }
+        assert warm.stats()["failed"] == []
+        assert set(warm.stats()["steps"]) == {"connections", *CATALOGS}
+        # The tool call was answered from the prewarmed cache
+        assert "Error" not in result[0].text
+        assert after["requests"] == warmed["requests"]
+
+    @pytest.mark.asyncio
+    async def test_prewarm_waits_for_tool_calls(self, memory_cache):
+        """Test that no prewarm request is sent while a tool call is in progress"""
+        warm = Prewarmer(catalogs=["teams"], connections=1)
+        with FakeDatadogServer(FakeDatadogConfig(teams=5)) as fake, default_org_at(fake.url):
+            with warm.interactive():
+                warm.start()
+                await asyncio.sleep(0.2)
+                assert fake.stats()["requests"] == {}
+            await warm.wait()
+            stats = fake.stats()
+        assert stats["requests"] == {"other": 1, "teams": 1}
+        assert warm.stats()["paused_s"] >= 0.2
+
+    @pytest.mark.asyncio
+    async def test_tool_call_joins_prewarm_in_flight(self, memory_cache):
+        """Test that a tool call asking for a catalog being prewarmed awaits that request"""
+        warm = Prewarmer(catalogs=["teams"], connections=0)
+        config = FakeDatadogConfig(teams=5, family_latency={"teams": 0.3})
+        with FakeDatadogServer(config) as fake, default_org_at(fake.url):
+            warm.start()
+            await asyncio.sleep(0.1)
+            result = await server.handle_call_tool("get_teams", {"include_members": False})
+            await warm.wait()
+            stats = fake.stats()
+        assert "team" in result[0].text.lower()
+        assert stats["requests"] == {"teams": 1}
+
+    @pytest.mark.asyncio
+    async def test_only_connections_without_response_cache(self):
+        """Test that catalogs are not fetched when nothing would keep them"""
+        warm = Prewarmer(catalogs=list(CATALOGS), connections=2)
+        with FakeDatadogServer(FakeDatadogConfig(teams=5)) as fake, default_org_at(fake.url):
+            warm.start()
+            await warm.wait()
+            stats = fake.stats()
+        assert stats["requests"] == {"other": 2}
+        assert set(warm.stats()["steps"]) == {"connections"}
+
+    def test_monitors_skipped_while_snapshot_runs(self, memory_cache):
+        """Test that the monitor snapshot, when on, is left to warm the default org's monitors"""
+        warm = Prewarmer(catalogs=["teams", "monitors"], connections=0)
+        with patch.object(prewarm_module, "MONITOR_SNAPSHOT_INTERVAL", 120):
+            assert [step for step, _ in warm._steps()] == ["teams"]
+        with patch.object(prewarm_module, "MONITOR_SNAPSHOT_INTERVAL", 0):
+            assert [step for step, _ in warm._steps()] == ["teams", "monitors"]
+
+    def test_catalogs_from_env(self):
+        """Test that DD_MCP_PREWARM picks catalogs and is off by default"""
+        with patch.dict("os.environ", {"DD_MCP_PREWARM": "teams, Metrics, bogus"}):
+            assert prewarm_module._catalogs_from_env() == ["metrics", "teams"]
+        with patch.dict("os.environ", {"DD_MCP_PREWARM": "all"}):
+            assert prewarm_module._catalogs_from_env() == list(CATALOGS)
+        with patch.dict("os.environ", {"DD_MCP_PREWARM": ""}):
+            assert prewarm_module._catalogs_from_env() == []
+        assert not Prewarmer(catalogs=[]).enabled
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
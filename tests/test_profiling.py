@@ -0,0 +1,186 @@
+"""
+Tests for opt-in slow tool call profiling
+"""
+
+import json
+import threading
+import time
+import tracemalloc
+import pytest
+from unittest.mock import patch, AsyncMock, MagicMock
+from datadog_mcp.utils import profiling
+from datadog_mcp.utils.profiling import CallProfile, phase, profile_tool_call, write_capture
+
+
+@pytest.fixture(autouse=True)
+def stop_tracemalloc():
+    """Stop tracemalloc if a profiled call started it"""
+    was_tracing = tracemalloc.is_tracing()
+    yield
+    if not was_tracing and tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+class TestPhaseTracking:
+    """Test phase breakdown accounting"""
+
+    def test_phase_outside_profiled_call_is_noop(self):
+        """Test that phase() does nothing when no call is being profiled"""
+        with phase("fetch"):
+            pass
+
+    @pytest.mark.asyncio
+    async def test_nested_phases_are_exclusive(self):
+        """Test that time in a nested phase is not double counted"""
+        with patch.object(profiling, "PROFILE_THRESHOLD_MS", 100000.0):
+            async with profile_tool_call("get_traces", {}) as call:
+                with phase("fetch"):
+                    time.sleep(0.01)
+                    with phase("parse"):
+                        time.sleep(0.02)
+                with phase("format"):
+                    time.sleep(0.01)
+
+        assert set(call.phases) == {"fetch", "parse", "format"}
+        assert call.phases["parse"] >= 20
+        # fetch only includes its own time, not the nested parse
+        assert call.phases["fetch"] < call.phases["parse"]
+        assert sum(call.phases.values()) <= call.duration_ms
+
+
+class TestSlowCallCapture:
+    """Test capture of calls exceeding the threshold"""
+
+    @pytest.mark.asyncio
+    async def test_disabled_by_default(self, tmp_path):
+        """Test that nothing is profiled without a threshold"""
+        with patch.object(profiling, "PROFILE_THRESHOLD_MS", None), \
+             patch.object(profiling, "PROFILE_DIR", str(tmp_path)):
+            async with profile_tool_call("get_logs", {}) as call:
+                pass
+
+        assert call is None
+        assert list(tmp_path.iterdir()) == []
+
+    @pytest.mark.asyncio
+    async def test_slow_call_is_captured(self, tmp_path):
+        """Test that a call above the threshold writes a report and profile"""
+        with patch.object(profiling, "PROFILE_THRESHOLD_MS", 0.0), \
+             patch.object(profiling, "PROFILE_DIR", str(tmp_path)):
+            async with profile_tool_call("get_logs", {"limit": 1000}):
+                with phase("extract"):
+                    sum(range(1000))
+
+        reports = list(tmp_path.glob("*.json"))
+        assert len(reports) == 1
+        assert len(list(tmp_path.glob("*.prof"))) == 1
+
+        report = json.loads(reports[0].read_text())
+        assert report["tool"] == "get_logs"
+        assert report["arguments"] == {"limit": 1000}
+        assert "extract" in report["phases_ms"]
+        assert report["memory"]["peak_bytes"] is not None
+        assert report["top_functions"]
+
+    @pytest.mark.asyncio
+    async def test_capture_is_written_off_the_event_loop(self, tmp_path):
+        """Test that the report and profile are written in a worker thread"""
+        threads = []
+        write = profiling.write_capture
+
+        def recording_write(call):
+            threads.append(threading.current_thread())
+            return write(call)
+
+        with patch.object(profiling, "PROFILE_THRESHOLD_MS", 0.0), \
+             patch.object(profiling, "PROFILE_DIR", str(tmp_path)), \
+             patch.object(profiling, "write_capture", recording_write):
+            async with profile_tool_call("get_logs", {}):
+                pass
+
+        assert threads and threads[0] is not threading.current_thread()
+        report = json.loads(next(tmp_path.glob("*.json")).read_text())
+        assert report["memory"]["top_allocations"]
+
+    @pytest.mark.asyncio
+    async def test_fast_call_is_not_captured(self, tmp_path):
+        """Test that calls below the threshold leave no files"""
+        with patch.object(profiling, "PROFILE_THRESHOLD_MS", 60000.0), \
+             patch.object(profiling, "PROFILE_DIR", str(tmp_path)):
+            async with profile_tool_call("get_logs", {}):
+                pass
+
+        assert list(tmp_path.iterdir()) == []
+
+    @pytest.mark.asyncio
+    async def test_tracemalloc_runs_only_during_profiled_calls(self, tmp_path):
+        """Test that tracemalloc is stopped after a capture unless it was tracing before"""
+        with patch.object(profiling, "PROFILE_THRESHOLD_MS", 0.0), \
+             patch.object(profiling, "PROFILE_DIR", str(tmp_path)):
+            tracemalloc.stop()
+            async with profile_tool_call("get_logs", {}):
+                assert tracemalloc.is_tracing()
+            assert not tracemalloc.is_tracing()
+
+            tracemalloc.start()
+            async with profile_tool_call("get_logs", {}):
+                pass
+            assert tracemalloc.is_tracing()
+            tracemalloc.stop()
+
+    def test_invalid_threshold_turns_profiling_off(self):
+        """Test that a threshold that is not a number is read once, with a warning"""
+        with patch.dict("os.environ", {"DD_MCP_PROFILE_THRESHOLD_MS": "abc"}), \
+             patch.object(profiling.logger, "warning") as warning:
+            assert profiling._threshold_from_env() is None
+        assert "DD_MCP_PROFILE_THRESHOLD_MS='abc'" in warning.call_args.args[0]
+        with patch.dict("os.environ", {"DD_MCP_PROFILE_THRESHOLD_MS": "250"}):
+            assert profiling._threshold_from_env() == 250.0
+        with patch.dict("os.environ", {"DD_MCP_PROFILE_THRESHOLD_MS": ""}):
+            assert profiling._threshold_from_env() is None
+
+    def test_captures_are_rotated(self, tmp_path):
+        """Test that only the newest captures are kept"""
+        for i in range(5):
+            call = CallProfile(f"tool_{i}")
+            call.duration_ms = 10
+            write_capture(call, directory=str(tmp_path), keep=3)
+            time.sleep(0.01)
+
+        reports = sorted(p.name for p in tmp_path.glob("*.json"))
+        assert len(reports) == 3
+        assert not any("tool_0" in name or "tool_1" in name for name in reports)
+
+
+class TestServerIntegration:
+    """Test profiling hook in the server dispatcher"""
+
+    @pytest.mark.asyncio
+    async def test_server_captures_slow_tool_call(self, tmp_path):
+        """Test that handle_call_tool profiles tool handlers"""
+        from datadog_mcp.server import TOOLS, handle_call_tool
+        from mcp.types import TextContent, Tool
+
+        mock_result = MagicMock()
+        mock_result.content = [TextContent(type="text", text="ok")]
+
+        original_tools = TOOLS.copy()
+        TOOLS["slow_tool"] = {
+            "definition": lambda: Tool(name="slow_tool", description="Slow tool", inputSchema={}),
+            "handler": AsyncMock(return_value=mock_result),
+        }
+
+        try:
+            with patch.object(profiling, "PROFILE_THRESHOLD_MS", 0.0), \
+                 patch.object(profiling, "PROFILE_DIR", str(tmp_path)):
+                result = await handle_call_tool("slow_tool", {})
+        finally:
+            TOOLS.clear()
+            TOOLS.update(original_tools)
+
+        assert result[0].text == "ok"
+        assert len(list(tmp_path.glob("*slow_tool*.json"))) == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,95 @@
+"""
+Tests for the span and log record types
+"""
+
+import json
+
+import pytest
+from datadog_mcp.utils.formatters import extract_log_info, extract_trace_info
+from datadog_mcp.utils.records import LogRecord, SpanRecord
+
+
+def make_span_event():
+    return {
+        "attributes": {
+            "trace_id": "t1",
+            "span_id": "s1",
+            "parent_id": "0",
+            "service": "web-api",
+            "resource_name": "GET /users",
+            "operation_name": "http.request",
+            "duration": 2_500_000,
+            "start_timestamp": "2023-01-01T12:00:00.000Z",
+            "status": "ok",
+            "env": "prod",
+            "tags": ["env:prod"],
+            "@http.status_code": 200,
+        }
+    }
+
+
+class TestSpanRecord:
+    """Test SpanRecord mapping behaviour"""
+
+    def test_reads_like_a_dict(self):
+        """Test that spans support the dict access the formatters use"""
+        span = extract_trace_info([make_span_event()])[0]
+        assert isinstance(span, SpanRecord)
+        assert span["service"] == "web-api"
+        assert span.get("duration_ms") == 2.5
+        assert span.get("missing", "default") == "default"
+        assert "custom_attributes" in span and "missing" not in span
+        with pytest.raises(KeyError):
+            span["missing"]
+
+    def test_to_dict(self):
+        """Test that JSON output keeps the original keys, in order"""
+        span = extract_trace_info([make_span_event()])[0]
+        data = span.to_dict()
+        assert list(data) == [
+            "trace_id", "span_id", "parent_id", "service", "resource_name", "operation_name",
+            "duration_ns", "duration_ms", "start_timestamp", "status", "error", "env", "tags",
+            "custom_attributes",
+        ]
+        assert data["custom_attributes"] == {"@http.status_code": 200}
+        assert json.loads(json.dumps(data)) == data
+        assert span == data
+
+    def test_uses_slots(self):
+        """Test that records carry no per-instance dict"""
+        span = extract_trace_info([make_span_event()])[0]
+        assert not hasattr(span, "__dict__")
+
+
+class TestLogRecord:
+    """Test LogRecord mapping behaviour"""
+
+    def test_core_and_extra_fields(self):
+        """Test that extra fields follow the core fields"""
+        log = LogRecord("2023-01-01T12:00:00Z", "info", "web-api", "host-1", "hello", {"tags": "env:prod"})
+        assert list(log) == ["timestamp", "level", "service", "host", "message", "tags"]
+        assert log["tags"] == "env:prod"
+        assert log.get("attr_x") is None
+        assert len(log) == 6
+        with pytest.raises(KeyError):
+            log["attr_x"]
+
+    def test_extra_overrides_core_field(self):
+        """Test that an extracted level attribute replaces the status-derived level"""
+        log = LogRecord("", "info", "", "", "", {"level": "WARN", "duration": "5"})
+        assert log["level"] == "WARN"
+        assert log.to_dict() == {
+            "timestamp": "", "level": "WARN", "service": "", "host": "", "message": "", "duration": "5",
+        }
+
+    def test_without_extra(self):
+        """Test a log with only core fields"""
+        log = extract_log_info([{"attributes": {"message": "hi"}}])[0]
+        assert log.to_dict() == {
+            "timestamp": "", "level": "unknown", "service": "unknown", "host": "unknown", "message": "hi",
+        }
+        assert log.items() == list(log.to_dict().items())
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,283 @@
+"""
+Tests for the persistent response cache
+"""
+
+import asyncio
+import threading
+import time
+from unittest.mock import patch
+
+import httpx
+import pytest
+from datadog_mcp import server
+from datadog_mcp.utils import datadog_client, response_cache
+from datadog_mcp.utils.json_codec import JsonProjection
+from datadog_mcp.utils.orgs import default_org_at
+from datadog_mcp.utils.response_cache import ResponseCache, cached, collect_stale_notes
+
+
+@pytest.fixture
+def memory_cache():
+    """Enable an in-memory response cache for one test"""
+    cache = ResponseCache(":memory:")
+    with patch.object(response_cache, "_cache", cache):
+        yield cache
+    cache.close()
+
+
+class TestResponseCache:
+    """Test storage, expiry, versioning and eviction"""
+
+    def test_set_and_get(self, tmp_path):
+        """Test that values round-trip with their age"""
+        cache = ResponseCache(str(tmp_path / "cache.db"))
+        cache.set("k", {"data": [1, 2]}, ttl=60)
+        entry = cache.get("k")
+        assert entry.value == {"data": [1, 2]}
+        assert entry.fresh
+        assert 0 <= entry.age < 5
+        assert cache.get("missing") is None
+
+    def test_expired_entries_are_not_fresh(self, tmp_path):
+        """Test the per-entry TTL"""
+        cache = ResponseCache(str(tmp_path / "cache.db"))
+        cache.set("k", [1], ttl=-1)
+        assert not cache.get("k").fresh
+
+    def test_values_of_one_function_and_scope(self, tmp_path):
+        """Test that only the named function's values within the scope are read"""
+        cache = ResponseCache(str(tmp_path / "cache.db"))
+        cache.set("fetch_teams/1|us|('a',)", "us-a", ttl=60)
+        cache.set("fetch_teams/2|us|('b',)", "us-b", ttl=-1)
+        cache.set("fetch_teams/1|eu|('a',)", "eu-a", ttl=60)
+        cache.set("fetch_teams_memberships/1|us|('a',)", "memberships", ttl=60)
+        cache.set("fetch_team/1|us|('a',)", "team", ttl=60)
+        assert sorted(cache.values_of("fetch_teams", "us")) == ["us-a", "us-b"]
+
+    def test_survives_restart(self, tmp_path):
+        """Test that a new process starts warm from the same file"""
+        path = str(tmp_path / "cache.db")
+        first = ResponseCache(path)
+        first.set("k", ["warm"], ttl=60)
+        first.set("stale", ["recently expired"], ttl=-1)
+        first.set("old", ["expired"], ttl=-100_000)
+        first.close()
+
+        second = ResponseCache(path)
+        assert second.get("k").value == ["warm"]
+        assert not second.get("stale").fresh  # kept for serving stale data
+        assert second.get("old") is None  # dropped on open, past any staleness window
+        assert len(second) == 2
+
+    def test_other_versions_are_ignored(self, tmp_path):
+        """Test that entries written by another version are not served"""
+        path = str(tmp_path / "cache.db")
+        ResponseCache(path, version="1/old").set("k", [1], ttl=60)
+        cache = ResponseCache(path, version="1/new")
+        assert cache.get("k") is None
+        assert len(cache) == 0
+
+    def test_size_cap_evicts_least_recently_used(self, tmp_path):
+        """Test eviction beyond the size cap"""
+        cache = ResponseCache(str(tmp_path / "cache.db"), max_bytes=200)
+        cache.set("a", "x" * 40, ttl=60)
+        time.sleep(0.01)
+        cache.set("b", "x" * 40, ttl=60)
+        time.sleep(0.01)
+        cache.get("a")  # now more recently used than b
+        time.sleep(0.01)
+        for key in "cde":
+            cache.set(key, "x" * 40, ttl=60)
+        assert cache.size <= 200
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+
+    def test_oversized_values_are_skipped(self, tmp_path):
+        """Test that one value cannot take over the cache"""
+        cache = ResponseCache(str(tmp_path / "cache.db"), max_bytes=400)
+        cache.set("big", "x" * 200, ttl=60)
+        assert cache.get("big") is None
+
+
+class TestCachedFetches:
+    """Test catalog fetches through the cache"""
+
+    @pytest.mark.asyncio
+    async def test_catalog_fetches_are_served_from_cache(self, fake_datadog, memory_cache):
+        """Test that repeated catalog fetches do not reach the API"""
+        before = fake_datadog.stats()["requests"].get("teams", 0)
+        first = await datadog_client.fetch_teams(page_size=10)
+        second = await datadog_client.fetch_teams(page_size=10)
+        assert first == second
+        assert fake_datadog.stats()["requests"]["teams"] == before + 1
+        assert memory_cache.hits == 1
+
+        await datadog_client.fetch_teams(page_size=20)
+        assert fake_datadog.stats()["requests"]["teams"] == before + 2
+
+    @pytest.mark.asyncio
+    async def test_scope_separates_sites(self, fake_datadog, memory_cache):
+        """Test that responses from another API URL are not shared"""
+        await datadog_client.fetch_service_definitions(page_size=5)
+        with default_org_at(fake_datadog.url.replace("127.0.0.1", "localhost")):
+            await datadog_client.fetch_service_definitions(page_size=5)
+        assert memory_cache.hits == 0
+        assert len(memory_cache) == 2
+
+    @pytest.mark.asyncio
+    async def test_projection_is_part_of_the_key(self, fake_datadog, memory_cache):
+        """Test that fetches with different field projections are cached apart"""
+        ids = await datadog_client.fetch_metrics_list(limit=5, fields=JsonProjection(["data.id"]))
+        full = await datadog_client.fetch_metrics_list(limit=5)
+        assert "attributes" not in ids["data"][0]
+        assert full != ids
+        again = await datadog_client.fetch_metrics_list(limit=5, fields=JsonProjection(["data.id"]))
+        assert again == ids
+        assert memory_cache.hits == 1
+
+    @pytest.mark.asyncio
+    async def test_disabled_by_default(self, fake_datadog):
+        """Test that nothing is cached without DD_MCP_CACHE_PATH"""
+        with patch.object(response_cache, "CACHE_PATH", ""):
+            assert response_cache.get_response_cache() is None
+
+    @pytest.mark.asyncio
+    async def test_cache_io_runs_off_the_event_loop(self, memory_cache):
+        """Test that cache reads and writes run in worker threads"""
+        threads = []
+        get, store = memory_cache.get, memory_cache.set
+
+        def recording(method):
+            def record(*args, **kwargs):
+                threads.append(threading.current_thread())
+                return method(*args, **kwargs)
+            return record
+
+        fetch, _ = make_fetch()
+        with patch.object(memory_cache, "get", recording(get)), patch.object(memory_cache, "set", recording(store)):
+            assert await fetch() == "v1"
+            assert await fetch() == "v1"
+        assert len(threads) == 3
+        assert threading.current_thread() not in threads
+
+
+def expire(cache, seconds_ago):
+    cache._db.execute("UPDATE entries SET expires_at = ?", (time.time() - seconds_ago,))
+
+
+def http_error(status):
+    request = httpx.Request("GET", "http://datadog")
+    return httpx.HTTPStatusError("error", request=request, response=httpx.Response(status, request=request))
+
+
+def make_fetch():
+    """A cached fetch whose next outcome the test controls"""
+    state = {"calls": 0, "value": "v1", "error": None, "delay": 0.0}
+
+    @cached(ttl=60)
+    async def fetch_catalog(name="x"):
+        state["calls"] += 1
+        await asyncio.sleep(state["delay"])
+        if state["error"] is not None:
+            raise state["error"]
+        return state["value"]
+
+    return fetch_catalog, state
+
+
+class TestStaleServing:
+    """Test stale-while-revalidate and stale-if-error"""
+
+    @pytest.mark.asyncio
+    async def test_stale_while_revalidate(self, memory_cache):
+        """Test that a recently expired entry is served at once and refreshed in the background"""
+        fetch, state = make_fetch()
+        assert await fetch() == "v1"
+        expire(memory_cache, 10)
+        state["value"] = "v2"
+
+        with collect_stale_notes() as notes:
+            assert await fetch() == "v1"
+        assert len(notes) == 1 and "fetch_catalog data is" in notes[0] and "background" in notes[0]
+
+        await asyncio.sleep(0.01)
+        assert state["calls"] == 2
+        assert await fetch() == "v2"
+
+    @pytest.mark.asyncio
+    async def test_monitors_are_not_revalidated_in_the_background(self, fake_datadog, memory_cache):
+        """Test that expired monitor pages are fetched again, so alert states are current"""
+        await datadog_client.fetch_monitors()
+        before = fake_datadog.stats()["requests"]["monitors"]
+        expire(memory_cache, 10)
+        with collect_stale_notes() as notes:
+            await datadog_client.fetch_monitors()
+        assert notes == []
+        assert fake_datadog.stats()["requests"]["monitors"] == before + 1
+
+    @pytest.mark.asyncio
+    async def test_stale_if_error(self, memory_cache):
+        """Test that an older entry is served when Datadog fails, and the failure shown"""
+        fetch, state = make_fetch()
+        await fetch()
+        expire(memory_cache, 1000)
+        state["error"] = http_error(503)
+
+        with collect_stale_notes() as notes:
+            assert await fetch() == "v1"
+        assert "Datadog request failed" in notes[0]
+        assert memory_cache.stale_hits == 1
+
+    @pytest.mark.asyncio
+    async def test_stale_if_slow(self, memory_cache):
+        """Test that a slow fetch falls back to stale data and still updates the cache"""
+        fetch, state = make_fetch()
+        await fetch()
+        expire(memory_cache, 1000)
+        state["value"], state["delay"] = "v2", 0.1
+
+        with patch.object(response_cache, "CACHE_STALE_TIMEOUT", 0.01), collect_stale_notes() as notes:
+            assert await fetch() == "v1"
+        assert "did not respond" in notes[0]
+        await asyncio.sleep(0.15)
+        state["delay"] = 0
+        assert await fetch() == "v2"
+        assert state["calls"] == 2
+
+    @pytest.mark.asyncio
+    async def test_client_errors_and_old_entries_are_not_masked(self, memory_cache):
+        """Test that 4xx errors and entries past the staleness window raise"""
+        fetch, state = make_fetch()
+        await fetch()
+        expire(memory_cache, 1000)
+        state["error"] = http_error(403)
+        with pytest.raises(httpx.HTTPStatusError):
+            await fetch()
+
+        expire(memory_cache, 100_000)
+        state["error"] = http_error(503)
+        with pytest.raises(httpx.HTTPStatusError):
+            await fetch()
+
+    @pytest.mark.asyncio
+    async def test_tool_output_is_marked(self, memory_cache):
+        """Test that tool output says when it was built from stale data"""
+        fetch, state = make_fetch()
+        await fetch()
+        expire(memory_cache, 10)
+
+        class Result:
+            def __init__(self, text):
+                self.content = [server.TextContent(type="text", text=text)]
+
+        async def handler(request):
+            return Result(await fetch())
+
+        with patch.dict(server.TOOLS, {"catalog": {"definition": None, "handler": handler}}):
+            content = await server.handle_call_tool("catalog", {})
+        assert content[0].text.startswith("Stale data: fetch_catalog data is")
+        assert content[1].text == "v1"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
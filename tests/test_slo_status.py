@@ -0,0 +1,151 @@
+"""
+Tests for the SLO status tool and the request fan-out it uses
+"""
+
+import json
+
+import httpx
+import pytest
+from datadog_mcp.tools import slo_status
+from datadog_mcp.utils import datadog_client
+from datadog_mcp.utils.fanout import fan_out, retry_after
+from datadog_mcp.utils.orgs import default_org_at
+from tests.fake_datadog import FakeDatadogConfig, FakeDatadogServer
+
+
+def make_slo(target=99.9, warning=99.95):
+    return {
+        "id": "abc",
+        "name": "web availability",
+        "type": "metric",
+        "tags": ["team:web"],
+        "thresholds": [
+            {"timeframe": "7d", "target": 99.0},
+            {"timeframe": "30d", "target": target, "warning": warning},
+        ],
+    }
+
+
+def make_request(**arguments):
+    class Request:
+        pass
+
+    request = Request()
+    request.arguments = arguments
+    return request
+
+
+class TestSloStatus:
+    """Test SLI, error budget and burn rate computation"""
+
+    def test_breached_slo(self):
+        """Test an SLO that used more than its error budget"""
+        status = slo_status._slo_status(make_slo(), {"overall": {"sli_value": 99.8}}, "30d")
+        assert status["status"] == "breached"
+        assert status["target"] == 99.9
+        assert status["error_budget_remaining"] == pytest.approx(-100.0)
+        assert status["burn_rate"] == pytest.approx(2.0)
+
+    def test_warning_and_ok_slos(self):
+        """Test the warning threshold and a healthy SLO"""
+        assert slo_status._slo_status(make_slo(), {"overall": {"sli_value": 99.92}}, "30d")["status"] == "warning"
+        healthy = slo_status._slo_status(make_slo(), {"overall": {"sli_value": 99.975}}, "30d")
+        assert healthy["status"] == "ok"
+        assert healthy["error_budget_remaining"] == pytest.approx(75.0)
+        assert healthy["burn_rate"] == pytest.approx(0.25)
+
+    def test_threshold_follows_timeframe(self):
+        """Test that the threshold of the requested timeframe is used"""
+        status = slo_status._slo_status(make_slo(), {"overall": {"sli_value": 99.5}}, "7d")
+        assert status["target"] == 99.0
+        assert status["status"] == "ok"
+
+    def test_missing_data_and_errors(self):
+        """Test SLOs without an SLI and SLOs whose history could not be fetched"""
+        assert slo_status._slo_status(make_slo(), {"overall": {}}, "30d")["status"] == "no data"
+        failed = slo_status._slo_status(make_slo(), RuntimeError("boom"), "30d")
+        assert failed["status"] == "error"
+        assert failed["error"] == "boom"
+
+    @pytest.mark.asyncio
+    async def test_tool_reports_every_slo(self, fake_datadog):
+        """Test the tool against the fake API, worst SLOs first"""
+        result = await slo_status.handle_call(make_request(format="json", limit=1000))
+        assert not result.isError
+        statuses = json.loads(result.content[0].text)
+        assert len(statuses) == 30
+        assert all(s["sli"] is not None for s in statuses)
+        order = [slo_status.STATUS_ORDER.index(s["status"]) for s in statuses]
+        assert order == sorted(order)
+
+        summary = await slo_status.handle_call(make_request(format="summary", timeframe="7d"))
+        assert summary.content[0].text.startswith("Status of 30 SLOs over 7d")
+
+    @pytest.mark.asyncio
+    async def test_unknown_timeframe(self):
+        """Test that an unsupported timeframe is reported as an error"""
+        result = await slo_status.handle_call(make_request(timeframe="1y"))
+        assert result.isError
+        assert "Unsupported timeframe" in result.content[0].text
+
+
+class TestFanOut:
+    """Test bounded, rate-limit-aware fan-out"""
+
+    def test_retry_after(self):
+        """Test reading the pause from throttled responses only"""
+        def error(status, headers):
+            request = httpx.Request("GET", "http://x")
+            response = httpx.Response(status, headers=headers, request=request)
+            return httpx.HTTPStatusError("error", request=request, response=response)
+
+        assert retry_after(error(429, {"Retry-After": "3"})) == 3.0
+        assert retry_after(error(429, {"X-RateLimit-Reset": "7"})) == 7.0
+        assert retry_after(error(429, {})) == 1.0
+        assert retry_after(error(500, {"Retry-After": "3"})) is None
+        assert retry_after(ValueError()) is None
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded(self):
+        """Test that no more than the given number of requests are in flight"""
+        config = FakeDatadogConfig(slos=20, family_latency={"slos": 0.05})
+        with FakeDatadogServer(config) as server:
+            with default_org_at(server.url):
+                slos = await datadog_client.fetch_slos(limit=1000)
+                results = await fan_out(
+                    slos, lambda slo: datadog_client.fetch_slo_history(slo["id"], 0, 100), concurrency=4
+                )
+            stats = server.stats()
+        assert len(results) == 20
+        assert all(isinstance(r, dict) for r in results)
+        assert stats["max_in_flight"] == 4
+
+    @pytest.mark.asyncio
+    async def test_throttled_requests_are_retried(self):
+        """Test that 429 responses pause the fan-out and are retried"""
+        config = FakeDatadogConfig(slos=8, rate_limit=5, rate_limit_period=1)
+        with FakeDatadogServer(config) as server:
+            with default_org_at(server.url):
+                slos = await datadog_client.fetch_slos(limit=1000)
+                results = await fan_out(
+                    slos, lambda slo: datadog_client.fetch_slo_history(slo["id"], 0, 100)
+                )
+            stats = server.stats()
+        assert all(isinstance(r, dict) for r in results)
+        assert stats["throttled"]["slos"] > 0
+
+    @pytest.mark.asyncio
+    async def test_failures_are_returned_in_place(self):
+        """Test that a failed item does not fail the others"""
+        async def call(item):
+            if item == 2:
+                raise RuntimeError("boom")
+            return item * 10
+
+        results = await fan_out([1, 2, 3], call)
+        assert results[0] == 10 and results[2] == 30
+        assert isinstance(results[1], RuntimeError)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,35 @@
+"""
+Tests for the text output builder
+"""
+
+import pytest
+from datadog_mcp.utils.text_writer import TextWriter
+
+
+class TestTextWriter:
+    """Test TextWriter output"""
+
+    def test_write_and_lines(self):
+        """Test appending raw text, single lines and several lines"""
+        out = TextWriter().write("a", "b").line(" c").lines(["d", "e"]).line()
+        assert out.getvalue() == "ab c\nd\ne\n\n"
+
+    def test_heading_underlines_last_line(self):
+        """Test that headings are underlined to the length of their last line"""
+        out = TextWriter().heading("Metrics | Total: 3\nNext cursor: abc")
+        assert out.getvalue() == "Metrics | Total: 3\nNext cursor: abc\n" + "=" * 16 + "\n\n"
+
+    def test_heading_custom_underline(self):
+        """Test a heading with a different underline character"""
+        assert TextWriter().heading("Title", "-").getvalue() == "Title\n-----\n\n"
+
+    def test_getvalue_is_repeatable(self):
+        """Test that reading the output does not reset the writer"""
+        out = TextWriter().write("x")
+        assert out.getvalue() == "x"
+        out.write("y")
+        assert out.getvalue() == "xy"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -337,6 +337,122 @@ class TestTraceFormatting:
         assert parsed["traces"][0]["service"] == "web-api"
 
 
+def make_span(span_id, parent_id, operation, start_ms, duration_ms, service="web-api", resource="", error=0):
+    return {
+        "span_id": span_id,
+        "parent_id": parent_id,
+        "service": service,
+        "operation_name": operation,
+        "resource_name": resource,
+        "duration_ns": int(duration_ms * 1_000_000),
+        "duration_ms": duration_ms,
+        "start_timestamp": f"2023-01-01T12:00:00.{start_ms:03d}Z",
+        "status": "ok",
+        "error": error,
+    }
+
+
+class TestTraceHierarchy:
+    """Test the trace hierarchy formatter"""
+
+    def test_empty(self):
+        """Test that no spans gives a placeholder"""
+        from datadog_mcp.utils.formatters import format_traces_as_hierarchy
+
+        assert format_traces_as_hierarchy([]) == "No traces found"
+
+    def test_children_ordered_by_start(self):
+        """Test that children are listed by start time, not input order"""
+        from datadog_mcp.utils.formatters import format_traces_as_hierarchy
+
+        output = format_traces_as_hierarchy([
+            make_span("1", "0", "http.request", 0, 100, resource="GET /users"),
+            make_span("3", "1", "second", 50, 10),
+            make_span("2", "1", "first", 10, 10),
+        ])
+        lines = output.splitlines()
+        assert lines[0].startswith("web-api - http.request (100.00ms, self 80.00ms)")
+        assert lines[1] == "  Resource: GET /users"
+        assert "first" in lines[2] and "second" in lines[3]
+
+    def test_self_time_and_critical_path(self):
+        """Test that overlapping children count once and the last-finishing chain is marked"""
+        from datadog_mcp.utils.formatters import format_traces_as_hierarchy
+
+        output = format_traces_as_hierarchy([
+            make_span("1", "0", "http.request", 0, 100),
+            make_span("2", "1", "cache.get", 10, 40),
+            make_span("3", "1", "db.query", 30, 60, service="postgres"),
+        ])
+        assert "(100.00ms, self 20.00ms)" in output
+        assert "cache.get (40.00ms, self 40.00ms) ok \n" in output
+        assert "db.query (60.00ms, self 60.00ms) ok  [critical path]" in output
+        assert "Bottleneck: postgres - db.query (60.00ms self time on the critical path)" in output
+
+    def test_repeated_leaf_siblings_collapse(self):
+        """Test that N+1 style repeated leaf spans are aggregated into one line"""
+        from datadog_mcp.utils.formatters import format_traces_as_hierarchy
+
+        spans = [make_span("1", "0", "http.request", 0, 200)]
+        spans += [
+            make_span(str(10 + i), "1", "db.query", 10 * i, 5 + i, service="postgres",
+                      resource="SELECT 1", error=int(i == 0))
+            for i in range(4)
+        ]
+        output = format_traces_as_hierarchy(spans)
+        assert output.count("db.query") == 1
+        assert ("postgres - db.query ×4 [SELECT 1] (26.00ms total, avg 6.50ms, max 8.00ms) ❌ 1 errors"
+                in output)
+        assert "db.query ×4" not in format_traces_as_hierarchy(spans[:3])
+
+    def test_deep_trace(self):
+        """Test that very deep traces do not hit the recursion limit"""
+        from datadog_mcp.utils.formatters import format_traces_as_hierarchy
+
+        spans = [make_span("0", None, "op", 0, 10)]
+        spans += [make_span(str(i), str(i - 1), "op", 0, 10) for i in range(1, 5000)]
+        output = format_traces_as_hierarchy(spans)
+        assert output.count("op (10.00ms, self") == 5000
+
+    def test_self_parent_and_duplicate_span_ids(self):
+        """Test that malformed parent links are shown once instead of looping"""
+        from datadog_mcp.utils.formatters import format_traces_as_hierarchy
+
+        first = {**make_span("1", None, "root", 0, 100), "trace_id": "a"}
+        self_parent = {**make_span("7", "7", "self.parent", 0, 10), "trace_id": "a"}
+        duplicate = {**make_span("1", "1", "duplicate", 10, 20), "trace_id": "a"}
+        other_trace = [
+            {**make_span("1", None, "other.root", 0, 50), "trace_id": "b"},
+            {**make_span("2", "1", "other.child", 5, 10), "trace_id": "b"},
+        ]
+        output = format_traces_as_hierarchy([first, self_parent, duplicate, *other_trace])
+        assert output.count("self.parent") == 1
+        assert output.count("duplicate") == 1
+        assert output.count("other.child") == 1
+        # Children are looked up within their own trace
+        lines = output.splitlines()
+        root_line = next(index for index, line in enumerate(lines) if "other.root" in line)
+        assert "└─ web-api - other.child" in lines[root_line + 1]
+
+    def test_parent_cycle_is_shown(self):
+        """Test that spans whose parents form a cycle are shown, not dropped"""
+        from datadog_mcp.utils.formatters import format_traces_as_hierarchy
+
+        spans = [
+            make_span("1", None, "root", 0, 100),
+            make_span("2", "3", "cycle.first", 0, 50),
+            make_span("3", "2", "cycle.second", 10, 20),
+            make_span("4", "3", "below.cycle", 12, 5),
+        ]
+        output = format_traces_as_hierarchy(spans)
+        assert "3 span(s) in or below parent cycles" in output
+        lines = output.splitlines()
+        assert len([line for line in lines if "ms, self " in line]) == len(spans)
+        cycle_line = next(index for index, line in enumerate(lines) if "cycle.first" in line)
+        assert "└─ web-api - cycle.second" in lines[cycle_line + 1]
+        assert "└─ web-api - below.cycle" in lines[cycle_line + 2]
+
+
 class TestTraceFiltering:
     """Test trace filtering functionality"""
 